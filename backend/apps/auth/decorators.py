@@ -2,9 +2,8 @@
 Custom Decorators for RBAC
 Provides convenient decorators for function-based views.
 
-NOTE: These decorators are scaffolding for Phase 3+ features
-(Branch Management, Patient Management, Exam Management, etc.).
-They are NOT currently used but are part of the planned RBAC architecture.
+NOTE: These decorators are part of the planned RBAC architecture for
+Phase 3+ features (Branch Management, Patient Management, Exam Management, etc.).
 """
 import logging
 
@@ -104,6 +104,12 @@ class Command(BaseCommand):
                 'description': 'Puede ver registros clínicos completos',
                 'module': 'patients'
             },
+            {
+                'code': 'patients.merge',
+                'name': 'Fusionar Pacientes',
+                'description': 'Puede fusionar registros de pacientes duplicados',
+                'module': 'patients'
+            },
             
             # Results & Reports Permissions
             {
@@ -391,6 +397,7 @@ class Command(BaseCommand):
                 'orders.transfer',
                 'orders.cancel',
                 'patients.view',
+                'patients.merge',
                 'results.submit',
                 'results.view',
                 'results.approve',
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-19 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(choices=[('login', 'Login Exitoso'), ('logout', 'Logout'), ('login_failed', 'Intento de Login Fallido'), ('password_change', 'Cambio de Contraseña'), ('password_reset', 'Reseteo de Contraseña'), ('account_locked', 'Cuenta Bloqueada'), ('account_unlocked', 'Cuenta Desbloqueada'), ('permission_denied', 'Permiso Denegado'), ('token_refresh', 'Token Renovado'), ('token_blacklist', 'Token Revocado'), ('patient_merge', 'Fusión de Pacientes'), ('patient_merge_undo', 'Fusión de Pacientes Revertida')], max_length=50, verbose_name='acción'),
+        ),
+    ]
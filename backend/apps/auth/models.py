@@ -408,6 +408,7 @@ class AuditLog(models.Model):
     - Password changes
     - Account lockouts
     - Permission denied events
+    - Sensitive data operations (e.g. patient merges)
     
     Fields:
     - user: User who performed the action (null for failed logins)
@@ -429,6 +430,9 @@ class AuditLog(models.Model):
         ('permission_denied', 'Permiso Denegado'),
         ('token_refresh', 'Token Renovado'),
         ('token_blacklist', 'Token Revocado'),
+        ('patient_merge', 'Fusión de Pacientes'),
+        ('patient_merge_undo', 'Fusión de Pacientes Revertida'),
+        ('order_transfer', 'Transferencia de Órdenes'),
     ]
     
     user = models.ForeignKey(
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-19 05:02
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='branch',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Upper(django.db.models.functions.text.Replace('code', models.Value('-'), models.Value(''))), name='branches_code_prefix_unique', violation_error_message='Ya existe una sucursal con el mismo código (sin distinguir mayúsculas ni guiones).'),
+        ),
+    ]
@@ -9,6 +9,8 @@ Models:
 """
 
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Replace, Upper
 from django.core.validators import MinLengthValidator
 
 
@@ -21,7 +23,9 @@ class Branch(models.Model):
     
     Fields:
     - name: Branch name
-    - code: Unique branch code (for internal reference)
+    - code: Unique branch code (for internal reference); also unique
+      ignoring case and hyphens, since order numbers carry it in that
+      form (see apps.exams.numbering)
     - address: Physical address
     - phone: Contact phone
     - email: Contact email
@@ -77,6 +81,13 @@ class Branch(models.Model):
             models.Index(fields=['code']),
             models.Index(fields=['is_active']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                Upper(Replace('code', Value('-'), Value(''))),
+                name='branches_code_prefix_unique',
+                violation_error_message='Ya existe una sucursal con el mismo código (sin distinguir mayúsculas ni guiones).',
+            ),
+        ]
     
     def __str__(self):
         return f'{self.code} - {self.name}'
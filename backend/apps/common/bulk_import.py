@@ -0,0 +1,370 @@
+"""
+Bulk Import Pipeline
+====================
+
+Streaming CSV import for legacy migrations (patients, exam catalog,
+price lists) with hundreds of thousands of rows.
+
+Pipeline, per chunk of `chunk_size` rows:
+
+    CSV file --(stream)--> ImportSpec.clean_row() --> rejects -> error file
+                                  |
+                                  v
+        COPY into a temporary staging table (one round trip)
+                                  |
+                                  v
+        INSERT INTO target SELECT ... FROM staging
+        ON CONFLICT (natural key) DO UPDATE        (one set-based upsert)
+
+The file is never loaded whole: memory is bounded by the chunk size.
+Each chunk is its own transaction, so a failure only loses that chunk
+(its rows are written to the error file with the database message).
+
+Usage:
+    class ExamTypeImportSpec(ImportSpec):
+        model = ExamType
+        columns = ('code', 'name', 'price')
+        conflict_fields = ('code',)
+
+    result = BulkImporter(ExamTypeImportSpec()).run(rows)
+
+Management commands subclass BaseImportCommand and only set `spec_class`.
+"""
+import csv
+import io
+import logging
+import os
+import time
+from collections import namedtuple
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+STAGING_TABLE = 'bulk_import_staging'
+
+# Staging column holding the source line, used to keep the last
+# occurrence of a key repeated within a chunk
+LINE_COLUMN = '_line'
+
+# Written for None; COPY turns it into NULL (FORCE_NULL also matches it
+# quoted, which is how csv.QUOTE_NONNUMERIC writes every string)
+NULL_MARKER = '\\N'
+
+
+class RowError(Exception):
+    """A CSV row that cannot be imported; the message goes to the error file."""
+
+
+class ImportResult(namedtuple('ImportResult', ['total', 'inserted', 'updated', 'rejected', 'elapsed'])):
+    """Outcome of an import run."""
+
+    @property
+    def rows_per_second(self):
+        return self.total / max(self.elapsed, 1e-6)
+
+
+def iter_csv_rows(stream, delimiter=','):
+    """
+    Stream a CSV file as (line_number, row dict) pairs.
+
+    Header names are lowercased and stripped so legacy exports with
+    'Código ' or 'NOMBRE' style headers map onto spec columns.
+    """
+    reader = csv.reader(stream, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [name.strip().lstrip('\ufeff').lower() for name in header]
+    for row in reader:
+        if not any(value.strip() for value in row):
+            continue
+        yield reader.line_num, dict(zip(header, (value.strip() for value in row)))
+
+
+def chunked(iterable, size):
+    """Yield lists of at most `size` items."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ImportSpec:
+    """
+    Describes how CSV rows map onto a table.
+
+    Attributes:
+        model: Target Django model
+        columns: Model fields written by the import (values from clean_row)
+        conflict_fields: Natural key; must be backed by a unique constraint
+        update_fields: Fields overwritten when the key already exists
+            (default: every column except the key)
+        required: CSV columns that must be present and non-empty
+    """
+
+    model = None
+    columns = ()
+    conflict_fields = ()
+    update_fields = None
+    required = ()
+
+    def prepare(self):
+        """Hook run once before the import (e.g. load lookup tables)."""
+
+    def finish(self, result):
+        """Hook run once after the import (e.g. invalidate caches)."""
+
+    def clean_field(self, name, value):
+        """
+        Validate a raw value with the model field's own rules (type,
+        max_length, choices, validators) and return the Python value.
+        """
+        field = self.model._meta.get_field(name)
+        if value == '' and field.null:
+            value = None
+        try:
+            return field.clean(value, None)
+        except ValidationError as e:
+            raise RowError(f'{name}: {" ".join(e.messages)}')
+
+    def clean_row(self, row):
+        """
+        Turn a CSV row dict into a dict of column values.
+
+        The default validates each column through `clean_field`;
+        subclasses override it to map legacy formats or derive columns.
+
+        Raises:
+            RowError: the row is rejected
+        """
+        return {name: self.clean_field(name, row.get(name, '')) for name in self.columns}
+
+    def check_required(self, row):
+        missing = [name for name in self.required if not row.get(name)]
+        if missing:
+            raise RowError(f'Faltan columnas obligatorias: {", ".join(missing)}')
+
+    # ── SQL ────────────────────────────────────────────────────
+
+    def db_columns(self):
+        return [self.model._meta.get_field(name).column for name in self.columns]
+
+    def upsert_sql(self):
+        """
+        INSERT ... SELECT FROM staging ON CONFLICT DO UPDATE.
+
+        DISTINCT ON keeps the last line of keys repeated within a chunk
+        (Postgres rejects an upsert that touches the same row twice).
+        `xmax = 0` in RETURNING is true only for freshly inserted rows.
+        Fields outside `columns` with a Django default (or the implicit ''
+        of NOT NULL text fields) get it as a literal on insert: model
+        defaults do not exist in the database.
+
+        Returns:
+            (sql, params)
+        """
+        quote = connection.ops.quote_name
+        opts = self.model._meta
+        columns = self.db_columns()
+        keys = [opts.get_field(name).column for name in self.conflict_fields]
+        update_fields = self.update_fields
+        if update_fields is None:
+            update_fields = [name for name in self.columns if name not in self.conflict_fields]
+        updates = [opts.get_field(name).column for name in update_fields]
+
+        insert_columns = list(columns)
+        select_values = [quote(c) for c in columns]
+        params = []
+        for field in opts.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                if field.column not in insert_columns:
+                    insert_columns.append(field.column)
+                    select_values.append('now()')
+                if getattr(field, 'auto_now', False):
+                    updates.append(field.column)
+            elif field.column not in insert_columns and not field.primary_key and (
+                field.has_default() or (field.empty_strings_allowed and not field.null)
+            ):
+                insert_columns.append(field.column)
+                select_values.append(f'CAST(%s AS {field.db_type(connection)})')
+                params.append(field.get_db_prep_save(field.get_default(), connection))
+
+        key_list = ', '.join(quote(c) for c in keys)
+        return f"""
+            INSERT INTO {quote(opts.db_table)} ({', '.join(quote(c) for c in insert_columns)})
+            SELECT DISTINCT ON ({key_list}) {', '.join(select_values)}
+            FROM {STAGING_TABLE}
+            ORDER BY {key_list}, {LINE_COLUMN} DESC
+            ON CONFLICT ({key_list}) DO UPDATE SET
+                {', '.join(f'{quote(c)} = EXCLUDED.{quote(c)}' for c in updates)}
+            RETURNING (xmax = 0)
+        """, params
+
+
+class BulkImporter:
+    """
+    Runs an ImportSpec over a stream of (line_number, row) pairs.
+
+    Args:
+        spec: ImportSpec instance
+        error_file: Text stream for rejected rows (CSV: line, error, original columns)
+        chunk_size: Rows validated, copied and upserted per transaction
+        progress: Optional callback(ImportResult) called after each chunk
+    """
+
+    def __init__(self, spec, error_file=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        self.spec = spec
+        self.error_file = error_file
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self._error_writer = None
+
+    def run(self, rows):
+        started = time.monotonic()
+        total = inserted = updated = rejected = 0
+        self.spec.prepare()
+
+        for chunk in chunked(rows, self.chunk_size):
+            valid = []
+            for line, row in chunk:
+                try:
+                    self.spec.check_required(row)
+                    valid.append((line, row, self.spec.clean_row(row)))
+                except RowError as e:
+                    self._reject(line, row, str(e))
+                    rejected += 1
+
+            if valid:
+                try:
+                    chunk_inserted, chunk_updated = self._load(valid)
+                    inserted += chunk_inserted
+                    updated += chunk_updated
+                except DatabaseError as e:
+                    logger.warning('Import chunk rejected by the database: %s', e)
+                    message = f'Error de base de datos: {str(e).strip().splitlines()[0]}'
+                    for line, row, _ in valid:
+                        self._reject(line, row, message)
+                    rejected += len(valid)
+
+            total += len(chunk)
+            if self.progress:
+                self.progress(ImportResult(total, inserted, updated, rejected, time.monotonic() - started))
+
+        result = ImportResult(total, inserted, updated, rejected, time.monotonic() - started)
+        self.spec.finish(result)
+        return result
+
+    def _load(self, valid):
+        """COPY one chunk into the staging table and upsert it; returns (inserted, updated)."""
+        columns = self.spec.db_columns()
+        buffer = io.StringIO()
+        # QUOTE_NONNUMERIC quotes every string, so '' stays an empty string;
+        # None is written as NULL_MARKER, loaded as NULL through FORCE_NULL
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC, lineterminator='\n')
+        for line, _, values in valid:
+            writer.writerow([line] + [
+                NULL_MARKER if values[name] is None else values[name] for name in self.spec.columns
+            ])
+        buffer.seek(0)
+
+        quote = connection.ops.quote_name
+        with transaction.atomic(), connection.cursor() as cursor:
+            # ON COMMIT DROP does not fire when nested in an outer atomic block
+            cursor.execute(f'DROP TABLE IF EXISTS {STAGING_TABLE}')
+            cursor.execute(
+                f'CREATE TEMP TABLE {STAGING_TABLE} ON COMMIT DROP AS '
+                f'SELECT 0::bigint AS {LINE_COLUMN}, {", ".join(quote(c) for c in columns)} '
+                f'FROM {quote(self.spec.model._meta.db_table)} WITH NO DATA'
+            )
+            column_list = ', '.join(quote(c) for c in columns)
+            cursor.copy_expert(
+                f'COPY {STAGING_TABLE} ({LINE_COLUMN}, {column_list}) '
+                f"FROM STDIN WITH (FORMAT csv, NULL '{NULL_MARKER}', FORCE_NULL ({column_list}))",
+                buffer,
+            )
+            cursor.execute(*self.spec.upsert_sql())
+            flags = [row[0] for row in cursor.fetchall()]
+
+        chunk_inserted = sum(flags)
+        return chunk_inserted, len(flags) - chunk_inserted
+
+    def _reject(self, line, row, message):
+        if self.error_file is None:
+            return
+        if self._error_writer is None:
+            self._error_writer = csv.writer(self.error_file)
+            self._error_writer.writerow(['line', 'error', *row.keys()])
+        self._error_writer.writerow([line, message, *row.values()])
+
+
+class BaseImportCommand(BaseCommand):
+    """
+    Management command base for CSV imports.
+
+    Subclasses set `spec_class` (and optionally `label`); the command
+    handles file arguments, the error file and rows/sec reporting.
+    """
+
+    spec_class = None
+    label = 'rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='CSV file to import')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows validated and upserted per transaction (default: {DEFAULT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--errors',
+            help='Where to write rejected rows (default: <csv_path>.errors.csv)'
+        )
+        parser.add_argument('--delimiter', default=',', help='CSV delimiter (default: ,)')
+        parser.add_argument('--encoding', default='utf-8-sig', help='File encoding (default: utf-8-sig)')
+
+    def get_spec(self, options):
+        return self.spec_class()
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        csv_path = options['csv_path']
+        errors_path = options['errors'] or f'{csv_path}.errors.csv'
+        self.stdout.write(self.style.SUCCESS(f'\n📥 Importing {self.label} from {csv_path}...\n'))
+
+        def report(result):
+            self.stdout.write(
+                f'   ✓ {result.total} rows ({result.inserted} new, {result.updated} updated, '
+                f'{result.rejected} rejected) - {result.rows_per_second:.0f} rows/s'
+            )
+
+        with open(csv_path, newline='', encoding=options['encoding']) as source, \
+                open(errors_path, 'w', newline='', encoding='utf-8') as error_file:
+            importer = BulkImporter(
+                self.get_spec(options),
+                error_file=error_file,
+                chunk_size=options['chunk_size'],
+                progress=report,
+            )
+            result = importer.run(iter_csv_rows(source, delimiter=options['delimiter']))
+
+        if not result.rejected:
+            os.remove(errors_path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Imported {result.inserted + result.updated} {self.label} '
+            f'({result.inserted} new, {result.updated} updated) in {result.elapsed:.1f}s '
+            f'({result.rows_per_second:.0f} rows/s)'
+        ))
+        if result.rejected:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {result.rejected} rows rejected, see {errors_path}\n'
+            ))
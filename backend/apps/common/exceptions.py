@@ -0,0 +1,27 @@
+"""
+Common Exceptions
+=================
+
+Exceptions raised by service-layer code. Views translate them into
+HTTP responses; the message is user-facing (Spanish).
+"""
+
+
+class BusinessRuleError(Exception):
+    """
+    A request is well-formed but violates a business rule
+    (e.g. merging a patient into itself). Views map it to HTTP 400.
+    """
+
+    def __init__(self, message, code='business_rule', details=None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.details = details or {}
+
+    def as_response_data(self):
+        """Payload in the API's error format."""
+        data = {'error': self.message, 'code': self.code}
+        if self.details:
+            data['details'] = self.details
+        return data
@@ -1,3 +1,46 @@
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from apps.branches.models import Branch
+from apps.common.bulk_import import BulkImporter
+from apps.patients.management.commands.import_patients import PatientImportSpec
+from apps.patients.models import Patient
+
+
+class NullablePatientImportSpec(PatientImportSpec):
+    """Patient spec that also writes a nullable FK (always empty)."""
+
+    columns = (*PatientImportSpec.columns, 'merged_into')
+
+    def clean_row(self, row):
+        values = super().clean_row(row)
+        values['merged_into'] = None
+        return values
+
+
+@skipUnless(connection.vendor == 'postgresql', 'COPY requires PostgreSQL')
+class BulkImportNullTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Branch.objects.create(name='Matriz', code='LAB-01')
+
+    def test_none_is_loaded_as_null_and_blank_text_as_empty_string(self):
+        row = {
+            'identification_number': '0102030405',
+            'first_name': 'Ana',
+            'last_name': 'Pérez',
+            'date_of_birth': '1990-05-01',
+            'gender': 'F',
+            'email': '',
+            'branch': 'LAB-01',
+        }
+
+        result = BulkImporter(NullablePatientImportSpec()).run([(2, row)])
+
+        self.assertEqual((result.inserted, result.rejected), (1, 0))
+        patient = Patient.objects.get(identification_number='0102030405')
+        self.assertIsNone(patient.merged_into_id)
+        self.assertEqual(patient.email, '')
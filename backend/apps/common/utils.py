@@ -0,0 +1,50 @@
+"""
+Common Utilities
+================
+
+Small helper functions shared across apps.
+"""
+
+import re
+import unicodedata
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_NON_DIGIT_RE = re.compile(r'\D+')
+
+# Trailing digits kept from phone numbers (drops country/trunk prefixes)
+PHONE_SIGNIFICANT_DIGITS = 9
+
+
+def strip_accents(value):
+    """
+    Remove diacritics from a string ('González' -> 'Gonzalez').
+
+    The 'ñ' is decomposed to 'n' as well, which matches what Postgres
+    `unaccent` does, so Python-side and SQL-side normalization agree.
+    """
+    decomposed = unicodedata.normalize('NFKD', value)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_text(value):
+    """
+    Normalize free text for indexing and comparison.
+
+    Lowercases, strips accents and collapses whitespace:
+        '  María   José GONZÁLEZ ' -> 'maria jose gonzalez'
+    """
+    if not value:
+        return ''
+    value = strip_accents(str(value)).lower()
+    return _WHITESPACE_RE.sub(' ', value).strip()
+
+
+def normalize_phone(value):
+    """
+    Reduce a phone number to its significant trailing digits.
+
+    '+593 99 123 4567' and '099-123-4567' both become '991234567', so
+    numbers typed with or without country/trunk prefixes compare equal.
+    """
+    digits = _NON_DIGIT_RE.sub('', value or '')
+    return digits[-PHONE_SIGNIFICANT_DIGITS:]
@@ -0,0 +1,146 @@
+"""
+Order Access Filter
+===================
+
+Which orders a user can see, by role and branch:
+
+- Superadmin: all orders
+- Lab technician: pending orders currently at their branch
+- Doctor: orders created at their branch
+- Manager / finance: orders created at OR currently at their branch
+
+The manager/finance rule is the expensive one. Written as
+Q(root_branch=b) | Q(current_branch=b), Postgres plans a BitmapOr (or a
+sequential scan) with poor row estimates and has to sort every matching
+order to serve a page. Instead it is compiled as
+
+    SELECT ... FROM exam_orders WHERE root_branch_id = b [AND status = s]
+    UNION ALL
+    SELECT ... FROM exam_orders WHERE current_branch_id = b AND root_branch_id <> b [AND status = s]
+    ORDER BY created_at DESC LIMIT n
+
+Each arm is a range scan of its (branch, status, created_at) index, the
+second arm excludes what the first already returned (de-duplication
+without a hash or sort), and ORDER BY ... LIMIT becomes a Merge Append
+that stops after n rows.
+
+A combined queryset supports ordering, slicing, count() and values() but
+not further filter() calls, so the status filter is pushed into both
+arms here. Compare both plans with `manage.py benchmark_order_visibility`.
+
+The same rules, applied to single order events instead of querysets,
+are exposed as order_scope() / scope_allows() for the live event stream.
+"""
+from collections import namedtuple
+
+from django.db.models import Q
+
+from .models import ExamOrder
+
+BRANCH_WIDE_ROLES = ('manager', 'finance_user')
+
+# role is None for users who see every order
+OrderScope = namedtuple('OrderScope', ['role', 'branch_id'])
+
+
+def branch_orders_or(branch, status=None, queryset=None):
+    """Reference OR formulation of branch visibility (benchmarks only)."""
+    queryset = ExamOrder.objects.all() if queryset is None else queryset
+    queryset = queryset.filter(Q(root_branch=branch) | Q(current_branch=branch))
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+def branch_orders(branch, status=None, queryset=None):
+    """
+    Orders created at or currently at a branch, as a UNION ALL of two
+    index scans.
+
+    Args:
+        branch: Branch instance or id
+        status: Optional status, applied inside both arms
+        queryset: Base ExamOrder queryset (e.g. with .only()); must not
+            be sliced or ordered
+
+    Returns:
+        Combined queryset; order it (e.g. '-created_at') and slice it
+    """
+    queryset = ExamOrder.objects.all() if queryset is None else queryset
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    created_here = queryset.filter(root_branch=branch).order_by()
+    moved_here = queryset.filter(current_branch=branch).exclude(root_branch=branch).order_by()
+    return created_here.union(moved_here, all=True)
+
+
+class OrderAccessFilter:
+    """Determines which orders a user can access based on role and branch"""
+
+    @staticmethod
+    def get_accessible_orders(user, status=None):
+        """
+        Returns queryset of orders user can access.
+
+        Args:
+            user: Authenticated user
+            status: Optional status filter (pushed into the index scans)
+
+        Returns:
+            ExamOrder queryset; for managers and finance users a combined
+            (UNION ALL) queryset, see branch_orders()
+        """
+        orders = ExamOrder.objects.all()
+        profile = getattr(user, 'profile', None)
+
+        if user.is_superuser or (profile is not None and profile.role == 'superadmin'):
+            return orders if status is None else orders.filter(status=status)
+
+        if profile is None or not profile.branch_id:
+            return orders.none()
+
+        if profile.role == 'lab_technician':
+            if status not in (None, 'pending'):
+                return orders.none()
+            return orders.filter(current_branch_id=profile.branch_id, status='pending')
+
+        if profile.role == 'doctor':
+            orders = orders.filter(root_branch_id=profile.branch_id)
+            return orders if status is None else orders.filter(status=status)
+
+        if profile.role in BRANCH_WIDE_ROLES:
+            return branch_orders(profile.branch_id, status=status)
+
+        return orders.none()
+
+
+def order_scope(user):
+    """
+    Resolve the order visibility of a user once (e.g. per event stream).
+
+    Returns:
+        OrderScope, or None if the user cannot see any order
+    """
+    profile = getattr(user, 'profile', None)
+    if user.is_superuser or (profile is not None and profile.role == 'superadmin'):
+        return OrderScope(None, None)
+    if profile is None or not profile.branch_id:
+        return None
+    return OrderScope(profile.role, profile.branch_id)
+
+
+def scope_allows(scope, root_branch_id, current_branch_id):
+    """
+    Whether an order event is visible in a scope. Technicians see every
+    event of orders at their branch (not only pending ones), so they
+    also learn when work leaves their queue.
+    """
+    if scope.role is None:
+        return True
+    if scope.role == 'lab_technician':
+        return current_branch_id == scope.branch_id
+    if scope.role == 'doctor':
+        return root_branch_id == scope.branch_id
+    if scope.role in BRANCH_WIDE_ROLES:
+        return scope.branch_id in (root_branch_id, current_branch_id)
+    return False
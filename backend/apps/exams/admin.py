@@ -1,3 +1,95 @@
+"""
+Django Admin Configuration for Exam Models
+"""
 from django.contrib import admin
+from .models import Analyzer, AnalyzerRun, ExamType, ExamOrder, OrderItem, OrderTransfer, PanelComponent
 
-# Register your models here.
+
+class PanelComponentInline(admin.TabularInline):
+    """Direct components of a panel; the closure table follows via signals"""
+    model = PanelComponent
+    fk_name = 'panel'
+    extra = 0
+    raw_id_fields = ['component']
+
+
+@admin.register(ExamType)
+class ExamTypeAdmin(admin.ModelAdmin):
+    """Exam catalog admin"""
+
+    list_display = ['code', 'name', 'category', 'sample_type', 'price', 'turnaround_hours', 'is_active']
+
+    list_filter = ['is_active', 'category', 'sample_type']
+
+    search_fields = ['code', 'name']
+
+    readonly_fields = ['created_at', 'updated_at']
+
+    inlines = [PanelComponentInline]
+
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    extra = 0
+    raw_id_fields = ['exam_type', 'panel']
+    readonly_fields = ['price', 'is_panel', 'branch', 'due_at', 'priority_score', 'claimed_by', 'claimed_at', 'claim_expires_at', 'analyzer_run', 'run_position']
+
+
+class OrderTransferInline(admin.TabularInline):
+    """Transfer history (written by the transfer service only)"""
+    model = OrderTransfer
+    extra = 0
+    can_delete = False
+    readonly_fields = ['batch_id', 'from_branch', 'to_branch', 'reason', 'transferred_by', 'transferred_at']
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ExamOrder)
+class ExamOrderAdmin(admin.ModelAdmin):
+    """Exam order admin"""
+
+    list_display = [
+        'order_number', 'patient', 'root_branch', 'current_branch', 'status', 'priority', 'total_price', 'created_at'
+    ]
+
+    list_filter = ['status', 'priority', 'root_branch', 'current_branch']
+
+    search_fields = ['order_number', 'patient__identification_number']
+
+    raw_id_fields = ['patient', 'created_by']
+
+    readonly_fields = ['order_number', 'root_branch', 'total_price', 'created_at', 'updated_at']
+
+    list_select_related = ['patient', 'root_branch', 'current_branch']
+
+    inlines = [OrderItemInline, OrderTransferInline]
+
+
+@admin.register(Analyzer)
+class AnalyzerAdmin(admin.ModelAdmin):
+    """Instruments of each branch and the exams they run"""
+
+    list_display = ['code', 'name', 'branch', 'rack_capacity', 'max_tests_per_run', 'is_active']
+
+    list_filter = ['is_active', 'branch']
+
+    search_fields = ['code', 'name']
+
+    filter_horizontal = ['exam_types']
+
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(AnalyzerRun)
+class AnalyzerRunAdmin(admin.ModelAdmin):
+    """Analyzer runs (built by the batching service; deleting one returns its items to the queue)"""
+
+    list_display = ['analyzer', 'sequence', 'sample_type', 'positions', 'tests', 'branch', 'created_by', 'created_at']
+
+    list_filter = ['sample_type', 'branch', 'analyzer']
+
+    readonly_fields = ['analyzer', 'branch', 'sample_type', 'sequence', 'positions', 'tests', 'created_by', 'created_at']
+
+    list_select_related = ['analyzer']
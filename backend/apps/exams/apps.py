@@ -6,3 +6,6 @@ class ExamsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.exams'
     verbose_name = 'Exams'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects catalog invalidation)
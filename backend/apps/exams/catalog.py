@@ -0,0 +1,175 @@
+"""
+Exam Catalog Cache
+==================
+
+Per-process, read-only copy of the active exam catalog, indexed by id.
+Order creation, total calculation and the catalog listing read from it
+instead of the database.
+
+Invalidation uses a version counter in Redis:
+- Saving or deleting an ExamType or a panel component (or a bulk
+  import) bumps the counter after the transaction commits
+- Each process remembers the version it loaded; at most once every
+  VERSION_CHECK_INTERVAL seconds it compares it with Redis (one GET) and
+  reloads the catalog (exams + panel closure: two queries) only if it
+  changed
+
+In the steady state a catalog read costs no database query and at most
+one Redis GET per interval.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import namedtuple
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.common.exceptions import BusinessRuleError
+from .models import ExamType
+from .panels import leaf_components
+
+VERSION_KEY = 'exam_catalog_version'
+
+# Seconds a process trusts its loaded catalog before re-checking Redis
+VERSION_CHECK_INTERVAL = 1.0
+
+CatalogExam = namedtuple(
+    'CatalogExam',
+    [
+        'id', 'code', 'name', 'category', 'price', 'sample_type', 'turnaround_hours',
+        'unit', 'reference_low', 'reference_high',
+    ]
+)
+
+_DECIMAL_FIELDS = ('price', 'reference_low', 'reference_high')
+
+_CATALOG_FIELDS = CatalogExam._fields
+
+
+class Catalog:
+    """
+    Immutable snapshot of the active catalog.
+
+    `components` maps a panel's id to the ids of the leaf exams it
+    expands into (from the closure table), so panel expansion is a dict
+    lookup.
+    """
+
+    def __init__(self, version, exams, components=None):
+        self.version = version
+        self.exams = tuple(exams)
+        self.components = components or {}
+        self.by_id = {exam.id: exam for exam in self.exams}
+        self.payload = [
+            {
+                **exam._asdict(),
+                **{f: None if getattr(exam, f) is None else str(getattr(exam, f)) for f in _DECIMAL_FIELDS},
+            }
+            for exam in self.exams
+        ]
+        digest = hashlib.sha1(json.dumps(self.payload, sort_keys=True).encode()).hexdigest()
+        self.etag = f'"catalog-{digest[:20]}"'
+
+    def get(self, exam_type_id):
+        return self.by_id.get(exam_type_id)
+
+    def components_of(self, exam_type_id):
+        """Component exam ids of a panel (empty for single exams)."""
+        return self.components.get(exam_type_id, ())
+
+
+_lock = threading.Lock()
+_state = {'catalog': None, 'checked_at': 0.0}
+
+
+def current_version():
+    """Read the catalog version from Redis (0 if never bumped)."""
+    return cache.get(VERSION_KEY, 0)
+
+
+def bump_version():
+    """Invalidate every process's catalog; returns the new version."""
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        # Key missing (first bump or Redis flushed); add() keeps a racing
+        # bump from being overwritten
+        if cache.add(VERSION_KEY, 1, timeout=None):
+            return 1
+        return cache.incr(VERSION_KEY)
+
+
+def invalidate_on_commit():
+    """Bump the version once the current transaction commits."""
+    transaction.on_commit(bump_version)
+
+
+def _load(version):
+    rows = (
+        ExamType.objects.filter(is_active=True)
+        .order_by('category', 'name')
+        .values_list(*_CATALOG_FIELDS)
+    )
+    exams = [CatalogExam(*row) for row in rows]
+    position = {exam.id: index for index, exam in enumerate(exams)}
+    # Panels expand to their active leaf exams, in catalog order
+    components = {
+        panel_id: tuple(sorted((pk for pk in leaves if pk in position), key=position.get))
+        for panel_id, leaves in leaf_components().items()
+        if panel_id in position
+    }
+    return Catalog(version, exams, components)
+
+
+def get_catalog():
+    """
+    Return the active catalog, reloading it if another process changed it.
+
+    Returns:
+        Catalog snapshot (treat as read-only)
+    """
+    catalog = _state['catalog']
+    now = time.monotonic()
+    if catalog is not None and now - _state['checked_at'] < VERSION_CHECK_INTERVAL:
+        return catalog
+
+    version = current_version()
+    if catalog is not None and catalog.version == version:
+        _state['checked_at'] = now
+        return catalog
+
+    with _lock:
+        catalog = _state['catalog']
+        if catalog is None or catalog.version != version:
+            catalog = _load(version)
+            _state['catalog'] = catalog
+        _state['checked_at'] = now
+    return catalog
+
+
+def clear_local_cache():
+    """Drop this process's snapshot (tests, shell sessions)."""
+    with _lock:
+        _state['catalog'] = None
+        _state['checked_at'] = 0.0
+
+
+def price_total(exam_type_ids):
+    """
+    Sum the list prices of the given exam types from the cached catalog.
+
+    Raises:
+        BusinessRuleError: unknown or inactive exam types
+    """
+    catalog = get_catalog()
+    missing = sorted({pk for pk in exam_type_ids if pk not in catalog.by_id})
+    if missing:
+        raise BusinessRuleError(
+            'Algunos exámenes no existen o están inactivos.',
+            code='invalid_exam_types',
+            details={'exam_type_ids': missing},
+        )
+    return sum((catalog.by_id[pk].price for pk in exam_type_ids), Decimal('0.00'))
@@ -0,0 +1,103 @@
+"""
+Order Events
+============
+
+Order status, result-ready and critical-value events for live
+dashboards (served as Server-Sent Events by stream.py).
+
+Each event is appended to a capped Redis stream (the short history used
+to resume after a reconnect, via Last-Event-ID) and published on a pub/sub
+channel (live fan-out), atomically in one Lua script per batch, so a
+batch of 500 orders costs one Redis round trip. The stream entry id is
+the SSE event id.
+
+Events are published after the surrounding transaction commits. Redis
+failures are logged and swallowed: dashboards are a convenience, never a
+reason to fail an order.
+"""
+import json
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = 'clinical_lab:order_events'
+CHANNEL = 'clinical_lab:order_events'
+
+# Roughly how many events are kept for Last-Event-ID resume
+STREAM_MAXLEN = 10_000
+
+ORDER_STATUS = 'order_status'
+RESULT_READY = 'result_ready'
+CRITICAL_VALUE = 'critical_value'
+
+# ARGV[1] = maxlen, ARGV[2..] = JSON payloads. Publishes "<id>\n<payload>".
+_PUBLISH_SCRIPT = """
+for i = 2, #ARGV do
+    local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', 'data', ARGV[i])
+    redis.call('PUBLISH', KEYS[2], id .. '\\n' .. ARGV[i])
+end
+return #ARGV - 1
+"""
+
+
+def order_event(event_type, order_id, order_number, status, root_branch_id, current_branch_id, **extra):
+    """
+    Build an event payload. Branch ids are always included: subscribers
+    filter on them by role (see access.scope_allows).
+    """
+    return {
+        'type': event_type,
+        'order_id': order_id,
+        'order_number': order_number,
+        'status': status,
+        'root_branch_id': root_branch_id,
+        'current_branch_id': current_branch_id,
+        'at': timezone.now().isoformat(),
+        **extra,
+    }
+
+
+def order_status_events(orders, **extra):
+    """order_status events for ExamOrder instances."""
+    return [
+        order_event(
+            ORDER_STATUS, order.id, order.order_number, order.status,
+            order.root_branch_id, order.current_branch_id, **extra
+        )
+        for order in orders
+    ]
+
+
+def publish_events(events):
+    """Append events to the stream and publish them now."""
+    if not events:
+        return
+    try:
+        redis = get_redis_connection('default')
+        publish = redis.register_script(_PUBLISH_SCRIPT)
+        publish(
+            keys=[STREAM_KEY, CHANNEL],
+            args=[STREAM_MAXLEN, *(json.dumps(event, separators=(',', ':')) for event in events)],
+        )
+    except RedisError:
+        logger.warning('Could not publish %d order events', len(events), exc_info=True)
+
+
+def publish_on_commit(events):
+    """Publish events once the current transaction commits."""
+    events = list(events)
+    if events:
+        transaction.on_commit(lambda: publish_events(events))
+
+
+def parse_message(data):
+    """Split a pub/sub message into (event id, payload dict)."""
+    if isinstance(data, bytes):
+        data = data.decode()
+    event_id, _, payload = data.partition('\n')
+    return event_id, json.loads(payload)
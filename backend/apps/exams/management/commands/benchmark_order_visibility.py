@@ -0,0 +1,147 @@
+"""
+Management command to benchmark branch order visibility: OR vs UNION ALL
+Run with: python manage.py benchmark_order_visibility [--orders 5000000] [--samples 20]
+
+Inserts synthetic orders spread over the existing active branches (a
+fraction of them transferred), ANALYZEs, and runs the manager/finance
+visibility query both ways with EXPLAIN ANALYZE:
+
+- or:    WHERE root_branch_id = b OR current_branch_id = b
+- union: UNION ALL of two (branch, status, created_at) index scans
+
+The synthetic rows are rolled back at the end unless --keep is given.
+"""
+import json
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from apps.branches.models import Branch
+from apps.exams.access import branch_orders, branch_orders_or
+from apps.patients.models import Patient
+
+_INSERT_SQL = """
+    INSERT INTO exam_orders (
+        order_number, patient_id, root_branch_id, current_branch_id, status, priority,
+        total_price, notes, created_by_id, created_at, updated_at
+    )
+    SELECT
+        'BENCH-' || s.g,
+        %(patient)s,
+        s.root,
+        CASE WHEN s.r1 < %(transfer_rate)s THEN s.other ELSE s.root END,
+        CASE WHEN s.r2 < 0.80 THEN 'completed' WHEN s.r2 < 0.90 THEN 'pending'
+             WHEN s.r2 < 0.95 THEN 'in_progress' ELSE 'cancelled' END,
+        'routine', 0, '', %(user)s, s.created_at, s.created_at
+    FROM (
+        SELECT
+            g,
+            (%(branches)s::bigint[])[1 + floor(random() * %(n)s)::int] AS root,
+            (%(branches)s::bigint[])[1 + floor(random() * %(n)s)::int] AS other,
+            random() AS r1,
+            random() AS r2,
+            now() - random() * interval '3 years' AS created_at
+        FROM generate_series(1, %(orders)s) AS g
+    ) AS s
+"""
+
+
+def plan_nodes(plan, depth=0):
+    """Flatten an EXPLAIN JSON plan into indented 'Node Type (index)' lines."""
+    label = plan['Node Type']
+    if plan.get('Index Name'):
+        label += f' ({plan["Index Name"]})'
+    lines = ['  ' * depth + label]
+    for child in plan.get('Plans', ()):
+        lines.extend(plan_nodes(child, depth + 1))
+    return lines
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks OR vs UNION ALL branch visibility on synthetic exam orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=5_000_000, help='Synthetic orders (default: 5000000)')
+        parser.add_argument('--transfer-rate', type=float, default=0.1, help='Share of transferred orders')
+        parser.add_argument('--samples', type=int, default=20, help='Queries per variant (default: 20)')
+        parser.add_argument('--limit', type=int, default=50, help='Page size (default: 50)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for branch/status picks')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic orders')
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        branch_ids = list(Branch.objects.filter(is_active=True).values_list('id', flat=True))
+        patient = Patient.objects.filter(is_active=True).first()
+        user = get_user_model().objects.filter(is_active=True).first()
+        if len(branch_ids) < 2 or patient is None or user is None:
+            raise CommandError('Se requieren al menos 2 sucursales activas, un paciente y un usuario.')
+
+        with transaction.atomic():
+            self._populate(options, branch_ids, patient, user)
+            self._run(options, branch_ids)
+            if not options['keep']:
+                transaction.set_rollback(True)
+                self.stdout.write('🧹 Synthetic orders rolled back\n')
+
+    def _populate(self, options, branch_ids, patient, user):
+        self.stdout.write(self.style.SUCCESS(
+            f'\n🏗️  Inserting {options["orders"]:,} synthetic orders over {len(branch_ids)} branches...'
+        ))
+        started = time.monotonic()
+        with connection.cursor() as cursor:
+            cursor.execute(_INSERT_SQL, {
+                'patient': patient.id,
+                'user': user.id,
+                'branches': branch_ids,
+                'n': len(branch_ids),
+                'orders': options['orders'],
+                'transfer_rate': options['transfer_rate'],
+            })
+            cursor.execute('ANALYZE exam_orders')
+        self.stdout.write(f'   done in {time.monotonic() - started:.1f}s\n')
+
+    def _explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ' + sql, params)
+            result = cursor.fetchone()[0]
+        if isinstance(result, str):
+            result = json.loads(result)
+        return result[0]
+
+    def _run(self, options, branch_ids):
+        rng = random.Random(options['seed'])
+        cases = [
+            (rng.choice(branch_ids), rng.choice([None, 'pending', 'completed']))
+            for _ in range(options['samples'])
+        ]
+        variants = [('or', branch_orders_or), ('union', branch_orders)]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'⏱️  {len(cases)} queries per variant, newest {options["limit"]} orders of a branch\n'
+        ))
+        self.stdout.write(f'   {"variant":<10}{"mean ms":>10}{"p50 ms":>10}{"p95 ms":>10}{"max ms":>10}')
+
+        plans = {}
+        for name, build in variants:
+            timings = []
+            for branch_id, status in cases:
+                queryset = build(branch_id, status=status).order_by('-created_at')[:options['limit']]
+                explained = self._explain(queryset)
+                timings.append(explained['Execution Time'])
+                plans.setdefault(name, explained['Plan'])
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f'   {name:<10}{statistics.mean(timings):>10.2f}{statistics.median(timings):>10.2f}'
+                f'{p95:>10.2f}{timings[-1]:>10.2f}'
+            )
+
+        for name, plan in plans.items():
+            self.stdout.write(f'\n📋 Plan ({name}, first query):')
+            for line in plan_nodes(plan):
+                self.stdout.write(f'   {line}')
+        self.stdout.write('')
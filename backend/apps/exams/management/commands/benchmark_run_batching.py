@@ -0,0 +1,65 @@
+"""
+Management command to benchmark analyzer run batching
+Run with: python manage.py benchmark_run_batching [--samples 20000] [--analyzers 6] [--exams 300]
+
+Plans runs for synthetic pending samples and analyzers in memory (no
+database needed), and reports samples per second, runs built and how
+full they are.
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from apps.exams.runs import Sample, plan_runs
+
+SAMPLE_TYPES = ('serum', 'blood', 'plasma', 'urine')
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks analyzer run assignment and bin packing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=20_000, help='Pending samples (default: 20000)')
+        parser.add_argument('--analyzers', type=int, default=6, help='Analyzers (default: 6)')
+        parser.add_argument('--exams', type=int, default=300, help='Exam types (default: 300)')
+        parser.add_argument('--rack-capacity', type=int, default=60, help='Positions per run (default: 60)')
+        parser.add_argument('--max-tests', type=int, default=250, help='Tests per run, 0 for unlimited (default: 250)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible runs')
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        rng = random.Random(options['seed'])
+        exam_ids = list(range(1, options['exams'] + 1))
+        sample_type_of = {pk: rng.choice(SAMPLE_TYPES) for pk in exam_ids}
+        analyzers = {
+            pk: (
+                set(rng.sample(exam_ids, len(exam_ids) // 3)),
+                options['rack_capacity'],
+                options['max_tests'] or None,
+            )
+            for pk in range(1, options['analyzers'] + 1)
+        }
+
+        samples = []
+        item_id = 0
+        for order_id in range(1, options['samples'] + 1):
+            by_type = {}
+            for exam_type_id in rng.sample(exam_ids, rng.randint(1, 12)):
+                item_id += 1
+                by_type.setdefault(sample_type_of[exam_type_id], []).append((item_id, exam_type_id))
+            priority = rng.choice((0, 0, 0, 10, 100)) + rng.random()
+            samples += [Sample(order_id, sample_type, priority, items) for sample_type, items in by_type.items()]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n⏱️  Batching {len(samples)} samples ({item_id} items) on {len(analyzers)} analyzers\n'
+        ))
+        started = time.perf_counter()
+        planned, unassigned = plan_runs(samples, analyzers)
+        elapsed = time.perf_counter() - started
+
+        positions = sum(len(run.positions) for run in planned)
+        tests = sum(len(item_ids) for run in planned for _, item_ids in run.positions)
+        self.stdout.write(f'   plan: {len(samples) / elapsed:12,.0f} samples/s ({elapsed * 1000:.0f} ms)')
+        self.stdout.write(f'   runs: {len(planned)}, positions used {positions / (len(planned) * options["rack_capacity"]):.1%}')
+        self.stdout.write(f'   tests batched: {tests}, unassigned: {len(unassigned)}')
+        self.stdout.write('')
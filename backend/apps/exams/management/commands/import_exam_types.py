@@ -0,0 +1,116 @@
+"""
+Management command to bulk import the exam catalog / price list from CSV
+Run with: python manage.py import_exam_types catalog.csv [--chunk-size 5000]
+
+Expected columns (header names are case-insensitive):
+    code, name, price, category, sample_type, description, is_active,
+    turnaround_hours, unit, reference_low, reference_high
+
+category and sample_type accept either the stored value ('chemistry')
+or the Spanish label ('Química Clínica'). A blank turnaround_hours
+takes the model default (24 h); a blank reference bound is left open.
+With --prices-only, existing exams only get their price updated (price
+list files).
+"""
+from apps.common.bulk_import import BaseImportCommand, ImportSpec, RowError
+from apps.common.utils import normalize_text
+from apps.exams.catalog import bump_version
+from apps.exams.models import ExamType
+
+BOOLEAN_VALUES = {
+    '': True, '1': True, 'true': True, 'si': True, 'yes': True, 'activo': True,
+    '0': False, 'false': False, 'no': False, 'inactivo': False,
+}
+
+
+def _choice_lookup(choices):
+    """Map both values and normalized labels onto the stored value."""
+    lookup = {}
+    for value, label in choices:
+        lookup[value] = value
+        lookup[normalize_text(label)] = value
+    return lookup
+
+
+def _decimal_text(value):
+    """Accept a decimal comma ('3,50') when the value has no dot."""
+    value = value.replace(' ', '')
+    if ',' in value and '.' not in value:
+        value = value.replace(',', '.')
+    return value
+
+
+class ExamTypeImportSpec(ImportSpec):
+    """Maps legacy catalog rows onto the exam_types table."""
+
+    model = ExamType
+    columns = (
+        'code', 'name', 'description', 'category', 'price', 'sample_type', 'turnaround_hours',
+        'unit', 'reference_low', 'reference_high', 'is_active',
+    )
+    conflict_fields = ('code',)
+    required = ('code', 'name', 'price')
+
+    categories = _choice_lookup(ExamType.CATEGORY_CHOICES)
+    sample_types = _choice_lookup(ExamType.SAMPLE_TYPE_CHOICES)
+    default_turnaround_hours = ExamType._meta.get_field('turnaround_hours').get_default()
+
+    def __init__(self, prices_only=False):
+        if prices_only:
+            self.update_fields = ('price',)
+
+    def finish(self, result):
+        # COPY/upsert bypasses model signals; invalidate cached catalogs
+        if result.inserted or result.updated:
+            bump_version()
+
+    def clean_row(self, row):
+        category = self.categories.get(normalize_text(row.get('category')) or 'other')
+        if category is None:
+            raise RowError(f'category: valor no reconocido {row["category"]!r}')
+
+        sample_type = self.sample_types.get(normalize_text(row.get('sample_type')) or 'blood')
+        if sample_type is None:
+            raise RowError(f'sample_type: valor no reconocido {row["sample_type"]!r}')
+
+        is_active = BOOLEAN_VALUES.get(normalize_text(row.get('is_active')))
+        if is_active is None:
+            raise RowError(f'is_active: valor no reconocido {row["is_active"]!r}')
+
+        reference_low = self.clean_field('reference_low', _decimal_text(row.get('reference_low', '')))
+        reference_high = self.clean_field('reference_high', _decimal_text(row.get('reference_high', '')))
+        if reference_low is not None and reference_high is not None and reference_low > reference_high:
+            raise RowError('reference_low: el límite inferior supera al superior')
+
+        return {
+            'code': self.clean_field('code', row['code'].upper()),
+            'name': self.clean_field('name', row['name']),
+            'description': self.clean_field('description', row.get('description', '')),
+            'category': category,
+            'price': self.clean_field('price', _decimal_text(row['price'].replace('$', ''))),
+            'sample_type': sample_type,
+            'turnaround_hours': self.clean_field(
+                'turnaround_hours', row.get('turnaround_hours') or self.default_turnaround_hours
+            ),
+            'unit': self.clean_field('unit', row.get('unit', '')),
+            'reference_low': reference_low,
+            'reference_high': reference_high,
+            'is_active': is_active,
+        }
+
+
+class Command(BaseImportCommand):
+    help = 'Bulk imports exam types / prices from a CSV file (COPY + upsert by code)'
+    spec_class = ExamTypeImportSpec
+    label = 'exam types'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--prices-only',
+            action='store_true',
+            help='Only update the price of existing exams (new codes are still created)'
+        )
+
+    def get_spec(self, options):
+        return ExamTypeImportSpec(prices_only=options['prices_only'])
@@ -0,0 +1,23 @@
+"""
+Management command to recompute the exam panel closure table
+Run with: python manage.py rebuild_panel_closure
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from apps.exams.catalog import bump_version
+from apps.exams.panels import rebuild_closure
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds exam_type_closure from the panel component edges'
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        self.stdout.write(self.style.SUCCESS('\n🧪 Rebuilding panel closure...\n'))
+        started = time.monotonic()
+        rows = rebuild_closure()
+        bump_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {rows} closure rows in {time.monotonic() - started:.2f}s\n'
+        ))
@@ -0,0 +1,59 @@
+"""
+Management command to refresh worklist priority scores
+Run with: python manage.py recompute_worklist_scores [--branch 1] [--interval 60]
+
+Scores age with the clock, so this is meant to run periodically: either
+from cron, or as a long-running process with --interval.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from apps.exams.scheduler import recompute_scores, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Recomputes priority scores of pending order items (STAT, aging, SLA)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--branch',
+            type=int,
+            action='append',
+            dest='branch_ids',
+            help='Only rescore these branches (repeatable; default: all)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Items per UPDATE (default: {DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Repeat every N seconds until interrupted (default: run once)'
+        )
+
+    def run_once(self, options):
+        started = time.monotonic()
+        count = recompute_scores(branch_ids=options['branch_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rescored {count} pending items in {time.monotonic() - started:.2f}s'
+        ))
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        self.stdout.write(self.style.SUCCESS('\n⏱️  Recomputing worklist priority scores...\n'))
+        if not options['interval']:
+            self.run_once(options)
+            return
+
+        try:
+            while True:
+                close_old_connections()
+                self.run_once(options)
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('\n👋 Stopped\n')
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.11 on 2026-10-19 03:57
+
+from decimal import Decimal
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(error_messages={'unique': 'Ya existe un examen con este código.'}, help_text='Código único del examen (ej: HEM-001)', max_length=20, unique=True, verbose_name='código')),
+                ('name', models.CharField(help_text='Nombre del examen', max_length=200, verbose_name='nombre')),
+                ('description', models.TextField(blank=True, help_text='Descripción o indicaciones del examen', verbose_name='descripción')),
+                ('category', models.CharField(choices=[('hematology', 'Hematología'), ('chemistry', 'Química Clínica'), ('immunology', 'Inmunología'), ('microbiology', 'Microbiología'), ('urinalysis', 'Uroanálisis'), ('parasitology', 'Parasitología'), ('hormones', 'Hormonas'), ('other', 'Otros')], default='other', help_text='Sección del laboratorio que realiza el examen', max_length=20, verbose_name='categoría')),
+                ('price', models.DecimalField(decimal_places=2, help_text='Precio de lista', max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0'))], verbose_name='precio')),
+                ('sample_type', models.CharField(choices=[('blood', 'Sangre total'), ('serum', 'Suero'), ('plasma', 'Plasma'), ('urine', 'Orina'), ('stool', 'Heces'), ('swab', 'Hisopado'), ('other', 'Otro')], default='blood', help_text='Muestra requerida', max_length=20, verbose_name='tipo de muestra')),
+                ('is_active', models.BooleanField(default=True, help_text='Exámenes inactivos no se pueden ordenar', verbose_name='activo')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+            ],
+            options={
+                'verbose_name': 'tipo de examen',
+                'verbose_name_plural': 'tipos de examen',
+                'db_table': 'exam_types',
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['category', 'name'], name='exam_types_categor_72481f_idx'), models.Index(fields=['is_active'], name='exam_types_is_acti_062ac7_idx')],
+            },
+        ),
+    ]
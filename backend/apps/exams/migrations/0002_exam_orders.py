@@ -0,0 +1,76 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:02
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0006_patient_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('branches', '0001_initial'),
+        ('exams', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_number', models.CharField(max_length=50, unique=True, verbose_name='número de orden')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('in_progress', 'En Proceso'), ('completed', 'Completada'), ('cancelled', 'Cancelada')], default='pending', max_length=20, verbose_name='estado')),
+                ('total_price', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='precio total')),
+                ('notes', models.TextField(blank=True, help_text='Indicaciones clínicas de la orden', verbose_name='indicaciones')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='orders_created', to=settings.AUTH_USER_MODEL, verbose_name='creado por')),
+                ('current_branch', models.ForeignKey(help_text='Sucursal donde se procesa la orden', on_delete=django.db.models.deletion.PROTECT, related_name='orders_in_progress', to='branches.branch', verbose_name='sucursal actual')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='orders', to='patients.patient', verbose_name='paciente')),
+                ('root_branch', models.ForeignKey(help_text='Sucursal donde se creó la orden (inmutable)', on_delete=django.db.models.deletion.PROTECT, related_name='orders_created', to='branches.branch', verbose_name='sucursal de origen')),
+            ],
+            options={
+                'verbose_name': 'orden de examen',
+                'verbose_name_plural': 'órdenes de examen',
+                'db_table': 'exam_orders',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, verbose_name='precio')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('in_progress', 'En Proceso'), ('completed', 'Completado'), ('cancelled', 'Cancelado')], default='pending', max_length=20, verbose_name='estado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+                ('exam_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='order_items', to='exams.examtype', verbose_name='examen')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='exams.examorder', verbose_name='orden')),
+                ('panel', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='exams.examtype', verbose_name='perfil')),
+            ],
+            options={
+                'verbose_name': 'examen de la orden',
+                'verbose_name_plural': 'exámenes de la orden',
+                'db_table': 'order_items',
+                'ordering': ['order', 'id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='orderitem',
+            constraint=models.UniqueConstraint(fields=('order', 'exam_type'), name='unique_order_exam_type'),
+        ),
+        migrations.AddIndex(
+            model_name='examorder',
+            index=models.Index(fields=['root_branch', 'status'], name='exam_orders_root_br_396807_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examorder',
+            index=models.Index(fields=['current_branch', 'status'], name='exam_orders_current_03c590_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examorder',
+            index=models.Index(fields=['patient', '-created_at', '-id'], name='exam_orders_patient_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0002_exam_orders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PanelComponent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0, verbose_name='posición')),
+                ('component', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='member_of', to='exams.examtype', verbose_name='componente')),
+                ('panel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='components', to='exams.examtype', verbose_name='perfil')),
+            ],
+            options={
+                'verbose_name': 'componente de perfil',
+                'verbose_name_plural': 'componentes de perfil',
+                'db_table': 'exam_panel_components',
+                'ordering': ['panel', 'position', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExamTypeClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path_count', models.PositiveIntegerField(default=1, verbose_name='caminos')),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='exams.examtype', verbose_name='perfil')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='exams.examtype', verbose_name='contenido')),
+            ],
+            options={
+                'verbose_name': 'clausura de perfil',
+                'verbose_name_plural': 'clausura de perfiles',
+                'db_table': 'exam_type_closure',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='panelcomponent',
+            constraint=models.UniqueConstraint(fields=('panel', 'component'), name='unique_panel_component'),
+        ),
+        migrations.AddConstraint(
+            model_name='panelcomponent',
+            constraint=models.CheckConstraint(check=models.Q(('panel', models.F('component')), _negated=True), name='panel_component_not_self'),
+        ),
+        migrations.AddIndex(
+            model_name='examtypeclosure',
+            index=models.Index(fields=['descendant', 'ancestor'], name='exam_type_c_descend_55d726_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='examtypeclosure',
+            constraint=models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_closure_pair'),
+        ),
+    ]
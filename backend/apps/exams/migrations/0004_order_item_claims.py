@@ -0,0 +1,70 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('exams', '0003_panel_closure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='branch',
+            field=models.ForeignKey(help_text='Sucursal que procesa el examen (sucursal actual de la orden)', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='branches.branch', verbose_name='sucursal'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='claim_expires_at',
+            field=models.DateTimeField(blank=True, help_text='Pasada esta hora el examen vuelve a la cola', null=True, verbose_name='vence la reserva'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='tomado en'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='tomado por'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='is_panel',
+            field=models.BooleanField(default=False, help_text='Línea del perfil ordenado; sus componentes son los que se procesan', verbose_name='cabecera de perfil'),
+        ),
+        # Existing items take their order's current branch; ordered
+        # exams that are panels become header lines. Constraints are made
+        # immediate so the NOT NULL change below does not hit pending
+        # deferred FK checks.
+        migrations.RunSQL(
+            sql="""
+                SET CONSTRAINTS ALL IMMEDIATE;
+                UPDATE order_items AS i SET branch_id = o.current_branch_id
+                FROM exam_orders AS o WHERE o.id = i.order_id;
+                UPDATE order_items AS i SET is_panel = TRUE
+                WHERE i.panel_id IS NULL
+                  AND EXISTS (SELECT 1 FROM exam_type_closure c WHERE c.ancestor_id = i.exam_type_id);
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='branch',
+            field=models.ForeignKey(help_text='Sucursal que procesa el examen (sucursal actual de la orden)', on_delete=django.db.models.deletion.PROTECT, related_name='+', to='branches.branch', verbose_name='sucursal'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(condition=models.Q(('is_panel', False), ('status', 'pending')), fields=['branch', 'id'], name='order_items_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['claimed_by', 'claim_expires_at'], name='order_items_claimed_c0d6fb_idx'),
+        ),
+    ]
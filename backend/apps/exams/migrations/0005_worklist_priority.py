@@ -0,0 +1,52 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0004_order_item_claims'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='orderitem',
+            name='order_items_queue_idx',
+        ),
+        migrations.AddField(
+            model_name='examorder',
+            name='priority',
+            field=models.CharField(choices=[('routine', 'Rutina'), ('urgent', 'Urgente'), ('stat', 'STAT')], default='routine', max_length=10, verbose_name='prioridad'),
+        ),
+        migrations.AddField(
+            model_name='examtype',
+            name='turnaround_hours',
+            field=models.PositiveSmallIntegerField(default=24, help_text='Plazo comprometido para resultados de rutina', verbose_name='tiempo de entrega (horas)'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='due_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='fecha comprometida'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='priority_score',
+            field=models.FloatField(default=0, verbose_name='puntaje de prioridad'),
+        ),
+        # Existing pending items get their routine SLA deadline; scores
+        # are filled in by the first recompute_worklist_scores run
+        migrations.RunSQL(
+            sql="""
+                UPDATE order_items AS i
+                SET due_at = i.created_at + make_interval(hours => t.turnaround_hours)
+                FROM exam_types AS t
+                WHERE t.id = i.exam_type_id AND i.status = 'pending';
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(condition=models.Q(('is_panel', False), ('status', 'pending')), fields=['branch', '-priority_score', 'id'], name='order_items_queue_idx'),
+        ),
+    ]
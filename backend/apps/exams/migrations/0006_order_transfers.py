@@ -0,0 +1,37 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('exams', '0005_worklist_priority'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderTransfer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_id', models.UUIDField(db_index=True, verbose_name='lote')),
+                ('reason', models.CharField(blank=True, max_length=255, verbose_name='motivo')),
+                ('transferred_at', models.DateTimeField(auto_now_add=True, verbose_name='transferido en')),
+                ('from_branch', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='branches.branch', verbose_name='sucursal de origen')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transfers', to='exams.examorder', verbose_name='orden')),
+                ('to_branch', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='branches.branch', verbose_name='sucursal de destino')),
+                ('transferred_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='transferido por')),
+            ],
+            options={
+                'verbose_name': 'transferencia de orden',
+                'verbose_name_plural': 'transferencias de órdenes',
+                'db_table': 'order_transfers',
+                'ordering': ['-transferred_at', '-id'],
+                'indexes': [models.Index(fields=['order', '-transferred_at'], name='order_trans_order_i_c9a0d8_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0006_order_transfers'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='examorder',
+            name='exam_orders_root_br_396807_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='examorder',
+            name='exam_orders_current_03c590_idx',
+        ),
+        migrations.AddIndex(
+            model_name='examorder',
+            index=models.Index(fields=['root_branch', 'status', '-created_at'], name='exam_orders_root_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examorder',
+            index=models.Index(fields=['current_branch', 'status', '-created_at'], name='exam_orders_current_idx'),
+        ),
+    ]
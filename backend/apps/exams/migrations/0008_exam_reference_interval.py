@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0007_order_branch_visibility_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examtype',
+            name='reference_high',
+            field=models.DecimalField(blank=True, decimal_places=4, help_text='Límite superior de referencia (vacío: sin límite)', max_digits=12, null=True, verbose_name='límite superior'),
+        ),
+        migrations.AddField(
+            model_name='examtype',
+            name='reference_low',
+            field=models.DecimalField(blank=True, decimal_places=4, help_text='Límite inferior de referencia (vacío: sin límite)', max_digits=12, null=True, verbose_name='límite inferior'),
+        ),
+        migrations.AddField(
+            model_name='examtype',
+            name='unit',
+            field=models.CharField(blank=True, help_text='Unidad de reporte (ej: mg/dL)', max_length=20, verbose_name='unidad'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:36
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('exams', '0008_exam_reference_interval'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Analyzer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=50, unique=True, verbose_name='código')),
+                ('name', models.CharField(max_length=100, verbose_name='nombre')),
+                ('rack_capacity', models.PositiveSmallIntegerField(default=60, validators=[django.core.validators.MinValueValidator(1)], verbose_name='posiciones por corrida')),
+                ('max_tests_per_run', models.PositiveIntegerField(blank=True, help_text='Vacío: sin límite de pruebas', null=True, validators=[django.core.validators.MinValueValidator(1)], verbose_name='pruebas por corrida')),
+                ('is_active', models.BooleanField(default=True, verbose_name='activo')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='analyzers', to='branches.branch', verbose_name='sucursal')),
+                ('exam_types', models.ManyToManyField(blank=True, related_name='analyzers', to='exams.examtype', verbose_name='exámenes')),
+            ],
+            options={
+                'verbose_name': 'equipo',
+                'verbose_name_plural': 'equipos',
+                'db_table': 'analyzers',
+                'ordering': ['branch', 'code'],
+            },
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='run_position',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='posición en la corrida'),
+        ),
+        migrations.CreateModel(
+            name='AnalyzerRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sample_type', models.CharField(choices=[('blood', 'Sangre total'), ('serum', 'Suero'), ('plasma', 'Plasma'), ('urine', 'Orina'), ('stool', 'Heces'), ('swab', 'Hisopado'), ('other', 'Otro')], max_length=20, verbose_name='tipo de muestra')),
+                ('sequence', models.PositiveIntegerField(verbose_name='número de corrida')),
+                ('positions', models.PositiveSmallIntegerField(verbose_name='muestras')),
+                ('tests', models.PositiveIntegerField(verbose_name='pruebas')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creada en')),
+                ('analyzer', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='runs', to='exams.analyzer', verbose_name='equipo')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='branches.branch', verbose_name='sucursal')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='creada por')),
+            ],
+            options={
+                'verbose_name': 'corrida de equipo',
+                'verbose_name_plural': 'corridas de equipo',
+                'db_table': 'analyzer_runs',
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='analyzer_run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='items', to='exams.analyzerrun', verbose_name='corrida'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzerrun',
+            index=models.Index(fields=['branch', '-created_at'], name='analyzer_runs_branch_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='analyzerrun',
+            constraint=models.UniqueConstraint(fields=('analyzer', 'sequence'), name='analyzer_run_sequence_unique'),
+        ),
+    ]
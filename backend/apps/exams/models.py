@@ -1,3 +1,730 @@
+"""
+Exam Models
+===========
+
+Laboratory exam catalog for the Clinical Lab Management System.
+
+Models:
+- ExamType: Laboratory test offered by the lab (catalog entry)
+- PanelComponent: Direct composition edge (panel contains exam or sub-panel)
+- ExamTypeClosure: Materialized transitive closure of PanelComponent
+- ExamOrder: Order of exams for a patient, tracked across branches
+- OrderItem: One exam of an order (panels expand into component items)
+- OrderTransfer: History of an order's moves between branches
+- Analyzer: Instrument of a branch and the exams it can run
+- AnalyzerRun: Batch of samples loaded on an analyzer together
+"""
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
 from django.db import models
 
-# Create your models here.
+
+class ExamType(models.Model):
+    """
+    Laboratory test available for ordering.
+
+    Fields:
+    - code: Unique catalog code (e.g. HEM-001), used by imports and analyzers
+    - name: Display name
+    - category: Laboratory section that performs the test
+    - price: List price
+    - sample_type: Specimen required
+    - turnaround_hours: Routine turnaround-time SLA
+    - unit / reference_low / reference_high: Default reporting unit and
+      reference interval of numeric results (either bound may be open)
+    - is_active: Inactive exams cannot be ordered
+    """
+
+    CATEGORY_CHOICES = [
+        ('hematology', 'Hematología'),
+        ('chemistry', 'Química Clínica'),
+        ('immunology', 'Inmunología'),
+        ('microbiology', 'Microbiología'),
+        ('urinalysis', 'Uroanálisis'),
+        ('parasitology', 'Parasitología'),
+        ('hormones', 'Hormonas'),
+        ('other', 'Otros'),
+    ]
+
+    SAMPLE_TYPE_CHOICES = [
+        ('blood', 'Sangre total'),
+        ('serum', 'Suero'),
+        ('plasma', 'Plasma'),
+        ('urine', 'Orina'),
+        ('stool', 'Heces'),
+        ('swab', 'Hisopado'),
+        ('other', 'Otro'),
+    ]
+
+    code = models.CharField(
+        'código',
+        max_length=20,
+        unique=True,
+        help_text='Código único del examen (ej: HEM-001)',
+        error_messages={
+            'unique': 'Ya existe un examen con este código.',
+        }
+    )
+
+    name = models.CharField(
+        'nombre',
+        max_length=200,
+        help_text='Nombre del examen'
+    )
+
+    description = models.TextField(
+        'descripción',
+        blank=True,
+        help_text='Descripción o indicaciones del examen'
+    )
+
+    category = models.CharField(
+        'categoría',
+        max_length=20,
+        choices=CATEGORY_CHOICES,
+        default='other',
+        help_text='Sección del laboratorio que realiza el examen'
+    )
+
+    price = models.DecimalField(
+        'precio',
+        max_digits=10,
+        decimal_places=2,
+        validators=[MinValueValidator(Decimal('0'))],
+        help_text='Precio de lista'
+    )
+
+    sample_type = models.CharField(
+        'tipo de muestra',
+        max_length=20,
+        choices=SAMPLE_TYPE_CHOICES,
+        default='blood',
+        help_text='Muestra requerida'
+    )
+
+    turnaround_hours = models.PositiveSmallIntegerField(
+        'tiempo de entrega (horas)',
+        default=24,
+        help_text='Plazo comprometido para resultados de rutina'
+    )
+
+    unit = models.CharField(
+        'unidad',
+        max_length=20,
+        blank=True,
+        help_text='Unidad de reporte (ej: mg/dL)'
+    )
+
+    reference_low = models.DecimalField(
+        'límite inferior',
+        max_digits=12,
+        decimal_places=4,
+        null=True,
+        blank=True,
+        help_text='Límite inferior de referencia (vacío: sin límite)'
+    )
+
+    reference_high = models.DecimalField(
+        'límite superior',
+        max_digits=12,
+        decimal_places=4,
+        null=True,
+        blank=True,
+        help_text='Límite superior de referencia (vacío: sin límite)'
+    )
+
+    is_active = models.BooleanField(
+        'activo',
+        default=True,
+        help_text='Exámenes inactivos no se pueden ordenar'
+    )
+
+    # Timestamps
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'exam_types'
+        verbose_name = 'tipo de examen'
+        verbose_name_plural = 'tipos de examen'
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['category', 'name']),
+            models.Index(fields=['is_active']),
+        ]
+
+    def __str__(self):
+        return f'{self.code} - {self.name}'
+
+
+class PanelComponent(models.Model):
+    """
+    Direct composition edge: `panel` contains `component`.
+
+    Panels nest ("Perfil preoperatorio" contains "Hemograma", which
+    contains the individual analytes); the flattened view lives in
+    ExamTypeClosure (see panels.py).
+
+    Fields:
+    - panel: Containing exam type
+    - component: Contained exam type (analyte or sub-panel)
+    - position: Display order within the panel
+    """
+
+    panel = models.ForeignKey(
+        ExamType,
+        on_delete=models.CASCADE,
+        related_name='components',
+        verbose_name='perfil'
+    )
+
+    component = models.ForeignKey(
+        ExamType,
+        on_delete=models.PROTECT,
+        related_name='member_of',
+        verbose_name='componente'
+    )
+
+    position = models.PositiveSmallIntegerField('posición', default=0)
+
+    class Meta:
+        db_table = 'exam_panel_components'
+        verbose_name = 'componente de perfil'
+        verbose_name_plural = 'componentes de perfil'
+        ordering = ['panel', 'position', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['panel', 'component'],
+                name='unique_panel_component',
+            ),
+            models.CheckConstraint(
+                check=~models.Q(panel=models.F('component')),
+                name='panel_component_not_self',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.panel_id} > {self.component_id}'
+
+    def clean(self):
+        from apps.common.exceptions import BusinessRuleError
+        from .panels import check_no_cycle
+
+        if self.panel_id and self.component_id:
+            try:
+                check_no_cycle(self.panel_id, self.component_id)
+            except BusinessRuleError as e:
+                raise ValidationError({'component': e.message})
+
+
+class ExamTypeClosure(models.Model):
+    """
+    Transitive closure of panel composition: one row per
+    (ancestor, descendant) pair reachable through PanelComponent edges.
+
+    Shared components (the same analyte in several sub-panels) are
+    reachable through more than one path; `path_count` records how many,
+    so removing one edge only deletes rows no other path still supports.
+    Maintained incrementally by panels.py, never edited directly.
+
+    Fields:
+    - ancestor: Panel
+    - descendant: Exam type contained at any depth
+    - path_count: Number of distinct composition paths
+    """
+
+    ancestor = models.ForeignKey(
+        ExamType,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='perfil'
+    )
+
+    descendant = models.ForeignKey(
+        ExamType,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='contenido'
+    )
+
+    path_count = models.PositiveIntegerField('caminos', default=1)
+
+    class Meta:
+        db_table = 'exam_type_closure'
+        verbose_name = 'clausura de perfil'
+        verbose_name_plural = 'clausura de perfiles'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ancestor', 'descendant'],
+                name='unique_closure_pair',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['descendant', 'ancestor']),
+        ]
+
+    def __str__(self):
+        return f'{self.ancestor_id} >> {self.descendant_id} ({self.path_count})'
+
+
+class ExamOrder(models.Model):
+    """
+    Exam order with branch tracking.
+
+    root_branch is where the order was created and never changes;
+    current_branch is where it is being processed (changes on transfer).
+
+    Fields:
+    - order_number: Human-readable number (see numbering.py)
+    - patient: Patient the exams are for
+    - root_branch / current_branch: Origin and processing branch
+    - status: Processing status
+    - priority: Priority class (routine, urgent, STAT)
+    - total_price: Sum of the ordered exams' list prices
+    - notes: Clinical indications
+    - created_by: User who created the order
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('in_progress', 'En Proceso'),
+        ('completed', 'Completada'),
+        ('cancelled', 'Cancelada'),
+    ]
+
+    PRIORITY_CHOICES = [
+        ('routine', 'Rutina'),
+        ('urgent', 'Urgente'),
+        ('stat', 'STAT'),
+    ]
+
+    order_number = models.CharField(
+        'número de orden',
+        max_length=50,
+        unique=True
+    )
+
+    patient = models.ForeignKey(
+        'patients.Patient',
+        on_delete=models.PROTECT,
+        related_name='orders',
+        verbose_name='paciente'
+    )
+
+    root_branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.PROTECT,
+        related_name='orders_created',
+        verbose_name='sucursal de origen',
+        help_text='Sucursal donde se creó la orden (inmutable)'
+    )
+
+    current_branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.PROTECT,
+        related_name='orders_in_progress',
+        verbose_name='sucursal actual',
+        help_text='Sucursal donde se procesa la orden'
+    )
+
+    status = models.CharField(
+        'estado',
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+
+    priority = models.CharField(
+        'prioridad',
+        max_length=10,
+        choices=PRIORITY_CHOICES,
+        default='routine'
+    )
+
+    total_price = models.DecimalField(
+        'precio total',
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+
+    notes = models.TextField(
+        'indicaciones',
+        blank=True,
+        help_text='Indicaciones clínicas de la orden'
+    )
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name='orders_created',
+        verbose_name='creado por'
+    )
+
+    # Timestamps
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'exam_orders'
+        verbose_name = 'orden de examen'
+        verbose_name_plural = 'órdenes de examen'
+        ordering = ['-created_at']
+        indexes = [
+            # Each arm of the branch visibility UNION (see access.py)
+            models.Index(
+                fields=['root_branch', 'status', '-created_at'],
+                name='exam_orders_root_idx',
+            ),
+            models.Index(
+                fields=['current_branch', 'status', '-created_at'],
+                name='exam_orders_current_idx',
+            ),
+            models.Index(
+                fields=['patient', '-created_at', '-id'],
+                name='exam_orders_patient_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.order_number
+
+
+class OrderItem(models.Model):
+    """
+    One exam of an order.
+
+    Ordering a panel creates one item for the panel itself (carrying the
+    price) plus one item per component exam (price 0, `panel` set), so
+    worklists and result entry work on components while billing sees
+    the panel.
+
+    Work queue: pending, non-header items of a branch form the technician
+    work queue (see worklist.py), served most urgent first. `branch`
+    mirrors the order's current_branch and `priority_score` is kept by
+    the scheduler (scheduler.py), so the queue is read from one partial
+    index on order_items; a claim is a lease (claimed_by +
+    claim_expires_at) that lapses unless renewed by heartbeats.
+
+    Fields:
+    - order: Parent order
+    - exam_type: Exam to perform (or the panel header)
+    - panel: Panel this component came from (null for ordered exams)
+    - is_panel: Header line of an ordered panel (not performed itself)
+    - branch: Branch processing the item (order's current_branch)
+    - price: Price charged for this line
+    - status: Processing status of this exam
+    - due_at: Turnaround-time SLA deadline
+    - priority_score: Queue rank (higher first), see scheduler.py
+    - claimed_by / claimed_at / claim_expires_at: Current work-queue lease
+    - analyzer_run / run_position: Analyzer run the item was batched into
+      and the rack position of its sample (see runs.py)
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('in_progress', 'En Proceso'),
+        ('completed', 'Completado'),
+        ('cancelled', 'Cancelado'),
+    ]
+
+    order = models.ForeignKey(
+        ExamOrder,
+        on_delete=models.CASCADE,
+        related_name='items',
+        verbose_name='orden'
+    )
+
+    exam_type = models.ForeignKey(
+        ExamType,
+        on_delete=models.PROTECT,
+        related_name='order_items',
+        verbose_name='examen'
+    )
+
+    panel = models.ForeignKey(
+        ExamType,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='perfil'
+    )
+
+    is_panel = models.BooleanField(
+        'cabecera de perfil',
+        default=False,
+        help_text='Línea del perfil ordenado; sus componentes son los que se procesan'
+    )
+
+    branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name='sucursal',
+        help_text='Sucursal que procesa el examen (sucursal actual de la orden)'
+    )
+
+    price = models.DecimalField(
+        'precio',
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+
+    status = models.CharField(
+        'estado',
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+
+    due_at = models.DateTimeField('fecha comprometida', null=True, blank=True)
+
+    priority_score = models.FloatField('puntaje de prioridad', default=0)
+
+    claimed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='tomado por'
+    )
+
+    claimed_at = models.DateTimeField('tomado en', null=True, blank=True)
+
+    claim_expires_at = models.DateTimeField(
+        'vence la reserva',
+        null=True,
+        blank=True,
+        help_text='Pasada esta hora el examen vuelve a la cola'
+    )
+
+    analyzer_run = models.ForeignKey(
+        'AnalyzerRun',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='items',
+        verbose_name='corrida'
+    )
+
+    run_position = models.PositiveSmallIntegerField('posición en la corrida', null=True, blank=True)
+
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'order_items'
+        verbose_name = 'examen de la orden'
+        verbose_name_plural = 'exámenes de la orden'
+        ordering = ['order', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['order', 'exam_type'],
+                name='unique_order_exam_type',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['branch', '-priority_score', 'id'],
+                name='order_items_queue_idx',
+                condition=models.Q(status='pending', is_panel=False),
+            ),
+            models.Index(fields=['claimed_by', 'claim_expires_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.order_id}: {self.exam_type_id}'
+
+
+class OrderTransfer(models.Model):
+    """
+    One move of an order from one branch to another.
+
+    Orders moved together (a courier batch) share a batch_id.
+
+    Fields:
+    - batch_id: Groups the orders moved in a single call
+    - order: Transferred order
+    - from_branch / to_branch: Previous and new current_branch
+    - reason: Why the order was moved
+    - transferred_by / transferred_at: Who moved it and when
+    """
+
+    batch_id = models.UUIDField('lote', db_index=True)
+
+    order = models.ForeignKey(
+        ExamOrder,
+        on_delete=models.CASCADE,
+        related_name='transfers',
+        verbose_name='orden'
+    )
+
+    from_branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name='sucursal de origen'
+    )
+
+    to_branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name='sucursal de destino'
+    )
+
+    reason = models.CharField('motivo', max_length=255, blank=True)
+
+    transferred_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='transferido por'
+    )
+
+    transferred_at = models.DateTimeField('transferido en', auto_now_add=True)
+
+    class Meta:
+        db_table = 'order_transfers'
+        verbose_name = 'transferencia de orden'
+        verbose_name_plural = 'transferencias de órdenes'
+        ordering = ['-transferred_at', '-id']
+        indexes = [
+            models.Index(fields=['order', '-transferred_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.order_id}: {self.from_branch_id} -> {self.to_branch_id}'
+
+
+class Analyzer(models.Model):
+    """
+    Laboratory instrument of a branch.
+
+    Fields:
+    - code: Instrument code, as reported with results and used by
+      analyzer-specific reference ranges and QC lots
+    - branch: Branch where the instrument is installed
+    - exam_types: Exams the instrument can run
+    - rack_capacity: Sample positions per run
+    - max_tests_per_run: Tests per run (reagent/throughput limit; empty:
+      only positions limit a run)
+    """
+
+    code = models.CharField('código', max_length=50, unique=True)
+
+    name = models.CharField('nombre', max_length=100)
+
+    branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.PROTECT,
+        related_name='analyzers',
+        verbose_name='sucursal'
+    )
+
+    exam_types = models.ManyToManyField(
+        ExamType,
+        related_name='analyzers',
+        blank=True,
+        verbose_name='exámenes'
+    )
+
+    rack_capacity = models.PositiveSmallIntegerField(
+        'posiciones por corrida',
+        default=60,
+        validators=[MinValueValidator(1)]
+    )
+
+    max_tests_per_run = models.PositiveIntegerField(
+        'pruebas por corrida',
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1)],
+        help_text='Vacío: sin límite de pruebas'
+    )
+
+    is_active = models.BooleanField('activo', default=True)
+
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'analyzers'
+        verbose_name = 'equipo'
+        verbose_name_plural = 'equipos'
+        ordering = ['branch', 'code']
+
+    def __str__(self):
+        return f'{self.code} - {self.name}'
+
+
+class AnalyzerRun(models.Model):
+    """
+    Samples batched to be loaded on an analyzer together.
+
+    A run holds samples of one sample type; each sample (the tube of an
+    order) takes one rack position and carries the order items it is
+    tested for (OrderItem.analyzer_run / run_position).
+
+    Fields:
+    - analyzer / branch: Where the run is processed
+    - sample_type: Sample type of every sample in the run
+    - sequence: Run number of the analyzer (1, 2, ...)
+    - positions / tests: Samples and tests batched
+    - created_by: User who built the run
+    """
+
+    analyzer = models.ForeignKey(
+        Analyzer,
+        on_delete=models.PROTECT,
+        related_name='runs',
+        verbose_name='equipo'
+    )
+
+    branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name='sucursal'
+    )
+
+    sample_type = models.CharField('tipo de muestra', max_length=20, choices=ExamType.SAMPLE_TYPE_CHOICES)
+
+    sequence = models.PositiveIntegerField('número de corrida')
+
+    positions = models.PositiveSmallIntegerField('muestras')
+
+    tests = models.PositiveIntegerField('pruebas')
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='creada por'
+    )
+
+    created_at = models.DateTimeField('creada en', auto_now_add=True)
+
+    class Meta:
+        db_table = 'analyzer_runs'
+        verbose_name = 'corrida de equipo'
+        verbose_name_plural = 'corridas de equipo'
+        ordering = ['-created_at', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['analyzer', 'sequence'], name='analyzer_run_sequence_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['branch', '-created_at'], name='analyzer_runs_branch_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.analyzer_id} #{self.sequence} ({self.sample_type})'
@@ -0,0 +1,168 @@
+"""
+Order Number Service
+====================
+
+Issues human-readable order numbers, one series per branch and year:
+
+    ORD-LAB01-2026-001234
+
+The branch code is part of the number so that per-branch series stay
+globally unique. It is written uppercase without hyphens; Branch.code is
+unique in that form too (branches_code_prefix_unique), so two branches
+never share a prefix.
+
+Allocation is two-level:
+- Postgres owns the series: one sequence per (branch, year), created on
+  demand, with INCREMENT BY BLOCK_SIZE. Each nextval() reserves a whole
+  block of BLOCK_SIZE numbers
+- Redis hands out numbers from the current block with an atomic Lua
+  script, so issuing a number is one Redis round trip and Postgres is
+  touched once per block
+
+Numbers are unique and increasing within a series but NOT contiguous:
+a block left half-used (Redis restart, two processes refilling at once)
+or a rolled-back order leaves a gap. Formatting never assumes
+contiguity, and the zero padding grows past 6 digits when needed.
+
+If Redis is unavailable, numbers are taken straight from Postgres (one
+block per order), which is slower and gappier but still unique.
+"""
+import logging
+
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 100
+
+ORDER_NUMBER_FORMAT = 'ORD-{branch}-{year}-{number:06d}'
+
+REDIS_KEY = 'clinical_lab:order_numbers:{branch_id}:{year}'
+
+# Hash fields: `next` = last number issued, `end` = last number of the block.
+# Returns the issued number, or nil when the block is exhausted.
+_TAKE_SCRIPT = """
+local nxt = tonumber(redis.call('HGET', KEYS[1], 'next') or '0')
+local last = tonumber(redis.call('HGET', KEYS[1], 'end') or '0')
+if nxt >= last then
+    return nil
+end
+return redis.call('HINCRBY', KEYS[1], 'next', 1)
+"""
+
+# Installs a new block [start, start + size - 1]. Returns 1 when
+# installed, 0 when the current block still has numbers (another process
+# refilled first; our block becomes a gap), or -last when the block is
+# behind numbers already issued (the sequence was recreated, e.g. its
+# creating transaction rolled back) so the caller can fast-forward it.
+_REFILL_SCRIPT = """
+local nxt = tonumber(redis.call('HGET', KEYS[1], 'next') or '0')
+local last = tonumber(redis.call('HGET', KEYS[1], 'end') or '0')
+local start = tonumber(ARGV[1])
+if nxt < last then
+    return 0
+end
+if start <= last then
+    return -last
+end
+redis.call('HSET', KEYS[1], 'next', start - 1, 'end', start + tonumber(ARGV[2]) - 1)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+# Keep a series' Redis state a little over a year
+REDIS_TTL = 400 * 24 * 3600
+
+
+def sequence_name(branch_id, year):
+    return f'order_number_seq_{int(branch_id)}_{int(year)}'
+
+
+def _ensure_sequence(name):
+    # Concurrent CREATE ... IF NOT EXISTS can still fail on the catalog
+    # unique index; the savepoint keeps the caller's transaction usable.
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE SEQUENCE IF NOT EXISTS {connection.ops.quote_name(name)} '
+                f'INCREMENT BY {BLOCK_SIZE} START WITH 1'
+            )
+    except DatabaseError:
+        logger.info('Order number sequence %s created concurrently', name)
+
+
+def reserve_block(branch_id, year):
+    """
+    Reserve the next block of a series in Postgres.
+
+    Returns:
+        First number of the block (the block is [start, start + BLOCK_SIZE - 1])
+    """
+    name = sequence_name(branch_id, year)
+    query = 'SELECT nextval(%s)'
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(query, [name])
+            return cursor.fetchone()[0]
+    except DatabaseError:
+        _ensure_sequence(name)
+    with connection.cursor() as cursor:
+        cursor.execute(query, [name])
+        return cursor.fetchone()[0]
+
+
+def _fast_forward(branch_id, year, last_issued):
+    """Move a series' sequence past `last_issued` (never backwards)."""
+    name = connection.ops.quote_name(sequence_name(branch_id, year))
+    logger.warning('Order number sequence %s behind issued numbers, fast-forwarding', name)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT setval(%s, GREATEST(last_value, %s)) FROM {name}',
+            [sequence_name(branch_id, year), last_issued - BLOCK_SIZE + 1],
+        )
+
+
+def allocate_number(branch_id, year):
+    """Return the next number of a (branch, year) series."""
+    try:
+        redis = get_redis_connection('default')
+        key = REDIS_KEY.format(branch_id=branch_id, year=year)
+        take = redis.register_script(_TAKE_SCRIPT)
+        refill = redis.register_script(_REFILL_SCRIPT)
+        while True:
+            number = take(keys=[key])
+            if number is not None:
+                return int(number)
+            start = reserve_block(branch_id, year)
+            status = refill(keys=[key], args=[start, BLOCK_SIZE, REDIS_TTL])
+            if status < 0:
+                _fast_forward(branch_id, year, -status)
+    except RedisError:
+        logger.warning('Redis unavailable, issuing order number directly from Postgres')
+        return reserve_block(branch_id, year)
+
+
+def format_order_number(branch_code, year, number):
+    return ORDER_NUMBER_FORMAT.format(
+        branch=branch_code.replace('-', '').upper(),
+        year=year,
+        number=number,
+    )
+
+
+def next_order_number(branch, year=None):
+    """
+    Issue the next order number for a branch.
+
+    Args:
+        branch: Branch instance (id and code are used)
+        year: Series year (default: current local year)
+
+    Returns:
+        Formatted order number, e.g. 'ORD-LAB01-2026-001234'
+    """
+    year = year or timezone.localdate().year
+    return format_order_number(branch.code, year, allocate_number(branch.id, year))
@@ -0,0 +1,214 @@
+"""
+Exam Panel Composition
+======================
+
+Panels nest, so the direct edges (PanelComponent) are flattened into a
+closure table (ExamTypeClosure) holding every (ancestor, descendant)
+pair with the number of paths between them. Expanding a panel is then
+one lookup on the (ancestor, descendant) unique index, whatever the depth.
+
+The closure is maintained incrementally. Adding the edge panel -> component
+adds, for every ancestor A of `panel` (and `panel` itself) and every
+descendant D of `component` (and `component` itself):
+
+    closure(A, D).path_count += paths(A, panel) * paths(component, D)
+
+Removing an edge subtracts the same amounts and deletes rows that reach
+zero. Both are one INSERT/UPDATE statement. Edits are serialized with a
+transaction-level advisory lock so concurrent edits cannot interleave.
+
+PanelComponent save/delete receivers (signals.py) call these, so edits
+from the admin or add_component() keep the closure current.
+rebuild_closure() recomputes the table from the edges (repair / initial
+load).
+"""
+from collections import defaultdict
+
+from django.db import connection, transaction
+
+from apps.common.exceptions import BusinessRuleError
+from .models import ExamTypeClosure, PanelComponent
+
+# Arbitrary key for pg_advisory_xact_lock serializing closure edits
+CLOSURE_LOCK_KEY = 7_301_036
+
+# Ancestors of the panel and descendants of the component, each
+# including the node itself with a single path
+_PATHS_CTE = """
+    WITH up AS (
+        SELECT ancestor_id AS id, path_count AS n FROM exam_type_closure WHERE descendant_id = %(panel)s
+        UNION ALL SELECT %(panel)s, 1
+    ),
+    down AS (
+        SELECT descendant_id AS id, path_count AS n FROM exam_type_closure WHERE ancestor_id = %(component)s
+        UNION ALL SELECT %(component)s, 1
+    ),
+    delta AS (
+        SELECT up.id AS ancestor_id, down.id AS descendant_id, SUM(up.n * down.n) AS n
+        FROM up CROSS JOIN down
+        GROUP BY up.id, down.id
+    )
+"""
+
+_ADD_SQL = _PATHS_CTE + """
+    INSERT INTO exam_type_closure (ancestor_id, descendant_id, path_count)
+    SELECT ancestor_id, descendant_id, n FROM delta
+    ON CONFLICT (ancestor_id, descendant_id)
+    DO UPDATE SET path_count = exam_type_closure.path_count + EXCLUDED.path_count
+"""
+
+_REMOVE_SQL = _PATHS_CTE + """
+    UPDATE exam_type_closure AS c SET path_count = c.path_count - delta.n
+    FROM delta
+    WHERE c.ancestor_id = delta.ancestor_id AND c.descendant_id = delta.descendant_id
+"""
+
+_PRUNE_SQL = 'DELETE FROM exam_type_closure WHERE path_count <= 0'
+
+_LEAVES_SQL = """
+    SELECT c.descendant_id
+    FROM exam_type_closure c
+    WHERE c.ancestor_id = %s
+      AND NOT EXISTS (SELECT 1 FROM exam_type_closure sub WHERE sub.ancestor_id = c.descendant_id)
+"""
+
+
+def _lock():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CLOSURE_LOCK_KEY])
+
+
+def check_no_cycle(panel_id, component_id):
+    """
+    Raises:
+        BusinessRuleError: adding panel -> component would create a cycle
+    """
+    if panel_id == component_id or ExamTypeClosure.objects.filter(
+        ancestor_id=component_id, descendant_id=panel_id
+    ).exists():
+        raise BusinessRuleError(
+            'Un perfil no puede contenerse a sí mismo.',
+            code='panel_cycle',
+            details={'panel_id': panel_id, 'component_id': component_id},
+        )
+
+
+def apply_edge_added(panel_id, component_id):
+    """
+    Update the closure for a new PanelComponent edge.
+
+    Raises:
+        BusinessRuleError: the edge would create a cycle
+    """
+    with transaction.atomic():
+        _lock()
+        check_no_cycle(panel_id, component_id)
+        with connection.cursor() as cursor:
+            cursor.execute(_ADD_SQL, {'panel': panel_id, 'component': component_id})
+
+
+def apply_edge_removed(panel_id, component_id):
+    """Update the closure after a PanelComponent edge was deleted."""
+    with transaction.atomic():
+        _lock()
+        with connection.cursor() as cursor:
+            cursor.execute(_REMOVE_SQL, {'panel': panel_id, 'component': component_id})
+            cursor.execute(_PRUNE_SQL)
+
+
+def add_component(panel, component, position=0):
+    """
+    Add an exam (or sub-panel) to a panel. The closure is updated by the
+    PanelComponent post_save receiver within the same transaction.
+
+    Returns:
+        PanelComponent
+
+    Raises:
+        BusinessRuleError: cycle or duplicate component
+    """
+    with transaction.atomic():
+        if PanelComponent.objects.filter(panel=panel, component=component).exists():
+            raise BusinessRuleError('El examen ya forma parte del perfil.', code='duplicate_component')
+        return PanelComponent.objects.create(panel=panel, component=component, position=position)
+
+
+def compute_closure(edges):
+    """
+    Compute {(ancestor, descendant): path_count} from (panel, component) edges.
+
+    Raises:
+        BusinessRuleError: the edges contain a cycle
+    """
+    children = defaultdict(list)
+    for panel_id, component_id in edges:
+        children[panel_id].append(component_id)
+
+    paths_from = {}
+    visiting = set()
+
+    def descendants(node):
+        if node in paths_from:
+            return paths_from[node]
+        if node in visiting:
+            raise BusinessRuleError('La composición de perfiles contiene un ciclo.', code='panel_cycle')
+        visiting.add(node)
+        counts = defaultdict(int)
+        for child in children.get(node, ()):
+            counts[child] += 1
+            for descendant, n in descendants(child).items():
+                counts[descendant] += n
+        visiting.discard(node)
+        paths_from[node] = counts
+        return counts
+
+    closure = {}
+    for panel_id in list(children):
+        for descendant, n in descendants(panel_id).items():
+            closure[(panel_id, descendant)] = n
+    return closure
+
+
+def rebuild_closure():
+    """
+    Recompute the whole closure table from PanelComponent.
+
+    Returns:
+        Number of closure rows
+    """
+    with transaction.atomic():
+        _lock()
+        closure = compute_closure(PanelComponent.objects.values_list('panel_id', 'component_id'))
+        ExamTypeClosure.objects.all().delete()
+        ExamTypeClosure.objects.bulk_create(
+            [
+                ExamTypeClosure(ancestor_id=a, descendant_id=d, path_count=n)
+                for (a, d), n in closure.items()
+            ],
+            batch_size=5000,
+        )
+    return len(closure)
+
+
+def expand_panel(panel_id):
+    """
+    Ids of the performable exams (leaves) a panel expands into, at any
+    depth: one indexed lookup. Returns [] for exams that are not panels.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(_LEAVES_SQL, [panel_id])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def leaf_components():
+    """
+    {panel_id: [leaf ids]} for every panel, from one scan of the closure
+    (used to build the catalog cache).
+    """
+    rows = list(ExamTypeClosure.objects.values_list('ancestor_id', 'descendant_id'))
+    panels = {ancestor for ancestor, _ in rows}
+    components = defaultdict(list)
+    for ancestor, descendant in rows:
+        if descendant not in panels:
+            components[ancestor].append(descendant)
+    return components
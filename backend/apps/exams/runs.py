@@ -0,0 +1,326 @@
+"""
+Analyzer Runs
+=============
+
+Batches the pending items of a branch into analyzer runs.
+
+A sample is the tube of one order for one sample type; it carries the
+order's pending items of that sample type. Building runs takes three
+steps:
+
+1. Assignment: each sample goes to the analyzer able to run most of its
+   items (ties: the analyzer with the fewest tests assigned so far). The
+   items it cannot run go to the next best analyzer, so a sample is
+   split only when no single analyzer covers it. Items no analyzer can
+   run stay unassigned.
+2. Packing, per (analyzer, sample type): samples are placed in priority
+   order (priority_score, see scheduler.py) into the first run with a
+   free rack position and enough test capacity (first fit). Urgent
+   samples therefore land in the earliest runs, and smaller samples
+   backfill the room left in earlier runs when a run is limited by tests.
+   Within a run, positions follow priority.
+3. Persistence: runs are written with one bulk_create and their items
+   with one bulk_update (analyzer_run, run_position).
+
+Pending items are read with one query (locked with SKIP LOCKED, so
+concurrent builders never batch the same item) and analyzer
+capabilities with another; packing is in memory. Items on a run leave
+the technician queue (worklist.py). Runs are exported as load lists:
+one row per rack position with the sample barcode (order number) and
+the exam codes to run.
+"""
+from collections import Counter, defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.common.exceptions import BusinessRuleError
+from .models import Analyzer, AnalyzerRun, OrderItem
+
+MAX_RUNS_LISTED = 100
+
+UPDATE_BATCH_SIZE = 1000
+
+# key: sample identity (order id); items: [(item_id, exam_type_id)]
+Sample = namedtuple('Sample', ['key', 'sample_type', 'priority', 'items'])
+
+# positions: [(sample key, [item_id])], in rack order
+PlannedRun = namedtuple('PlannedRun', ['analyzer_id', 'sample_type', 'positions'])
+
+LOAD_LIST_COLUMNS = ('position', 'barcode', 'priority', 'sample_type', 'tests')
+
+
+def assign(samples, capabilities):
+    """
+    Split samples between analyzers.
+
+    Args:
+        samples: Iterable of Sample
+        capabilities: {analyzer_id: set of exam_type_ids it runs}
+
+    Returns:
+        ({analyzer_id: list of Sample (with the items assigned to it)},
+        list of unassigned item ids)
+    """
+    runnable_by = defaultdict(list)
+    for analyzer_id in sorted(capabilities):
+        for exam_type_id in capabilities[analyzer_id]:
+            runnable_by[exam_type_id].append(analyzer_id)
+
+    load = Counter()
+    assigned = defaultdict(list)
+    unassigned = []
+    for sample in samples:
+        remaining = sample.items
+        while remaining:
+            coverage = Counter(
+                analyzer_id for _, exam_type_id in remaining for analyzer_id in runnable_by.get(exam_type_id, ())
+            )
+            if not coverage:
+                unassigned += [item_id for item_id, _ in remaining]
+                break
+            best = min(coverage, key=lambda analyzer_id: (-coverage[analyzer_id], load[analyzer_id], analyzer_id))
+            taken = [item for item in remaining if item[1] in capabilities[best]]
+            remaining = [item for item in remaining if item[1] not in capabilities[best]]
+            assigned[best].append(sample._replace(items=taken))
+            load[best] += len(taken)
+    return assigned, unassigned
+
+
+def pack(samples, rack_capacity, max_tests=None):
+    """
+    First-fit packing of samples into runs, in priority order.
+
+    A sample with more items than max_tests is split over several
+    positions (aliquots).
+
+    Args:
+        samples: Samples of one analyzer and sample type
+        rack_capacity: Positions per run
+        max_tests: Tests per run (None: unlimited)
+
+    Returns:
+        List of runs, each a list of Sample in rack order
+    """
+    ordered = sorted(samples, key=lambda sample: (-sample.priority, sample.key))
+    if max_tests:
+        ordered = [
+            sample._replace(items=sample.items[start:start + max_tests])
+            for sample in ordered
+            for start in range(0, len(sample.items), max_tests)
+        ]
+
+    runs, tests = [], []
+    # Runs with free positions, oldest first; full runs are dropped
+    open_runs = []
+    for sample in ordered:
+        size = len(sample.items)
+        target = None
+        for index in open_runs:
+            if max_tests is None or tests[index] + size <= max_tests:
+                target = index
+                break
+        if target is None:
+            runs.append([])
+            tests.append(0)
+            target = len(runs) - 1
+            open_runs.append(target)
+        runs[target].append(sample)
+        tests[target] += size
+        if len(runs[target]) >= rack_capacity:
+            open_runs.remove(target)
+    for run in runs:
+        run.sort(key=lambda sample: (-sample.priority, sample.key))
+    return runs
+
+
+def plan_runs(samples, analyzers):
+    """
+    Assign and pack samples (no database access).
+
+    Args:
+        samples: Iterable of Sample
+        analyzers: {analyzer_id: (set of exam_type_ids, rack_capacity, max_tests_per_run)}
+
+    Returns:
+        (list of PlannedRun, list of unassigned item ids)
+    """
+    assigned, unassigned = assign(samples, {pk: exams for pk, (exams, _, _) in analyzers.items()})
+    planned = []
+    for analyzer_id in sorted(assigned):
+        _, rack_capacity, max_tests = analyzers[analyzer_id]
+        by_type = defaultdict(list)
+        for sample in assigned[analyzer_id]:
+            by_type[sample.sample_type].append(sample)
+        for sample_type in sorted(by_type):
+            for run in pack(by_type[sample_type], rack_capacity, max_tests):
+                planned.append(PlannedRun(
+                    analyzer_id, sample_type,
+                    [(sample.key, [item_id for item_id, _ in sample.items]) for sample in run],
+                ))
+    return planned, unassigned
+
+
+def pending_samples(branch, sample_types=None, now=None):
+    """
+    Pending, unbatched and unclaimed items of a branch grouped into
+    samples (one query; rows are locked, skipping locked ones).
+
+    Must run inside a transaction.
+    """
+    now = now or timezone.now()
+    queryset = OrderItem.objects.filter(
+        Q(claim_expires_at__isnull=True) | Q(claim_expires_at__lt=now),
+        branch=branch,
+        status='pending',
+        is_panel=False,
+        analyzer_run__isnull=True,
+    )
+    if sample_types:
+        queryset = queryset.filter(exam_type__sample_type__in=sample_types)
+
+    samples = {}
+    for item_id, order_id, exam_type_id, sample_type, score in (
+        queryset.select_for_update(skip_locked=True, of=('self',))
+        .order_by('order_id', 'id')
+        .values_list('id', 'order_id', 'exam_type_id', 'exam_type__sample_type', 'priority_score')
+    ):
+        sample = samples.get((order_id, sample_type))
+        if sample is None:
+            sample = samples[(order_id, sample_type)] = Sample(order_id, sample_type, score, [])
+        elif score > sample.priority:
+            sample = samples[(order_id, sample_type)] = sample._replace(priority=score)
+        sample.items.append((item_id, exam_type_id))
+    return list(samples.values())
+
+
+def build_runs(branch, user, analyzer_ids=None, sample_types=None, dry_run=False):
+    """
+    Batch the branch's pending items into analyzer runs.
+
+    Args:
+        branch: Branch whose pending items are batched
+        user: User building the runs
+        analyzer_ids: Only these analyzers of the branch (None: all active)
+        sample_types: Only these sample types (None: all)
+        dry_run: Plan without saving (runs are returned unsaved)
+
+    Returns:
+        (list of AnalyzerRun, list of unassigned item ids)
+
+    Raises:
+        BusinessRuleError: no active analyzer matches
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = Analyzer.objects.filter(branch=branch, is_active=True)
+        if analyzer_ids is not None:
+            queryset = queryset.filter(id__in=analyzer_ids)
+        # Locked so concurrent builds of an analyzer get distinct sequences
+        analyzers = list(queryset.select_for_update().order_by('id'))
+        if not analyzers:
+            raise BusinessRuleError('No hay equipos activos en la sucursal.', code='no_analyzers')
+
+        analyzers_by_id = {analyzer.id: analyzer for analyzer in analyzers}
+        capabilities = defaultdict(set)
+        for analyzer_id, exam_type_id in Analyzer.exam_types.through.objects.filter(
+            analyzer_id__in=analyzers_by_id
+        ).values_list('analyzer_id', 'examtype_id'):
+            capabilities[analyzer_id].add(exam_type_id)
+
+        planned, unassigned = plan_runs(
+            pending_samples(branch, sample_types, now),
+            {
+                analyzer.id: (capabilities[analyzer.id], analyzer.rack_capacity, analyzer.max_tests_per_run)
+                for analyzer in analyzers
+            },
+        )
+
+        last_sequence = dict(
+            AnalyzerRun.objects.filter(analyzer_id__in=analyzers_by_id)
+            .values('analyzer_id')
+            .annotate(last=Max('sequence'))
+            .values_list('analyzer_id', 'last')
+        )
+        sequences = Counter()
+        runs = []
+        for plan in planned:
+            sequences[plan.analyzer_id] += 1
+            runs.append(AnalyzerRun(
+                analyzer=analyzers_by_id[plan.analyzer_id],
+                branch=branch,
+                sample_type=plan.sample_type,
+                sequence=last_sequence.get(plan.analyzer_id, 0) + sequences[plan.analyzer_id],
+                positions=len(plan.positions),
+                tests=sum(len(item_ids) for _, item_ids in plan.positions),
+                created_by=user,
+                created_at=now,
+            ))
+        if dry_run or not runs:
+            return runs, unassigned
+
+        AnalyzerRun.objects.bulk_create(runs)
+        items = [
+            OrderItem(id=item_id, analyzer_run_id=run.id, run_position=position, updated_at=now)
+            for run, plan in zip(runs, planned)
+            for position, (_, item_ids) in enumerate(plan.positions, start=1)
+            for item_id in item_ids
+        ]
+        OrderItem.objects.bulk_update(
+            items, ['analyzer_run', 'run_position', 'updated_at'], batch_size=UPDATE_BATCH_SIZE
+        )
+    return runs, unassigned
+
+
+def _run_count(aggregate):
+    counts = (
+        OrderItem.objects.filter(analyzer_run=OuterRef('pk'))
+        .order_by()
+        .values('analyzer_run')
+        .annotate(count=aggregate)
+        .values('count')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def recount_runs(run_ids):
+    """Recompute positions and tests of analyzer runs from their items (one UPDATE)."""
+    AnalyzerRun.objects.filter(id__in=run_ids).update(
+        positions=_run_count(Count('run_position', distinct=True)),
+        tests=_run_count(Count('id')),
+    )
+
+
+def recent_runs(branch_id=None, limit=MAX_RUNS_LISTED):
+    """Latest runs, newest first (of one branch, or all when branch_id is None)."""
+    queryset = AnalyzerRun.objects.select_related('analyzer')
+    if branch_id is not None:
+        queryset = queryset.filter(branch_id=branch_id)
+    return list(queryset.order_by('-created_at', '-id')[:limit])
+
+
+def load_list(run):
+    """
+    Load list of a run: one row per rack position, in position order.
+
+    Returns:
+        List of dicts with LOAD_LIST_COLUMNS; tests is a list of exam codes
+    """
+    rows = {}
+    for position, barcode, priority, code in (
+        run.items.order_by('run_position', 'exam_type__code')
+        .values_list('run_position', 'order__order_number', 'order__priority', 'exam_type__code')
+    ):
+        row = rows.get(position)
+        if row is None:
+            row = rows[position] = {
+                'position': position,
+                'barcode': barcode,
+                'priority': priority,
+                'sample_type': run.sample_type,
+                'tests': [],
+            }
+        row['tests'].append(code)
+    return list(rows.values())
@@ -0,0 +1,217 @@
+"""
+Exam Serializers
+Serialize exam catalog and order data
+"""
+from rest_framework import serializers
+
+from .models import AnalyzerRun, ExamOrder, ExamType, OrderItem, OrderTransfer
+from .worklist import DEFAULT_LEASE_SECONDS
+
+
+class CatalogExamSerializer(serializers.Serializer):
+    """Active exam type as served from the catalog cache"""
+    id = serializers.IntegerField()
+    code = serializers.CharField()
+    name = serializers.CharField()
+    category = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    sample_type = serializers.CharField()
+    turnaround_hours = serializers.IntegerField()
+    unit = serializers.CharField()
+    reference_low = serializers.DecimalField(max_digits=12, decimal_places=4, allow_null=True)
+    reference_high = serializers.DecimalField(max_digits=12, decimal_places=4, allow_null=True)
+
+
+class OrderSpecSerializer(serializers.Serializer):
+    """One order: patient and exam types (panels are expanded)"""
+    patient_id = serializers.IntegerField(min_value=1)
+    exam_type_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=200
+    )
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    priority = serializers.ChoiceField(
+        choices=ExamOrder.PRIORITY_CHOICES,
+        required=False,
+        default='routine'
+    )
+
+
+class OrderCreateSerializer(OrderSpecSerializer):
+    """Single order creation"""
+    branch_id = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        help_text='Only for users without an assigned branch (superadmin)'
+    )
+
+
+class OrderBatchCreateSerializer(serializers.Serializer):
+    """Many orders created in one transaction"""
+    orders = OrderSpecSerializer(many=True, allow_empty=False)
+    branch_id = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        help_text='Only for users without an assigned branch (superadmin)'
+    )
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    """Order line"""
+
+    class Meta:
+        model = OrderItem
+        fields = ['id', 'exam_type', 'panel', 'price', 'status', 'due_at']
+        read_only_fields = fields
+
+
+class ExamOrderSerializer(serializers.ModelSerializer):
+    """Exam order with its items"""
+    items = OrderItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ExamOrder
+        fields = [
+            'id',
+            'order_number',
+            'patient',
+            'root_branch',
+            'current_branch',
+            'status',
+            'priority',
+            'total_price',
+            'notes',
+            'items',
+            'created_by',
+            'created_at',
+        ]
+        read_only_fields = fields
+
+
+class WorklistClaimSerializer(serializers.Serializer):
+    """Claim the next items of the caller's branch queue"""
+    limit = serializers.IntegerField(required=False, min_value=1, default=1)
+    lease_seconds = serializers.IntegerField(required=False, min_value=1, default=DEFAULT_LEASE_SECONDS)
+    branch_id = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        help_text='Only for users without an assigned branch (superadmin)'
+    )
+
+
+class WorklistItemIdsSerializer(serializers.Serializer):
+    """Item ids held by the caller"""
+    item_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=200
+    )
+
+
+class WorklistHeartbeatSerializer(WorklistItemIdsSerializer):
+    """Lease renewal"""
+    lease_seconds = serializers.IntegerField(required=False, min_value=1, default=DEFAULT_LEASE_SECONDS)
+
+
+class WorkItemSerializer(serializers.ModelSerializer):
+    """Claimed order item with what the technician needs to process it"""
+    order_number = serializers.CharField(source='order.order_number', read_only=True)
+    patient = serializers.IntegerField(source='order.patient_id', read_only=True)
+    priority = serializers.CharField(source='order.priority', read_only=True)
+    exam_code = serializers.CharField(source='exam_type.code', read_only=True)
+    exam_name = serializers.CharField(source='exam_type.name', read_only=True)
+    sample_type = serializers.CharField(source='exam_type.sample_type', read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = [
+            'id',
+            'order',
+            'order_number',
+            'patient',
+            'exam_type',
+            'exam_code',
+            'exam_name',
+            'sample_type',
+            'panel',
+            'status',
+            'priority',
+            'due_at',
+            'priority_score',
+            'claimed_at',
+            'claim_expires_at',
+        ]
+        read_only_fields = fields
+
+
+class OrderTransferRequestSerializer(serializers.Serializer):
+    """Move a batch of orders to another branch"""
+    order_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=1000
+    )
+    to_branch_id = serializers.IntegerField(min_value=1)
+    reason = serializers.CharField(required=False, allow_blank=True, max_length=255, default='')
+
+
+class OrderTransferSerializer(serializers.ModelSerializer):
+    """Transfer history row"""
+
+    class Meta:
+        model = OrderTransfer
+        fields = ['id', 'batch_id', 'order', 'from_branch', 'to_branch', 'reason', 'transferred_by', 'transferred_at']
+        read_only_fields = fields
+
+
+class BuildRunsSerializer(serializers.Serializer):
+    """Batch the branch's pending items into analyzer runs"""
+    analyzer_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=100,
+        help_text='Only these analyzers (default: every active analyzer of the branch)'
+    )
+    sample_types = serializers.ListField(
+        child=serializers.ChoiceField(choices=ExamType.SAMPLE_TYPE_CHOICES),
+        required=False,
+        allow_empty=False
+    )
+    dry_run = serializers.BooleanField(required=False, default=False)
+    branch_id = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        help_text='Only for users without an assigned branch (superadmin)'
+    )
+
+
+class AnalyzerRunSerializer(serializers.ModelSerializer):
+    """Analyzer run (id is null for dry runs)"""
+    analyzer_code = serializers.CharField(source='analyzer.code', read_only=True)
+
+    class Meta:
+        model = AnalyzerRun
+        fields = [
+            'id',
+            'analyzer',
+            'analyzer_code',
+            'branch',
+            'sample_type',
+            'sequence',
+            'positions',
+            'tests',
+            'created_by',
+            'created_at',
+        ]
+        read_only_fields = fields
+
+
+class LoadListRowSerializer(serializers.Serializer):
+    """One rack position of a load list"""
+    position = serializers.IntegerField()
+    barcode = serializers.CharField(help_text='Order number on the sample label')
+    priority = serializers.CharField()
+    sample_type = serializers.CharField()
+    tests = serializers.ListField(child=serializers.CharField(), help_text='Exam codes to run')
@@ -0,0 +1,195 @@
+"""
+Exam Order Services
+===================
+
+Order creation with a fixed number of queries, independent of the number
+of exams (and of orders, for batches):
+
+- Exam types and panel components come from the per-process catalog
+  cache (no queries in the steady state)
+- Order numbers come from the Redis-backed number service
+- One query validates and locks all patients (a concurrent deactivation
+  or merge waits for the orders to commit)
+- One bulk_create inserts the orders, one inserts all their items
+- Patient summaries are updated with one INSERT + one UPDATE
+
+Items get their SLA deadline and initial worklist score at creation
+(see scheduler.py).
+
+Prices are list prices from the catalog, summed with Decimal in Python.
+"""
+from collections import Counter, namedtuple
+from decimal import Decimal
+
+from django.db import transaction
+
+from apps.common.exceptions import BusinessRuleError
+from apps.patients.models import Patient
+from apps.patients.summary import apply_order_deltas
+from .catalog import get_catalog
+from .events import order_status_events, publish_on_commit
+from .models import ExamOrder, OrderItem
+from .numbering import next_order_number
+from .scheduler import due_at, priority_score
+
+MAX_BATCH_ORDERS = 500
+
+OrderRequest = namedtuple(
+    'OrderRequest', ['patient_id', 'exam_type_ids', 'notes', 'priority'], defaults=('', 'routine')
+)
+
+# (exam_type_id, panel_id or None, price, is_panel header)
+PlannedItem = namedtuple('PlannedItem', ['exam_type_id', 'panel_id', 'price', 'is_panel'])
+
+
+def plan_items(catalog, exam_type_ids):
+    """
+    Expand ordered exams into order lines and compute the total.
+
+    Each ordered exam becomes a priced line; panels add one zero-priced
+    line per component. A component that was also ordered on its own is
+    kept once, as the priced line.
+
+    Returns:
+        (list of PlannedItem, total_price)
+
+    Raises:
+        BusinessRuleError: empty order, unknown or inactive exam types
+    """
+    ordered = list(dict.fromkeys(exam_type_ids))
+    if not ordered:
+        raise BusinessRuleError('La orden debe incluir al menos un examen.', code='empty_order')
+
+    missing = [pk for pk in ordered if pk not in catalog.by_id]
+    if missing:
+        raise BusinessRuleError(
+            'Algunos exámenes no existen o están inactivos.',
+            code='invalid_exam_types',
+            details={'exam_type_ids': missing},
+        )
+
+    items = [
+        PlannedItem(pk, None, catalog.by_id[pk].price, bool(catalog.components_of(pk)))
+        for pk in ordered
+    ]
+    seen = set(ordered)
+    for panel_id in ordered:
+        for component_id in catalog.components_of(panel_id):
+            if component_id not in seen:
+                seen.add(component_id)
+                items.append(PlannedItem(component_id, panel_id, Decimal('0.00'), False))
+
+    total = sum((item.price for item in items), Decimal('0.00'))
+    return items, total
+
+
+def _validate_patients(patient_ids):
+    """Check that the patients exist and are active, locking their rows (in a transaction)."""
+    found = set(
+        Patient.objects.select_for_update()
+        .filter(id__in=set(patient_ids), is_active=True)
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+    missing = sorted(set(patient_ids) - found)
+    if missing:
+        raise BusinessRuleError(
+            'Algunos pacientes no existen o están inactivos.',
+            code='invalid_patients',
+            details={'patient_ids': missing},
+        )
+
+
+def create_orders(requests, branch, user):
+    """
+    Create many orders in one transaction.
+
+    Args:
+        requests: Iterable of OrderRequest
+        branch: Branch creating the orders (root and current branch)
+        user: User creating the orders
+
+    Returns:
+        List of ExamOrder (with ids); items are not prefetched
+
+    Raises:
+        BusinessRuleError: invalid batch; nothing is created
+    """
+    requests = list(requests)
+    if not requests:
+        raise BusinessRuleError('Debe indicar al menos una orden.', code='empty_batch')
+    if len(requests) > MAX_BATCH_ORDERS:
+        raise BusinessRuleError(
+            f'Máximo {MAX_BATCH_ORDERS} órdenes por operación.', code='batch_too_large'
+        )
+
+    catalog = get_catalog()
+    plans = []
+    for index, request in enumerate(requests):
+        try:
+            plans.append(plan_items(catalog, request.exam_type_ids))
+        except BusinessRuleError as e:
+            e.details = {**(e.details or {}), 'index': index}
+            raise
+
+    def new_item(order, item):
+        created_at = order.created_at
+        due = due_at(order.priority, catalog.by_id[item.exam_type_id].turnaround_hours, created_at)
+        return OrderItem(
+            order=order,
+            exam_type_id=item.exam_type_id,
+            panel_id=item.panel_id,
+            is_panel=item.is_panel,
+            branch=branch,
+            price=item.price,
+            due_at=due,
+            priority_score=priority_score(order.priority, created_at, due, created_at),
+        )
+
+    with transaction.atomic():
+        _validate_patients([r.patient_id for r in requests])
+
+        # Numbers come from Redis and are not rolled back; a rollback
+        # leaves gaps, which the numbering scheme tolerates.
+        numbers = [next_order_number(branch) for _ in requests]
+
+        orders = ExamOrder.objects.bulk_create([
+            ExamOrder(
+                order_number=number,
+                patient_id=request.patient_id,
+                root_branch=branch,
+                current_branch=branch,
+                priority=request.priority,
+                total_price=total,
+                notes=request.notes,
+                created_by=user,
+            )
+            for number, request, (_, total) in zip(numbers, requests, plans)
+        ])
+        OrderItem.objects.bulk_create([
+            new_item(order, item)
+            for order, (items, _) in zip(orders, plans)
+            for item in items
+        ])
+        # Visits are the saved created_at (set by bulk_create, auto_now_add),
+        # the column the summary rebuild reads
+        visits = {}
+        for order in orders:
+            visits[order.patient_id] = max(order.created_at, visits.get(order.patient_id, order.created_at))
+        apply_order_deltas(Counter(r.patient_id for r in requests), visits)
+        publish_on_commit(order_status_events(orders))
+
+    return orders
+
+
+def create_order(patient_id, exam_type_ids, branch, user, notes='', priority='routine'):
+    """
+    Create one order with its items.
+
+    Returns:
+        ExamOrder
+
+    Raises:
+        BusinessRuleError: invalid patient or exams
+    """
+    return create_orders([OrderRequest(patient_id, exam_type_ids, notes, priority)], branch, user)[0]
@@ -0,0 +1,37 @@
+"""
+Exam Signal Receivers
+=====================
+
+- Invalidates the per-process catalog cache (see catalog.py)
+- Keeps the panel closure table current (see panels.py)
+
+Connected in ExamsConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalog import invalidate_on_commit
+from .models import ExamType, PanelComponent
+from .panels import apply_edge_added, apply_edge_removed, rebuild_closure
+
+
+@receiver(post_save, sender=ExamType)
+@receiver(post_delete, sender=ExamType)
+def exam_type_changed(sender, **kwargs):
+    invalidate_on_commit()
+
+
+@receiver(post_save, sender=PanelComponent)
+def panel_component_saved(sender, instance, created, **kwargs):
+    if created:
+        apply_edge_added(instance.panel_id, instance.component_id)
+    else:
+        # The edge's endpoints may have changed; edits are rare
+        rebuild_closure()
+    invalidate_on_commit()
+
+
+@receiver(post_delete, sender=PanelComponent)
+def panel_component_deleted(sender, instance, **kwargs):
+    apply_edge_removed(instance.panel_id, instance.component_id)
+    invalidate_on_commit()
@@ -0,0 +1,240 @@
+"""
+Order Event Stream (Server-Sent Events)
+=======================================
+
+GET /api/exams/events streams order status and result-ready events to
+dashboards, replacing polling. It is an async view and needs the ASGI
+server (clinical_lab.asgi under uvicorn workers); under WSGI it answers
+501 instead of tying up a worker thread per open tab.
+
+Fan-out: each worker process holds ONE Redis pub/sub subscription
+(EventBroker). Its reader task pushes every event into the bounded
+in-memory queue of each connected client, and each client filters by its
+own role/branch scope (access.scope_allows). A client too slow to keep up
+is disconnected; EventSource reconnects and resumes from the stream.
+
+Resume: event ids are Redis stream ids. A reconnecting client sends
+Last-Event-ID and the missed events are replayed from the capped stream
+(events.py) before live delivery; ids already replayed are skipped. If
+the client fell further behind than the stream keeps, a `reset` event
+tells it to reload its data.
+
+Connections are closed after MAX_CONNECTION_SECONDS (the browser
+reconnects transparently), which bounds the cost of peers that vanished
+without the server noticing.
+"""
+import asyncio
+import json
+import logging
+import time
+
+import redis.asyncio as aioredis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from redis.exceptions import RedisError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from apps.auth.permissions import user_has_permission
+from .access import order_scope, scope_allows
+from .events import CHANNEL, STREAM_KEY, parse_message
+
+logger = logging.getLogger(__name__)
+
+CLIENT_QUEUE_SIZE = 256
+HEARTBEAT_SECONDS = 15
+MAX_CONNECTION_SECONDS = 300
+RECONNECT_DELAY = 2
+REPLAY_LIMIT = 1000
+RETRY_MS = 3000
+
+
+def _redis():
+    cache = settings.CACHES['default']
+    return aioredis.from_url(cache['LOCATION'], password=cache['OPTIONS'].get('PASSWORD') or None)
+
+
+def _id_key(event_id):
+    """Stream ids ('1718000000000-3') compare numerically, part by part."""
+    ms, _, seq = event_id.partition('-')
+    return int(ms), int(seq or 0)
+
+
+def _visible(scope, payload):
+    # Transfers are also shown at the branch the order left
+    return scope_allows(scope, payload['root_branch_id'], payload['current_branch_id']) or (
+        'from_branch_id' in payload
+        and scope_allows(scope, payload['root_branch_id'], payload['from_branch_id'])
+    )
+
+
+def format_event(event_id, event_type, payload):
+    return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(payload, separators=(",", ":"))}\n\n'
+
+
+class _Client:
+    __slots__ = ('queue', 'lagging')
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.lagging = False
+
+
+class EventBroker:
+    """One pub/sub subscription per process, fanned out to local clients."""
+
+    def __init__(self):
+        self._clients = set()
+        self._task = None
+
+    def subscribe(self):
+        client = _Client()
+        self._clients.add(client)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._read())
+        return client
+
+    def unsubscribe(self, client):
+        self._clients.discard(client)
+
+    def _dispatch(self, event):
+        for client in list(self._clients):
+            try:
+                client.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                client.lagging = True
+                self._clients.discard(client)
+
+    async def _read(self):
+        while True:
+            try:
+                async with _redis() as redis:
+                    async with redis.pubsub() as pubsub:
+                        await pubsub.subscribe(CHANNEL)
+                        async for message in pubsub.listen():
+                            if message['type'] == 'message':
+                                self._dispatch(parse_message(message['data']))
+            except RedisError:
+                logger.warning('Order event subscription lost, reconnecting', exc_info=True)
+            await asyncio.sleep(RECONNECT_DELAY)
+
+
+broker = EventBroker()
+
+
+async def _replay(last_event_id):
+    """
+    Missed events after last_event_id, oldest first.
+
+    Returns:
+        (list of (id, payload), complete) where complete is False when
+        events were trimmed from the stream or exceed REPLAY_LIMIT
+    """
+    try:
+        async with _redis() as redis:
+            oldest = await redis.xrange(STREAM_KEY, count=1)
+            entries = await redis.xrange(STREAM_KEY, min=f'({last_event_id}', count=REPLAY_LIMIT)
+    except RedisError:
+        logger.warning('Could not replay order events', exc_info=True)
+        return [], False
+
+    # Entries older than the oldest kept one may have been trimmed
+    trimmed = not oldest or _id_key(oldest[0][0].decode()) > _id_key(last_event_id)
+    complete = len(entries) < REPLAY_LIMIT and not trimmed
+    events = [(entry_id.decode(), json.loads(fields[b'data'])) for entry_id, fields in entries]
+    return events, complete
+
+
+async def event_stream(scope, last_event_id=None):
+    """Async generator of SSE frames for one client."""
+    client = broker.subscribe()
+    deadline = time.monotonic() + MAX_CONNECTION_SECONDS
+    last_key = None
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+
+        if last_event_id:
+            events, complete = await _replay(last_event_id)
+            if not complete:
+                yield format_event(last_event_id, 'reset', {'reason': 'history_unavailable'})
+            for event_id, payload in events:
+                last_key = _id_key(event_id)
+                if _visible(scope, payload):
+                    yield format_event(event_id, payload['type'], payload)
+
+        while time.monotonic() < deadline and not client.lagging:
+            try:
+                event_id, payload = await asyncio.wait_for(client.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if last_key is not None and _id_key(event_id) <= last_key:
+                continue
+            if _visible(scope, payload):
+                yield format_event(event_id, payload['type'], payload)
+    finally:
+        broker.unsubscribe(client)
+
+
+def _authenticate(request):
+    """
+    Resolve (user, scope) from a Bearer token, an `access_token` query
+    parameter (EventSource cannot send headers) or the session.
+    """
+    header = request.headers.get('Authorization', '')
+    raw_token = header[7:] if header.startswith('Bearer ') else request.GET.get('access_token')
+    if raw_token:
+        authenticator = JWTAuthentication()
+        try:
+            user = authenticator.get_user(authenticator.get_validated_token(raw_token))
+        except (InvalidToken, AuthenticationFailed):
+            return None, None
+    else:
+        user = request.user
+    if not user or not user.is_authenticated:
+        return None, None
+    if not user_has_permission(user, 'orders.view'):
+        return user, None
+    return user, order_scope(user)
+
+
+async def order_events_view(request):
+    """
+    Stream order events
+
+    GET /api/exams/events
+    Headers: Authorization: Bearer <token> (or ?access_token=<token>),
+             Last-Event-ID: <id> (sent automatically by EventSource on reconnect)
+
+    Stream:
+        id: 1718000000000-0
+        event: order_status
+        data: {"type":"order_status","order_id":101,"status":"completed",...}
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método no permitido.'}, status=405)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'El flujo de eventos requiere el servidor ASGI.'}, status=501
+        )
+
+    user, scope = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'error': 'Autenticación requerida.'}, status=401)
+    if scope is None:
+        return JsonResponse({'error': 'No tiene permiso para ver órdenes.'}, status=403)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        _id_key(last_event_id or '0')
+    except ValueError:
+        last_event_id = None
+    response = StreamingHttpResponse(
+        event_stream(scope, last_event_id or None),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,3 +1,50 @@
-from django.test import TestCase
+import threading
 
-# Create your tests here.
+from django.db import connection
+from django.test import TransactionTestCase
+
+from apps.branches.models import Branch
+from apps.exams.numbering import BLOCK_SIZE, next_order_number
+
+
+class OrderNumberConcurrencyTests(TransactionTestCase):
+    """Order numbers issued from many threads at once must never repeat."""
+
+    THREADS = 8
+    NUMBERS_PER_THREAD = 3 * BLOCK_SIZE // 2
+
+    def setUp(self):
+        self.branch = Branch.objects.create(
+            name='Sucursal Prueba', code='TST-01', address='-', phone='-', email='tst@example.com'
+        )
+
+    def test_concurrent_allocation_is_unique_and_increasing(self):
+        results = [[] for _ in range(self.THREADS)]
+        errors = []
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker(index):
+            try:
+                barrier.wait()
+                for _ in range(self.NUMBERS_PER_THREAD):
+                    results[index].append(next_order_number(self.branch, year=2026))
+            except Exception as e:  # surfaced below; threads swallow exceptions
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        issued = [number for numbers in results for number in numbers]
+        self.assertEqual(len(issued), len(set(issued)))
+        self.assertTrue(all(n.startswith('ORD-TST01-2026-') for n in issued))
+
+        # Each thread sees its own numbers strictly increasing
+        for numbers in results:
+            sequence = [int(n.rsplit('-', 1)[1]) for n in numbers]
+            self.assertEqual(sequence, sorted(set(sequence)))
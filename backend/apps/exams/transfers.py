@@ -0,0 +1,146 @@
+"""
+Order Transfers
+===============
+
+Moves orders between branches (e.g. a courier batch of samples sent to
+the central lab). root_branch never changes; current_branch does, and
+every move is recorded in OrderTransfer.
+
+A batch is one transaction with a fixed number of statements however
+many orders it carries:
+
+    SELECT ... FROM exam_orders WHERE id = ANY(...) ORDER BY id FOR UPDATE
+    UPDATE exam_orders SET current_branch_id = ... WHERE id = ANY(...)
+    UPDATE order_items SET branch_id = ..., claim = NULL WHERE order_id = ANY(...)
+    INSERT INTO order_transfers ... (bulk_create)
+
+plus, when moved pending items were batched on analyzer runs, one query
+for the runs involved, one UPDATE taking the items off them and one
+UPDATE recounting the runs' positions and tests.
+
+Orders are locked in ascending id order, so two overlapping batches wait
+on each other instead of deadlocking. Work-queue claims on the moved
+items are dropped: the items now belong to the destination branch queue.
+One order_status event per moved order is published after commit, so
+both branches' dashboards update.
+"""
+import uuid
+from collections import namedtuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.common.exceptions import BusinessRuleError
+from .events import ORDER_STATUS, order_event, publish_on_commit
+from .models import ExamOrder, OrderItem, OrderTransfer
+from .runs import recount_runs
+
+MAX_TRANSFER_ORDERS = 1000
+
+# Orders in these states have nothing left to process
+CLOSED_STATUSES = ('completed', 'cancelled')
+
+TransferResult = namedtuple('TransferResult', ['batch_id', 'transferred', 'skipped'])
+
+
+def transfer_orders(order_ids, to_branch, user, reason='', from_branch=None):
+    """
+    Move a set of orders to another branch in one transaction.
+
+    Args:
+        order_ids: Ids of the orders to move
+        to_branch: Destination Branch
+        user: User performing the transfer
+        reason: Optional reason, stored on every history row
+        from_branch: If given, every order must currently be at this
+            branch (users can only send out orders they hold)
+
+    Returns:
+        TransferResult(batch_id, transferred ids, skipped ids); orders
+        already at the destination are skipped
+
+    Raises:
+        BusinessRuleError: invalid batch; nothing is moved
+    """
+    order_ids = sorted(set(order_ids))
+    if not order_ids:
+        raise BusinessRuleError('Debe indicar al menos una orden.', code='empty_batch')
+    if len(order_ids) > MAX_TRANSFER_ORDERS:
+        raise BusinessRuleError(
+            f'Máximo {MAX_TRANSFER_ORDERS} órdenes por transferencia.', code='batch_too_large'
+        )
+    if not to_branch.is_active:
+        raise BusinessRuleError('La sucursal de destino está inactiva.', code='invalid_branch')
+
+    batch_id = uuid.uuid4()
+    with transaction.atomic():
+        locked = list(
+            ExamOrder.objects.filter(id__in=order_ids)
+            .select_for_update()
+            .order_by('id')
+            .values_list('id', 'current_branch_id', 'status', 'order_number', 'root_branch_id')
+        )
+
+        missing = sorted(set(order_ids) - {row[0] for row in locked})
+        if missing:
+            raise BusinessRuleError(
+                'Algunas órdenes no existen.', code='invalid_orders', details={'order_ids': missing}
+            )
+        closed = [row[0] for row in locked if row[2] in CLOSED_STATUSES]
+        if closed:
+            raise BusinessRuleError(
+                'No se pueden transferir órdenes completadas o canceladas.',
+                code='order_not_transferable',
+                details={'order_ids': closed},
+            )
+        if from_branch is not None:
+            elsewhere = [row[0] for row in locked if row[1] not in (from_branch.id, to_branch.id)]
+            if elsewhere:
+                raise BusinessRuleError(
+                    'Algunas órdenes no están en su sucursal.',
+                    code='order_not_in_branch',
+                    details={'order_ids': elsewhere},
+                )
+
+        moving = [row for row in locked if row[1] != to_branch.id]
+        moved_ids = [row[0] for row in moving]
+        if moving:
+            now = timezone.now()
+            ExamOrder.objects.filter(id__in=moved_ids).update(current_branch=to_branch, updated_at=now)
+            OrderItem.objects.filter(order_id__in=moved_ids).update(
+                branch=to_branch,
+                claimed_by=None,
+                claimed_at=None,
+                claim_expires_at=None,
+                updated_at=now,
+            )
+            # Pending items leave the analyzer runs of the previous branch
+            batched = OrderItem.objects.filter(
+                order_id__in=moved_ids, status='pending', analyzer_run__isnull=False
+            )
+            run_ids = list(batched.order_by().values_list('analyzer_run_id', flat=True).distinct())
+            if run_ids:
+                batched.update(analyzer_run=None, run_position=None)
+                recount_runs(run_ids)
+            OrderTransfer.objects.bulk_create([
+                OrderTransfer(
+                    batch_id=batch_id,
+                    order_id=pk,
+                    from_branch_id=branch_id,
+                    to_branch=to_branch,
+                    reason=reason,
+                    transferred_by=user,
+                )
+                for pk, branch_id, *_ in moving
+            ])
+            publish_on_commit(
+                order_event(
+                    ORDER_STATUS, pk, order_number, order_status, root_branch_id, to_branch.id,
+                    from_branch_id=branch_id,
+                )
+                for pk, branch_id, order_status, order_number, root_branch_id in moving
+            )
+
+    skipped = [row[0] for row in locked if row[1] == to_branch.id]
+    return TransferResult(batch_id, moved_ids, skipped)
+
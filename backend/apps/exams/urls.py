@@ -0,0 +1,22 @@
+"""
+Exam URL Configuration
+Maps endpoints to views
+"""
+from django.urls import path
+from . import stream, views
+
+app_name = 'exams'
+
+urlpatterns = [
+    path('types', views.exam_catalog_view, name='catalog'),
+    path('orders', views.create_order_view, name='order-create'),
+    path('orders/batch', views.create_orders_batch_view, name='order-batch-create'),
+    path('orders/transfer', views.transfer_orders_view, name='order-transfer'),
+    path('events', stream.order_events_view, name='order-events'),
+    path('worklist/claim', views.worklist_claim_view, name='worklist-claim'),
+    path('worklist/heartbeat', views.worklist_heartbeat_view, name='worklist-heartbeat'),
+    path('worklist/release', views.worklist_release_view, name='worklist-release'),
+    path('runs', views.analyzer_runs_view, name='analyzer-runs'),
+    path('runs/build', views.build_runs_view, name='analyzer-runs-build'),
+    path('runs/<int:run_id>/load-list', views.run_load_list_view, name='analyzer-run-load-list'),
+]
@@ -1 +1,598 @@
-# Views will be implemented in future phases.
+"""
+Exam Views
+Handles exam catalog and order endpoints
+"""
+import csv
+
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+
+from apps.auth.decorators import require_permission
+from apps.auth.models import AuditLog
+from apps.auth.views import get_client_ip, get_user_agent
+from apps.branches.models import Branch
+from apps.common.exceptions import BusinessRuleError
+from .catalog import get_catalog
+from .models import AnalyzerRun, ExamOrder, OrderItem
+from .serializers import (
+    CatalogExamSerializer,
+    OrderCreateSerializer,
+    OrderBatchCreateSerializer,
+    ExamOrderSerializer,
+    WorklistClaimSerializer,
+    WorklistItemIdsSerializer,
+    WorklistHeartbeatSerializer,
+    WorkItemSerializer,
+    OrderTransferRequestSerializer,
+    BuildRunsSerializer,
+    AnalyzerRunSerializer,
+    LoadListRowSerializer,
+)
+from .services import create_order, create_orders, OrderRequest, MAX_BATCH_ORDERS
+from .transfers import transfer_orders, MAX_TRANSFER_ORDERS
+from .worklist import claim_items, heartbeat, release_items, MAX_CLAIM_SIZE
+from . import runs
+
+
+@extend_schema(
+    tags=['Exams'],
+    summary='Exam Catalog',
+    description=(
+        'Active exam types, served from the per-process catalog cache. '
+        'Send the previous ETag in If-None-Match to get 304 when unchanged.'
+    ),
+    parameters=[
+        OpenApiParameter('If-None-Match', str, location=OpenApiParameter.HEADER, description='ETag of a cached copy'),
+    ],
+    responses={
+        200: CatalogExamSerializer(many=True),
+        304: OpenApiResponse(description='Catalog unchanged'),
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def exam_catalog_view(request):
+    """
+    List the active exam catalog
+
+    GET /api/exams/types
+
+    Response (ETag: "catalog-3f2a..."):
+    {
+        "count": 2,
+        "results": [
+            {"id": 1, "code": "HEM-001", "name": "Hemograma", "category": "hematology",
+             "price": "12.50", "sample_type": "blood"}
+        ]
+    }
+    """
+    catalog = get_catalog()
+    headers = {'ETag': catalog.etag, 'Cache-Control': 'private, no-cache'}
+
+    if catalog.etag in request.headers.get('If-None-Match', ''):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        {'count': len(catalog.payload), 'results': catalog.payload},
+        status=status.HTTP_200_OK,
+        headers=headers
+    )
+
+
+def resolve_order_branch(user, branch_id=None):
+    """
+    Branch where the user creates orders: their assigned branch, or the
+    requested one for users without a branch (superadmin).
+
+    Raises:
+        BusinessRuleError: no usable branch
+    """
+    profile = getattr(user, 'profile', None)
+    if profile is not None and profile.branch_id:
+        return profile.branch
+    if branch_id is not None:
+        branch = Branch.objects.filter(id=branch_id, is_active=True).first()
+        if branch is not None:
+            return branch
+    raise BusinessRuleError('Debe indicar una sucursal activa para la orden.', code='invalid_branch')
+
+
+def _orders_response(orders):
+    orders = ExamOrder.objects.filter(id__in=[o.id for o in orders]).prefetch_related('items').order_by('id')
+    return ExamOrderSerializer(orders, many=True).data
+
+
+@extend_schema(
+    tags=['Exams'],
+    summary='Create Exam Order',
+    description=(
+        'Creates an order with its items in one transaction. Panels are expanded '
+        'into their component exams; the total is the sum of list prices.'
+    ),
+    request=OrderCreateSerializer,
+    responses={
+        201: ExamOrderSerializer,
+        400: OpenApiResponse(description='Invalid patient, exams or branch'),
+        403: OpenApiResponse(description='Missing orders.create permission'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('orders.create')
+def create_order_view(request):
+    """
+    Create an exam order
+
+    POST /api/exams/orders
+
+    Request:
+    {
+        "patient_id": 12,
+        "exam_type_ids": [3, 7],
+        "notes": "Ayuno de 8 horas",
+        "priority": "stat"
+    }
+    """
+    serializer = OrderCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    try:
+        branch = resolve_order_branch(request.user, data.get('branch_id'))
+        order = create_order(
+            data['patient_id'], data['exam_type_ids'], branch, request.user,
+            notes=data['notes'], priority=data['priority']
+        )
+    except BusinessRuleError as e:
+        return Response(e.as_response_data(), status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(_orders_response([order])[0], status=status.HTTP_201_CREATED)
+
+
+@extend_schema(
+    tags=['Exams'],
+    summary='Create Exam Orders in Batch',
+    description=(
+        f'Creates up to {MAX_BATCH_ORDERS} orders (e.g. a health fair) in one '
+        'transaction; if any order is invalid nothing is created.'
+    ),
+    request=OrderBatchCreateSerializer,
+    responses={
+        201: ExamOrderSerializer(many=True),
+        400: OpenApiResponse(description='Invalid batch (details.index points at the order)'),
+        403: OpenApiResponse(description='Missing orders.create permission'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('orders.create')
+def create_orders_batch_view(request):
+    """
+    Create many exam orders
+
+    POST /api/exams/orders/batch
+
+    Request:
+    {
+        "orders": [
+            {"patient_id": 12, "exam_type_ids": [3, 7]},
+            {"patient_id": 13, "exam_type_ids": [3]}
+        ]
+    }
+
+    Response:
+    {
+        "count": 2,
+        "results": [{"id": 101, "order_number": "ORD-LAB01-2026-000101", ...}]
+    }
+    """
+    serializer = OrderBatchCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    try:
+        branch = resolve_order_branch(request.user, data.get('branch_id'))
+        orders = create_orders(
+            [
+                OrderRequest(o['patient_id'], o['exam_type_ids'], o['notes'], o['priority'])
+                for o in data['orders']
+            ],
+            branch,
+            request.user,
+        )
+    except BusinessRuleError as e:
+        return Response(e.as_response_data(), status=status.HTTP_400_BAD_REQUEST)
+
+    results = _orders_response(orders)
+    return Response({'count': len(results), 'results': results}, status=status.HTTP_201_CREATED)
+
+
+def _work_items(item_ids):
+    return WorkItemSerializer(
+        OrderItem.objects.filter(id__in=item_ids)
+        .select_related('order', 'exam_type')
+        .order_by('-priority_score', 'id'),
+        many=True
+    ).data
+
+
+@extend_schema(
+    tags=['Exams'],
+    summary='Claim Work Items',
+    description=(
+        f'Claims up to {MAX_CLAIM_SIZE} pending exams of the caller\'s branch, '
+        'most urgent first (priority class, waiting time and SLA deadline). '
+        'Concurrent technicians never receive the same item; claims are leases '
+        'that expire unless renewed with the heartbeat endpoint.'
+    ),
+    request=WorklistClaimSerializer,
+    responses={
+        200: WorkItemSerializer(many=True),
+        400: OpenApiResponse(description='Invalid limit, lease or branch'),
+        403: OpenApiResponse(description='Missing orders.view_pending permission'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('orders.view_pending')
+def worklist_claim_view(request):
+    """
+    Claim the next pending exams
+
+    POST /api/exams/worklist/claim
+
+    Request:
+    {
+        "limit": 5,
+        "lease_seconds": 300
+    }
+
+    Response:
+    {
+        "count": 2,
+        "results": [
+            {"id": 501, "order_number": "ORD-LAB01-2026-000101", "exam_code": "HEM-001",
+             "claim_expires_at": "2026-03-01T10:05:00Z", ...}
+        ]
+    }
+    """
+    serializer = WorklistClaimSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    try:
+        branch = resolve_order_branch(request.user, data.get('branch_id'))
+        item_ids = claim_items(request.user, branch, data['limit'], data['lease_seconds'])
+    except BusinessRuleError as e:
+        return Response(e.as_response_data(), status=status.HTTP_400_BAD_REQUEST)
+
+    results = _work_items(item_ids)
+    return Response({'count': len(results), 'results': results}, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    tags=['Exams'],
+    summary='Renew Work Item Claims',
+    description=(
+        'Extends the caller\'s live claims. Items whose lease already expired '
+        'are not renewed and are missing from item_ids in the response.'
+    ),
+    request=WorklistHeartbeatSerializer,
+    responses={
+        200: OpenApiResponse(description='Renewed item ids'),
+        400: OpenApiResponse(description='Invalid request'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('orders.view_pending')
+def worklist_heartbeat_view(request):
+    """
+    Renew claims
+
+    POST /api/exams/worklist/heartbeat
+
+    Request:
+    {
+        "item_ids": [501, 502],
+        "lease_seconds": 300
+    }
+
+    Response:
+    {
+        "item_ids": [501, 502]
+    }
+    """
+    serializer = WorklistHeartbeatSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    try:
+        renewed = heartbeat(request.user, data['item_ids'], data['lease_seconds'])
+    except BusinessRuleError as e:
+        return Response(e.as_response_data(), status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'item_ids': renewed}, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    tags=['Exams'],
+    summary='Release Work Items',
+    description='Returns the caller\'s claimed items to the branch queue.',
+    request=WorklistItemIdsSerializer,
+    responses={
+        200: OpenApiResponse(description='Number of released items'),
+        400: OpenApiResponse(description='Invalid request'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('orders.view_pending')
+def worklist_release_view(request):
+    """
+    Release claims
+
+    POST /api/exams/worklist/release
+
+    Request:
+    {
+        "item_ids": [501]
+    }
+
+    Response:
+    {
+        "released": 1
+    }
+    """
+    serializer = WorklistItemIdsSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    released = release_items(request.user, serializer.validated_data['item_ids'])
+    return Response({'released': released}, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    tags=['Exams'],
+    summary='Transfer Orders',
+    description=(
+        f'Moves up to {MAX_TRANSFER_ORDERS} orders to another branch in one transaction '
+        '(e.g. a courier batch to the central lab). Users with an assigned branch can only '
+        'send orders currently at their branch. Orders already at the destination are skipped.'
+    ),
+    request=OrderTransferRequestSerializer,
+    responses={
+        200: OpenApiResponse(description='Batch id, transferred and skipped order ids'),
+        400: OpenApiResponse(description='Invalid batch; nothing is moved'),
+        403: OpenApiResponse(description='Missing orders.transfer permission'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('orders.transfer')
+def transfer_orders_view(request):
+    """
+    Transfer orders to another branch
+
+    POST /api/exams/orders/transfer
+
+    Request:
+    {
+        "order_ids": [101, 102, 103],
+        "to_branch_id": 1,
+        "reason": "Envío a laboratorio central"
+    }
+
+    Response:
+    {
+        "batch_id": "5c1f...",
+        "transferred": [101, 102],
+        "skipped": [103]
+    }
+    """
+    serializer = OrderTransferRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    profile = getattr(request.user, 'profile', None)
+    try:
+        to_branch = Branch.objects.filter(id=data['to_branch_id']).first()
+        if to_branch is None:
+            raise BusinessRuleError('La sucursal de destino no existe.', code='invalid_branch')
+        result = transfer_orders(
+            data['order_ids'],
+            to_branch,
+            request.user,
+            reason=data['reason'],
+            from_branch=profile.branch if profile is not None and profile.branch_id else None,
+        )
+    except BusinessRuleError as e:
+        return Response(e.as_response_data(), status=status.HTTP_400_BAD_REQUEST)
+
+    # One entry for the whole batch; per-order detail lives in order_transfers
+    AuditLog.objects.create(
+        user=request.user,
+        action='order_transfer',
+        ip_address=get_client_ip(request),
+        user_agent=get_user_agent(request),
+        details={
+            'batch_id': str(result.batch_id),
+            'to_branch_id': to_branch.id,
+            'count': len(result.transferred),
+            'order_ids': result.transferred,
+        }
+    )
+
+    return Response(
+        {
+            'batch_id': str(result.batch_id),
+            'transferred': result.transferred,
+            'skipped': result.skipped,
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+def _user_branch_id(user):
+    profile = getattr(user, 'profile', None)
+    return profile.branch_id if profile is not None else None
+
+
+@extend_schema(
+    tags=['Exams'],
+    summary='Build Analyzer Runs',
+    description=(
+        'Batches the pending, unclaimed exams of the caller\'s branch into analyzer runs: '
+        'each sample (order and sample type) goes to the analyzer that runs most of its exams, '
+        'then samples are packed most urgent first into runs within the analyzer\'s rack '
+        'positions and tests per run. Batched exams leave the technician queue. '
+        'With dry_run the plan is returned without saving it.'
+    ),
+    request=BuildRunsSerializer,
+    responses={
+        201: AnalyzerRunSerializer(many=True),
+        200: OpenApiResponse(description='Dry run: planned runs (id null)'),
+        400: OpenApiResponse(description='Invalid request, branch or no active analyzers'),
+        403: OpenApiResponse(description='Missing orders.view_pending permission'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('orders.view_pending')
+def build_runs_view(request):
+    """
+    Batch pending exams into analyzer runs
+
+    POST /api/exams/runs/build
+
+    Request:
+    {
+        "sample_types": ["serum"],
+        "dry_run": false
+    }
+
+    Response:
+    {
+        "count": 2,
+        "results": [
+            {"id": 41, "analyzer_code": "COBAS-1", "sample_type": "serum", "sequence": 118,
+             "positions": 60, "tests": 214, ...}
+        ],
+        "unassigned_item_ids": [9031]
+    }
+    """
+    serializer = BuildRunsSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    try:
+        branch = resolve_order_branch(request.user, data.get('branch_id'))
+        built, unassigned = runs.build_runs(
+            branch,
+            request.user,
+            analyzer_ids=data.get('analyzer_ids'),
+            sample_types=data.get('sample_types'),
+            dry_run=data['dry_run'],
+        )
+    except BusinessRuleError as e:
+        return Response(e.as_response_data(), status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {
+            'count': len(built),
+            'results': AnalyzerRunSerializer(built, many=True).data,
+            'unassigned_item_ids': unassigned,
+        },
+        status=status.HTTP_200_OK if data['dry_run'] else status.HTTP_201_CREATED
+    )
+
+
+@extend_schema(
+    tags=['Exams'],
+    summary='Analyzer Runs',
+    description=f'Latest {runs.MAX_RUNS_LISTED} analyzer runs of the caller\'s branch (all branches for superadmin).',
+    responses={
+        200: AnalyzerRunSerializer(many=True),
+        403: OpenApiResponse(description='Missing orders.view_pending permission'),
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@require_permission('orders.view_pending')
+def analyzer_runs_view(request):
+    """
+    Latest analyzer runs
+
+    GET /api/exams/runs
+    """
+    recent = runs.recent_runs(_user_branch_id(request.user))
+    return Response({'results': AnalyzerRunSerializer(recent, many=True).data})
+
+
+@extend_schema(
+    tags=['Exams'],
+    summary='Analyzer Run Load List',
+    description=(
+        'Rack positions of a run with the sample barcode (order number) and the exam '
+        'codes to run; export=csv downloads it for the analyzer.'
+    ),
+    parameters=[
+        OpenApiParameter('export', str, enum=['csv'], description='csv: download as a CSV file'),
+    ],
+    responses={
+        200: LoadListRowSerializer(many=True),
+        403: OpenApiResponse(description='Missing orders.view_pending permission'),
+        404: OpenApiResponse(description='Run not found (or of another branch)'),
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@require_permission('orders.view_pending')
+def run_load_list_view(request, run_id):
+    """
+    Load list of an analyzer run
+
+    GET /api/exams/runs/{run_id}/load-list[?export=csv]
+
+    Response:
+    {
+        "run": {"id": 41, "analyzer_code": "COBAS-1", "sequence": 118, ...},
+        "results": [
+            {"position": 1, "barcode": "ORD-LAB01-2026-000101", "priority": "stat",
+             "sample_type": "serum", "tests": ["GLU", "K", "NA"]}
+        ]
+    }
+    """
+    queryset = AnalyzerRun.objects.select_related('analyzer')
+    branch_id = _user_branch_id(request.user)
+    if branch_id is not None:
+        queryset = queryset.filter(branch_id=branch_id)
+    run = get_object_or_404(queryset, id=run_id)
+    rows = runs.load_list(run)
+
+    if request.query_params.get('export') == 'csv':
+        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = (
+            f'attachment; filename="{run.analyzer.code}-{run.sequence}.csv"'
+        )
+        writer = csv.writer(response)
+        writer.writerow(runs.LOAD_LIST_COLUMNS)
+        for row in rows:
+            writer.writerow([*(row[column] for column in runs.LOAD_LIST_COLUMNS[:-1]), ' '.join(row['tests'])])
+        return response
+
+    return Response({
+        'run': AnalyzerRunSerializer(run).data,
+        'results': LoadListRowSerializer(rows, many=True).data,
+    })
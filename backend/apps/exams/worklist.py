@@ -0,0 +1,145 @@
+"""
+Technician Work Queue
+=====================
+
+Pending order items of a branch form a shared queue. A technician claims
+the next N items; a claim is a lease that expires after `lease_seconds`
+unless renewed with heartbeats, so items held by a closed browser tab
+return to the queue on their own.
+
+Claiming is one short transaction:
+
+    SELECT id FROM order_items
+    WHERE branch_id = %s AND status = 'pending' AND NOT is_panel
+      AND analyzer_run_id IS NULL
+      AND (claim_expires_at IS NULL OR claim_expires_at < now())
+    ORDER BY priority_score DESC, id LIMIT n
+    FOR UPDATE SKIP LOCKED
+
+followed by an UPDATE of those ids. SKIP LOCKED makes concurrent
+claimers pass over rows another transaction is claiming instead of
+waiting on them, so technicians never block each other and never get the
+same item. The query is a top-K read of the partial index
+order_items_queue_idx (scores are maintained by scheduler.py), whose size
+is the pending queue of the branch only, so claim latency does not grow
+with the order history. Items batched into an analyzer run (runs.py)
+are processed by the instrument and are not served.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.common.exceptions import BusinessRuleError
+from .models import OrderItem
+
+DEFAULT_LEASE_SECONDS = 300
+MAX_LEASE_SECONDS = 3600
+MAX_CLAIM_SIZE = 50
+
+
+def claimable(branch, now=None):
+    """Queryset of the branch's queue items not held by a live lease."""
+    now = now or timezone.now()
+    return OrderItem.objects.filter(
+        Q(claim_expires_at__isnull=True) | Q(claim_expires_at__lt=now),
+        branch=branch,
+        status='pending',
+        is_panel=False,
+        analyzer_run__isnull=True,
+    )
+
+
+def _check_lease(lease_seconds):
+    if not 1 <= lease_seconds <= MAX_LEASE_SECONDS:
+        raise BusinessRuleError(
+            f'La reserva debe durar entre 1 y {MAX_LEASE_SECONDS} segundos.', code='invalid_lease'
+        )
+
+
+def claim_items(user, branch, limit=1, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Claim the most urgent pending items of a branch for a technician.
+
+    Args:
+        user: Technician claiming the items
+        branch: Branch whose queue is served
+        limit: Maximum number of items to claim
+        lease_seconds: Lease length; renew with heartbeat()
+
+    Returns:
+        List of claimed item ids (fewer than `limit` when the queue is short)
+
+    Raises:
+        BusinessRuleError: invalid limit or lease
+    """
+    if not 1 <= limit <= MAX_CLAIM_SIZE:
+        raise BusinessRuleError(
+            f'Puede tomar entre 1 y {MAX_CLAIM_SIZE} exámenes a la vez.', code='invalid_claim_size'
+        )
+    _check_lease(lease_seconds)
+
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            claimable(branch, now)
+            .select_for_update(skip_locked=True)
+            .order_by('-priority_score', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if ids:
+            OrderItem.objects.filter(id__in=ids).update(
+                claimed_by=user,
+                claimed_at=now,
+                claim_expires_at=now + timedelta(seconds=lease_seconds),
+                updated_at=now,
+            )
+    return ids
+
+
+def _held_by(user, item_ids, now):
+    return OrderItem.objects.filter(
+        id__in=item_ids,
+        claimed_by=user,
+        claim_expires_at__gte=now,
+        status='pending',
+    )
+
+
+def heartbeat(user, item_ids, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Renew the caller's live leases.
+
+    Expired leases are not revived: the item may already belong to
+    someone else, so the client must drop ids missing from the result.
+
+    Returns:
+        Sorted list of renewed item ids
+    """
+    _check_lease(lease_seconds)
+    now = timezone.now()
+    with transaction.atomic():
+        held = _held_by(user, item_ids, now).select_for_update(skip_locked=True)
+        ids = sorted(held.values_list('id', flat=True))
+        OrderItem.objects.filter(id__in=ids).update(
+            claim_expires_at=now + timedelta(seconds=lease_seconds),
+            updated_at=now,
+        )
+    return ids
+
+
+def release_items(user, item_ids):
+    """
+    Return the caller's claimed items to the queue.
+
+    Returns:
+        Number of items released
+    """
+    now = timezone.now()
+    return _held_by(user, item_ids, now).update(
+        claimed_by=None,
+        claimed_at=None,
+        claim_expires_at=None,
+        updated_at=now,
+    )
@@ -1,3 +1,90 @@
+"""
+Django Admin Configuration for Patient Models
+"""
 from django.contrib import admin
+from .models import Patient, DuplicateCandidate, PatientMergeJournal, PatientRecord, PatientSummary
 
-# Register your models here.
+
+@admin.register(Patient)
+class PatientAdmin(admin.ModelAdmin):
+    """Patient admin with search on ID number and names"""
+
+    list_display = [
+        'identification_number',
+        'last_name',
+        'first_name',
+        'date_of_birth',
+        'gender',
+        'branch',
+        'is_active',
+    ]
+
+    list_filter = ['is_active', 'gender', 'branch']
+
+    search_fields = ['identification_number', 'last_name', 'first_name']
+
+    readonly_fields = ['full_name_normalized', 'created_by', 'created_at', 'updated_at']
+
+    list_select_related = ['branch']
+
+
+@admin.register(DuplicateCandidate)
+class DuplicateCandidateAdmin(admin.ModelAdmin):
+    """Review queue of probable duplicate patients"""
+
+    list_display = ['patient', 'duplicate', 'score', 'matched_on', 'status', 'created_at']
+
+    list_filter = ['status']
+
+    raw_id_fields = ['patient', 'duplicate', 'reviewed_by']
+
+    list_select_related = ['patient', 'duplicate']
+
+
+@admin.register(PatientMergeJournal)
+class PatientMergeJournalAdmin(admin.ModelAdmin):
+    """Read-only history of patient merges"""
+
+    list_display = ['batch_id', 'survivor', 'merged', 'merged_by', 'merged_at', 'undone_at']
+
+    search_fields = ['batch_id']
+
+    raw_id_fields = ['survivor', 'merged', 'merged_by', 'undone_by']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PatientRecord)
+class PatientRecordAdmin(admin.ModelAdmin):
+    """Clinical record admin"""
+
+    list_display = ['patient', 'record_date', 'chief_complaint', 'branch', 'created_by']
+
+    list_filter = ['branch']
+
+    search_fields = ['patient__identification_number', 'chief_complaint', 'diagnosis']
+
+    raw_id_fields = ['patient', 'created_by']
+
+    readonly_fields = ['created_at', 'updated_at']
+
+    date_hierarchy = 'record_date'
+
+
+@admin.register(PatientSummary)
+class PatientSummaryAdmin(admin.ModelAdmin):
+    """Read-only view of the patient summary projection"""
+
+    list_display = ['patient', 'last_visit_at', 'order_count', 'open_balance', 'last_abnormal_result_at']
+
+    raw_id_fields = ['patient']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -6,3 +6,6 @@ class PatientsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.patients'
     verbose_name = 'Patients'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects summary receivers)
@@ -0,0 +1,299 @@
+"""
+Duplicate Patient Detection
+===========================
+
+Blocking-key duplicate detection. Instead of comparing every pair of
+patients (O(n²)), patients are grouped into blocks that share a cheap
+key, and only patients within the same block are compared:
+
+- birth_date: date of birth + phonetic key of the first surname
+- id_prefix:  first ID_PREFIX_LENGTH characters of the normalized ID
+              number (uppercase alphanumerics)
+- phone:      significant digits of the phone number
+
+Scoring is vectorized with NumPy: each block is turned into matrices of
+hashed character-bigram vectors, and all pairwise similarities of the
+block come out of a single matrix product.
+
+Modes:
+- find_duplicates(): incremental check of one (possibly unsaved)
+  registration; one indexed query + one small matrix product
+- find_duplicate_pairs(): full scan; blocks are scored in parallel on
+  a process pool
+"""
+import logging
+import zlib
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.db import connections
+from django.db.models import Q
+
+from apps.common.utils import normalize_phone, normalize_text
+from .models import ID_PREFIX_LENGTH, Patient, id_number_prefix
+from .phonetics import patient_phonetic_keys
+
+logger = logging.getLogger(__name__)
+
+BIGRAM_DIMS = 512
+
+# Blocks larger than this are junk keys (placeholder phones, '000000'
+# ID prefixes) and would reintroduce quadratic cost, so they are skipped.
+MAX_BLOCK_SIZE = 500
+
+# Upper bound of candidates fetched for an incremental check
+MAX_INCREMENTAL_CANDIDATES = 200
+
+DEFAULT_THRESHOLD = 0.8
+
+SCORE_WEIGHTS = {
+    'name': 0.45,
+    'birth_date': 0.25,
+    'id_number': 0.20,
+    'phone': 0.10,
+}
+
+DedupRecord = namedtuple(
+    'DedupRecord',
+    ['id', 'name', 'birth_ordinal', 'id_number', 'phone', 'surname_key'],
+)
+
+_RECORD_FIELDS = (
+    'id',
+    'full_name_normalized',
+    'date_of_birth',
+    'identification_number',
+    'phone_normalized',
+    'last_name_phonetic',
+)
+
+
+def normalize_id_number(value):
+    """Uppercase alphanumerics only ('09.1234-567' -> '091234567')."""
+    return ''.join(ch for ch in (value or '').upper() if ch.isalnum())
+
+
+def _to_record(row):
+    pk, name, birth_date, id_number, phone, surname_key = row
+    return DedupRecord(
+        pk, name, birth_date.toordinal(), normalize_id_number(id_number), phone, surname_key,
+    )
+
+
+def blocking_keys(record):
+    """Return the (kind, key) blocks a record belongs to."""
+    keys = []
+    if record.surname_key:
+        keys.append(('birth_date', f'{record.birth_ordinal}:{record.surname_key}'))
+    if len(record.id_number) >= ID_PREFIX_LENGTH:
+        keys.append(('id_prefix', record.id_number[:ID_PREFIX_LENGTH]))
+    if record.phone:
+        keys.append(('phone', record.phone))
+    return keys
+
+
+# ── Vectorized scoring ────────────────────────────────────────
+
+
+def _bigram_matrix(values):
+    """
+    Hash the character bigrams of each string into a fixed-size vector.
+
+    Rows are L2-normalized, so `M @ M.T` yields the cosine similarity of
+    every pair of strings at once.
+    """
+    matrix = np.zeros((len(values), BIGRAM_DIMS), dtype=np.float32)
+    for row, value in enumerate(values):
+        if not value:
+            continue
+        padded = f' {value} '
+        buckets = [zlib.crc32(padded[i:i + 2].encode()) % BIGRAM_DIMS for i in range(len(padded) - 1)]
+        np.add.at(matrix[row], buckets, 1.0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def score_matrix(records):
+    """
+    Compute the pairwise duplicate score of a list of records.
+
+    Returns:
+        (n, n) float32 matrix; entry [i, j] is the weighted combination of
+        name similarity, birth date equality, ID similarity and phone equality
+    """
+    names = _bigram_matrix([r.name for r in records])
+    ids = _bigram_matrix([r.id_number for r in records])
+
+    birth = np.array([r.birth_ordinal for r in records])
+    id_numbers = np.array([r.id_number for r in records])
+    phones = np.array([r.phone for r in records])
+
+    id_similarity = ids @ ids.T
+    id_exact = (id_numbers[:, None] == id_numbers[None, :]) & (id_numbers[:, None] != '')
+    id_similarity[id_exact] = 1.0
+
+    return (
+        SCORE_WEIGHTS['name'] * (names @ names.T)
+        + SCORE_WEIGHTS['birth_date'] * (birth[:, None] == birth[None, :])
+        + SCORE_WEIGHTS['id_number'] * id_similarity
+        + SCORE_WEIGHTS['phone'] * ((phones[:, None] == phones[None, :]) & (phones[:, None] != ''))
+    )
+
+
+def score_block(records, threshold=DEFAULT_THRESHOLD):
+    """
+    Score every pair within a block.
+
+    Returns:
+        List of (lower_id, higher_id, score) for pairs at or above threshold
+    """
+    if len(records) < 2:
+        return []
+    scores = score_matrix(records)
+    rows, cols = np.nonzero(np.triu(scores >= threshold, k=1))
+    pairs = []
+    for i, j in zip(rows.tolist(), cols.tolist()):
+        a, b = sorted((records[i].id, records[j].id))
+        pairs.append((a, b, float(scores[i, j])))
+    return pairs
+
+
+def _score_block_task(task):
+    """Process-pool entry point: (kind, records, threshold) -> (kind, pairs)."""
+    kind, records, threshold = task
+    return kind, score_block(records, threshold)
+
+
+# ── Incremental mode ──────────────────────────────────────────
+
+
+def find_duplicates(first_name, last_name, date_of_birth, identification_number='',
+                    phone='', exclude_id=None, threshold=DEFAULT_THRESHOLD):
+    """
+    Check a single registration against existing patients.
+
+    Candidates are fetched with one query whose OR-ed conditions are all
+    served by the blocking-key indexes, then scored in one matrix product.
+
+    Args:
+        first_name, last_name, date_of_birth, identification_number, phone:
+            Demographics of the registration (need not be saved yet)
+        exclude_id: Patient id to ignore (the registration itself, if saved)
+        threshold: Minimum score to report
+
+    Returns:
+        List of (Patient, score) sorted by descending score
+    """
+    probe = DedupRecord(
+        id=exclude_id,
+        name=normalize_text(f'{first_name} {last_name}'),
+        birth_ordinal=date_of_birth.toordinal(),
+        id_number=normalize_id_number(identification_number),
+        phone=normalize_phone(phone),
+        surname_key=patient_phonetic_keys(first_name, last_name)['last_name_phonetic'],
+    )
+
+    block_filter = Q()
+    if probe.surname_key:
+        block_filter |= Q(date_of_birth=date_of_birth, last_name_phonetic=probe.surname_key)
+    if len(probe.id_number) >= ID_PREFIX_LENGTH:
+        # Same key as the full scan: prefix of the normalized ID number
+        block_filter |= Q(id_prefix=probe.id_number[:ID_PREFIX_LENGTH])
+    if probe.phone:
+        block_filter |= Q(phone_normalized=probe.phone)
+    if not block_filter:
+        return []
+
+    candidates = Patient.objects.annotate(id_prefix=id_number_prefix()).filter(block_filter, is_active=True)
+    if exclude_id is not None:
+        candidates = candidates.exclude(id=exclude_id)
+    rows = list(candidates.values_list(*_RECORD_FIELDS)[:MAX_INCREMENTAL_CANDIDATES])
+    if not rows:
+        return []
+
+    records = [probe] + [_to_record(row) for row in rows]
+    scores = score_matrix(records)[0, 1:]
+    matches = {records[i + 1].id: float(s) for i, s in enumerate(scores) if s >= threshold}
+    if not matches:
+        return []
+
+    patients = Patient.objects.select_related('branch').in_bulk(list(matches))
+    return sorted(
+        ((patients[pk], score) for pk, score in matches.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+
+# ── Full-scan mode ────────────────────────────────────────────
+
+
+def build_blocks(records, max_block_size=MAX_BLOCK_SIZE):
+    """
+    Group records by blocking key.
+
+    Returns:
+        List of (kind, [records]) with at least two records each
+    """
+    blocks = defaultdict(list)
+    for record in records:
+        for kind, key in blocking_keys(record):
+            blocks[(kind, key)].append(record)
+
+    result = []
+    for (kind, key), members in blocks.items():
+        if len(members) < 2:
+            continue
+        if len(members) > max_block_size:
+            logger.warning('Skipping oversized %s block %r (%d patients)', kind, key, len(members))
+            continue
+        result.append((kind, members))
+    return result
+
+
+def iter_dedup_records(chunk_size=5000):
+    """Stream active patients as DedupRecords without loading model instances."""
+    rows = Patient.objects.filter(is_active=True).order_by().values_list(*_RECORD_FIELDS)
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield _to_record(row)
+
+
+def find_duplicate_pairs(threshold=DEFAULT_THRESHOLD, workers=None, max_block_size=MAX_BLOCK_SIZE):
+    """
+    Scan all active patients for probable duplicates.
+
+    Args:
+        threshold: Minimum score to report
+        workers: Process pool size (None = CPU count, 1 = run inline)
+        max_block_size: Skip blocks larger than this
+
+    Returns:
+        Dict {(lower_id, higher_id): (score, [kinds])}; a pair found in
+        several blocks is reported once with all matching block kinds
+    """
+    blocks = build_blocks(iter_dedup_records(), max_block_size)
+    tasks = [(kind, members, threshold) for kind, members in blocks]
+
+    if workers == 1:
+        results = map(_score_block_task, tasks)
+        return _collect_pairs(results)
+
+    # Forked workers must not reuse the parent's DB sockets; they only do
+    # NumPy work on the pickled records.
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _collect_pairs(pool.map(_score_block_task, tasks, chunksize=64))
+
+
+def _collect_pairs(results):
+    pairs = {}
+    for kind, block_pairs in results:
+        for a, b, score in block_pairs:
+            previous = pairs.get((a, b))
+            if previous is None:
+                pairs[(a, b)] = (score, [kind])
+            elif kind not in previous[1]:
+                previous[1].append(kind)
+    return pairs
@@ -0,0 +1,63 @@
+"""
+Management command to (re)compute patient search keys in batches
+Run with: python manage.py backfill_phonetic_keys [--batch-size 2000] [--only-missing]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.patients.models import Patient, SEARCH_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Backfills normalized names and Spanish phonetic keys for existing patients'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Patients updated per transaction (default: 2000)'
+        )
+        parser.add_argument(
+            '--only-missing',
+            action='store_true',
+            help='Only process patients without a surname phonetic key'
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        batch_size = options['batch_size']
+        self.stdout.write(self.style.SUCCESS('\n🔤 Backfilling patient phonetic keys...\n'))
+
+        patients = Patient.objects.only('id', 'first_name', 'last_name', *SEARCH_FIELDS).order_by('id')
+        if options['only_missing']:
+            patients = patients.filter(last_name_phonetic='')
+
+        started = time.monotonic()
+        processed = 0
+        last_id = 0
+
+        # Keyset pagination: each batch is an index range scan on the PK,
+        # so late batches cost the same as early ones.
+        while True:
+            batch = list(patients.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+
+            for patient in batch:
+                patient.refresh_search_fields()
+
+            with transaction.atomic():
+                Patient.objects.bulk_update(batch, SEARCH_FIELDS)
+
+            processed += len(batch)
+            last_id = batch[-1].id
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'   ✓ {processed} patients ({processed / max(elapsed, 1e-6):.0f} rows/s)'
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f'\n✅ Updated {processed} patients in {time.monotonic() - started:.1f}s\n')
+        )
@@ -0,0 +1,97 @@
+"""
+Management command to benchmark phonetic vs trigram patient search
+Run with: python manage.py benchmark_patient_search [--samples 200] [--seed 42]
+
+Picks random patients, misspells their first surname the way front-desk
+staff typically do (z/s, v/b, j/x, ll/y, silent h, missing accents) and
+measures latency and recall@limit for every search mode.
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from apps.common.utils import strip_accents
+from apps.patients.models import Patient
+from apps.patients.phonetics import name_tokens
+from apps.patients.services import search_patients, SEARCH_MODES, DEFAULT_SEARCH_LIMIT
+
+# (wrong, right) spelling confusions common in Spanish names
+MISSPELLINGS = [
+    ('z', 's'), ('s', 'z'), ('v', 'b'), ('b', 'v'), ('j', 'x'), ('x', 'j'),
+    ('ll', 'y'), ('y', 'll'), ('ce', 'se'), ('ci', 'si'), ('h', ''),
+    ('gue', 'ge'), ('qu', 'k'),
+]
+
+
+def misspell(word, rng):
+    """Apply one plausible misspelling to a word (accents are always dropped)."""
+    word = strip_accents(word).lower()
+    candidates = [(a, b) for a, b in MISSPELLINGS if a in word]
+    if not candidates:
+        return word
+    wrong, right = rng.choice(candidates)
+    return word.replace(wrong, right, 1)
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks phonetic, trigram and combined patient search on misspelled surnames'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=200, help='Number of queries (default: 200)')
+        parser.add_argument('--limit', type=int, default=DEFAULT_SEARCH_LIMIT, help='Results per query')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible runs')
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        rng = random.Random(options['seed'])
+        queries = self._build_queries(rng, options['samples'])
+        if not queries:
+            self.stdout.write(self.style.ERROR('\n❌ No patients found to benchmark.\n'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n⏱️  Benchmarking {len(queries)} misspelled queries '
+            f'({Patient.objects.count()} patients)\n'
+        ))
+        self.stdout.write(f'   {"mode":<10}{"mean ms":>10}{"p50 ms":>10}{"p95 ms":>10}{"recall":>10}')
+
+        for mode in SEARCH_MODES:
+            timings = []
+            hits = 0
+            for patient_id, query in queries:
+                started = time.perf_counter()
+                results = search_patients(query, limit=options['limit'], mode=mode)
+                timings.append((time.perf_counter() - started) * 1000)
+                hits += any(p.id == patient_id for p in results)
+
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f'   {mode:<10}{statistics.mean(timings):>10.2f}{statistics.median(timings):>10.2f}'
+                f'{p95:>10.2f}{hits / len(queries):>10.1%}'
+            )
+
+        self.stdout.write('')
+
+    def _build_queries(self, rng, samples):
+        """Return (patient_id, misspelled 'given surname') pairs for random patients."""
+        bounds = Patient.objects.filter(is_active=True).aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            return []
+
+        queries = []
+        for _ in range(samples):
+            # Random PK probe instead of ORDER BY random(), which would sort the table
+            patient = (
+                Patient.objects.filter(is_active=True, id__gte=rng.randint(bounds['low'], bounds['high']))
+                .only('id', 'first_name', 'last_name')
+                .order_by('id')
+                .first()
+            )
+            given, surnames = name_tokens(patient.first_name), name_tokens(patient.last_name)
+            if not given or not surnames:
+                continue
+            queries.append((patient.id, f'{given[0]} {misspell(surnames[0], rng)}'))
+        return queries
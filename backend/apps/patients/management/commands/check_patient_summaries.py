@@ -0,0 +1,48 @@
+"""
+Management command to verify the patient summary projection
+Run with: python manage.py check_patient_summaries [--fix] [--show 20]
+
+Exits with status 1 when inconsistencies are found (and not fixed), so
+it can run as a scheduled health check.
+"""
+import sys
+
+from django.core.management.base import BaseCommand
+from apps.patients.summary import find_inconsistencies, rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Compares PatientSummary rows against a recomputation from the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Rebuild the inconsistent summaries'
+        )
+        parser.add_argument(
+            '--show',
+            type=int,
+            default=20,
+            help='Number of inconsistent patients to print (default: 20)'
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        self.stdout.write(self.style.SUCCESS('\n🔎 Checking patient summaries...\n'))
+        problems = find_inconsistencies()
+
+        if not problems:
+            self.stdout.write(self.style.SUCCESS('✅ All summaries are consistent\n'))
+            return
+
+        self.stdout.write(self.style.WARNING(f'⚠️  {len(problems)} inconsistent summaries'))
+        for patient_id, diff in problems[:options['show']]:
+            fields = ', '.join(f'{field}: {have!r} != {want!r}' for field, (have, want) in diff.items())
+            self.stdout.write(f'   • Patient {patient_id}: {fields}')
+
+        if options['fix']:
+            rebuild_summaries(patient_ids=[patient_id for patient_id, _ in problems])
+            self.stdout.write(self.style.SUCCESS(f'\n✅ Rebuilt {len(problems)} summaries\n'))
+        else:
+            sys.exit(1)
@@ -0,0 +1,62 @@
+"""
+Management command to scan all patients for probable duplicates
+Run with: python manage.py find_duplicate_patients [--threshold 0.8] [--workers 4]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from apps.patients.dedup import find_duplicate_pairs, DEFAULT_THRESHOLD, MAX_BLOCK_SIZE
+from apps.patients.models import DuplicateCandidate
+
+
+class Command(BaseCommand):
+    help = 'Finds probable duplicate patients with blocking keys and stores them for review'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help=f'Minimum similarity score (default: {DEFAULT_THRESHOLD})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Worker processes for block scoring (default: CPU count, 1 = inline)'
+        )
+        parser.add_argument(
+            '--max-block-size',
+            type=int,
+            default=MAX_BLOCK_SIZE,
+            help=f'Skip blocks with more patients than this (default: {MAX_BLOCK_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        self.stdout.write(self.style.SUCCESS('\n🔍 Scanning patients for duplicates...\n'))
+        started = time.monotonic()
+
+        pairs = find_duplicate_pairs(
+            threshold=options['threshold'],
+            workers=options['workers'],
+            max_block_size=options['max_block_size'],
+        )
+        self.stdout.write(f'   ✓ Found {len(pairs)} candidate pairs in {time.monotonic() - started:.1f}s')
+
+        # Upsert so re-runs refresh scores without touching review status
+        DuplicateCandidate.objects.bulk_create(
+            [
+                DuplicateCandidate(patient_id=a, duplicate_id=b, score=score, matched_on=kinds)
+                for (a, b), (score, kinds) in pairs.items()
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['patient', 'duplicate'],
+            update_fields=['score', 'matched_on'],
+        )
+
+        pending = DuplicateCandidate.objects.filter(status='pending').count()
+        self.stdout.write(
+            self.style.SUCCESS(f'\n✅ Done in {time.monotonic() - started:.1f}s — {pending} pairs pending review\n')
+        )
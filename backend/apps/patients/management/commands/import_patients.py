@@ -0,0 +1,115 @@
+"""
+Management command to bulk import patients from a legacy CSV export
+Run with: python manage.py import_patients patients.csv [--branch LAB-01] [--chunk-size 5000]
+
+Expected columns (header names are case-insensitive):
+    identification_number, first_name, last_name, date_of_birth, gender,
+    phone, email, address, branch (branch code)
+
+Existing patients (same identification_number) are updated in place;
+their registering branch and active flag are kept.
+"""
+from datetime import datetime
+
+from apps.branches.models import Branch
+from apps.common.bulk_import import BaseImportCommand, ImportSpec, RowError
+from apps.patients.models import Patient, SEARCH_FIELDS
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+
+GENDER_ALIASES = {
+    'm': 'M', 'masculino': 'M', 'hombre': 'M', 'male': 'M',
+    'f': 'F', 'femenino': 'F', 'mujer': 'F', 'female': 'F',
+    'o': 'O', 'otro': 'O', 'other': 'O',
+}
+
+
+class PatientImportSpec(ImportSpec):
+    """Maps legacy patient rows onto the patients table."""
+
+    model = Patient
+    columns = (
+        'identification_number',
+        'first_name',
+        'last_name',
+        'date_of_birth',
+        'gender',
+        'phone',
+        'email',
+        'address',
+        'branch',
+        'is_active',
+        *SEARCH_FIELDS,
+    )
+    conflict_fields = ('identification_number',)
+    update_fields = (
+        'first_name',
+        'last_name',
+        'date_of_birth',
+        'gender',
+        'phone',
+        'email',
+        'address',
+        *SEARCH_FIELDS,
+    )
+    required = ('identification_number', 'first_name', 'last_name', 'date_of_birth', 'gender')
+
+    def __init__(self, default_branch=None):
+        self.default_branch = default_branch
+        self.branch_ids = {}
+
+    def prepare(self):
+        self.branch_ids = {
+            code.upper(): pk for code, pk in Branch.objects.values_list('code', 'id')
+        }
+
+    def clean_row(self, row):
+        branch_code = (row.get('branch') or self.default_branch or '').upper()
+        if branch_code not in self.branch_ids:
+            raise RowError(f'branch: sucursal desconocida {branch_code!r}')
+
+        gender = GENDER_ALIASES.get(row['gender'].lower())
+        if gender is None:
+            raise RowError(f'gender: valor no reconocido {row["gender"]!r}')
+
+        patient = Patient(
+            identification_number=self.clean_field('identification_number', row['identification_number']),
+            first_name=self.clean_field('first_name', row['first_name']),
+            last_name=self.clean_field('last_name', row['last_name']),
+            date_of_birth=parse_date(row['date_of_birth']),
+            gender=gender,
+            phone=self.clean_field('phone', row.get('phone', '')),
+            email=self.clean_field('email', row.get('email', '')),
+            address=self.clean_field('address', row.get('address', '')),
+        )
+        patient.refresh_search_fields()
+
+        values = {name: getattr(patient, name) for name in self.columns if name != 'branch'}
+        values['branch'] = self.branch_ids[branch_code]
+        values['is_active'] = True
+        return values
+
+
+def parse_date(value):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise RowError(f'date_of_birth: fecha inválida {value!r}')
+
+
+class Command(BaseImportCommand):
+    help = 'Bulk imports patients from a CSV file (COPY + upsert by identification number)'
+    spec_class = PatientImportSpec
+    label = 'patients'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--branch',
+            help='Branch code used for rows without a branch column'
+        )
+
+    def get_spec(self, options):
+        return PatientImportSpec(default_branch=options['branch'])
@@ -0,0 +1,41 @@
+"""
+Management command to recompute the patient summary projection
+Run with: python manage.py rebuild_patient_summaries [--patient 12 --patient 57]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from apps.patients.summary import rebuild_summaries, SUMMARY_SOURCES
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds PatientSummary rows with one grouped query per source'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--patient',
+            type=int,
+            action='append',
+            dest='patient_ids',
+            help='Only rebuild these patients (repeatable; default: all)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per upsert statement (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        self.stdout.write(self.style.SUCCESS(
+            f'\n📊 Rebuilding patient summaries from {len(SUMMARY_SOURCES)} sources...\n'
+        ))
+        started = time.monotonic()
+        written = rebuild_summaries(
+            patient_ids=options['patient_ids'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Wrote {written} summaries in {time.monotonic() - started:.1f}s\n'
+        ))
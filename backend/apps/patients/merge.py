@@ -0,0 +1,266 @@
+"""
+Patient Merge
+=============
+
+Merges duplicate patients into a surviving record.
+
+Every table with a foreign key to `patients` (orders, clinical records,
+invoices, results, ...) is discovered from model metadata and repointed
+with ONE set-based UPDATE per column for the whole batch of pairs:
+
+    UPDATE exam_orders AS t SET patient_id = m.new_id
+    FROM unnest(ARRAY[merged ids], ARRAY[survivor ids]) AS m(old_id, new_id)
+    WHERE t.patient_id = m.old_id
+    RETURNING t.id, m.old_id
+
+The RETURNING rows become a compact journal (row ids per table/column)
+that `undo_merge_batch` uses to move exactly those rows back.
+
+Locking: all involved patients are locked with SELECT ... FOR UPDATE in
+ascending id order before any write, so concurrent merges touching the
+same patients wait on each other instead of deadlocking.
+"""
+import uuid
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from apps.common.exceptions import BusinessRuleError
+from .models import Patient, DuplicateCandidate, PatientMergeJournal
+
+MAX_MERGE_PAIRS = 500
+
+# Models whose patient FKs describe merges/dedup themselves; never repointed
+MERGE_EXCLUDED_MODELS = (DuplicateCandidate, PatientMergeJournal)
+
+# Sent inside the merge (and undo) transaction so receivers, e.g.
+# denormalized projections, can refresh derived data atomically.
+# kwargs: survivor_ids, merged_ids, batch_id, undone
+patients_merged = Signal()
+
+_REPOINT_SQL = """
+    UPDATE {table} AS t SET {fk} = m.new_id
+    FROM unnest(%s::bigint[], %s::bigint[]) AS m(old_id, new_id)
+    WHERE t.{fk} = m.old_id
+    RETURNING t.{pk}, m.old_id
+"""
+
+_RESTORE_SQL = """
+    UPDATE {table} SET {fk} = %s
+    WHERE {pk} = ANY(%s::bigint[]) AND {fk} = %s
+"""
+
+_DEACTIVATE_SQL = """
+    UPDATE patients AS p SET is_active = false, merged_into_id = m.new_id, updated_at = %s
+    FROM unnest(%s::bigint[], %s::bigint[]) AS m(old_id, new_id)
+    WHERE p.id = m.old_id
+"""
+
+
+def referencing_columns():
+    """
+    Return {'table.fk_column': (table, pk_column, fk_column)} for every
+    many-to-one FK that points at Patient.
+
+    One-to-one relations (per-patient projections) are skipped: both
+    patients already own a row, so those are recomputed instead of moved.
+    """
+    columns = {}
+    for relation in Patient._meta.get_fields(include_hidden=True):
+        if not (relation.is_relation and relation.auto_created and not relation.concrete):
+            continue
+        model = relation.related_model
+        field = relation.field
+        if model in MERGE_EXCLUDED_MODELS or not field.many_to_one or field.one_to_one:
+            continue
+        if model._meta.proxy or not model._meta.managed:
+            continue
+        table = model._meta.db_table
+        columns[f'{table}.{field.column}'] = (table, model._meta.pk.column, field.column)
+    return dict(sorted(columns.items()))
+
+
+def _validate_pairs(pairs):
+    """Reject self-merges, repeated patients and merge chains within a batch."""
+    if not pairs:
+        raise BusinessRuleError('Debe indicar al menos un par de pacientes.', code='empty_batch')
+    if len(pairs) > MAX_MERGE_PAIRS:
+        raise BusinessRuleError(
+            f'Máximo {MAX_MERGE_PAIRS} pares por operación.', code='batch_too_large'
+        )
+
+    merged_ids = [merged for _, merged in pairs]
+    survivor_ids = {survivor for survivor, _ in pairs}
+
+    if any(survivor == merged for survivor, merged in pairs):
+        raise BusinessRuleError('Un paciente no puede fusionarse consigo mismo.', code='self_merge')
+    if len(set(merged_ids)) != len(merged_ids):
+        raise BusinessRuleError('Un paciente aparece más de una vez como fusionado.', code='repeated_patient')
+    chained = survivor_ids.intersection(merged_ids)
+    if chained:
+        raise BusinessRuleError(
+            'Un paciente no puede ser sobreviviente y fusionado en el mismo lote.',
+            code='merge_chain',
+            details={'patient_ids': sorted(chained)},
+        )
+
+
+def _lock_patients(patient_ids):
+    """Lock patients in ascending id order; returns {id: is_active}."""
+    return dict(
+        Patient.objects.select_for_update()
+        .filter(id__in=patient_ids)
+        .order_by('id')
+        .values_list('id', 'is_active')
+    )
+
+
+def merge_patients(pairs, user=None):
+    """
+    Merge a batch of (survivor_id, merged_id) pairs in one transaction.
+
+    Args:
+        pairs: Iterable of (survivor_id, merged_id)
+        user: User performing the merge
+
+    Returns:
+        (batch_id, list of PatientMergeJournal)
+
+    Raises:
+        BusinessRuleError: invalid batch, missing or inactive patients
+    """
+    pairs = [(int(survivor), int(merged)) for survivor, merged in pairs]
+    _validate_pairs(pairs)
+
+    survivor_ids = [survivor for survivor, _ in pairs]
+    merged_ids = [merged for _, merged in pairs]
+    batch_id = uuid.uuid4()
+    now = timezone.now()
+
+    with transaction.atomic():
+        status_by_id = _lock_patients(set(survivor_ids) | set(merged_ids))
+        missing = sorted(set(survivor_ids + merged_ids) - set(status_by_id))
+        if missing:
+            raise BusinessRuleError(
+                'Algunos pacientes no existen.', code='not_found', details={'patient_ids': missing}
+            )
+        inactive = sorted(pk for pk, is_active in status_by_id.items() if not is_active)
+        if inactive:
+            raise BusinessRuleError(
+                'Algunos pacientes ya están inactivos o fusionados.',
+                code='inactive_patient',
+                details={'patient_ids': inactive},
+            )
+
+        repointed = defaultdict(lambda: defaultdict(list))
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for key, (table, pk, fk) in referencing_columns().items():
+                cursor.execute(
+                    _REPOINT_SQL.format(table=quote(table), pk=quote(pk), fk=quote(fk)),
+                    [merged_ids, survivor_ids],
+                )
+                for row_id, old_id in cursor.fetchall():
+                    repointed[old_id][key].append(row_id)
+
+            cursor.execute(_DEACTIVATE_SQL, [now, merged_ids, survivor_ids])
+
+        journals = PatientMergeJournal.objects.bulk_create([
+            PatientMergeJournal(
+                batch_id=batch_id,
+                survivor_id=survivor,
+                merged_id=merged,
+                repointed={key: ids for key, ids in repointed[merged].items()},
+                merged_by=user,
+            )
+            for survivor, merged in pairs
+        ])
+
+        pair_filter = Q()
+        for survivor, merged in pairs:
+            low, high = sorted((survivor, merged))
+            pair_filter |= Q(patient_id=low, duplicate_id=high)
+        DuplicateCandidate.objects.filter(pair_filter).update(
+            status='merged', reviewed_by=user, reviewed_at=now
+        )
+
+        patients_merged.send(
+            sender=Patient,
+            survivor_ids=survivor_ids,
+            merged_ids=merged_ids,
+            batch_id=batch_id,
+            undone=False,
+        )
+
+    return batch_id, journals
+
+
+def undo_merge_batch(batch_id, user=None):
+    """
+    Revert every merge of a batch, moving back exactly the journaled rows.
+
+    Rows are only moved if they still point at the survivor, so later
+    edits (e.g. an order deliberately reassigned) are not clobbered.
+
+    Returns:
+        Number of rows moved back
+
+    Raises:
+        BusinessRuleError: unknown/already undone batch, or a survivor that
+        has itself been merged since (undo the later merge first)
+    """
+    now = timezone.now()
+    quote = connection.ops.quote_name
+    columns = referencing_columns()
+    restored = 0
+
+    with transaction.atomic():
+        journals = list(
+            PatientMergeJournal.objects.select_for_update()
+            .filter(batch_id=batch_id, undone_at__isnull=True)
+            .order_by('id')
+        )
+        if not journals:
+            raise BusinessRuleError('Lote de fusión inexistente o ya revertido.', code='not_found')
+
+        involved = {j.survivor_id for j in journals} | {j.merged_id for j in journals}
+        status_by_id = _lock_patients(involved)
+        merged_later = sorted({j.survivor_id for j in journals if not status_by_id.get(j.survivor_id)})
+        if merged_later:
+            raise BusinessRuleError(
+                'El paciente sobreviviente fue fusionado después; revierta esa fusión primero.',
+                code='merged_later',
+                details={'patient_ids': merged_later},
+            )
+
+        with connection.cursor() as cursor:
+            for journal in journals:
+                for key, row_ids in journal.repointed.items():
+                    if key not in columns:
+                        continue
+                    table, pk, fk = columns[key]
+                    cursor.execute(
+                        _RESTORE_SQL.format(table=quote(table), pk=quote(pk), fk=quote(fk)),
+                        [journal.merged_id, row_ids, journal.survivor_id],
+                    )
+                    restored += cursor.rowcount
+
+        Patient.objects.filter(id__in=[j.merged_id for j in journals]).update(
+            is_active=True, merged_into=None, updated_at=now
+        )
+        PatientMergeJournal.objects.filter(id__in=[j.id for j in journals]).update(
+            undone_by=user, undone_at=now
+        )
+
+        patients_merged.send(
+            sender=Patient,
+            survivor_ids=[j.survivor_id for j in journals],
+            merged_ids=[j.merged_id for j in journals],
+            batch_id=batch_id,
+            undone=True,
+        )
+
+    return restored
@@ -0,0 +1,97 @@
+# Generated by Django 4.2.11 on 2026-10-19 03:47
+
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Spanish text search configuration that also strips accents, so
+# 'Gonzalez' matches 'González' in full-text queries.
+SPANISH_UNACCENT_CONFIG_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'spanish_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION spanish_unaccent (COPY = spanish);
+        ALTER TEXT SEARCH CONFIGURATION spanish_unaccent
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+    END IF;
+END
+$$;
+"""
+
+# Keep patients.search_vector current for every write path (ORM saves,
+# bulk_create, COPY imports and raw UPDATEs). Surnames weigh more than
+# given names when ranking.
+SEARCH_VECTOR_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION patients_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('spanish_unaccent', coalesce(NEW.last_name, '')), 'A') ||
+        setweight(to_tsvector('spanish_unaccent', coalesce(NEW.first_name, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER patients_search_vector_update
+    BEFORE INSERT OR UPDATE OF first_name, last_name ON patients
+    FOR EACH ROW EXECUTE FUNCTION patients_search_vector_update();
+"""
+
+SEARCH_VECTOR_TRIGGER_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS patients_search_vector_update ON patients;
+DROP FUNCTION IF EXISTS patients_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('branches', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.RunSQL(
+            sql=SPANISH_UNACCENT_CONFIG_SQL,
+            reverse_sql='DROP TEXT SEARCH CONFIGURATION IF EXISTS spanish_unaccent;',
+        ),
+        migrations.CreateModel(
+            name='Patient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(help_text='Nombres del paciente', max_length=100, verbose_name='nombres')),
+                ('last_name', models.CharField(help_text='Apellidos del paciente', max_length=100, verbose_name='apellidos')),
+                ('date_of_birth', models.DateField(help_text='Fecha de nacimiento del paciente', verbose_name='fecha de nacimiento')),
+                ('gender', models.CharField(choices=[('M', 'Masculino'), ('F', 'Femenino'), ('O', 'Otro')], help_text='Sexo biológico (usado para rangos de referencia)', max_length=1, verbose_name='sexo')),
+                ('identification_number', models.CharField(error_messages={'unique': 'Ya existe un paciente con este número de identificación.'}, help_text='Documento de identidad o pasaporte', max_length=30, unique=True, verbose_name='número de identificación')),
+                ('phone', models.CharField(blank=True, help_text='Teléfono de contacto', max_length=20, verbose_name='teléfono')),
+                ('email', models.EmailField(blank=True, help_text='Email de contacto', max_length=254, verbose_name='email')),
+                ('address', models.TextField(blank=True, help_text='Dirección de residencia', verbose_name='dirección')),
+                ('is_active', models.BooleanField(default=True, help_text='Pacientes inactivos no aparecen en búsquedas', verbose_name='activo')),
+                ('full_name_normalized', models.CharField(editable=False, help_text='Nombre completo en minúsculas y sin acentos', max_length=201, verbose_name='nombre normalizado')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Mantenido por el trigger patients_search_vector_update', null=True, verbose_name='vector de búsqueda')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+                ('branch', models.ForeignKey(help_text='Sucursal donde se registró el paciente', on_delete=django.db.models.deletion.PROTECT, related_name='patients', to='branches.branch', verbose_name='sucursal')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='patients_created', to=settings.AUTH_USER_MODEL, verbose_name='creado por')),
+            ],
+            options={
+                'verbose_name': 'paciente',
+                'verbose_name_plural': 'pacientes',
+                'db_table': 'patients',
+                'ordering': ['last_name', 'first_name'],
+                'indexes': [models.Index(fields=['branch'], name='patients_branch__4725b0_idx'), models.Index(fields=['-created_at'], name='patients_created_d307a3_idx'), models.Index(fields=['identification_number'], name='patients_id_number_like_idx', opclasses=['varchar_pattern_ops']), django.contrib.postgres.indexes.GinIndex(fields=['full_name_normalized'], name='patients_name_trgm_idx', opclasses=['gin_trgm_ops']), django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='patients_search_vector_idx')],
+            },
+        ),
+        migrations.RunSQL(
+            sql=SEARCH_VECTOR_TRIGGER_SQL,
+            reverse_sql=SEARCH_VECTOR_TRIGGER_REVERSE_SQL,
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.11 on 2026-10-19 03:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patient',
+            name='first_name_phonetic',
+            field=models.CharField(blank=True, editable=False, max_length=20, verbose_name='clave fonética nombre'),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='last_name_phonetic',
+            field=models.CharField(blank=True, editable=False, max_length=20, verbose_name='clave fonética primer apellido'),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='second_last_name_phonetic',
+            field=models.CharField(blank=True, editable=False, max_length=20, verbose_name='clave fonética segundo apellido'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['last_name_phonetic', 'first_name_phonetic'], name='patients_phonetic_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['second_last_name_phonetic'], name='patients_phonetic_2nd_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.11 on 2026-10-19 03:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('patients', '0002_phonetic_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Similitud combinada (0-1)', verbose_name='puntaje')),
+                ('matched_on', models.JSONField(blank=True, default=list, help_text='Claves de bloqueo compartidas por el par', verbose_name='coincidencias')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('merged', 'Fusionado'), ('dismissed', 'Descartado')], default='pending', max_length=20, verbose_name='estado')),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True, verbose_name='revisado en')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+            ],
+            options={
+                'verbose_name': 'posible duplicado',
+                'verbose_name_plural': 'posibles duplicados',
+                'db_table': 'patient_duplicate_candidates',
+                'ordering': ['-score'],
+            },
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='phone_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=20, verbose_name='teléfono normalizado'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['date_of_birth', 'last_name_phonetic'], name='patients_dob_phonetic_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['phone_normalized'], name='patients_phone_norm_idx'),
+        ),
+        migrations.AddField(
+            model_name='duplicatecandidate',
+            name='duplicate',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='patients.patient', verbose_name='posible duplicado'),
+        ),
+        migrations.AddField(
+            model_name='duplicatecandidate',
+            name='patient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicate_candidates', to='patients.patient', verbose_name='paciente'),
+        ),
+        migrations.AddField(
+            model_name='duplicatecandidate',
+            name='reviewed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='revisado por'),
+        ),
+        migrations.AddIndex(
+            model_name='duplicatecandidate',
+            index=models.Index(fields=['status', '-score'], name='patient_dup_status_c55bdb_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='duplicatecandidate',
+            constraint=models.UniqueConstraint(fields=('patient', 'duplicate'), name='unique_duplicate_pair'),
+        ),
+        migrations.AddConstraint(
+            model_name='duplicatecandidate',
+            constraint=models.CheckConstraint(check=models.Q(('patient__lt', models.F('duplicate'))), name='duplicate_pair_ordered'),
+        ),
+    ]
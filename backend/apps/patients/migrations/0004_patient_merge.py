@@ -0,0 +1,42 @@
+# Generated by Django 4.2.11 on 2026-10-19 03:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('patients', '0003_duplicate_detection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patient',
+            name='merged_into',
+            field=models.ForeignKey(blank=True, help_text='Paciente que sobrevivió a la fusión de este registro', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='patients.patient', verbose_name='fusionado en'),
+        ),
+        migrations.CreateModel(
+            name='PatientMergeJournal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_id', models.UUIDField(db_index=True, verbose_name='lote')),
+                ('repointed', models.JSONField(default=dict, help_text='IDs de filas reasignadas por tabla.columna', verbose_name='filas reasignadas')),
+                ('merged_at', models.DateTimeField(auto_now_add=True, verbose_name='fusionado en')),
+                ('undone_at', models.DateTimeField(blank=True, null=True, verbose_name='revertido en')),
+                ('merged', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='patients.patient', verbose_name='paciente fusionado')),
+                ('merged_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='fusionado por')),
+                ('survivor', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='patients.patient', verbose_name='paciente sobreviviente')),
+                ('undone_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='revertido por')),
+            ],
+            options={
+                'verbose_name': 'fusión de pacientes',
+                'verbose_name_plural': 'fusiones de pacientes',
+                'db_table': 'patient_merge_journal',
+                'ordering': ['-merged_at'],
+                'indexes': [models.Index(fields=['survivor', '-merged_at'], name='patient_mer_survivo_ce788b_idx'), models.Index(fields=['merged'], name='patient_mer_merged__75defe_idx')],
+            },
+        ),
+    ]
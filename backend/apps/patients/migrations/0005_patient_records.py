@@ -0,0 +1,40 @@
+# Generated by Django 4.2.11 on 2026-10-19 03:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('branches', '0001_initial'),
+        ('patients', '0004_patient_merge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_date', models.DateTimeField(default=django.utils.timezone.now, help_text='Fecha y hora de la consulta', verbose_name='fecha del registro')),
+                ('chief_complaint', models.TextField(help_text='Motivo principal de la consulta', verbose_name='motivo de consulta')),
+                ('diagnosis', models.TextField(blank=True, help_text='Diagnóstico o impresión clínica', verbose_name='diagnóstico')),
+                ('notes', models.TextField(blank=True, help_text='Notas clínicas adicionales', verbose_name='notas')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='branches.branch', verbose_name='sucursal')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='patient_records_created', to=settings.AUTH_USER_MODEL, verbose_name='registrado por')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='records', to='patients.patient', verbose_name='paciente')),
+            ],
+            options={
+                'verbose_name': 'registro clínico',
+                'verbose_name_plural': 'registros clínicos',
+                'db_table': 'patient_records',
+                'ordering': ['-record_date', '-id'],
+                'indexes': [models.Index(fields=['patient', '-record_date', '-id'], name='patient_records_timeline_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.11 on 2026-10-19 03:59
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0005_patient_records'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientSummary',
+            fields=[
+                ('patient', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='patients.patient', verbose_name='paciente')),
+                ('last_visit_at', models.DateTimeField(blank=True, null=True, verbose_name='última visita')),
+                ('order_count', models.IntegerField(default=0, verbose_name='órdenes')),
+                ('open_balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='saldo pendiente')),
+                ('last_abnormal_result_at', models.DateTimeField(blank=True, null=True, verbose_name='último resultado anormal')),
+                ('last_abnormal_exam', models.CharField(blank=True, max_length=200, verbose_name='examen del último resultado anormal')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+            ],
+            options={
+                'verbose_name': 'resumen de paciente',
+                'verbose_name_plural': 'resúmenes de pacientes',
+                'db_table': 'patient_summaries',
+            },
+        ),
+    ]
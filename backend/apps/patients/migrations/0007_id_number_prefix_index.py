@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:52
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0006_patient_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(django.db.models.functions.text.Left(django.db.models.functions.text.Upper(models.Func(models.F('identification_number'), models.Value('[^[:alnum:]]'), models.Value(''), models.Value('g'), function='REGEXP_REPLACE', output_field=models.CharField())), 6), name='patients_id_prefix_idx'),
+        ),
+    ]
@@ -1,3 +1,592 @@
+"""
+Patient Models
+==============
+
+Patient demographics for the Clinical Lab Management System.
+
+Search Features:
+- Normalized full name (lowercase, no accents) with a pg_trgm GIN index
+  for typo-tolerant, prefix-friendly lookups
+- tsvector column (Spanish config + unaccent) maintained by a database
+  trigger, so bulk inserts and raw SQL updates keep it current too
+- Precomputed Spanish phonetic keys (see phonetics.py) with btree
+  indexes, so misspelled surnames are found with equality lookups
+- Blocking-key indexes (birth date + surname key, ID prefix, phone)
+  used by the duplicate detection engine (see dedup.py)
+
+Models:
+- Patient: Patient demographics, owned by the branch that registered them
+- DuplicateCandidate: Pair of patients flagged as probable duplicates
+- PatientMergeJournal: Record of a merge, with the rows it repointed (undo)
+- PatientRecord: Clinical history entry (consultation notes, diagnosis)
+- PatientSummary: Denormalized patient header (see summary.py)
+"""
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, Func, Value
+from django.db.models.functions import Left, Upper
+from django.utils import timezone
+
+from apps.common.utils import normalize_phone, normalize_text
+from .phonetics import patient_phonetic_keys
+
+# Derived columns recomputed whenever the name or phone fields change
+SEARCH_FIELDS = (
+    'full_name_normalized',
+    'first_name_phonetic',
+    'last_name_phonetic',
+    'second_last_name_phonetic',
+    'phone_normalized',
+)
+SEARCH_SOURCE_FIELDS = {'first_name', 'last_name', 'phone'}
+
+# Length of the ID-number blocking key of duplicate detection
+ID_PREFIX_LENGTH = 6
+
+
+def id_number_prefix():
+    """
+    SQL twin of dedup.normalize_id_number(identification_number)[:ID_PREFIX_LENGTH]
+    (uppercase alphanumerics only), backed by an expression index.
+    """
+    alphanumerics = Func(
+        F('identification_number'), Value('[^[:alnum:]]'), Value(''), Value('g'),
+        function='REGEXP_REPLACE',
+        output_field=models.CharField(),
+    )
+    return Left(Upper(alphanumerics), ID_PREFIX_LENGTH)
+
+
+class Patient(models.Model):
+    """
+    Patient registered at a laboratory branch.
+
+    Fields:
+    - first_name / last_name: Given names and surnames
+    - date_of_birth: Birth date
+    - gender: Biological sex (used for reference ranges)
+    - identification_number: National ID / passport (unique)
+    - phone / email / address: Contact information
+    - branch: Branch where the patient was registered
+    - created_by: User who registered the patient
+    - full_name_normalized: 'first last' lowercased without accents (search)
+    - search_vector: Spanish tsvector over the names (set by DB trigger)
+    - *_phonetic: Spanish phonetic keys of the first given name and of
+      the first and second surnames
+    - phone_normalized: Significant trailing digits of the phone number
+    - merged_into: Surviving patient, if this record was merged away
+    """
+
+    GENDER_CHOICES = [
+        ('M', 'Masculino'),
+        ('F', 'Femenino'),
+        ('O', 'Otro'),
+    ]
+
+    first_name = models.CharField(
+        'nombres',
+        max_length=100,
+        help_text='Nombres del paciente'
+    )
+
+    last_name = models.CharField(
+        'apellidos',
+        max_length=100,
+        help_text='Apellidos del paciente'
+    )
+
+    date_of_birth = models.DateField(
+        'fecha de nacimiento',
+        help_text='Fecha de nacimiento del paciente'
+    )
+
+    gender = models.CharField(
+        'sexo',
+        max_length=1,
+        choices=GENDER_CHOICES,
+        help_text='Sexo biológico (usado para rangos de referencia)'
+    )
+
+    identification_number = models.CharField(
+        'número de identificación',
+        max_length=30,
+        unique=True,
+        help_text='Documento de identidad o pasaporte',
+        error_messages={
+            'unique': 'Ya existe un paciente con este número de identificación.',
+        }
+    )
+
+    phone = models.CharField(
+        'teléfono',
+        max_length=20,
+        blank=True,
+        help_text='Teléfono de contacto'
+    )
+
+    email = models.EmailField(
+        'email',
+        blank=True,
+        help_text='Email de contacto'
+    )
+
+    address = models.TextField(
+        'dirección',
+        blank=True,
+        help_text='Dirección de residencia'
+    )
+
+    branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.PROTECT,
+        related_name='patients',
+        verbose_name='sucursal',
+        help_text='Sucursal donde se registró el paciente'
+    )
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='patients_created',
+        verbose_name='creado por'
+    )
+
+    is_active = models.BooleanField(
+        'activo',
+        default=True,
+        help_text='Pacientes inactivos no aparecen en búsquedas'
+    )
+
+    merged_into = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='fusionado en',
+        help_text='Paciente que sobrevivió a la fusión de este registro'
+    )
+
+    # Search fields (derived, never edited directly)
+    full_name_normalized = models.CharField(
+        'nombre normalizado',
+        max_length=201,
+        editable=False,
+        help_text='Nombre completo en minúsculas y sin acentos'
+    )
+
+    search_vector = SearchVectorField(
+        'vector de búsqueda',
+        null=True,
+        editable=False,
+        help_text='Mantenido por el trigger patients_search_vector_update'
+    )
+
+    first_name_phonetic = models.CharField(
+        'clave fonética nombre',
+        max_length=20,
+        blank=True,
+        editable=False,
+    )
+
+    last_name_phonetic = models.CharField(
+        'clave fonética primer apellido',
+        max_length=20,
+        blank=True,
+        editable=False,
+    )
+
+    second_last_name_phonetic = models.CharField(
+        'clave fonética segundo apellido',
+        max_length=20,
+        blank=True,
+        editable=False,
+    )
+
+    phone_normalized = models.CharField(
+        'teléfono normalizado',
+        max_length=20,
+        blank=True,
+        editable=False,
+    )
+
+    # Timestamps
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'patients'
+        verbose_name = 'paciente'
+        verbose_name_plural = 'pacientes'
+        ordering = ['last_name', 'first_name']
+        indexes = [
+            models.Index(fields=['branch']),
+            models.Index(fields=['-created_at']),
+            models.Index(
+                fields=['identification_number'],
+                name='patients_id_number_like_idx',
+                opclasses=['varchar_pattern_ops'],
+            ),
+            GinIndex(
+                fields=['full_name_normalized'],
+                name='patients_name_trgm_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
+            GinIndex(
+                fields=['search_vector'],
+                name='patients_search_vector_idx',
+            ),
+            models.Index(
+                fields=['last_name_phonetic', 'first_name_phonetic'],
+                name='patients_phonetic_idx',
+            ),
+            models.Index(
+                fields=['second_last_name_phonetic'],
+                name='patients_phonetic_2nd_idx',
+            ),
+            models.Index(
+                fields=['date_of_birth', 'last_name_phonetic'],
+                name='patients_dob_phonetic_idx',
+            ),
+            models.Index(
+                fields=['phone_normalized'],
+                name='patients_phone_norm_idx',
+            ),
+            models.Index(
+                id_number_prefix(),
+                name='patients_id_prefix_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.full_name} ({self.identification_number})'
+
+    @property
+    def full_name(self):
+        return f'{self.first_name} {self.last_name}'.strip()
+
+    def refresh_search_fields(self):
+        """Recompute derived search columns from the name fields."""
+        self.full_name_normalized = normalize_text(self.full_name)
+        for field, key in patient_phonetic_keys(self.first_name, self.last_name).items():
+            setattr(self, field, key)
+        self.phone_normalized = normalize_phone(self.phone)
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and SEARCH_SOURCE_FIELDS & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | set(SEARCH_FIELDS)
+        super().save(*args, **kwargs)
+
+
+class DuplicateCandidate(models.Model):
+    """
+    Pair of patients the dedup engine considers probable duplicates.
+
+    The pair is stored with the lower patient id first so each pair
+    appears once regardless of which scan found it.
+
+    Fields:
+    - patient / duplicate: The two patients (patient.id < duplicate.id)
+    - score: Combined similarity score (0-1)
+    - matched_on: Blocking keys the pair shared (birth_date, id_prefix, phone)
+    - status: Review status
+    - reviewed_by / reviewed_at: Who resolved the pair and when
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('merged', 'Fusionado'),
+        ('dismissed', 'Descartado'),
+    ]
+
+    patient = models.ForeignKey(
+        Patient,
+        on_delete=models.CASCADE,
+        related_name='duplicate_candidates',
+        verbose_name='paciente'
+    )
+
+    duplicate = models.ForeignKey(
+        Patient,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='posible duplicado'
+    )
+
+    score = models.FloatField(
+        'puntaje',
+        help_text='Similitud combinada (0-1)'
+    )
+
+    matched_on = models.JSONField(
+        'coincidencias',
+        default=list,
+        blank=True,
+        help_text='Claves de bloqueo compartidas por el par'
+    )
+
+    status = models.CharField(
+        'estado',
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+
+    reviewed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='revisado por'
+    )
+
+    reviewed_at = models.DateTimeField('revisado en', null=True, blank=True)
+
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+
+    class Meta:
+        db_table = 'patient_duplicate_candidates'
+        verbose_name = 'posible duplicado'
+        verbose_name_plural = 'posibles duplicados'
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['patient', 'duplicate'],
+                name='unique_duplicate_pair',
+            ),
+            models.CheckConstraint(
+                check=models.Q(patient__lt=models.F('duplicate')),
+                name='duplicate_pair_ordered',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', '-score']),
+        ]
+
+    def __str__(self):
+        return f'{self.patient_id} ~ {self.duplicate_id} ({self.score:.2f})'
+
+
+class PatientMergeJournal(models.Model):
+    """
+    Journal entry for one merged pair, kept for audit and undo.
+
+    `repointed` maps each referencing column to the primary keys of the
+    rows moved from the merged patient to the survivor:
+        {"exam_orders.patient_id": [10, 11], "patient_records.patient_id": [7]}
+
+    Fields:
+    - batch_id: Groups the pairs merged in a single call
+    - survivor / merged: Patients involved (merged is deactivated)
+    - repointed: Rows moved per table/column (compact undo data)
+    - merged_by / merged_at: Who merged and when
+    - undone_by / undone_at: Set when the merge is reverted
+    """
+
+    batch_id = models.UUIDField('lote', db_index=True)
+
+    survivor = models.ForeignKey(
+        Patient,
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name='paciente sobreviviente'
+    )
+
+    merged = models.ForeignKey(
+        Patient,
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name='paciente fusionado'
+    )
+
+    repointed = models.JSONField(
+        'filas reasignadas',
+        default=dict,
+        help_text='IDs de filas reasignadas por tabla.columna'
+    )
+
+    merged_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='fusionado por'
+    )
+
+    merged_at = models.DateTimeField('fusionado en', auto_now_add=True)
+
+    undone_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='revertido por'
+    )
+
+    undone_at = models.DateTimeField('revertido en', null=True, blank=True)
+
+    class Meta:
+        db_table = 'patient_merge_journal'
+        verbose_name = 'fusión de pacientes'
+        verbose_name_plural = 'fusiones de pacientes'
+        ordering = ['-merged_at']
+        indexes = [
+            models.Index(fields=['survivor', '-merged_at']),
+            models.Index(fields=['merged']),
+        ]
+
+    def __str__(self):
+        return f'{self.merged_id} -> {self.survivor_id} ({self.batch_id})'
+
+    @property
+    def is_undone(self):
+        return self.undone_at is not None
+
+
+class PatientRecord(models.Model):
+    """
+    Clinical history entry for a patient.
+
+    Indexed on (patient, record_date DESC, id DESC) so the timeline reads
+    a patient's history newest-first as a single index range scan and
+    resumes from a cursor without re-reading earlier pages.
+
+    Fields:
+    - patient: Patient the record belongs to
+    - branch: Branch where the patient was seen
+    - record_date: When the consultation took place
+    - chief_complaint: Reason for the visit
+    - diagnosis: Diagnosis / clinical impression
+    - notes: Additional clinical notes
+    - created_by: Doctor who wrote the record
+    """
+
+    patient = models.ForeignKey(
+        Patient,
+        on_delete=models.CASCADE,
+        related_name='records',
+        verbose_name='paciente'
+    )
+
+    branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name='sucursal'
+    )
+
+    record_date = models.DateTimeField(
+        'fecha del registro',
+        default=timezone.now,
+        help_text='Fecha y hora de la consulta'
+    )
+
+    chief_complaint = models.TextField(
+        'motivo de consulta',
+        help_text='Motivo principal de la consulta'
+    )
+
+    diagnosis = models.TextField(
+        'diagnóstico',
+        blank=True,
+        help_text='Diagnóstico o impresión clínica'
+    )
+
+    notes = models.TextField(
+        'notas',
+        blank=True,
+        help_text='Notas clínicas adicionales'
+    )
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='patient_records_created',
+        verbose_name='registrado por'
+    )
+
+    # Timestamps
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'patient_records'
+        verbose_name = 'registro clínico'
+        verbose_name_plural = 'registros clínicos'
+        ordering = ['-record_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['patient', '-record_date', '-id'],
+                name='patient_records_timeline_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.patient_id} @ {self.record_date:%Y-%m-%d}: {self.chief_complaint[:40]}'
+
+
+class PatientSummary(models.Model):
+    """
+    Denormalized header shown on every patient screen.
+
+    Maintained incrementally with F-expression deltas by the functions in
+    summary.py as orders, invoices, payments and results change; rebuilt
+    and verified by the rebuild/check management commands.
+
+    Fields:
+    - patient: Summarized patient (primary key)
+    - last_visit_at: Latest consultation or order
+    - order_count: Number of exam orders
+    - open_balance: Amount invoiced and not yet paid
+    - last_abnormal_result_at / last_abnormal_exam: Latest abnormal result
+    """
+
+    patient = models.OneToOneField(
+        Patient,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='summary',
+        verbose_name='paciente'
+    )
+
+    last_visit_at = models.DateTimeField('última visita', null=True, blank=True)
+
+    order_count = models.IntegerField('órdenes', default=0)
+
+    open_balance = models.DecimalField(
+        'saldo pendiente',
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+
+    last_abnormal_result_at = models.DateTimeField('último resultado anormal', null=True, blank=True)
+
+    last_abnormal_exam = models.CharField(
+        'examen del último resultado anormal',
+        max_length=200,
+        blank=True
+    )
+
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'patient_summaries'
+        verbose_name = 'resumen de paciente'
+        verbose_name_plural = 'resúmenes de pacientes'
 
-# Create your models here.
+    def __str__(self):
+        return f'Resumen {self.patient_id}'
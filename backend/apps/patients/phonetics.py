@@ -0,0 +1,136 @@
+"""
+Spanish Phonetic Encoder
+========================
+
+Encodes Spanish names into phonetic keys so that spellings which sound
+the same in Latin American Spanish collapse to one key:
+
+    González / Gonzales   -> GONSALES
+    Jiménez / Ximénez     -> JIMENES
+    Vázquez / Basques     -> BASKES
+    Yáñez / Llanes        -> YANES
+
+Rules (applied left to right on the accent-free, lowercased word):
+- Silent 'h' is dropped ('ch' is kept as its own sound)
+- b/v/w -> B, z/s/soft c -> S (seseo), hard c/k/q(u) -> K
+- soft g / j / initial x -> J, hard g / gu(e|i) -> G
+- ll / consonant y -> Y, final y -> I, ph -> F, rr -> R
+- Repeated codes are collapsed ('Garrido' -> GARIDO)
+
+Keys are plain strings stored in btree-indexed columns, so phonetic
+lookups are simple equality index hits.
+"""
+
+from apps.common.utils import normalize_text
+
+# Particles that are part of compound surnames but carry no identity
+# ('de la Cruz', 'del Pino').
+NAME_PARTICLES = frozenset({'de', 'del', 'la', 'las', 'los', 'y', 'e', 'da', 'di', 'van', 'von'})
+
+PHONETIC_KEY_LENGTH = 20
+
+_VOWELS = frozenset('aeiou')
+_FRONT_VOWELS = frozenset('ei')
+
+
+def encode_word(word):
+    """
+    Return the phonetic key for a single word.
+
+    Args:
+        word: Any string; accents and case are ignored
+
+    Returns:
+        Uppercase key (may be empty for words without letters)
+    """
+    word = ''.join(ch for ch in normalize_text(word) if 'a' <= ch <= 'z')
+    codes = []
+    i = 0
+    length = len(word)
+
+    while i < length:
+        ch = word[i]
+        nxt = word[i + 1] if i + 1 < length else ''
+        after = word[i + 2] if i + 2 < length else ''
+        step = 1
+
+        if ch in _VOWELS:
+            code = ch.upper()
+        elif ch == 'h':
+            code = ''
+        elif ch == 'c':
+            if nxt == 'h':
+                code, step = 'X', 2
+            elif nxt in _FRONT_VOWELS:
+                code = 'S'
+            else:
+                code = 'K'
+        elif ch == 'q':
+            code = 'K'
+            if nxt == 'u':
+                step = 2
+        elif ch == 'k':
+            code = 'K'
+        elif ch in 'zs':
+            code = 'S'
+        elif ch == 'x':
+            code = 'J' if i == 0 else 'KS'
+        elif ch == 'j':
+            code = 'J'
+        elif ch == 'g':
+            if nxt in _FRONT_VOWELS:
+                code = 'J'
+            elif nxt == 'u' and after in _FRONT_VOWELS:
+                code, step = 'G', 2
+            else:
+                code = 'G'
+        elif ch in 'bvw':
+            code = 'B'
+        elif ch == 'p' and nxt == 'h':
+            code, step = 'F', 2
+        elif ch == 'l' and nxt == 'l':
+            code, step = 'Y', 2
+        elif ch == 'y':
+            code = 'I' if (i + 1 == length or nxt not in _VOWELS) and i > 0 else 'Y'
+        else:
+            code = ch.upper()
+
+        for c in code:
+            if not codes or codes[-1] != c:
+                codes.append(c)
+        i += step
+
+    return ''.join(codes)[:PHONETIC_KEY_LENGTH]
+
+
+def name_tokens(value):
+    """Split a name into significant tokens, dropping surname particles."""
+    return [t for t in normalize_text(value).split(' ') if t and t not in NAME_PARTICLES]
+
+
+def encode_name(value):
+    """
+    Return phonetic keys for every significant token of a name.
+
+    >>> encode_name('María de los Ángeles')
+    ['MARIA', 'ANJELES']
+    """
+    return [key for key in (encode_word(t) for t in name_tokens(value)) if key]
+
+
+def patient_phonetic_keys(first_name, last_name):
+    """
+    Compute the phonetic key columns for a patient.
+
+    Returns:
+        Dict with first_name_phonetic (first given name),
+        last_name_phonetic (first surname) and second_last_name_phonetic
+        (second surname, '' if none)
+    """
+    given = encode_name(first_name)
+    surnames = encode_name(last_name)
+    return {
+        'first_name_phonetic': given[0] if given else '',
+        'last_name_phonetic': surnames[0] if surnames else '',
+        'second_last_name_phonetic': surnames[1] if len(surnames) > 1 else '',
+    }
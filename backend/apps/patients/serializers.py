@@ -0,0 +1,122 @@
+"""
+Serializers for Patient Management
+Handles data validation and transformation for patient endpoints
+"""
+from rest_framework import serializers
+from .models import Patient, PatientMergeJournal, PatientSummary
+
+
+class PatientSerializer(serializers.ModelSerializer):
+    """Serializer for patient demographics"""
+    branch_name = serializers.CharField(source='branch.name', read_only=True)
+
+    class Meta:
+        model = Patient
+        fields = [
+            'id',
+            'first_name',
+            'last_name',
+            'date_of_birth',
+            'gender',
+            'identification_number',
+            'phone',
+            'email',
+            'address',
+            'branch',
+            'branch_name',
+            'is_active',
+            'created_at',
+        ]
+        read_only_fields = ['id', 'created_at']
+
+
+class PatientSearchResultSerializer(serializers.ModelSerializer):
+    """Compact serializer for search results"""
+    branch_name = serializers.CharField(source='branch.name', read_only=True)
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Patient
+        fields = [
+            'id',
+            'first_name',
+            'last_name',
+            'date_of_birth',
+            'gender',
+            'identification_number',
+            'phone',
+            'branch',
+            'branch_name',
+            'score',
+        ]
+        read_only_fields = fields
+
+
+class DuplicateCheckSerializer(serializers.Serializer):
+    """Demographics of a registration to check for duplicates"""
+    first_name = serializers.CharField(max_length=100)
+    last_name = serializers.CharField(max_length=100)
+    date_of_birth = serializers.DateField()
+    identification_number = serializers.CharField(max_length=30, required=False, allow_blank=True, default='')
+    phone = serializers.CharField(max_length=20, required=False, allow_blank=True, default='')
+    exclude_id = serializers.IntegerField(required=False, allow_null=True, default=None)
+
+
+class MergePairSerializer(serializers.Serializer):
+    """One survivor/merged pair"""
+    survivor_id = serializers.IntegerField(min_value=1)
+    merged_id = serializers.IntegerField(min_value=1)
+
+
+class MergeRequestSerializer(serializers.Serializer):
+    """Batch of pairs to merge in one transaction"""
+    pairs = MergePairSerializer(many=True, allow_empty=False)
+
+
+class PatientMergeJournalSerializer(serializers.ModelSerializer):
+    """Serializer for merge journal entries"""
+    repointed_counts = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PatientMergeJournal
+        fields = [
+            'id',
+            'batch_id',
+            'survivor',
+            'merged',
+            'repointed_counts',
+            'merged_by',
+            'merged_at',
+            'undone_at',
+        ]
+        read_only_fields = fields
+
+    def get_repointed_counts(self, obj):
+        return {key: len(ids) for key, ids in obj.repointed.items()}
+
+
+class TimelineEntrySerializer(serializers.Serializer):
+    """One entry of the patient timeline (record, order or result)"""
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    date = serializers.DateTimeField()
+    title = serializers.CharField()
+    detail = serializers.CharField(allow_blank=True, allow_null=True)
+    data = serializers.DictField()
+
+
+class PatientSummarySerializer(serializers.ModelSerializer):
+    """Patient header: last visit, orders, balance, last abnormal result"""
+
+    class Meta:
+        model = PatientSummary
+        fields = [
+            'patient',
+            'last_visit_at',
+            'order_count',
+            'open_balance',
+            'last_abnormal_result_at',
+            'last_abnormal_exam',
+            'updated_at',
+        ]
+        read_only_fields = fields
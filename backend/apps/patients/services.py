@@ -0,0 +1,119 @@
+"""
+Patient Services
+Business logic for patient lookup
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import Case, F, FloatField, Q, Value, When
+
+from apps.common.utils import normalize_text
+from .models import Patient
+from .phonetics import encode_name
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 50
+SEARCH_MODES = ('auto', 'trigram', 'phonetic')
+
+# Score added to rows whose phonetic keys match the query
+PHONETIC_MATCH_BONUS = 0.5
+
+# A single token containing at least one digit is treated as an ID number
+ID_NUMBER_RE = re.compile(r'^[\w.-]*\d[\w.-]*$')
+
+
+def phonetic_filter(term):
+    """
+    Build a Q matching patients whose phonetic keys equal the query's.
+
+    One token is matched against both surname keys; two or more tokens
+    must match a surname key and the given-name key (in any order), so
+    'gonzales maria' and 'maria gonzalez' find the same patients. All
+    conditions are equality/IN lookups on btree-indexed columns.
+
+    Returns:
+        Q object, or None if the query has no encodable tokens
+    """
+    keys = encode_name(term)
+    if not keys:
+        return None
+    if len(keys) == 1:
+        return Q(last_name_phonetic=keys[0]) | Q(second_last_name_phonetic=keys[0])
+    return (
+        Q(last_name_phonetic__in=keys, first_name_phonetic__in=keys)
+        | Q(last_name_phonetic__in=keys, second_last_name_phonetic__in=keys)
+    )
+
+
+def search_patients(query, limit=DEFAULT_SEARCH_LIMIT, mode='auto'):
+    """
+    Search active patients by identification number or name.
+
+    ID-like queries ('0912345', 'P-123') use a prefix scan on the
+    identification_number btree. Name queries depend on `mode`:
+
+    - trigram: filter with the pg_trgm word-similarity operator, answered
+      by one bitmap scan of the trigram GIN index; tolerates typos and
+      partial words
+    - phonetic: equality lookups on the precomputed Spanish phonetic
+      keys; finds 'Ximénez' for 'Jiménez' with no similarity math
+    - auto (default): either of the above; phonetic matches get a bonus
+
+    The (small) matched set is ranked by trigram similarity plus the
+    Spanish full-text rank, so exact surname matches sort first.
+
+    Args:
+        query: Raw text typed by the user
+        limit: Maximum number of results (capped at MAX_SEARCH_LIMIT)
+        mode: One of SEARCH_MODES
+
+    Returns:
+        List of Patient instances annotated with `score`
+    """
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    raw = (query or '').strip()
+    term = normalize_text(raw)
+    if not term:
+        return []
+
+    patients = (
+        Patient.objects.filter(is_active=True)
+        .select_related('branch')
+        .defer('search_vector', 'address')
+    )
+
+    if ID_NUMBER_RE.match(raw):
+        return list(
+            patients.filter(identification_number__startswith=raw)
+            .annotate(score=Value(1.0, output_field=FloatField()))
+            .order_by('identification_number')[:limit]
+        )
+
+    trigram_q = Q(full_name_normalized__trigram_word_similar=term)
+    phonetic_q = phonetic_filter(term) if mode != 'trigram' else None
+
+    if mode == 'phonetic':
+        if phonetic_q is None:
+            return []
+        condition, bonus = phonetic_q, Value(PHONETIC_MATCH_BONUS)
+    elif phonetic_q is not None:
+        condition = trigram_q | phonetic_q
+        bonus = Case(
+            When(phonetic_q, then=Value(PHONETIC_MATCH_BONUS)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    else:
+        condition, bonus = trigram_q, Value(0.0)
+
+    text_query = SearchQuery(raw, config='spanish_unaccent', search_type='websearch')
+    return list(
+        patients.filter(condition)
+        .annotate(
+            similarity=TrigramWordSimilarity(term, 'full_name_normalized'),
+            text_rank=SearchRank(F('search_vector'), text_query),
+            phonetic_bonus=bonus,
+        )
+        .annotate(score=F('similarity') + F('text_rank') + F('phonetic_bonus'))
+        .order_by('-score', 'last_name', 'first_name')[:limit]
+    )
@@ -0,0 +1,33 @@
+"""
+Patient Signal Receivers
+========================
+
+Keeps the PatientSummary projection in sync (see summary.py).
+Connected in PatientsConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .merge import patients_merged
+from .models import PatientRecord
+from .summary import rebuild_summaries, record_visit
+
+
+@receiver(post_save, sender=PatientRecord)
+def patient_record_saved(sender, instance, created, **kwargs):
+    if created:
+        record_visit(instance.patient_id, instance.record_date)
+    else:
+        # The date may have moved backwards; recompute this patient only
+        rebuild_summaries(patient_ids=[instance.patient_id])
+
+
+@receiver(post_delete, sender=PatientRecord)
+def patient_record_deleted(sender, instance, **kwargs):
+    rebuild_summaries(patient_ids=[instance.patient_id])
+
+
+@receiver(patients_merged)
+def refresh_merged_summaries(sender, survivor_ids, merged_ids, **kwargs):
+    """Merges move whole histories between patients: recompute both sides."""
+    rebuild_summaries(patient_ids=list(set(survivor_ids) | set(merged_ids)))
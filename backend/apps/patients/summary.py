@@ -0,0 +1,277 @@
+"""
+Patient Summary Projection
+==========================
+
+Keeps PatientSummary (the patient header: last visit, order count, open
+balance, last abnormal result) current without aggregate queries on read.
+
+Incremental path:
+    Writers call the delta functions below inside their transaction.
+    Each is one UPDATE with F-expressions, so concurrent deltas for the
+    same patient serialize on the row lock and never lose updates:
+
+        record_visit(patient_id, at)              last_visit_at = GREATEST(...)
+        apply_order_delta(patient_id, +1, at)     order_count = order_count + 1
+        apply_order_deltas(deltas, visits)        same, batched with unnest
+        apply_balance_delta(patient_id, amount)   invoices (+), payments (-)
+        record_abnormal_result(patient_id, at, exam_name)
+        refresh_abnormal_results(patient_ids)     corrected results
+
+Rebuild path:
+    compute_summaries() runs ONE grouped query per registered source
+    (SUMMARY_SOURCES) and combines the partial rows in Python. It backs
+    both the rebuild command and the consistency checker.
+
+Receivers wiring these functions to model changes live in signals.py.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import PatientRecord, PatientSummary
+
+SUMMARY_FIELDS = (
+    'last_visit_at',
+    'order_count',
+    'open_balance',
+    'last_abnormal_result_at',
+    'last_abnormal_exam',
+)
+
+EMPTY_SUMMARY = {
+    'last_visit_at': None,
+    'order_count': 0,
+    'open_balance': Decimal('0.00'),
+    'last_abnormal_result_at': None,
+    'last_abnormal_exam': '',
+}
+
+
+# ── Incremental deltas ────────────────────────────────────────
+
+
+def _apply(patient_id, condition=None, **updates):
+    """
+    Run one UPDATE on the patient's summary row, creating the row first
+    if it does not exist yet.
+    """
+    updates['updated_at'] = timezone.now()
+    rows = PatientSummary.objects.filter(patient_id=patient_id)
+    if condition is not None:
+        rows = rows.filter(condition)
+    if rows.update(**updates):
+        return
+    PatientSummary.objects.bulk_create([PatientSummary(patient_id=patient_id)], ignore_conflicts=True)
+    rows.update(**updates)
+
+
+def record_visit(patient_id, at):
+    """Move last_visit_at forward to `at` (never backwards)."""
+    _apply(patient_id, last_visit_at=Greatest(Coalesce('last_visit_at', Value(at)), Value(at)))
+
+
+def apply_order_delta(patient_id, delta, at=None):
+    """Add `delta` (+1 created, -1 deleted/cancelled) to the order count."""
+    updates = {'order_count': F('order_count') + delta}
+    if at is not None and delta > 0:
+        updates['last_visit_at'] = Greatest(Coalesce('last_visit_at', Value(at)), Value(at))
+    _apply(patient_id, **updates)
+
+
+def apply_order_deltas(deltas, visits):
+    """
+    Apply order-count deltas for many patients at once (batch order
+    creation): one INSERT for missing rows plus one UPDATE ... FROM unnest,
+    regardless of the number of patients.
+
+    Args:
+        deltas: Dict {patient_id: orders added}
+        visits: Dict {patient_id: created_at of the patient's newest
+            order} (moves last_visit_at forward)
+    """
+    if not deltas:
+        return
+    patient_ids = list(deltas)
+    PatientSummary.objects.bulk_create(
+        [PatientSummary(patient_id=pk) for pk in patient_ids], ignore_conflicts=True
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE patient_summaries AS s
+            SET order_count = s.order_count + d.delta,
+                last_visit_at = GREATEST(COALESCE(s.last_visit_at, d.at), d.at),
+                updated_at = %s
+            FROM unnest(%s::bigint[], %s::int[], %s::timestamptz[]) AS d(patient_id, delta, at)
+            WHERE s.patient_id = d.patient_id
+            """,
+            [
+                timezone.now(),
+                patient_ids,
+                [deltas[pk] for pk in patient_ids],
+                [visits[pk] for pk in patient_ids],
+            ],
+        )
+
+
+def apply_balance_delta(patient_id, amount):
+    """Add `amount` to the open balance (invoice issued: +, payment/void: -)."""
+    if amount:
+        _apply(patient_id, open_balance=F('open_balance') + amount)
+
+
+def record_abnormal_result(patient_id, at, exam_name):
+    """Replace the last abnormal result if `at` is newer than the stored one."""
+    newer = Q(last_abnormal_result_at__isnull=True) | Q(last_abnormal_result_at__lt=at)
+    _apply(patient_id, condition=newer, last_abnormal_result_at=at, last_abnormal_exam=exam_name)
+
+
+def refresh_abnormal_results(patient_ids):
+    """
+    Recompute the last abnormal result of these patients from their
+    results (a corrected value may no longer be abnormal, which
+    record_abnormal_result cannot undo).
+    """
+    latest = dict(abnormal_result_summaries(patient_ids))
+    for patient_id in patient_ids:
+        values = latest.get(patient_id) or {'last_abnormal_result_at': None, 'last_abnormal_exam': ''}
+        _apply(patient_id, **values)
+
+
+# ── Grouped recomputation ─────────────────────────────────────
+
+
+def clinical_record_summaries(patient_ids=None):
+    """last_visit_at from clinical records (one grouped query)."""
+    records = PatientRecord.objects.all()
+    if patient_ids is not None:
+        records = records.filter(patient_id__in=patient_ids)
+    for row in records.order_by().values('patient_id').annotate(last_visit_at=Max('record_date')):
+        yield row['patient_id'], {'last_visit_at': row['last_visit_at']}
+
+
+def order_summaries(patient_ids=None):
+    """order_count and last_visit_at from non-cancelled orders (one grouped query)."""
+    from apps.exams.models import ExamOrder
+
+    orders = ExamOrder.objects.exclude(status='cancelled')
+    if patient_ids is not None:
+        orders = orders.filter(patient_id__in=patient_ids)
+    rows = orders.order_by().values('patient_id').annotate(
+        order_count=Count('id'), last_visit_at=Max('created_at')
+    )
+    for row in rows:
+        yield row['patient_id'], {'order_count': row['order_count'], 'last_visit_at': row['last_visit_at']}
+
+
+def abnormal_result_summaries(patient_ids=None):
+    """Latest abnormal result per patient (one DISTINCT ON query)."""
+    from apps.reports.models import ExamResult
+
+    results = ExamResult.objects.filter(is_abnormal=True)
+    if patient_ids is not None:
+        results = results.filter(patient_id__in=patient_ids)
+    rows = (
+        results.order_by('patient_id', '-performed_at', '-id')
+        .distinct('patient_id')
+        .values('patient_id', 'performed_at', 'exam_type__name')
+    )
+    for row in rows:
+        yield row['patient_id'], {
+            'last_abnormal_result_at': row['performed_at'],
+            'last_abnormal_exam': row['exam_type__name'],
+        }
+
+
+# Each source yields (patient_id, partial summary) from a single grouped query
+SUMMARY_SOURCES = [
+    clinical_record_summaries,
+    order_summaries,
+    abnormal_result_summaries,
+]
+
+
+def _combine(current, partial):
+    for field, value in partial.items():
+        if value is None:
+            continue
+        if field in ('order_count', 'open_balance'):
+            current[field] += value
+        elif field == 'last_visit_at':
+            current[field] = max(filter(None, (current[field], value)))
+        elif field == 'last_abnormal_result_at':
+            if current[field] is None or value > current[field]:
+                current[field] = value
+                current['last_abnormal_exam'] = partial.get('last_abnormal_exam', '')
+
+
+def compute_summaries(patient_ids=None):
+    """
+    Recompute summaries from the source tables.
+
+    Returns:
+        Dict {patient_id: {field: value}} for patients with any activity
+    """
+    summaries = defaultdict(lambda: dict(EMPTY_SUMMARY))
+    for source in SUMMARY_SOURCES:
+        for patient_id, partial in source(patient_ids):
+            _combine(summaries[patient_id], partial)
+    return summaries
+
+
+def rebuild_summaries(patient_ids=None, batch_size=5000):
+    """
+    Rewrite summary rows from compute_summaries().
+
+    Existing rows in scope are first reset to the empty summary, so
+    patients that no longer have activity do not keep stale values.
+
+    Returns:
+        Number of summary rows written
+    """
+    summaries = compute_summaries(patient_ids)
+    now = timezone.now()
+    rows = [
+        PatientSummary(patient_id=patient_id, updated_at=now, **values)
+        for patient_id, values in summaries.items()
+    ]
+    with transaction.atomic():
+        existing = PatientSummary.objects.all()
+        if patient_ids is not None:
+            existing = existing.filter(patient_id__in=patient_ids)
+        existing.update(updated_at=now, **EMPTY_SUMMARY)
+        PatientSummary.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['patient'],
+            update_fields=[*SUMMARY_FIELDS, 'updated_at'],
+        )
+    return len(rows)
+
+
+def find_inconsistencies(patient_ids=None):
+    """
+    Compare stored summaries against a recomputation.
+
+    Returns:
+        List of (patient_id, {field: (stored, expected)}) for rows that differ
+    """
+    expected = compute_summaries(patient_ids)
+    stored_rows = PatientSummary.objects.values('patient_id', *SUMMARY_FIELDS)
+    if patient_ids is not None:
+        stored_rows = stored_rows.filter(patient_id__in=patient_ids)
+
+    stored = {row.pop('patient_id'): row for row in stored_rows.iterator(chunk_size=5000)}
+    problems = []
+    for patient_id in sorted(set(stored) | set(expected)):
+        have = stored.get(patient_id, EMPTY_SUMMARY)
+        want = expected.get(patient_id, EMPTY_SUMMARY)
+        diff = {f: (have[f], want[f]) for f in SUMMARY_FIELDS if have[f] != want[f]}
+        if diff:
+            problems.append((patient_id, diff))
+    return problems
@@ -0,0 +1,204 @@
+"""
+Patient Timeline
+================
+
+Newest-first history of a patient merged from several sources
+(clinical records, exam orders, exam results).
+
+Each source is read with a keyset query over its
+(patient_id, <date> DESC, id DESC) index, fetching at most one page.
+The per-source streams are then combined with a k-way heap merge, so a
+page costs one bounded index range scan per source no matter how deep
+into the history the reader is.
+
+Global order is (date DESC, source rank ASC, id DESC). The cursor is
+the position of the last entry returned; every source can resume from
+that single position:
+
+    source ranked before the cursor's source:  date <  cursor.date
+    the cursor's own source:                   date <  cursor.date
+                                               or (date = cursor.date and id < cursor.id)
+    source ranked after the cursor's source:   date <= cursor.date
+
+Cursors are signed and opaque to clients.
+"""
+import heapq
+from collections import namedtuple
+
+from django.core import signing
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from apps.common.exceptions import BusinessRuleError
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+CURSOR_SALT = 'patients.timeline'
+
+TimelineEntry = namedtuple('TimelineEntry', ['type', 'id', 'date', 'title', 'detail', 'data'])
+
+
+class TimelineSource:
+    """
+    One stream of timeline entries.
+
+    Attributes:
+        type: Entry type reported to clients (also the cursor key)
+        date_field: Model field the stream is ordered by; must be covered
+            by an index on (patient, date_field DESC, id DESC)
+    """
+
+    type = None
+    date_field = None
+
+    def get_queryset(self, patient_id):
+        raise NotImplementedError
+
+    def to_entry(self, obj):
+        raise NotImplementedError
+
+    def fetch(self, patient_id, rank, cursor, limit):
+        """Return up to `limit` entries strictly after `cursor` in timeline order."""
+        queryset = self.get_queryset(patient_id)
+        if cursor is not None:
+            cursor_date, cursor_rank, cursor_id = cursor
+            before = Q(**{f'{self.date_field}__lt': cursor_date})
+            if rank > cursor_rank:
+                before = Q(**{f'{self.date_field}__lte': cursor_date})
+            elif rank == cursor_rank:
+                before |= Q(**{self.date_field: cursor_date, 'id__lt': cursor_id})
+            queryset = queryset.filter(before)
+        objects = queryset.order_by(f'-{self.date_field}', '-id')[:limit]
+        return [(getattr(obj, self.date_field), -rank, obj.id, self.to_entry(obj)) for obj in objects]
+
+
+class ClinicalRecordSource(TimelineSource):
+    type = 'clinical_record'
+    date_field = 'record_date'
+
+    def get_queryset(self, patient_id):
+        from .models import PatientRecord
+        return (
+            PatientRecord.objects.filter(patient_id=patient_id)
+            .select_related('created_by')
+            .only('id', 'record_date', 'chief_complaint', 'diagnosis', 'branch_id',
+                  'created_by__first_name', 'created_by__last_name')
+        )
+
+    def to_entry(self, record):
+        return TimelineEntry(
+            type=self.type,
+            id=record.id,
+            date=record.record_date,
+            title=record.chief_complaint,
+            detail=record.diagnosis,
+            data={
+                'branch_id': record.branch_id,
+                'doctor': record.created_by.get_full_name() if record.created_by else None,
+            },
+        )
+
+
+class OrderSource(TimelineSource):
+    type = 'order'
+    date_field = 'created_at'
+
+    def get_queryset(self, patient_id):
+        from apps.exams.models import ExamOrder
+        return ExamOrder.objects.filter(patient_id=patient_id).only(
+            'id', 'created_at', 'order_number', 'status', 'total_price', 'root_branch_id', 'current_branch_id'
+        )
+
+    def to_entry(self, order):
+        return TimelineEntry(
+            type=self.type,
+            id=order.id,
+            date=order.created_at,
+            title=order.order_number,
+            detail=order.get_status_display(),
+            data={
+                'status': order.status,
+                'total_price': str(order.total_price),
+                'root_branch_id': order.root_branch_id,
+                'current_branch_id': order.current_branch_id,
+            },
+        )
+
+
+class ResultSource(TimelineSource):
+    type = 'result'
+    date_field = 'performed_at'
+
+    def get_queryset(self, patient_id):
+        from apps.reports.models import ExamResult
+        return (
+            ExamResult.objects.filter(patient_id=patient_id)
+            .select_related('exam_type')
+            .only('id', 'performed_at', 'order_id', 'result_value', 'unit', 'is_abnormal',
+                  'abnormal_flag', 'branch_id', 'exam_type__name')
+        )
+
+    def to_entry(self, result):
+        return TimelineEntry(
+            type=self.type,
+            id=result.id,
+            date=result.performed_at,
+            title=result.exam_type.name,
+            detail=f'{result.result_value} {result.unit}'.strip(),
+            data={
+                'order_id': result.order_id,
+                'is_abnormal': result.is_abnormal,
+                'abnormal_flag': result.abnormal_flag,
+                'branch_id': result.branch_id,
+            },
+        )
+
+
+# Ranked sources; the rank breaks ties between entries with the same date
+TIMELINE_SOURCES = (
+    ClinicalRecordSource(),
+    OrderSource(),
+    ResultSource(),
+)
+
+
+def encode_cursor(entry_key):
+    date, negative_rank, pk, _ = entry_key
+    return signing.dumps([date.isoformat(), -negative_rank, pk], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor):
+    try:
+        date, rank, pk = signing.loads(cursor, salt=CURSOR_SALT)
+        return parse_datetime(date), int(rank), int(pk)
+    except (signing.BadSignature, TypeError, ValueError):
+        raise BusinessRuleError('Cursor inválido.', code='invalid_cursor')
+
+
+def patient_timeline(patient_id, cursor=None, limit=DEFAULT_PAGE_SIZE, types=None):
+    """
+    Return one page of a patient's timeline.
+
+    Args:
+        patient_id: Patient id
+        cursor: Opaque cursor from a previous page (None for the first page)
+        limit: Page size
+        types: Optional iterable of entry types to include
+
+    Returns:
+        (list of TimelineEntry, next_cursor or None)
+    """
+    position = decode_cursor(cursor) if cursor else None
+    streams = [
+        source.fetch(patient_id, rank, position, limit + 1)
+        for rank, source in enumerate(TIMELINE_SOURCES)
+        if types is None or source.type in types
+    ]
+
+    # Each stream is already sorted by (date, -rank, id) descending
+    merged = heapq.merge(*streams, key=lambda item: item[:3], reverse=True)
+    page = [item for _, item in zip(range(limit + 1), merged)]
+
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return [item[3] for item in page[:limit]], next_cursor
@@ -0,0 +1,17 @@
+"""
+Patient URL Configuration
+Maps endpoints to views
+"""
+from django.urls import path
+from . import views
+
+app_name = 'patients'
+
+urlpatterns = [
+    path('search', views.patient_search_view, name='search'),
+    path('duplicates/check', views.duplicate_check_view, name='duplicate-check'),
+    path('merge', views.merge_patients_view, name='merge'),
+    path('<int:patient_id>/summary', views.patient_summary_view, name='summary'),
+    path('<int:patient_id>/timeline', views.patient_timeline_view, name='timeline'),
+    path('merge/<uuid:batch_id>/undo', views.undo_merge_view, name='merge-undo'),
+]
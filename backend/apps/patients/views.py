@@ -1 +1,386 @@
-# Views will be implemented in future phases.
+"""
+Patient Views
+Handles patient lookup endpoints
+"""
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+
+from apps.auth.decorators import require_permission
+from apps.auth.models import AuditLog
+from apps.auth.views import get_client_ip, get_user_agent
+from apps.common.exceptions import BusinessRuleError
+from .dedup import find_duplicates
+from .merge import merge_patients, undo_merge_batch, MAX_MERGE_PAIRS
+from .serializers import (
+    PatientSearchResultSerializer,
+    DuplicateCheckSerializer,
+    MergeRequestSerializer,
+    PatientMergeJournalSerializer,
+    TimelineEntrySerializer,
+    PatientSummarySerializer,
+)
+from .models import Patient, PatientSummary
+from .services import search_patients, DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, SEARCH_MODES
+from .timeline import patient_timeline, TIMELINE_SOURCES, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+@extend_schema(
+    tags=['Patients'],
+    summary='Search Patients',
+    description=(
+        'Typo-tolerant patient lookup by name or identification number. '
+        'Combines trigram similarity with Spanish phonetic keys; results are '
+        'ranked by similarity, full-text rank and phonetic match.'
+    ),
+    parameters=[
+        OpenApiParameter('q', str, required=True, description='Name or identification number'),
+        OpenApiParameter(
+            'limit', int,
+            description=f'Maximum results (default {DEFAULT_SEARCH_LIMIT}, max {MAX_SEARCH_LIMIT})'
+        ),
+        OpenApiParameter('mode', str, enum=list(SEARCH_MODES), description='Matching strategy (default auto)'),
+    ],
+    responses={
+        200: PatientSearchResultSerializer(many=True),
+        400: OpenApiResponse(description='Query too short, invalid limit or mode'),
+        403: OpenApiResponse(description='Missing patients.view permission'),
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@require_permission('patients.view')
+def patient_search_view(request):
+    """
+    Search patients
+
+    GET /api/patients/search?q=gonzalez&limit=20&mode=auto
+
+    Response:
+    {
+        "count": 2,
+        "results": [
+            {"id": 12, "first_name": "María", "last_name": "González", ..., "score": 1.42}
+        ]
+    }
+    """
+    query = request.query_params.get('q', '').strip()
+    if len(query) < 2:
+        return Response(
+            {'error': 'La búsqueda debe tener al menos 2 caracteres.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_SEARCH_LIMIT))
+    except ValueError:
+        return Response(
+            {'error': 'El parámetro limit debe ser un número entero.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    mode = request.query_params.get('mode', 'auto')
+    if mode not in SEARCH_MODES:
+        return Response(
+            {'error': f'Modo de búsqueda inválido. Opciones: {", ".join(SEARCH_MODES)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    patients = search_patients(query, limit=limit, mode=mode)
+    serializer = PatientSearchResultSerializer(patients, many=True)
+    return Response(
+        {'count': len(patients), 'results': serializer.data},
+        status=status.HTTP_200_OK
+    )
+
+
+@extend_schema(
+    tags=['Patients'],
+    summary='Check Duplicate Registration',
+    description=(
+        'Checks a (possibly unsaved) registration against existing patients '
+        'sharing its birth date + surname sound, ID prefix or phone.'
+    ),
+    request=DuplicateCheckSerializer,
+    responses={
+        200: PatientSearchResultSerializer(many=True),
+        400: OpenApiResponse(description='Validation error'),
+        403: OpenApiResponse(description='Missing patients.create permission'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('patients.create')
+def duplicate_check_view(request):
+    """
+    Check a registration for probable duplicates
+
+    POST /api/patients/duplicates/check
+
+    Request:
+    {
+        "first_name": "María",
+        "last_name": "Gonzales Pérez",
+        "date_of_birth": "1980-05-01",
+        "identification_number": "0912345678",
+        "phone": "0991234567"
+    }
+
+    Response:
+    {
+        "count": 1,
+        "results": [{"id": 12, "first_name": "María", "last_name": "González Pérez", ..., "score": 0.93}]
+    }
+    """
+    serializer = DuplicateCheckSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    matches = find_duplicates(**serializer.validated_data)
+    patients = []
+    for patient, score in matches:
+        patient.score = round(score, 4)
+        patients.append(patient)
+
+    return Response(
+        {'count': len(patients), 'results': PatientSearchResultSerializer(patients, many=True).data},
+        status=status.HTTP_200_OK
+    )
+
+
+@extend_schema(
+    tags=['Patients'],
+    summary='Merge Duplicate Patients',
+    description=(
+        f'Merges up to {MAX_MERGE_PAIRS} (survivor, merged) pairs in one transaction. '
+        'Every record referencing a merged patient is moved to its survivor and '
+        'the merged patient is deactivated. The batch can be undone.'
+    ),
+    request=MergeRequestSerializer,
+    responses={
+        201: PatientMergeJournalSerializer(many=True),
+        400: OpenApiResponse(description='Invalid batch (self-merge, chains, inactive patients)'),
+        403: OpenApiResponse(description='Missing patients.merge permission'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('patients.merge')
+def merge_patients_view(request):
+    """
+    Merge duplicate patients
+
+    POST /api/patients/merge
+
+    Request:
+    {
+        "pairs": [
+            {"survivor_id": 12, "merged_id": 57},
+            {"survivor_id": 30, "merged_id": 31}
+        ]
+    }
+
+    Response:
+    {
+        "batch_id": "6f1c...",
+        "results": [{"survivor": 12, "merged": 57, "repointed_counts": {"exam_orders.patient_id": 3}, ...}]
+    }
+    """
+    serializer = MergeRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    pairs = [(p['survivor_id'], p['merged_id']) for p in serializer.validated_data['pairs']]
+    try:
+        batch_id, journals = merge_patients(pairs, user=request.user)
+    except BusinessRuleError as e:
+        return Response(e.as_response_data(), status=status.HTTP_400_BAD_REQUEST)
+
+    AuditLog.objects.create(
+        user=request.user,
+        action='patient_merge',
+        ip_address=get_client_ip(request),
+        user_agent=get_user_agent(request),
+        details={
+            'batch_id': str(batch_id),
+            'pairs': [list(pair) for pair in pairs],
+            'rows_repointed': sum(len(ids) for j in journals for ids in j.repointed.values()),
+        }
+    )
+
+    return Response(
+        {
+            'batch_id': str(batch_id),
+            'results': PatientMergeJournalSerializer(journals, many=True).data,
+        },
+        status=status.HTTP_201_CREATED
+    )
+
+
+@extend_schema(
+    tags=['Patients'],
+    summary='Undo Patient Merge',
+    description='Reverts every merge of a batch, moving back exactly the journaled rows.',
+    request=None,
+    responses={
+        200: OpenApiResponse(description='Merge batch reverted'),
+        400: OpenApiResponse(description='Unknown/already undone batch or survivor merged later'),
+        403: OpenApiResponse(description='Missing patients.merge permission'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('patients.merge')
+def undo_merge_view(request, batch_id):
+    """
+    Undo a merge batch
+
+    POST /api/patients/merge/<batch_id>/undo
+
+    Response:
+    {
+        "batch_id": "6f1c...",
+        "rows_restored": 4
+    }
+    """
+    try:
+        restored = undo_merge_batch(batch_id, user=request.user)
+    except BusinessRuleError as e:
+        return Response(e.as_response_data(), status=status.HTTP_400_BAD_REQUEST)
+
+    AuditLog.objects.create(
+        user=request.user,
+        action='patient_merge_undo',
+        ip_address=get_client_ip(request),
+        user_agent=get_user_agent(request),
+        details={'batch_id': str(batch_id), 'rows_restored': restored}
+    )
+
+    return Response(
+        {'batch_id': str(batch_id), 'rows_restored': restored},
+        status=status.HTTP_200_OK
+    )
+
+
+@extend_schema(
+    tags=['Patients'],
+    summary='Patient Timeline',
+    description=(
+        'Newest-first history of a patient merging clinical records, orders and '
+        'results. Pages are fetched with the opaque `next_cursor` of the previous page.'
+    ),
+    parameters=[
+        OpenApiParameter('cursor', str, description='Cursor returned by the previous page'),
+        OpenApiParameter(
+            'limit', int,
+            description=f'Entries per page (default {DEFAULT_PAGE_SIZE}, max {MAX_PAGE_SIZE})'
+        ),
+        OpenApiParameter(
+            'types', str,
+            description='Comma-separated entry types: ' + ', '.join(s.type for s in TIMELINE_SOURCES)
+        ),
+    ],
+    responses={
+        200: TimelineEntrySerializer(many=True),
+        400: OpenApiResponse(description='Invalid cursor, limit or types'),
+        403: OpenApiResponse(description='Missing patients.view_clinical_records permission'),
+        404: OpenApiResponse(description='Patient not found'),
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@require_permission('patients.view_clinical_records')
+def patient_timeline_view(request, patient_id):
+    """
+    Patient timeline
+
+    GET /api/patients/<patient_id>/timeline?limit=25&cursor=...&types=clinical_record
+
+    Response:
+    {
+        "results": [
+            {"type": "clinical_record", "id": 7, "date": "2026-03-02T10:15:00Z",
+             "title": "Dolor abdominal", "detail": "Gastritis", "data": {...}}
+        ],
+        "next_cursor": "eyJ..."   // null on the last page
+    }
+    """
+    patient = get_object_or_404(Patient.objects.only('id'), id=patient_id)
+
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return Response(
+            {'error': 'El parámetro limit debe ser un número entero.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    types = None
+    if request.query_params.get('types'):
+        types = set(request.query_params['types'].split(','))
+        valid_types = {source.type for source in TIMELINE_SOURCES}
+        if not types <= valid_types:
+            return Response(
+                {'error': f'Tipos inválidos. Opciones: {", ".join(sorted(valid_types))}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    try:
+        entries, next_cursor = patient_timeline(
+            patient.id,
+            cursor=request.query_params.get('cursor'),
+            limit=limit,
+            types=types,
+        )
+    except BusinessRuleError as e:
+        return Response(e.as_response_data(), status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {
+            'results': TimelineEntrySerializer([e._asdict() for e in entries], many=True).data,
+            'next_cursor': next_cursor,
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@extend_schema(
+    tags=['Patients'],
+    summary='Patient Summary',
+    description='Precomputed patient header (single primary-key lookup, no aggregates).',
+    responses={
+        200: PatientSummarySerializer,
+        403: OpenApiResponse(description='Missing patients.view permission'),
+        404: OpenApiResponse(description='Patient not found'),
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@require_permission('patients.view')
+def patient_summary_view(request, patient_id):
+    """
+    Patient summary
+
+    GET /api/patients/<patient_id>/summary
+
+    Response:
+    {
+        "patient": 12,
+        "last_visit_at": "2026-03-02T10:15:00Z",
+        "order_count": 14,
+        "open_balance": "25.00",
+        "last_abnormal_result_at": "2026-02-11T08:40:00Z",
+        "last_abnormal_exam": "Glucosa"
+    }
+    """
+    summary = PatientSummary.objects.filter(patient_id=patient_id).first()
+    if summary is None:
+        # Patients without activity have no row yet
+        patient = get_object_or_404(Patient.objects.only('id'), id=patient_id)
+        summary = PatientSummary(patient=patient)
+
+    return Response(PatientSummarySerializer(summary).data, status=status.HTTP_200_OK)
@@ -1,3 +1,156 @@
+"""
+Django Admin Configuration for Report Models
+"""
 from django.contrib import admin
+from .models import (
+    AutoverificationRule, CriticalAlert, CriticalValueRule, DeltaCheckRule, ExamResult, QCLot, QCRun,
+    ReferenceRange, UndeliveredResult, UnitConversion,
+)
 
-# Register your models here.
+
+@admin.register(ExamResult)
+class ExamResultAdmin(admin.ModelAdmin):
+    """Exam results admin (results are entered through the API)"""
+
+    list_display = ['order', 'exam_type', 'result_value', 'unit', 'abnormal_flag', 'delta_failed', 'branch', 'performed_at']
+
+    list_filter = ['verification_status', 'is_abnormal', 'delta_failed', 'branch']
+
+    search_fields = ['order__order_number', 'patient__identification_number', 'exam_type__code']
+
+    raw_id_fields = ['order_item', 'order', 'patient', 'exam_type', 'previous_result', 'performed_by', 'verified_by']
+
+    readonly_fields = ['created_at', 'updated_at']
+
+    list_select_related = ['order', 'exam_type', 'branch']
+
+
+@admin.register(ReferenceRange)
+class ReferenceRangeAdmin(admin.ModelAdmin):
+    """Reference intervals; changes reload every process's engine"""
+
+    list_display = ['exam_type', 'sex', 'age_min_days', 'age_max_days', 'branch', 'analyzer', 'low', 'high', 'unit', 'is_active']
+
+    list_filter = ['is_active', 'sex', 'branch']
+
+    search_fields = ['exam_type__code', 'exam_type__name', 'analyzer']
+
+    raw_id_fields = ['exam_type']
+
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(UnitConversion)
+class UnitConversionAdmin(admin.ModelAdmin):
+    """Unit conversion factors (inverse direction is derived)"""
+
+    list_display = ['from_unit', 'to_unit', 'factor', 'exam_type']
+
+    search_fields = ['from_unit', 'to_unit', 'exam_type__code']
+
+    raw_id_fields = ['exam_type']
+
+
+@admin.register(DeltaCheckRule)
+class DeltaCheckRuleAdmin(admin.ModelAdmin):
+    """Delta check limits per exam type"""
+
+    list_display = ['exam_type', 'absolute_limit', 'percent_limit', 'window_days', 'is_active']
+
+    list_filter = ['is_active']
+
+    search_fields = ['exam_type__code', 'exam_type__name']
+
+    raw_id_fields = ['exam_type']
+
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(AutoverificationRule)
+class AutoverificationRuleAdmin(admin.ModelAdmin):
+    """Autoverification rules (the rule without exam is the default)"""
+
+    list_display = ['__str__', 'low_limit', 'high_limit', 'allow_abnormal', 'require_delta_pass', 'require_qc', 'is_active']
+
+    list_filter = ['is_active', 'allow_abnormal']
+
+    search_fields = ['exam_type__code', 'exam_type__name']
+
+    raw_id_fields = ['exam_type']
+
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(CriticalValueRule)
+class CriticalValueRuleAdmin(admin.ModelAdmin):
+    """Critical (panic) limits per exam type"""
+
+    list_display = ['exam_type', 'critical_low', 'critical_high', 'is_active']
+
+    list_filter = ['is_active']
+
+    search_fields = ['exam_type__code', 'exam_type__name']
+
+    raw_id_fields = ['exam_type']
+
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(CriticalAlert)
+class CriticalAlertAdmin(admin.ModelAdmin):
+    """Critical value alerts and their acknowledgement"""
+
+    list_display = ['order', 'exam_type', 'value', 'flag', 'escalation_level', 'created_at', 'delivered_at', 'acknowledged_at']
+
+    list_filter = ['flag', 'escalation_level', 'root_branch']
+
+    search_fields = ['order__order_number', 'patient__identification_number', 'exam_type__code']
+
+    raw_id_fields = ['result', 'order', 'patient', 'exam_type', 'notify_user', 'acknowledged_by']
+
+    list_select_related = ['order', 'exam_type']
+
+
+@admin.register(QCLot)
+class QCLotAdmin(admin.ModelAdmin):
+    """QC material lots; changes reload every process's QC states"""
+
+    list_display = ['exam_type', 'analyzer', 'lot_number', 'level', 'target_mean', 'target_sd', 'expires_on', 'is_active']
+
+    list_filter = ['is_active', 'analyzer', 'level']
+
+    search_fields = ['exam_type__code', 'exam_type__name', 'lot_number', 'analyzer']
+
+    raw_id_fields = ['exam_type']
+
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(QCRun)
+class QCRunAdmin(admin.ModelAdmin):
+    """QC measurements (recorded through the API, which evaluates the Westgard rules)"""
+
+    list_display = ['lot', 'value', 'z_score', 'violations', 'is_rejected', 'measured_at']
+
+    list_filter = ['is_rejected', 'lot__analyzer']
+
+    search_fields = ['lot__exam_type__code', 'lot__lot_number']
+
+    raw_id_fields = ['lot', 'performed_by']
+
+    readonly_fields = ['z_score', 'violations', 'is_rejected', 'created_at']
+
+    list_select_related = ['lot']
+
+
+@admin.register(UndeliveredResult)
+class UndeliveredResultAdmin(admin.ModelAdmin):
+    """Instrument results not written (re-processed with manage.py reprocess_instrument_results)"""
+
+    list_display = ['barcode', 'test_code', 'value', 'unit', 'analyzer', 'reason', 'attempts', 'received_at', 'resolved_at']
+
+    list_filter = ['reason', 'analyzer', ('resolved_at', admin.EmptyFieldListFilter)]
+
+    search_fields = ['barcode', 'test_code']
+
+    readonly_fields = ['received_at', 'resolved_at', 'attempts']
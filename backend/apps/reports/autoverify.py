@@ -0,0 +1,325 @@
+"""
+Result Autoverification
+=======================
+
+Releases results that need no human review and routes the rest to the
+review queue.
+
+AutoverificationRule rows are compiled into a decision table: one row
+per exam with a rule (plus the default rule and a "no rule" sentinel),
+with one NumPy column per condition:
+
+    row  active  low   high  allow_abnormal  require_delta  require_qc
+    0    True    70.0  180.0 False           True           True
+    1    True    nan   nan   True            False          True
+    ...
+
+Evaluating a batch maps every result to its row (one dict probe) and
+computes each condition for the whole batch with array operations, OR-ing
+one bit per failed condition into a reason mask:
+
+    reasons |= OUTSIDE_LIMITS * ((value < low[rows]) | (value > high[rows]))
+
+Critical values (critical.py) are always held. A result with an empty
+mask is auto-verified; the others are held with the codes of the failed
+conditions. Only the blocking instrument flags
+are checked per result, and only for results carrying flags.
+
+Instrument data is read from the result's detailed_results:
+- flags: list of instrument flag codes
+- qc_status: QC state reported by the instrument ('ok' when absent)
+
+QC also fails while the analyte is out of control on the result's
+analyzer (Westgard rules over the lab's own QC runs, see qc.py).
+
+The table is rebuilt whenever the reference engine is (rules changes
+bump the same version, see signals.py).
+`manage.py benchmark_autoverification` measures throughput.
+"""
+import threading
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AutoverificationRule, ExamResult
+from .qc import get_qc_states
+from .ranges import get_engine
+
+STATUS_PENDING = 'pending'
+STATUS_AUTO_VERIFIED = 'auto_verified'
+STATUS_VERIFIED = 'verified'
+
+QC_OK = 'ok'
+
+NO_RULE = 1
+QUALITATIVE = 2
+OUTSIDE_LIMITS = 4
+ABNORMAL = 8
+DELTA_FAILED = 16
+INSTRUMENT_FLAG = 32
+QC_FAILED = 64
+CRITICAL = 128
+
+# Reason codes stored on held results, in bit order
+REASONS = (
+    (NO_RULE, 'no_rule'),
+    (QUALITATIVE, 'qualitative'),
+    (OUTSIDE_LIMITS, 'outside_limits'),
+    (ABNORMAL, 'abnormal'),
+    (DELTA_FAILED, 'delta_failed'),
+    (INSTRUMENT_FLAG, 'instrument_flag'),
+    (QC_FAILED, 'qc_failed'),
+    (CRITICAL, 'critical'),
+)
+
+DEFAULT_BATCH_SIZE = 1000
+
+DEFAULT_QUEUE_SIZE = 50
+MAX_QUEUE_SIZE = 200
+MAX_VERIFY_RESULTS = 500
+
+
+def _nan(value):
+    return np.nan if value is None else float(value)
+
+
+def instrument_flags(detailed_results):
+    """Instrument flag codes of a result."""
+    flags = (detailed_results or {}).get('flags') or ()
+    return flags if isinstance(flags, (list, tuple)) else (flags,)
+
+
+def qc_failed(detailed_results):
+    """Whether the instrument reported QC as anything but ok."""
+    return str((detailed_results or {}).get('qc_status', QC_OK)).lower() != QC_OK
+
+
+class DecisionTable:
+    """
+    Compiled autoverification rules.
+
+    Args:
+        version: Version the table was built for
+        rules: Iterable of dicts with AutoverificationRule values
+        critical_limits: {exam_type_id: (low, high)} critical limits
+    """
+
+    def __init__(self, version, rules=(), critical_limits=None):
+        self.version = version
+        self.critical_limits = critical_limits or {}
+        rules = [rule for rule in rules if rule['is_active']]
+        self.row_of = {rule['exam_type_id']: index for index, rule in enumerate(rules)}
+        # The last row is the "no rule" sentinel
+        self.default_row = self.row_of.pop(None, len(rules))
+        self.active = np.array([True] * len(rules) + [False])
+        self.low = np.array([_nan(rule['low_limit']) for rule in rules] + [np.nan])
+        self.high = np.array([_nan(rule['high_limit']) for rule in rules] + [np.nan])
+        self.allow_abnormal = np.array([rule['allow_abnormal'] for rule in rules] + [False])
+        self.require_delta = np.array([rule['require_delta_pass'] for rule in rules] + [False])
+        self.require_qc = np.array([rule['require_qc'] for rule in rules] + [False])
+        self.blocking = [frozenset(rule['blocking_flags'] or ()) for rule in rules] + [frozenset()]
+
+    def evaluate(self, exam_type_ids, numbers, abnormal, delta_failed, flags, qc):
+        """
+        Reason masks for a batch of results (0 = auto-verify).
+
+        Args:
+            exam_type_ids: Exam of each result
+            numbers: Numeric values (None for qualitative results)
+            abnormal: Whether each result is outside its reference interval
+            delta_failed: Whether each result failed the delta check
+            flags: Instrument flag codes of each result
+            qc: Whether QC was reported failed for each result
+
+        Returns:
+            NumPy int array of reason masks
+        """
+        if not len(exam_type_ids):
+            return np.zeros(0, dtype=np.int64)
+        rows = np.array([self.row_of.get(pk, self.default_row) for pk in exam_type_ids])
+        values = np.array([np.nan if n is None else n for n in numbers], dtype=float)
+        abnormal = np.array(abnormal, dtype=bool)
+        delta_failed = np.array(delta_failed, dtype=bool)
+        qc = np.array(qc, dtype=bool)
+        flagged = np.array([
+            bool(codes) and not self.blocking[row].isdisjoint(codes)
+            for row, codes in zip(rows.tolist(), flags)
+        ], dtype=bool)
+
+        reasons = np.zeros(len(rows), dtype=np.int64)
+        reasons |= NO_RULE * ~self.active[rows]
+        reasons |= QUALITATIVE * np.isnan(values)
+        # Comparisons with NaN (open limit) are False
+        with np.errstate(invalid='ignore'):
+            reasons |= OUTSIDE_LIMITS * ((values < self.low[rows]) | (values > self.high[rows]))
+        reasons |= ABNORMAL * (abnormal & ~self.allow_abnormal[rows])
+        reasons |= DELTA_FAILED * (delta_failed & self.require_delta[rows])
+        reasons |= INSTRUMENT_FLAG * flagged
+        reasons |= QC_FAILED * (qc & self.require_qc[rows])
+
+        if self.critical_limits:
+            no_limits = (None, None)
+            critical_low, critical_high = np.array([
+                self.critical_limits.get(pk, no_limits) for pk in exam_type_ids
+            ], dtype=float).T
+            with np.errstate(invalid='ignore'):
+                reasons |= CRITICAL * ((values < critical_low) | (values > critical_high))
+        return reasons
+
+    def decide(self, results, now, qc_states=None):
+        """
+        Set the verification fields of ExamResult instances (not saved).
+
+        Args:
+            qc_states: QCStates to check (default: the current ones)
+
+        Returns:
+            Number of auto-verified results
+        """
+        qc_states = qc_states if qc_states is not None else get_qc_states()
+        masks = self.evaluate(
+            [r.exam_type_id for r in results],
+            [r.numeric_value for r in results],
+            [bool(r.abnormal_flag) for r in results],
+            [r.delta_failed for r in results],
+            [instrument_flags(r.detailed_results) for r in results],
+            [
+                qc_failed(r.detailed_results) or qc_states.failed(r.analyzer, r.exam_type_id, now)
+                for r in results
+            ],
+        )
+        released = 0
+        for result, mask in zip(results, masks.tolist()):
+            if mask:
+                result.verification_status = STATUS_PENDING
+                result.verification_reasons = reason_codes(mask)
+                result.verified_at = None
+            else:
+                result.verification_status = STATUS_AUTO_VERIFIED
+                result.verification_reasons = []
+                result.verified_at = now
+                released += 1
+            result.verified_by = None
+        return released
+
+
+def reason_codes(mask):
+    """Reason codes of a mask, in bit order."""
+    return [code for bit, code in REASONS if mask & bit]
+
+
+_lock = threading.Lock()
+_state = {'table': None}
+
+
+def _load(engine):
+    rules = AutoverificationRule.objects.values(
+        'exam_type_id', 'low_limit', 'high_limit', 'allow_abnormal',
+        'require_delta_pass', 'require_qc', 'blocking_flags', 'is_active',
+    )
+    return DecisionTable(engine.version, rules, engine.critical_limits)
+
+
+def get_decision_table():
+    """Return the decision table, rebuilding it with the reference engine."""
+    engine = get_engine()
+    table = _state['table']
+    if table is None or table.version != engine.version:
+        with _lock:
+            table = _state['table']
+            if table is None or table.version != engine.version:
+                table = _load(engine)
+                _state['table'] = table
+    return table
+
+
+def autoverify_pending(branch_ids=None, batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """
+    Re-evaluate results waiting for review (after rule changes, or for
+    results entered before a rule existed).
+
+    Results are read in id-ordered batches; each batch is read, decided
+    and written in one transaction with its rows locked, releasing its
+    passing results with one UPDATE and refreshing the reasons of the
+    rest. Rows locked by a concurrent re-submission are skipped: the
+    submission decides them on their new value.
+
+    Returns:
+        (evaluated, released)
+    """
+    now = now or timezone.now()
+    table = get_decision_table()
+    evaluated = released = 0
+    last_id = 0
+    while True:
+        queryset = ExamResult.objects.filter(verification_status=STATUS_PENDING, id__gt=last_id)
+        if branch_ids:
+            queryset = queryset.filter(branch_id__in=branch_ids)
+        with transaction.atomic():
+            batch = list(
+                queryset.select_for_update(skip_locked=True).order_by('id').only(
+                    'id', 'exam_type_id', 'numeric_value', 'abnormal_flag', 'delta_failed',
+                    'detailed_results', 'analyzer', 'verification_reasons',
+                )[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            previous_reasons = {result.id: result.verification_reasons for result in batch}
+            table.decide(batch, now)
+
+            passing = [r.id for r in batch if r.verification_status == STATUS_AUTO_VERIFIED]
+            changed = [
+                r for r in batch
+                if r.verification_status == STATUS_PENDING and r.verification_reasons != previous_reasons[r.id]
+            ]
+            if passing:
+                released += ExamResult.objects.filter(id__in=passing).update(
+                    verification_status=STATUS_AUTO_VERIFIED,
+                    verification_reasons=[],
+                    verified_at=now,
+                    updated_at=now,
+                )
+            if changed:
+                ExamResult.objects.bulk_update(changed, ['verification_reasons'])
+        evaluated += len(batch)
+    return evaluated, released
+
+
+def review_queue(branch_id=None, after_id=0, limit=DEFAULT_QUEUE_SIZE):
+    """
+    Results waiting for review, oldest first (exam_results_review_idx).
+
+    Args:
+        branch_id: Only results of this branch (None: all branches)
+        after_id: Keyset cursor, id of the last result already seen
+        limit: Page size
+    """
+    queryset = ExamResult.objects.filter(verification_status=STATUS_PENDING, id__gt=after_id)
+    if branch_id is not None:
+        queryset = queryset.filter(branch_id=branch_id)
+    return list(
+        queryset.select_related('exam_type').order_by('id')[:limit]
+    )
+
+
+def verify_results(result_ids, user, branch_id=None, now=None):
+    """
+    Sign off results from the review queue with one UPDATE.
+
+    Results already verified (or of another branch) are left untouched.
+
+    Returns:
+        Number of results verified
+    """
+    now = now or timezone.now()
+    queryset = ExamResult.objects.filter(id__in=set(result_ids), verification_status=STATUS_PENDING)
+    if branch_id is not None:
+        queryset = queryset.filter(branch_id=branch_id)
+    return queryset.update(
+        verification_status=STATUS_VERIFIED,
+        verified_by=user,
+        verified_at=now,
+        updated_at=now,
+    )
@@ -0,0 +1,305 @@
+"""
+Critical Value Alerts
+=====================
+
+Results beyond an exam's critical limits (CriticalValueRule) raise an
+alert that must be acknowledged by the ordering side.
+
+Pipeline:
+
+1. Detection, inline at result submission: the limits are compiled into
+   the reference engine, so checking an analyte is one dict probe
+   (ReferenceEngine.critical).
+2. CriticalAlert rows are written in the result's transaction: the
+   database is the durable record, and the acknowledgement state.
+3. After commit the alert ids are appended to a Redis stream
+   (ALERT_STREAM) consumed by a consumer group of alert workers
+   (`manage.py critical_alert_worker`). A worker blocks on XREADGROUP,
+   so it wakes as soon as an alert is queued.
+4. Delivery: the worker publishes a `critical_value` event on the order
+   events channel (live dashboards over SSE, see apps.exams.stream),
+   stamps delivered_at and XACKs the entry. Entries left unacknowledged
+   by a crashed worker are claimed by another one after CLAIM_IDLE_MS.
+5. Escalation timer: an alert not acknowledged within ESCALATION_MINUTES
+   is escalated (escalation_level + 1, re-queued and re-published) up
+   to MAX_ESCALATION_LEVEL; the worker polls the escalate_at partial
+   index every second.
+6. If queuing to Redis failed after commit, the undelivered sweep
+   re-queues the alert from the database after REDELIVER_SECONDS.
+7. Re-submitting a result closes its open alerts (superseded_at) in the
+   same transaction; a new alert is raised only if the new value is
+   still critical.
+
+Delivery is at-least-once; delivered_at keeps the first delivery.
+Latency (created_at -> delivered_at -> acknowledged_at) is reported by
+`manage.py critical_alert_latency`.
+"""
+import logging
+from collections import namedtuple
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError, ResponseError
+
+from apps.exams.events import CRITICAL_VALUE, order_event, publish_events
+from .models import CriticalAlert
+
+logger = logging.getLogger(__name__)
+
+ALERT_STREAM = 'clinical_lab:critical_alerts'
+ALERT_GROUP = 'alert_workers'
+ALERT_STREAM_MAXLEN = 100_000
+
+ESCALATION_MINUTES = 10
+MAX_ESCALATION_LEVEL = 3
+
+CLAIM_IDLE_MS = 30_000
+REDELIVER_SECONDS = 30
+READ_COUNT = 100
+
+DEFAULT_PENDING_SIZE = 50
+MAX_PENDING_SIZE = 200
+
+# index: position in the submission, flag: 'L' or 'H', threshold: limit crossed
+CriticalHit = namedtuple('CriticalHit', ['index', 'flag', 'threshold'])
+
+
+def detect(engine, exam_type_ids, numbers):
+    """
+    Critical values of a submission.
+
+    Returns:
+        List of CriticalHit
+    """
+    hits = []
+    for index, (exam_type_id, number) in enumerate(zip(exam_type_ids, numbers)):
+        critical = engine.critical(exam_type_id, number)
+        if critical is not None:
+            hits.append(CriticalHit(index, *critical))
+    return hits
+
+
+def create_alerts(hits, now, resubmitted_ids=()):
+    """
+    Write the alerts of a submission (inside its transaction) and queue
+    them once it commits.
+
+    Args:
+        hits: (ExamOrder, saved ExamResult, CriticalHit) triples
+        now: Submission time (alert creation time)
+        resubmitted_ids: Ids of existing results overwritten by the
+            submission; their open alerts are closed as superseded
+
+    Returns:
+        List of CriticalAlert
+    """
+    if resubmitted_ids:
+        CriticalAlert.objects.filter(
+            result_id__in=resubmitted_ids, acknowledged_at__isnull=True
+        ).update(acknowledged_at=now, superseded_at=now, escalate_at=None)
+    if not hits:
+        return []
+    alerts = CriticalAlert.objects.bulk_create([
+        CriticalAlert(
+            result=result,
+            order=order,
+            patient_id=order.patient_id,
+            exam_type_id=result.exam_type_id,
+            root_branch_id=order.root_branch_id,
+            branch_id=order.current_branch_id,
+            notify_user_id=order.created_by_id,
+            value=result.numeric_value,
+            flag=hit.flag,
+            threshold=hit.threshold,
+            escalate_at=now + timedelta(minutes=ESCALATION_MINUTES),
+            created_at=now,
+        )
+        for order, result, hit in hits
+    ])
+    queued = [(alert.id, 0) for alert in alerts]
+    transaction.on_commit(lambda: enqueue(queued))
+    return alerts
+
+
+def enqueue(alerts):
+    """
+    Append (alert_id, escalation_level) pairs to the alert stream.
+
+    Redis failures are logged; the undelivered sweep re-queues the alerts.
+    """
+    if not alerts:
+        return
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        for alert_id, level in alerts:
+            pipe.xadd(
+                ALERT_STREAM,
+                {'alert_id': alert_id, 'level': level},
+                maxlen=ALERT_STREAM_MAXLEN,
+                approximate=True,
+            )
+        pipe.execute()
+    except RedisError:
+        logger.warning('Could not queue %d critical alerts', len(alerts), exc_info=True)
+
+
+def ensure_group(redis):
+    """Create the consumer group (and the stream) if needed."""
+    try:
+        redis.xgroup_create(ALERT_STREAM, ALERT_GROUP, id='0', mkstream=True)
+    except ResponseError as e:
+        if 'BUSYGROUP' not in str(e):
+            raise
+
+
+def read_entries(redis, consumer, block_ms=1000):
+    """
+    Entries for this worker: ones abandoned by dead workers first, then
+    new ones (blocking up to block_ms).
+
+    Returns:
+        List of (entry_id, alert_id)
+    """
+    _, claimed, *_ = redis.xautoclaim(
+        ALERT_STREAM, ALERT_GROUP, consumer, CLAIM_IDLE_MS, start_id='0-0', count=READ_COUNT
+    )
+    messages = claimed
+    if not messages:
+        response = redis.xreadgroup(
+            ALERT_GROUP, consumer, {ALERT_STREAM: '>'}, count=READ_COUNT, block=block_ms
+        )
+        messages = response[0][1] if response else []
+    return [
+        (entry_id, int(fields[b'alert_id']))
+        for entry_id, fields in messages
+        if fields
+    ]
+
+
+def _alert_event(alert):
+    order = alert.order
+    return order_event(
+        CRITICAL_VALUE, order.id, order.order_number, order.status,
+        order.root_branch_id, order.current_branch_id,
+        alert_id=alert.id,
+        result_id=alert.result_id,
+        patient_id=alert.patient_id,
+        exam_type_id=alert.exam_type_id,
+        value=alert.value,
+        flag=alert.flag,
+        threshold=alert.threshold,
+        escalation_level=alert.escalation_level,
+        notify_user_id=alert.notify_user_id,
+        created_at=alert.created_at.isoformat(),
+    )
+
+
+def deliver(redis, entries, now):
+    """
+    Publish queued alerts live, stamp their first delivery and XACK them.
+
+    Acknowledged alerts are only XACKed.
+
+    Returns:
+        Delivery latencies (seconds) of alerts delivered for the first time
+    """
+    if not entries:
+        return []
+    alerts = list(
+        CriticalAlert.objects.filter(id__in={alert_id for _, alert_id in entries})
+        .select_related('order')
+    )
+    live = [alert for alert in alerts if alert.acknowledged_at is None]
+    publish_events([_alert_event(alert) for alert in live])
+
+    first = [alert for alert in live if alert.delivered_at is None]
+    if first:
+        CriticalAlert.objects.filter(id__in=[a.id for a in first], delivered_at__isnull=True).update(
+            delivered_at=now
+        )
+    redis.xack(ALERT_STREAM, ALERT_GROUP, *[entry_id for entry_id, _ in entries])
+    return [(now - alert.created_at).total_seconds() for alert in first]
+
+
+def escalate_due(now, limit=100):
+    """
+    Escalate unacknowledged alerts whose timer expired.
+
+    Returns:
+        Number of alerts escalated
+    """
+    with transaction.atomic():
+        due = list(
+            CriticalAlert.objects.select_for_update(skip_locked=True)
+            .filter(acknowledged_at__isnull=True, escalate_at__lte=now)
+            .order_by('escalate_at')[:limit]
+        )
+        for alert in due:
+            alert.escalation_level += 1
+            alert.escalate_at = (
+                now + timedelta(minutes=ESCALATION_MINUTES)
+                if alert.escalation_level < MAX_ESCALATION_LEVEL else None
+            )
+        if due:
+            CriticalAlert.objects.bulk_update(due, ['escalation_level', 'escalate_at'])
+            queued = [(alert.id, alert.escalation_level) for alert in due]
+            transaction.on_commit(lambda: enqueue(queued))
+    return len(due)
+
+
+def requeue_undelivered(now, limit=500):
+    """
+    Re-queue alerts never delivered REDELIVER_SECONDS after creation
+    (their enqueue after commit was lost).
+
+    Returns:
+        Number of alerts re-queued
+    """
+    stale = list(
+        CriticalAlert.objects.filter(
+            delivered_at__isnull=True,
+            acknowledged_at__isnull=True,
+            created_at__lte=now - timedelta(seconds=REDELIVER_SECONDS),
+        )
+        .order_by('created_at')
+        .values_list('id', 'escalation_level')[:limit]
+    )
+    enqueue(stale)
+    return len(stale)
+
+
+def _scope(queryset, branch_id):
+    if branch_id is None:
+        return queryset
+    return queryset.filter(Q(root_branch_id=branch_id) | Q(branch_id=branch_id))
+
+
+def pending_alerts(branch_id=None, limit=DEFAULT_PENDING_SIZE):
+    """
+    Unacknowledged alerts, most escalated and oldest first.
+
+    Args:
+        branch_id: Alerts ordered from or resulted at this branch (None: all)
+    """
+    queryset = _scope(CriticalAlert.objects.filter(acknowledged_at__isnull=True), branch_id)
+    return list(
+        queryset.select_related('order', 'patient', 'exam_type')
+        .order_by('-escalation_level', 'created_at')[:limit]
+    )
+
+
+def acknowledge(alert_ids, user, branch_id=None, now=None):
+    """
+    Acknowledge alerts, stopping their escalation.
+
+    Alerts already acknowledged (or outside the branch) are left untouched.
+
+    Returns:
+        Number of alerts acknowledged
+    """
+    now = now or timezone.now()
+    queryset = CriticalAlert.objects.filter(id__in=set(alert_ids), acknowledged_at__isnull=True)
+    return _scope(queryset, branch_id).update(acknowledged_by=user, acknowledged_at=now, escalate_at=None)
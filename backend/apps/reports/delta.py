@@ -0,0 +1,135 @@
+"""
+Delta Check
+===========
+
+Compares new numeric results with the patient's previous result of the
+same exam. A large change between two results is a classic sign of a
+mislabelled sample or an analytical error, even when both values are
+inside the reference interval.
+
+The previous value of every analyte of a submission is read with one
+query, whatever the panel size:
+
+    SELECT DISTINCT ON (exam_type_id) ...
+    FROM exam_results
+    WHERE patient_id = %s AND exam_type_id IN (...) AND numeric_value IS NOT NULL
+    ORDER BY exam_type_id, performed_at DESC, id DESC
+
+which walks the exam_results_delta_idx index
+(patient, exam_type, performed_at DESC, id DESC) and stops at the first
+row of each exam.
+
+Limits come from DeltaCheckRule, compiled into the reference engine
+(ranges.py). A change fails when it exceeds the absolute limit or the
+percent limit (relative to the previous value; not applied when the
+previous value is 0). Previous results older than the rule's window are
+reported but not compared.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+import numpy as np
+
+from .models import ExamResult
+
+# previous_id / previous_value are None when the patient has no earlier
+# numeric result (or it cannot be converted to the current unit)
+Delta = namedtuple('Delta', ['previous_id', 'previous_value', 'failed'])
+
+NO_DELTA = Delta(None, None, False)
+
+PreviousResult = namedtuple('PreviousResult', ['id', 'value', 'unit', 'performed_at'])
+
+
+def previous_results(patient_id, exam_type_ids, exclude_order_id=None):
+    """
+    Latest numeric result of each exam for a patient, in one query.
+
+    Args:
+        patient_id: Patient id
+        exam_type_ids: Exams to look up
+        exclude_order_id: Order whose results must be ignored (the order
+            being resulted, so a re-submission does not compare with itself)
+
+    Returns:
+        {exam_type_id: PreviousResult}
+    """
+    exclude = [exclude_order_id] if exclude_order_id is not None else ()
+    return previous_results_many([patient_id], exam_type_ids, exclude).get(patient_id, {})
+
+
+def previous_results_many(patient_ids, exam_type_ids, exclude_order_ids=()):
+    """
+    previous_results() for several patients at once (batched submissions):
+    DISTINCT ON (patient_id, exam_type_id) over the same index.
+
+    Returns:
+        {patient_id: {exam_type_id: PreviousResult}}
+    """
+    patient_ids, exam_type_ids = set(patient_ids), set(exam_type_ids)
+    if not patient_ids or not exam_type_ids:
+        return {}
+    queryset = ExamResult.objects.filter(
+        patient_id__in=patient_ids, exam_type_id__in=exam_type_ids, numeric_value__isnull=False
+    )
+    if exclude_order_ids:
+        queryset = queryset.exclude(order_id__in=set(exclude_order_ids))
+    rows = (
+        queryset.order_by('patient_id', 'exam_type_id', '-performed_at', '-id')
+        .distinct('patient_id', 'exam_type_id')
+        .values_list('patient_id', 'exam_type_id', 'id', 'numeric_value', 'unit', 'performed_at')
+    )
+    previous = {}
+    for patient_id, exam_type_id, *rest in rows:
+        previous.setdefault(patient_id, {})[exam_type_id] = PreviousResult(*rest)
+    return previous
+
+
+def check_deltas(engine, exam_type_ids, numbers, units, previous, now):
+    """
+    Delta check a submission against the previous results.
+
+    Args:
+        engine: ReferenceEngine (delta rules and unit conversion)
+        exam_type_ids: Exam of each value
+        numbers: Numeric values (None for qualitative results)
+        units: Unit of each value
+        previous: {exam_type_id: PreviousResult} from previous_results()
+        now: Time of the new results (for rule windows)
+
+    Returns:
+        List of Delta, parallel to numbers
+    """
+    deltas = []
+    current, prior, absolute, percent = [], [], [], []
+    for exam_type_id, number, unit in zip(exam_type_ids, numbers, units):
+        before = previous.get(exam_type_id) if number is not None else None
+        value = before and engine.convert(before.value, exam_type_id, before.unit, unit)
+        if value is None:
+            deltas.append(NO_DELTA)
+            value = np.nan
+        else:
+            deltas.append(Delta(before.id, value, False))
+
+        rule = engine.delta_rules.get(exam_type_id)
+        in_window = rule is not None and before is not None and (
+            now - before.performed_at <= timedelta(days=rule.window_days)
+        )
+        current.append(np.nan if number is None else number)
+        prior.append(value)
+        absolute.append(rule.absolute if in_window and rule.absolute is not None else np.nan)
+        percent.append(rule.percent if in_window and rule.percent is not None else np.nan)
+
+    if not deltas:
+        return deltas
+    current, prior = np.array(current, dtype=float), np.array(prior, dtype=float)
+    change = np.abs(current - prior)
+    relative = np.full_like(change, np.nan)
+    np.divide(change * 100, np.abs(prior), out=relative, where=prior != 0)
+    # Comparisons with NaN (no previous value, no rule, outside the window) are False
+    with np.errstate(invalid='ignore'):
+        failed = (change > np.array(absolute, dtype=float)) | (relative > np.array(percent, dtype=float))
+    return [
+        delta._replace(failed=True) if fail else delta
+        for delta, fail in zip(deltas, failed.tolist())
+    ]
@@ -0,0 +1,25 @@
+"""
+Instrument Interfaces
+=====================
+
+Result ingestion from analyzers over TCP:
+
+- astm.py: ASTM E1381 framing / E1394 records (LIS1-A / LIS2-A2)
+- hl7.py: HL7 v2 ORU messages over MLLP
+- listener.py: asyncio server, barcode index and batched writes
+  (`manage.py instrument_listener`; `manage.py instrument_simulator`
+  replays traffic against it). Acknowledged results that could not be
+  written are kept for `manage.py reprocess_instrument_results`
+
+Parsers are incremental: feed() accepts whatever bytes arrived, returns
+the reply to send back (ACK/NAK) and the results completed so far, and
+keeps partial frames for the next call.
+"""
+from collections import namedtuple
+
+# barcode: sample id as read by the instrument (the order number)
+# test_code: instrument test code (matched against ExamType.code)
+# flags: instrument flag codes, stored in detailed_results['flags']
+InstrumentResult = namedtuple(
+    'InstrumentResult', ['barcode', 'test_code', 'value', 'unit', 'flags', 'analyzer']
+)
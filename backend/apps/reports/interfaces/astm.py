@@ -0,0 +1,188 @@
+"""
+ASTM E1381 / E1394
+==================
+
+Low level (E1381): the instrument opens a transmission with ENQ, sends
+frames and closes with EOT; every frame is acknowledged (ACK) or
+rejected (NAK, the instrument resends it):
+
+    <STX> FN text <ETX|ETB> C1 C2 <CR><LF>
+
+FN is the frame number (1-7, then 0), ETB marks an intermediate frame of
+a long record and C1 C2 is the checksum: sum of the bytes from FN to
+ETX/ETB inclusive, modulo 256, in uppercase hex.
+
+Records (E1394), one per line, fields split by the delimiters declared
+in the header (default | \\ ^ &):
+
+    H|\\^&|||COBAS^1.0|||||||P|1
+    P|1
+    O|1|SUC1-20260301-0042||^^^GLU\\^^^K|R
+    R|1|^^^GLU|98|mg/dL|70-110|N||F
+    R|2|^^^K|7.1|mmol/L|3.5-5.1|HH||F
+    L|1|N
+
+Results take the specimen id of the preceding O record as barcode.
+"""
+from . import InstrumentResult
+
+ENQ, STX, ETX, EOT, ACK, NAK, ETB = b'\x05', b'\x02', b'\x03', b'\x04', b'\x06', b'\x15', b'\x17'
+CR, LF = b'\r', b'\n'
+
+# Result status codes of results that are not values (X: cannot be done,
+# I: pending in the instrument)
+SKIPPED_STATUSES = {'X', 'I'}
+
+
+def checksum(frame):
+    """Checksum of FN..ETX/ETB (bytes) as two uppercase hex digits."""
+    return b'%02X' % (sum(frame) % 256)
+
+
+def build_frame(number, text, final=True):
+    """Frame a record (text without FN) with frame number and checksum."""
+    body = str(number % 8).encode() + text.encode('latin-1') + (ETX if final else ETB)
+    return STX + body + checksum(body) + CR + LF
+
+
+def build_message(barcode, results, analyzer='SIM'):
+    """
+    Records of one sample, for simulators and tests.
+
+    Args:
+        barcode: Specimen id
+        results: Iterable of (test_code, value, unit, flag)
+
+    Returns:
+        List of record strings (each ending in CR)
+    """
+    results = list(results)
+    tests = '\\'.join(f'^^^{code}' for code, *_ in results)
+    records = [f'H|\\^&|||{analyzer}^1.0|||||||P|1', 'P|1', f'O|1|{barcode}||{tests}|R']
+    records += [
+        f'R|{seq}|^^^{code}|{value}|{unit}||{flag}||F'
+        for seq, (code, value, unit, flag) in enumerate(results, start=1)
+    ]
+    records.append('L|1|N')
+    return [record + '\r' for record in records]
+
+
+class AstmReceiver:
+    """
+    Incremental ASTM receiver for one connection.
+
+    Args:
+        analyzer: Analyzer code for the results (default: the sender
+            name of the header record)
+    """
+
+    def __init__(self, analyzer=''):
+        self.analyzer = analyzer
+        self.buffer = bytearray()
+        self.pending = ''
+        self._reset_message()
+
+    def _reset_message(self):
+        self.field, self.repeat, self.component = '|', '\\', '^'
+        self.sender = ''
+        self.specimen = ''
+
+    def feed(self, data):
+        """
+        Consume received bytes.
+
+        Returns:
+            (reply bytes, list of InstrumentResult)
+        """
+        self.buffer += data
+        reply = bytearray()
+        results = []
+        buffer = self.buffer
+        while buffer:
+            head = buffer[:1]
+            if head == ENQ:
+                reply += ACK
+                del buffer[:1]
+            elif head == EOT:
+                self.pending = ''
+                self._reset_message()
+                del buffer[:1]
+            elif head == STX:
+                end = self._frame_end(buffer)
+                if end is None:
+                    break
+                body = bytes(buffer[1:end + 1])
+                valid = buffer[end + 1:end + 3] == checksum(body)
+                del buffer[:end + 5]
+                if not valid:
+                    reply += NAK
+                    continue
+                reply += ACK
+                self.pending += body[1:-1].decode('latin-1')
+                if body[-1:] == ETX:
+                    results += self._records(final=True)
+                else:
+                    results += self._records(final=False)
+            else:
+                # Stray bytes between frames (CR/LF, ACKs of our replies)
+                del buffer[:1]
+        return bytes(reply), results
+
+    @staticmethod
+    def _frame_end(buffer):
+        """Index of the frame's ETX/ETB, or None until the frame is complete."""
+        for position, byte in enumerate(buffer):
+            if byte in (ETX[0], ETB[0]):
+                return position if len(buffer) >= position + 5 else None
+            if position and byte == STX[0]:
+                # Truncated frame followed by a new one: drop the fragment
+                del buffer[:position]
+                return None
+        return None
+
+    def _records(self, final):
+        lines = self.pending.split('\r')
+        # Without ETX the last line may continue in the next frame
+        self.pending = '' if final else lines.pop()
+        results = []
+        for line in lines:
+            line = line.strip('\n')
+            if line:
+                result = self._record(line)
+                if result is not None:
+                    results.append(result)
+        return results
+
+    def _record(self, line):
+        kind = line[0].upper()
+        if kind == 'H':
+            if len(line) >= 5:
+                self.field, self.repeat, self.component = line[1], line[2], line[3]
+            fields = line.split(self.field)
+            self.sender = fields[4].split(self.component)[0] if len(fields) > 4 else ''
+            return None
+
+        fields = line.split(self.field)
+        if kind == 'O':
+            specimen = fields[2] if len(fields) > 2 else ''
+            if not specimen and len(fields) > 3:
+                specimen = fields[3]
+            self.specimen = specimen.split(self.component)[0].strip()
+        elif kind == 'R' and len(fields) > 3:
+            status = fields[8].strip().upper() if len(fields) > 8 else ''
+            if status in SKIPPED_STATUSES:
+                return None
+            components = fields[2].split(self.component)
+            code = components[3] if len(components) > 3 else next((c for c in reversed(components) if c), '')
+            flags = fields[6].split(self.repeat) if len(fields) > 6 else []
+            return InstrumentResult(
+                barcode=self.specimen,
+                test_code=code.strip(),
+                value=fields[3].split(self.component)[0].strip(),
+                unit=fields[4].split(self.component)[0].strip() if len(fields) > 4 else '',
+                flags=tuple(flag for flag in flags if flag and flag != 'N'),
+                analyzer=self.analyzer or self.sender,
+            )
+        elif kind == 'L':
+            self.specimen = ''
+        return None
@@ -0,0 +1,148 @@
+"""
+HL7 v2 over MLLP
+================
+
+Each message is wrapped in MLLP start / end blocks:
+
+    <VT> MSH|^~\\&|... <CR> PID|... <CR> OBR|... <CR> OBX|... <CR> <FS><CR>
+
+Observation results (ORU^R01) are read segment by segment:
+
+- OBR-3 (filler order number, else OBR-2 placer order number): barcode
+  of the observations that follow
+- OBX-3 test code, OBX-5 value, OBX-6 units, OBX-8 abnormal flags,
+  OBX-11 result status (X / D: no value), OBX-18 equipment
+
+Every message is answered with an ACK carrying its control id (MSH-10):
+AA when it was read, AE when it could not be parsed.
+"""
+import logging
+from datetime import datetime
+
+from . import InstrumentResult
+
+logger = logging.getLogger(__name__)
+
+START_BLOCK = b'\x0b'
+END_BLOCK = b'\x1c\r'
+
+# Result status codes of observations that carry no value
+SKIPPED_STATUSES = {'X', 'D', 'W'}
+
+
+def wrap(message):
+    """Frame a message (segments joined by CR) for MLLP."""
+    return START_BLOCK + message.encode('utf-8') + END_BLOCK
+
+
+def _timestamp():
+    return datetime.now().strftime('%Y%m%d%H%M%S')
+
+
+def build_message(barcode, results, control_id, analyzer='SIM'):
+    """
+    ORU^R01 message of one sample, for simulators and tests.
+
+    Args:
+        barcode: Sample id (OBR-3)
+        results: Iterable of (test_code, value, unit, flag)
+        control_id: Message control id (MSH-10)
+    """
+    segments = [
+        f'MSH|^~\\&|{analyzer}|LAB|LIS|LAB|{_timestamp()}||ORU^R01|{control_id}|P|2.5.1',
+        'PID|1',
+        f'OBR|1||{barcode}',
+    ]
+    segments += [
+        f'OBX|{seq}|NM|{code}^^LN||{value}|{unit}||{flag}|||F|||||||{analyzer}'
+        for seq, (code, value, unit, flag) in enumerate(results, start=1)
+    ]
+    return '\r'.join(segments) + '\r'
+
+
+def ack(control_id, code='AA', sending='LIS'):
+    """ACK message for a received message (not framed)."""
+    return '\r'.join([
+        f'MSH|^~\\&|{sending}|LAB|||{_timestamp()}||ACK|{control_id}|P|2.5.1',
+        f'MSA|{code}|{control_id}',
+    ]) + '\r'
+
+
+class MllpReceiver:
+    """
+    Incremental MLLP receiver for one connection.
+
+    Args:
+        analyzer: Analyzer code for the results (default: OBX-18, else
+            the sending application MSH-3)
+    """
+
+    def __init__(self, analyzer=''):
+        self.analyzer = analyzer
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """
+        Consume received bytes.
+
+        Returns:
+            (reply bytes, list of InstrumentResult)
+        """
+        self.buffer += data
+        reply = bytearray()
+        results = []
+        while True:
+            end = self.buffer.find(END_BLOCK)
+            if end < 0:
+                break
+            start = self.buffer.rfind(START_BLOCK, 0, end)
+            message = bytes(self.buffer[start + 1:end]) if start >= 0 else b''
+            del self.buffer[:end + len(END_BLOCK)]
+            if not message:
+                continue
+            control_id, parsed, code = self._message(message.decode('utf-8', errors='replace'))
+            results += parsed
+            reply += wrap(ack(control_id, code))
+        return bytes(reply), results
+
+    def _message(self, text):
+        """(control id, results, acknowledgment code) of one message."""
+        segments = [s for s in text.replace('\n', '\r').split('\r') if s]
+        if not segments or not segments[0].startswith('MSH') or len(segments[0]) < 8:
+            return '', [], 'AE'
+        header = segments[0]
+        field = header[3]
+        component, repeat = header[4], header[5]
+        msh = header.split(field)
+        # MSH-1 is the separator itself, so MSH-n is msh[n - 1]
+        control_id = msh[9] if len(msh) > 9 else ''
+        sender = msh[2].split(component)[0] if len(msh) > 2 else ''
+
+        results = []
+        barcode = ''
+        try:
+            for segment in segments[1:]:
+                fields = segment.split(field)
+                kind = fields[0]
+                if kind == 'OBR':
+                    filler = fields[3] if len(fields) > 3 else ''
+                    placer = fields[2] if len(fields) > 2 else ''
+                    barcode = (filler or placer).split(component)[0].strip()
+                elif kind == 'OBX' and len(fields) > 5:
+                    status = fields[11].strip().upper() if len(fields) > 11 else ''
+                    if status in SKIPPED_STATUSES:
+                        continue
+                    equipment = fields[18].split(component)[0] if len(fields) > 18 else ''
+                    flags = fields[8].split(repeat) if len(fields) > 8 else []
+                    results.append(InstrumentResult(
+                        barcode=barcode,
+                        test_code=fields[3].split(component)[0].strip(),
+                        value=fields[5].split(component)[0].strip(),
+                        unit=fields[6].split(component)[0].strip() if len(fields) > 6 else '',
+                        flags=tuple(flag for flag in flags if flag and flag != 'N'),
+                        analyzer=self.analyzer or equipment or sender,
+                    ))
+        except IndexError:
+            logger.warning('Malformed HL7 message %s', control_id)
+            return control_id, [], 'AE'
+        return control_id, results, 'AA'
@@ -0,0 +1,438 @@
+"""
+Instrument Listener
+===================
+
+asyncio TCP server receiving results from analyzers (ASTM or HL7/MLLP)
+and writing them in batches.
+
+Per connection, received bytes go through the protocol's incremental
+parser (astm.AstmReceiver / hl7.MllpReceiver); its ACK/NAK reply is
+written back immediately, so instruments are never throttled by the
+database. Since the instrument considers an acknowledged result
+delivered, results that are not written (no open order, rejected by
+validation, failed write) are kept in UndeliveredResult for
+re-processing (reprocess_undelivered, `manage.py
+reprocess_instrument_results`). Buffered results are flushed on
+shutdown.
+
+Parsed results are matched to order items through an in-memory barcode
+index:
+
+    order_number -> {EXAM_CODE: (order_id, order_item_id)}
+
+loaded from the open orders with one query and refreshed every
+REFRESH_SECONDS; an unknown barcode is looked up individually (misses
+are remembered for MISS_TTL seconds so a stray sample does not hit the
+database on every result).
+
+Matched results are buffered and flushed when the buffer holds
+batch_size results or flush_ms after the first buffered one, whichever
+comes first. A flush groups the results by order (the last value of an
+item wins) and writes them with services.submit_result_batch: one
+transaction and a fixed number of queries for the whole batch. Orders
+rejected by validation are skipped without losing the rest; if the batch
+hits a database error, its orders are retried one by one
+(submit_isolated), so only the failing orders are set aside.
+
+Database work runs on a single worker thread, keeping the ORM out of the
+event loop and serializing flushes.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+
+from apps.exams.models import OrderItem
+from ..models import UndeliveredResult
+from apps.common.exceptions import BusinessRuleError
+from ..services import CLOSED_STATUSES, ResultEntry, submit_result_batch
+from . import InstrumentResult
+from .astm import AstmReceiver
+from .hl7 import MllpReceiver
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_ASTM = 'astm'
+PROTOCOL_HL7 = 'hl7'
+RECEIVERS = {PROTOCOL_ASTM: AstmReceiver, PROTOCOL_HL7: MllpReceiver}
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_MS = 200
+
+REFRESH_SECONDS = 60
+MISS_TTL = 30
+
+READ_SIZE = 64 * 1024
+
+REASON_UNMATCHED = 'unmatched'
+REASON_REJECTED = 'rejected'
+REASON_FAILED = 'failed'
+DATABASE_ERROR = 'database_error'
+UNMATCHED_ERROR = 'Sin orden abierta para la muestra y prueba.'
+
+REPROCESS_LIMIT = 5000
+
+
+class BarcodeIndex:
+    """Barcode and test code -> (order_id, order_item_id) of open orders."""
+
+    def __init__(self):
+        self.items = {}
+        self.misses = {}
+        self.loaded_at = 0.0
+
+    @staticmethod
+    def _rows(queryset):
+        rows = {}
+        for order_number, order_id, item_id, code in queryset.values_list(
+            'order__order_number', 'order_id', 'id', 'exam_type__code'
+        ):
+            rows.setdefault(order_number, {})[code.upper()] = (order_id, item_id)
+        return rows
+
+    @staticmethod
+    def _open_items():
+        return OrderItem.objects.filter(is_panel=False).exclude(
+            status='cancelled'
+        ).exclude(order__status__in=CLOSED_STATUSES)
+
+    def load(self):
+        """Reload every open order (one query)."""
+        self.items = self._rows(self._open_items())
+        self.misses = {}
+        self.loaded_at = time.monotonic()
+        return len(self.items)
+
+    def refresh_if_stale(self):
+        if time.monotonic() - self.loaded_at >= REFRESH_SECONDS:
+            self.load()
+
+    def resolve(self, results):
+        """
+        Match results to order items (runs on the database thread).
+
+        Returns:
+            (list of (order_id, ResultEntry, InstrumentResult),
+            list of unmatched InstrumentResult)
+        """
+        self.refresh_if_stale()
+        now = time.monotonic()
+        unknown = {
+            r.barcode for r in results
+            if r.barcode not in self.items and now - self.misses.get(r.barcode, -MISS_TTL) >= MISS_TTL
+        }
+        if unknown:
+            found = self._rows(self._open_items().filter(order__order_number__in=unknown))
+            self.items.update(found)
+            self.misses.update({barcode: now for barcode in unknown - found.keys()})
+
+        matched, unmatched = [], []
+        for result in results:
+            target = self.items.get(result.barcode, {}).get(result.test_code.upper())
+            if target is None:
+                unmatched.append(result)
+                continue
+            order_id, item_id = target
+            detailed = {'flags': list(result.flags)} if result.flags else {}
+            entry = ResultEntry(item_id, result.value, detailed, result.unit, result.analyzer)
+            matched.append((order_id, entry, result))
+        return matched, unmatched
+
+
+class Stats:
+    """Counters reported by the listener."""
+
+    def __init__(self):
+        self.received = self.matched = self.unmatched = 0
+        self.written = self.rejected = self.batches = 0
+        self.started_at = time.monotonic()
+
+    def rate(self):
+        elapsed = time.monotonic() - self.started_at
+        return self.received / elapsed if elapsed else 0.0
+
+
+class ResultBatcher:
+    """
+    Buffers matched results and flushes them on size or time.
+
+    Args:
+        write: Callable taking [(order_id, [ResultEntry])] run on the
+            database thread; returns (written, {order_id: error})
+        executor: Single-thread executor for database work
+        dead_letter: Callable taking (reason, [(InstrumentResult, error)])
+            run on the database thread for results that were not written
+    """
+
+    def __init__(self, write, executor, stats, batch_size=DEFAULT_BATCH_SIZE, flush_ms=DEFAULT_FLUSH_MS,
+                 dead_letter=None):
+        self.write = write
+        self.executor = executor
+        self.dead_letter = dead_letter or save_undelivered
+        self.stats = stats
+        self.batch_size = batch_size
+        self.flush_delay = flush_ms / 1000
+        self.buffer = {}
+        self.timer = None
+
+    async def add(self, matched):
+        for order_id, entry, result in matched:
+            # Keyed by item: a repeated measurement replaces the buffered one
+            self.buffer[entry.order_item_id] = (order_id, entry, result)
+        if len(self.buffer) >= self.batch_size:
+            await self.flush()
+        elif self.buffer and self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(
+                self.flush_delay, lambda: asyncio.ensure_future(self.flush())
+            )
+
+    async def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, {}
+        by_order, sources = {}, defaultdict(list)
+        for order_id, entry, result in batch.values():
+            by_order.setdefault(order_id, []).append(entry)
+            sources[order_id].append(result)
+        loop = asyncio.get_running_loop()
+        try:
+            written, rejected = await loop.run_in_executor(self.executor, self.write, list(by_order.items()))
+        except Exception as e:
+            logger.exception('Could not write a batch of %d results', len(batch))
+            self.stats.rejected += len(batch)
+            await self.keep(REASON_FAILED, [(result, str(e)) for _, _, result in batch.values()])
+            return
+        self.stats.batches += 1
+        self.stats.written += written
+        for order_id, error in rejected.items():
+            self.stats.rejected += len(by_order[order_id])
+            logger.warning('Results of order %s rejected: %s', order_id, error.message)
+        for reason in (REASON_REJECTED, REASON_FAILED):
+            failures = [
+                (result, error.message)
+                for order_id, error in rejected.items() if _reason(error) == reason
+                for result in sources[order_id]
+            ]
+            if failures:
+                await self.keep(reason, failures)
+
+    async def keep(self, reason, failures):
+        """Store results that were acknowledged but not written."""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.executor, self.dead_letter, reason, failures)
+        except Exception:
+            # Last resort: the results only survive in the log
+            logger.exception(
+                'Could not store %d undelivered results (%s): %s',
+                len(failures), reason, [result for result, _ in failures],
+            )
+
+
+def submit_isolated(submissions, user):
+    """
+    submit_result_batch with skip_invalid, failing per order: if the batch
+    hits a database error, its orders are retried one by one and only
+    the failing ones are skipped (with a DATABASE_ERROR error).
+
+    Inside a transaction every attempt is a savepoint, so a failed order
+    does not abort the caller's transaction.
+
+    Returns:
+        (list of SubmissionResult, {order_id: BusinessRuleError} skipped)
+    """
+    try:
+        return submit_result_batch(submissions, user, skip_invalid=True)
+    except DatabaseError:
+        logger.warning('Batch of %d orders failed, retrying order by order', len(submissions), exc_info=True)
+
+    submitted, skipped = [], {}
+    for order_id, entries in submissions:
+        try:
+            order_submitted, order_skipped = submit_result_batch([(order_id, entries)], user, skip_invalid=True)
+        except DatabaseError as e:
+            skipped[order_id] = BusinessRuleError(
+                f'Error de base de datos: {str(e).strip().splitlines()[0]}', code=DATABASE_ERROR
+            )
+            continue
+        submitted += order_submitted
+        skipped.update(order_skipped)
+    return submitted, skipped
+
+
+def _reason(error):
+    return REASON_FAILED if error.code == DATABASE_ERROR else REASON_REJECTED
+
+
+def database_writer(user):
+    """Batch writer for ResultBatcher backed by submit_result_batch."""
+
+    def write(submissions):
+        close_old_connections()
+        submitted, skipped = submit_isolated(submissions, user)
+        return sum(len(submission.results) for submission in submitted), skipped
+
+    return write
+
+
+def save_undelivered(reason, failures):
+    """
+    Store undelivered results (one INSERT; runs on the database thread).
+
+    Args:
+        reason: UndeliveredResult reason
+        failures: List of (InstrumentResult, error message)
+    """
+    close_old_connections()
+    UndeliveredResult.objects.bulk_create([
+        UndeliveredResult(
+            barcode=result.barcode,
+            test_code=result.test_code,
+            value=result.value,
+            unit=result.unit,
+            flags=list(result.flags),
+            analyzer=result.analyzer,
+            reason=reason,
+            error=error,
+        )
+        for result, error in failures
+    ])
+
+
+def reprocess_undelivered(user, limit=REPROCESS_LIMIT):
+    """
+    Retry pending undelivered results: match them against the open
+    orders again and write them with submit_isolated, so an order that
+    still fails is skipped without rolling back the others.
+
+    Rows retried least are picked first (then oldest first), so rows that
+    keep failing do not hold back newer ones. Written rows are marked
+    resolved in the same transaction; the rest stay pending with their
+    attempt count and last error updated.
+
+    Args:
+        user: User recorded as performer (None for unattended runs)
+        limit: Most rows retried in one call
+
+    Returns:
+        (resolved, still pending) counts of the rows retried
+    """
+    with transaction.atomic():
+        rows = list(
+            UndeliveredResult.objects.filter(resolved_at__isnull=True)
+            .select_for_update(skip_locked=True)
+            .order_by('attempts', 'received_at', 'id')[:limit]
+        )
+        if not rows:
+            return 0, 0
+        rows.sort(key=lambda row: (row.received_at, row.id))
+
+        results = [
+            InstrumentResult(row.barcode, row.test_code, row.value, row.unit, tuple(row.flags), row.analyzer)
+            for row in rows
+        ]
+        row_of = {id(result): row for row, result in zip(rows, results)}
+        index = BarcodeIndex()
+        index.load()
+        matched, _ = index.resolve(results)
+
+        # Oldest first, so a later measurement of an item replaces an earlier one
+        latest, rows_by_order = {}, defaultdict(list)
+        for order_id, entry, result in matched:
+            latest[entry.order_item_id] = (order_id, entry)
+            rows_by_order[order_id].append(row_of[id(result)])
+        by_order = {}
+        for order_id, entry in latest.values():
+            by_order.setdefault(order_id, []).append(entry)
+        skipped = {}
+        if by_order:
+            _, skipped = submit_isolated(list(by_order.items()), user)
+
+        resolved = {
+            row.id for order_id, order_rows in rows_by_order.items() if order_id not in skipped for row in order_rows
+        }
+        UndeliveredResult.objects.filter(id__in=resolved).update(resolved_at=timezone.now())
+
+        errors = {
+            row.id: skipped[order_id]
+            for order_id, order_rows in rows_by_order.items() if order_id in skipped for row in order_rows
+        }
+        pending = [row for row in rows if row.id not in resolved]
+        for row in pending:
+            error = errors.get(row.id)
+            row.reason = _reason(error) if error else REASON_UNMATCHED
+            row.error = error.message if error else UNMATCHED_ERROR
+            row.attempts += 1
+        UndeliveredResult.objects.bulk_update(pending, ['reason', 'error', 'attempts'])
+    return len(resolved), len(pending)
+
+
+class InstrumentListener:
+    """
+    Connection handler shared by the protocol servers.
+
+    Args:
+        index: BarcodeIndex (None: count results without matching them)
+        batcher: ResultBatcher (None: do not write)
+        analyzer: Analyzer code overriding the one sent by instruments
+    """
+
+    def __init__(self, index, batcher, executor, stats, analyzer=''):
+        self.index = index
+        self.batcher = batcher
+        self.executor = executor
+        self.stats = stats
+        self.analyzer = analyzer
+
+    def handler(self, protocol):
+        receiver_class = RECEIVERS[protocol]
+
+        async def handle(reader, writer):
+            peer = writer.get_extra_info('peername')
+            receiver = receiver_class(self.analyzer)
+            logger.debug('%s connection from %s', protocol.upper(), peer)
+            try:
+                while True:
+                    data = await reader.read(READ_SIZE)
+                    if not data:
+                        break
+                    reply, results = receiver.feed(data)
+                    if reply:
+                        writer.write(reply)
+                    if results:
+                        await self.receive(results)
+                    await writer.drain()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                writer.close()
+                logger.debug('%s connection from %s closed', protocol.upper(), peer)
+
+        return handle
+
+    async def receive(self, results):
+        self.stats.received += len(results)
+        if self.index is None:
+            return
+        loop = asyncio.get_running_loop()
+        matched, unmatched = await loop.run_in_executor(self.executor, self.index.resolve, results)
+        self.stats.matched += len(matched)
+        self.stats.unmatched += len(unmatched)
+        for result in unmatched:
+            logger.warning('No open order item for sample %s test %s', result.barcode, result.test_code)
+        if self.batcher is not None:
+            if unmatched:
+                await self.batcher.keep(REASON_UNMATCHED, [(result, UNMATCHED_ERROR) for result in unmatched])
+            await self.batcher.add(matched)
+
+
+def new_executor():
+    """Single database thread for index lookups and batch writes."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='instrument-db')
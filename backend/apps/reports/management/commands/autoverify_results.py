@@ -0,0 +1,43 @@
+"""
+Management command to re-run autoverification on held results
+Run with: python manage.py autoverify_results [--branch 1] [--batch-size 1000]
+
+Results are autoverified when they are submitted; run this after
+changing the rules so that results held under the old rules are
+released (or get up-to-date reasons).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from apps.reports.autoverify import autoverify_pending, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Re-evaluates results waiting for review against the autoverification rules'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--branch',
+            type=int,
+            action='append',
+            dest='branch_ids',
+            help='Only these branches (repeatable; default: all)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Results per batch (default: {DEFAULT_BATCH_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        self.stdout.write(self.style.SUCCESS('\n🔎 Re-evaluating held results...\n'))
+        started = time.monotonic()
+        evaluated, released = autoverify_pending(
+            branch_ids=options['branch_ids'], batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Evaluated {evaluated} results, released {released} '
+            f'in {time.monotonic() - started:.2f}s\n'
+        ))
@@ -0,0 +1,99 @@
+"""
+Management command to benchmark the autoverification decision table
+Run with: python manage.py benchmark_autoverification [--results 100000] [--synthetic]
+
+Evaluates a batch of random results against the loaded rules, or against
+synthetic rules (--synthetic, no database needed), and reports results
+per second for the array evaluation alone and for full decisions on
+result instances.
+"""
+import random
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from apps.reports.autoverify import DecisionTable, get_decision_table, reason_codes
+from apps.reports.qc import QCStates
+
+FLAGS = ('HEMOLYSIS', 'LIPEMIA', 'ICTERUS', 'CLOT', 'SHORT_SAMPLE')
+
+
+def synthetic_table(exams, rng):
+    """Rules for most exams plus a default rule."""
+    rules = [{
+        'exam_type_id': None, 'low_limit': None, 'high_limit': None, 'allow_abnormal': False,
+        'require_delta_pass': True, 'require_qc': True, 'blocking_flags': ['CLOT'], 'is_active': True,
+    }]
+    for pk in range(1, exams + 1):
+        if rng.random() < 0.9:
+            low = rng.uniform(0, 20)
+            rules.append({
+                'exam_type_id': pk, 'low_limit': low, 'high_limit': low * 10,
+                'allow_abnormal': rng.random() < 0.2, 'require_delta_pass': True,
+                'require_qc': True, 'blocking_flags': rng.sample(FLAGS, 2), 'is_active': True,
+            })
+    return DecisionTable(('synthetic',), rules)
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks autoverification throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--results', type=int, default=100_000, help='Results per batch (default: 100000)')
+        parser.add_argument('--synthetic', action='store_true', help='Use synthetic rules instead of the database')
+        parser.add_argument('--exams', type=int, default=500, help='Synthetic exam types (default: 500)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible runs')
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        rng = random.Random(options['seed'])
+        table = synthetic_table(options['exams'], rng) if options['synthetic'] else get_decision_table()
+        exam_ids = sorted(table.row_of) or list(range(1, options['exams'] + 1))
+
+        results = [
+            SimpleNamespace(
+                exam_type_id=rng.choice(exam_ids),
+                analyzer='',
+                numeric_value=None if rng.random() < 0.05 else rng.uniform(0, 150),
+                abnormal_flag=rng.choice(('', '', '', '', 'L', 'H')),
+                delta_failed=rng.random() < 0.03,
+                detailed_results=(
+                    {'flags': [rng.choice(FLAGS)]} if rng.random() < 0.05
+                    else {'qc_status': 'fail'} if rng.random() < 0.01
+                    else {}
+                ),
+            )
+            for _ in range(options['results'])
+        ]
+        count = len(results)
+        self.stdout.write(self.style.SUCCESS(
+            f'\n⏱️  Decision table: {len(table.row_of)} exam rules, {count} results\n'
+        ))
+
+        columns = (
+            [r.exam_type_id for r in results],
+            [r.numeric_value for r in results],
+            [bool(r.abnormal_flag) for r in results],
+            [r.delta_failed for r in results],
+            [r.detailed_results.get('flags', ()) for r in results],
+            [r.detailed_results.get('qc_status', 'ok') != 'ok' for r in results],
+        )
+        started = time.perf_counter()
+        masks = table.evaluate(*columns)
+        evaluate_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        released = table.decide(results, now=None, qc_states=QCStates(None))
+        decide_s = time.perf_counter() - started
+
+        held = {}
+        for mask in masks.tolist():
+            for code in reason_codes(mask):
+                held[code] = held.get(code, 0) + 1
+
+        self.stdout.write(f'   evaluate (arrays):  {count / evaluate_s:12,.0f} results/s')
+        self.stdout.write(f'   decide (instances): {count / decide_s:12,.0f} results/s')
+        self.stdout.write(f'   released: {released} ({released / count:.1%})')
+        for code, n in sorted(held.items(), key=lambda item: -item[1]):
+            self.stdout.write(f'   held by {code}: {n}')
+        self.stdout.write('')
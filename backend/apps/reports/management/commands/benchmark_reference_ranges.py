@@ -0,0 +1,116 @@
+"""
+Management command to benchmark reference range lookups
+Run with: python manage.py benchmark_reference_ranges [--evaluations 10000] [--synthetic]
+
+Measures single lookups, whole-panel resolution and vectorized flagging
+against the loaded engine, or against a synthetic one (--synthetic, no
+database needed) with many exams, sex-specific age bands, branch and
+analyzer overrides.
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from apps.reports.ranges import ReferenceEngine, Interval, get_engine
+
+# Age band edges in days: neonate, infant, child, adolescent, adult, elderly
+AGE_EDGES = [0, 28, 365, 365 * 12, 365 * 18, 365 * 65, None]
+
+
+def synthetic_engine(exams, branches, rng):
+    """Engine with sex x age-band ranges for every exam plus some overrides."""
+    defaults = {pk: Interval(1.0, 10.0, 'mg/dL') for pk in range(1, exams + 1)}
+    ranges = []
+    for pk in range(1, exams + 1):
+        for sex in ('M', 'F'):
+            for start, end in zip(AGE_EDGES, AGE_EDGES[1:]):
+                low = rng.uniform(1, 50)
+                ranges.append({
+                    'exam_type_id': pk, 'sex': sex, 'age_min_days': start, 'age_max_days': end,
+                    'branch_id': None, 'analyzer': '', 'low': low, 'high': low * 2, 'unit': 'mg/dL',
+                })
+        if rng.random() < 0.2:
+            ranges.append({
+                'exam_type_id': pk, 'sex': '', 'age_min_days': 365 * 18, 'age_max_days': None,
+                'branch_id': rng.randint(1, branches), 'analyzer': f'AN-{rng.randint(1, 3)}',
+                'low': 5.0, 'high': 9.0, 'unit': 'mg/dL',
+            })
+    conversions = [(None, 'g/dL', 'g/L', 10), (1, 'mg/dL', 'mmol/L', 0.0555)]
+    return ReferenceEngine(('synthetic',), defaults, ranges, conversions)
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks reference range lookups and panel flagging'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--evaluations', type=int, default=10_000, help='Lookups to time (default: 10000)')
+        parser.add_argument('--panel-size', type=int, default=30, help='Analytes per panel (default: 30)')
+        parser.add_argument('--synthetic', action='store_true', help='Use a synthetic engine instead of the database')
+        parser.add_argument('--exams', type=int, default=500, help='Synthetic exam types (default: 500)')
+        parser.add_argument('--branches', type=int, default=10, help='Synthetic branches (default: 10)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible runs')
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+        if options['synthetic']:
+            engine = synthetic_engine(options['exams'], options['branches'], rng)
+        else:
+            engine = get_engine()
+        build_ms = (time.perf_counter() - started) * 1000
+
+        exam_ids = sorted(engine.defaults)
+        if not exam_ids:
+            self.stdout.write(self.style.ERROR('\n❌ No exam types found; try --synthetic.\n'))
+            return
+
+        bands = sum(len(starts) for starts, _, _ in engine.bands.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'\n⏱️  Engine: {len(exam_ids)} exams, {bands} ranges, {len(engine.factors)} factors '
+            f'(built in {build_ms:.1f} ms)\n'
+        ))
+
+        contexts = [
+            (
+                rng.choice(exam_ids),
+                rng.choice(('M', 'F')),
+                rng.randint(0, 365 * 90),
+                rng.randint(1, options['branches']),
+                rng.choice(('', 'AN-1', 'AN-2')),
+            )
+            for _ in range(options['evaluations'])
+        ]
+        started = time.perf_counter()
+        for exam_id, sex, age, branch_id, analyzer in contexts:
+            engine.lookup(exam_id, sex, age, branch_id, analyzer)
+        single_us = (time.perf_counter() - started) * 1e6 / len(contexts)
+
+        size = min(options['panel_size'], len(exam_ids))
+        panels = max(1, options['evaluations'] // size)
+        lookup_times, flag_times = [], []
+        for _ in range(panels):
+            ids = rng.sample(exam_ids, size)
+            values = [rng.uniform(0, 120) for _ in ids]
+            sex, age = rng.choice(('M', 'F')), rng.randint(0, 365 * 90)
+            started = time.perf_counter()
+            intervals = engine.lookup_many(ids, sex, age, rng.randint(1, options['branches']))
+            middle = time.perf_counter()
+            engine.flag(values, intervals)
+            ended = time.perf_counter()
+            lookup_times.append((middle - started) * 1e6)
+            flag_times.append((ended - middle) * 1e6)
+
+        lookup_times.sort()
+        flag_times.sort()
+        self.stdout.write(f'   single lookup:        {single_us:8.2f} µs  ({len(contexts)} evaluations)')
+        self.stdout.write(
+            f'   panel of {size} lookups: {statistics.mean(lookup_times):8.2f} µs mean, '
+            f'{lookup_times[int(len(lookup_times) * 0.95)]:.2f} µs p95  ({panels} panels)'
+        )
+        self.stdout.write(
+            f'   panel of {size} flags:   {statistics.mean(flag_times):8.2f} µs mean, '
+            f'{flag_times[int(len(flag_times) * 0.95)]:.2f} µs p95'
+        )
+        self.stdout.write('')
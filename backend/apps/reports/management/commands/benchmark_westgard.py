@@ -0,0 +1,70 @@
+"""
+Management command to benchmark the Westgard rule evaluation
+Run with: python manage.py benchmark_westgard [--synthetic] [--series 500] [--runs 200]
+
+Evaluates the QC history of the database (or synthetic series with
+--synthetic, no database needed) in one pass, and reports runs per
+second and how many analytes are out of control.
+"""
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+from apps.reports import qc
+
+
+def synthetic_history(series, runs, rng):
+    """Rows for qc.evaluate: two levels per series, some series drifting."""
+    start = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+    rows = []
+    run_id = 0
+    for exam_type_id in range(1, series + 1):
+        drift = rng.uniform(0.5, 1.5) if rng.random() < 0.1 else 0.0
+        for index in range(runs):
+            level = index % 2
+            mean, sd = (100.0, 5.0) if level else (40.0, 2.0)
+            run_id += 1
+            shift = drift * sd * index / runs
+            rows.append((
+                run_id, exam_type_id, 'SIM', rng.gauss(mean + shift, sd), mean, sd,
+                start + timedelta(hours=index * 4), level + 1,
+            ))
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks Westgard rule evaluation over QC history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--synthetic', action='store_true', help='Use synthetic QC runs instead of the database')
+        parser.add_argument('--series', type=int, default=500, help='Synthetic analyte/analyzer series (default: 500)')
+        parser.add_argument('--runs', type=int, default=200, help='Synthetic runs per series (default: 200)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible runs')
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        if options['synthetic']:
+            rows = synthetic_history(options['series'], options['runs'], random.Random(options['seed']))
+        else:
+            rows = qc._history()
+        self.stdout.write(self.style.SUCCESS(f'\n⏱️  Westgard evaluation of {len(rows)} QC runs\n'))
+        if not rows:
+            self.stdout.write(self.style.WARNING('⚠️  No QC runs to evaluate\n'))
+            return
+
+        started = time.perf_counter()
+        _, masks, states = qc.evaluate(rows)
+        elapsed = time.perf_counter() - started
+
+        violated = {}
+        for mask in masks.tolist():
+            for code in qc.rule_codes(mask):
+                violated[code] = violated.get(code, 0) + 1
+        out = sum(1 for state in states.values() if not state.in_control)
+
+        self.stdout.write(f'   evaluate: {len(rows) / elapsed:12,.0f} runs/s ({elapsed * 1000:.1f} ms)')
+        self.stdout.write(f'   series: {len(states)}, out of control: {out}')
+        for _, code in qc.RULES:
+            self.stdout.write(f'   {code}: {violated.get(code, 0)} runs')
+        self.stdout.write('')
@@ -0,0 +1,58 @@
+"""
+Management command to report critical value alert latency
+Run with: python manage.py critical_alert_latency [--days 7]
+
+End-to-end latency of recent alerts: result submission -> live delivery
+by the alert worker, and result submission -> acknowledgement.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+from apps.reports.models import CriticalAlert
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+class Command(BaseCommand):
+    help = 'Reports delivery and acknowledgement latency of critical value alerts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Alerts created in the last N days (default: 7)')
+
+    def report(self, label, durations, unit, scale):
+        values = sorted(d.total_seconds() * scale for d in durations)
+        if not values:
+            self.stdout.write(f'   {label}: no data')
+            return
+        self.stdout.write(
+            f'   {label}: n={len(values)}  p50 {percentile(values, 0.5):.1f} {unit}  '
+            f'p95 {percentile(values, 0.95):.1f} {unit}  max {values[-1]:.1f} {unit}'
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        since = timezone.now() - timedelta(days=options['days'])
+        alerts = CriticalAlert.objects.filter(created_at__gte=since)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n⏱️  Critical alerts since {since:%Y-%m-%d %H:%M}: {alerts.count()}\n'
+        ))
+        delivery = alerts.filter(delivered_at__isnull=False).annotate(
+            latency=F('delivered_at') - F('created_at')
+        ).values_list('latency', flat=True)
+        acknowledgement = alerts.filter(acknowledged_at__isnull=False, superseded_at__isnull=True).annotate(
+            latency=F('acknowledged_at') - F('created_at')
+        ).values_list('latency', flat=True)
+
+        self.report('delivery', delivery, 'ms', 1000)
+        self.report('acknowledgement', acknowledgement, 'min', 1 / 60)
+        pending = alerts.filter(acknowledged_at__isnull=True).count()
+        undelivered = alerts.filter(delivered_at__isnull=True).count()
+        superseded = alerts.filter(superseded_at__isnull=False).count()
+        self.stdout.write(
+            f'   unacknowledged: {pending}  undelivered: {undelivered}  superseded: {superseded}\n'
+        )
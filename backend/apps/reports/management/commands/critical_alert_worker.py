@@ -0,0 +1,74 @@
+"""
+Management command to deliver and escalate critical value alerts
+Run with: python manage.py critical_alert_worker [--consumer worker-1]
+
+Long-running process (run at least one, more for redundancy; each needs
+its own --consumer name). Blocks on the alert stream so alerts are
+delivered as soon as they are queued, escalates unacknowledged alerts
+and re-queues alerts whose enqueue was lost (see apps/reports/critical.py).
+"""
+import os
+import socket
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+from apps.reports import critical
+
+
+class Command(BaseCommand):
+    help = 'Delivers critical value alerts from the alert stream and escalates unacknowledged ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--consumer',
+            default=f'{socket.gethostname()}-{os.getpid()}',
+            help='Consumer name within the worker group (default: host-pid)'
+        )
+        parser.add_argument(
+            '--block-ms',
+            type=int,
+            default=1000,
+            help='Longest wait for new alerts before running the timers (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        consumer = options['consumer']
+        redis = get_redis_connection('default')
+        critical.ensure_group(redis)
+        self.stdout.write(self.style.SUCCESS(f'\n🚨 Critical alert worker {consumer} started\n'))
+
+        next_sweep = 0.0
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    entries = critical.read_entries(redis, consumer, block_ms=options['block_ms'])
+                    latencies = critical.deliver(redis, entries, timezone.now())
+                except RedisError as e:
+                    self.stdout.write(self.style.ERROR(f'❌ Redis error: {e}'))
+                    time.sleep(1)
+                    continue
+                if latencies:
+                    self.stdout.write(
+                        f'📨 Delivered {len(latencies)} alerts, latency '
+                        f'median {statistics.median(latencies) * 1000:.0f} ms, '
+                        f'max {max(latencies) * 1000:.0f} ms'
+                    )
+
+                now = timezone.now()
+                escalated = critical.escalate_due(now)
+                if escalated:
+                    self.stdout.write(self.style.WARNING(f'⚠️  Escalated {escalated} unacknowledged alerts'))
+                if time.monotonic() >= next_sweep:
+                    requeued = critical.requeue_undelivered(now)
+                    if requeued:
+                        self.stdout.write(self.style.WARNING(f'🔁 Re-queued {requeued} undelivered alerts'))
+                    next_sweep = time.monotonic() + critical.REDELIVER_SECONDS
+        except KeyboardInterrupt:
+            self.stdout.write('\n👋 Stopped\n')
@@ -0,0 +1,108 @@
+"""
+Management command to receive analyzer results over TCP
+Run with: python manage.py instrument_listener [--astm-port 5100] [--hl7-port 5200]
+
+Long-running process. Serves ASTM (E1381/E1394) and HL7 v2 over MLLP,
+matches results to open orders by sample barcode (order number) and
+test code (exam code), and writes them in batches
+(see apps/reports/interfaces/listener.py). Results that cannot be written
+are kept for reprocess_instrument_results. --dry-run parses and matches
+without writing.
+"""
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from apps.reports.interfaces import listener
+
+STATS_INTERVAL = 10
+
+
+class Command(BaseCommand):
+    help = 'Receives instrument results over ASTM and HL7/MLLP and writes them in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='0.0.0.0', help='Address to listen on (default: 0.0.0.0)')
+        parser.add_argument('--astm-port', type=int, default=5100, help='ASTM port, 0 to disable (default: 5100)')
+        parser.add_argument('--hl7-port', type=int, default=5200, help='HL7/MLLP port, 0 to disable (default: 5200)')
+        parser.add_argument('--analyzer', default='', help='Analyzer code for every result (default: sent by the instrument)')
+        parser.add_argument('--user', default='', help='Username recorded as performer of the results')
+        parser.add_argument(
+            '--batch-size', type=int, default=listener.DEFAULT_BATCH_SIZE,
+            help=f'Results per write (default: {listener.DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--flush-ms', type=int, default=listener.DEFAULT_FLUSH_MS,
+            help=f'Longest wait before writing buffered results (default: {listener.DEFAULT_FLUSH_MS})'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Parse and match results without writing them')
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        ports = {
+            protocol: port
+            for protocol, port in (
+                (listener.PROTOCOL_ASTM, options['astm_port']),
+                (listener.PROTOCOL_HL7, options['hl7_port']),
+            )
+            if port
+        }
+        if not ports:
+            raise CommandError('Enable at least one of --astm-port / --hl7-port')
+
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f'User {options["user"]} does not exist')
+
+        executor = listener.new_executor()
+        stats = listener.Stats()
+        index = listener.BarcodeIndex()
+        samples = executor.submit(index.load).result()
+        self.stdout.write(f'🔎 Indexed {samples} open samples')
+
+        batcher = None
+        if not options['dry_run']:
+            batcher = listener.ResultBatcher(
+                listener.database_writer(user), executor, stats,
+                batch_size=options['batch_size'], flush_ms=options['flush_ms'],
+            )
+        server = listener.InstrumentListener(index, batcher, executor, stats, analyzer=options['analyzer'])
+
+        try:
+            asyncio.run(self.serve(server, batcher, options['host'], ports, stats))
+        except KeyboardInterrupt:
+            self.stdout.write('\n👋 Stopped\n')
+        finally:
+            executor.shutdown(wait=True)
+        self.report(stats)
+
+    async def serve(self, server, batcher, host, ports, stats):
+        servers = []
+        for protocol, port in ports.items():
+            servers.append(await asyncio.start_server(server.handler(protocol), host, port))
+            self.stdout.write(self.style.SUCCESS(f'🧪 {protocol.upper()} listening on {host}:{port}'))
+        if batcher is None:
+            self.stdout.write(self.style.WARNING('⚠️  Dry run: results are not written'))
+
+        try:
+            last = 0
+            while True:
+                await asyncio.sleep(STATS_INTERVAL)
+                if stats.received != last:
+                    last = stats.received
+                    self.report(stats)
+        finally:
+            if batcher is not None:
+                await batcher.flush()
+            for instance in servers:
+                instance.close()
+
+    def report(self, stats):
+        self.stdout.write(
+            f'📊 {stats.received} received ({stats.rate():.0f}/s), {stats.matched} matched, '
+            f'{stats.unmatched} unmatched, {stats.written} written in {stats.batches} batches, '
+            f'{stats.rejected} rejected'
+        )
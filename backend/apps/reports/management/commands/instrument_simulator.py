@@ -0,0 +1,164 @@
+"""
+Management command to simulate analyzers sending results
+Run with: python manage.py instrument_simulator --protocol astm [--samples 1000] [--connections 4]
+
+Opens --connections concurrent instrument connections to an
+instrument_listener and sends samples following the protocol handshake
+(ASTM: ENQ, one ACKed frame per record, EOT; HL7: one ACKed message per
+sample). Samples are synthetic (SIM barcodes, --tests codes), taken from
+open orders (--from-db), or a captured session is replayed as is
+(--replay FILE). Reports results and samples per second.
+"""
+import asyncio
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.reports.interfaces import astm, hl7
+
+DEFAULT_TESTS = 'GLU,CREA,UREA,NA,K,CL,ALT,AST,CHOL,TRIG'
+
+
+async def _expect(reader, expected):
+    reply = await reader.read(1)
+    if reply != expected:
+        raise ConnectionError(f'Expected {expected!r}, got {reply!r}')
+
+
+async def send_astm(reader, writer, sample):
+    barcode, results = sample
+    writer.write(astm.ENQ)
+    await _expect(reader, astm.ACK)
+    for number, record in enumerate(astm.build_message(barcode, results), start=1):
+        writer.write(astm.build_frame(number, record))
+        await _expect(reader, astm.ACK)
+    writer.write(astm.EOT)
+
+
+async def send_hl7(reader, writer, sample, control_id):
+    barcode, results = sample
+    writer.write(hl7.wrap(hl7.build_message(barcode, results, control_id)))
+    await reader.readuntil(hl7.END_BLOCK)
+
+
+class Command(BaseCommand):
+    help = 'Sends simulated instrument results to an instrument listener'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--protocol', choices=('astm', 'hl7'), default='astm', help='Protocol (default: astm)')
+        parser.add_argument('--host', default='127.0.0.1', help='Listener host (default: 127.0.0.1)')
+        parser.add_argument('--port', type=int, help='Listener port (default: 5100 ASTM, 5200 HL7)')
+        parser.add_argument('--samples', type=int, default=1000, help='Samples per connection (default: 1000)')
+        parser.add_argument('--connections', type=int, default=4, help='Concurrent connections (default: 4)')
+        parser.add_argument('--tests', default=DEFAULT_TESTS, help='Synthetic test codes, comma separated')
+        parser.add_argument('--tests-per-sample', type=int, default=5, help='Synthetic results per sample (default: 5)')
+        parser.add_argument('--from-db', action='store_true', help='Send results for open order items')
+        parser.add_argument('--replay', metavar='FILE', help='Replay a captured session instead of generating samples')
+        parser.add_argument('--repeat', type=int, default=1, help='Times to replay --replay (default: 1)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible runs')
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        port = options['port'] or (5100 if options['protocol'] == 'astm' else 5200)
+        if options['replay']:
+            with open(options['replay'], 'rb') as capture:
+                payload = capture.read()
+            started = time.perf_counter()
+            received = asyncio.run(self.replay(options['host'], port, payload, options['repeat']))
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f'\n✅ Replayed {len(payload) * options["repeat"]} bytes in {elapsed:.2f}s, '
+                f'{received} reply bytes\n'
+            ))
+            return
+
+        rng = random.Random(options['seed'])
+        connections = [
+            self.samples(options, rng) for _ in range(options['connections'])
+        ]
+        total_results = sum(len(results) for samples in connections for _, results in samples)
+        total_samples = sum(len(samples) for samples in connections)
+        if not total_results:
+            raise CommandError('No samples to send')
+
+        self.stdout.write(
+            f'🧪 Sending {total_samples} samples ({total_results} results) over '
+            f'{len(connections)} {options["protocol"].upper()} connections to {options["host"]}:{port}'
+        )
+        started = time.perf_counter()
+        asyncio.run(self.send_all(options['protocol'], options['host'], port, connections))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ {total_results / elapsed:,.0f} results/s, {total_samples / elapsed:,.0f} samples/s '
+            f'({elapsed:.2f}s)\n'
+        ))
+
+    def samples(self, options, rng):
+        """[(barcode, [(code, value, unit, flag)])] for one connection."""
+        if options['from_db']:
+            return self.open_samples(options['samples'], rng)
+        codes = [code.strip() for code in options['tests'].split(',') if code.strip()]
+        per_sample = min(options['tests_per_sample'], len(codes))
+        return [
+            (
+                f'SIM{rng.randrange(10 ** 8):08d}',
+                [(code, f'{rng.uniform(1, 200):.1f}', '', '') for code in rng.sample(codes, per_sample)],
+            )
+            for _ in range(options['samples'])
+        ]
+
+    @staticmethod
+    def open_samples(limit, rng):
+        from apps.exams.models import OrderItem
+
+        samples = {}
+        for order_number, code, unit in (
+            OrderItem.objects.filter(is_panel=False, order__status__in=('pending', 'in_progress'))
+            .exclude(status__in=('completed', 'cancelled'))
+            .values_list('order__order_number', 'exam_type__code', 'exam_type__unit')
+            .order_by('order_id')[:limit * 20]
+        ):
+            samples.setdefault(order_number, []).append((code, f'{rng.uniform(1, 200):.1f}', unit, ''))
+        return list(samples.items())[:limit]
+
+    async def send_all(self, protocol, host, port, connections):
+        await asyncio.gather(*[
+            self.send_connection(protocol, host, port, samples, number)
+            for number, samples in enumerate(connections)
+        ])
+
+    @staticmethod
+    async def send_connection(protocol, host, port, samples, number):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for sequence, sample in enumerate(samples):
+                if protocol == 'astm':
+                    await send_astm(reader, writer, sample)
+                else:
+                    await send_hl7(reader, writer, sample, f'SIM{number}-{sequence}')
+            await writer.drain()
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    @staticmethod
+    async def replay(host, port, payload, repeat):
+        reader, writer = await asyncio.open_connection(host, port)
+        received = 0
+
+        async def drain_replies():
+            nonlocal received
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    return
+                received += len(data)
+
+        replies = asyncio.ensure_future(drain_replies())
+        for _ in range(repeat):
+            writer.write(payload)
+            await writer.drain()
+        writer.write_eof()
+        await replies
+        writer.close()
+        return received
@@ -0,0 +1,72 @@
+"""
+Management command to list and re-process undelivered instrument results
+Run with: python manage.py reprocess_instrument_results [--list] [--user interface]
+
+Results the instrument listener acknowledged but could not write (no open
+order yet, rejected by validation, failed write) are kept in
+UndeliveredResult. Run this after fixing the cause (order registered,
+exam code mapped, database back) to write them; --list only shows what
+is pending.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from apps.reports.interfaces.listener import REPROCESS_LIMIT, reprocess_undelivered
+from apps.reports.models import UndeliveredResult
+
+LISTED = 50
+
+
+class Command(BaseCommand):
+    help = 'Lists or re-processes instrument results that were acknowledged but not written'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--list', action='store_true', help='Only list pending results')
+        parser.add_argument('--user', default='', help='Username recorded as performer of the results')
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=REPROCESS_LIMIT,
+            help=f'Most results retried (default: {REPROCESS_LIMIT})'
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command"""
+        if options['list']:
+            self.list_pending()
+            return
+
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f'User {options["user"]} does not exist')
+
+        self.stdout.write(self.style.SUCCESS('\n🔁 Re-processing undelivered instrument results...\n'))
+        started = time.monotonic()
+        resolved, pending = reprocess_undelivered(user, limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Written {resolved} results, {pending} still pending '
+            f'in {time.monotonic() - started:.2f}s\n'
+        ))
+
+    def list_pending(self):
+        pending = UndeliveredResult.objects.filter(resolved_at__isnull=True)
+        counts = dict(pending.order_by().values_list('reason').annotate(total=Count('id')))
+        if not counts:
+            self.stdout.write(self.style.SUCCESS('\n✅ No undelivered results\n'))
+            return
+
+        labels = dict(UndeliveredResult.REASON_CHOICES)
+        self.stdout.write(f'\n📋 {sum(counts.values())} undelivered results:')
+        for reason, total in sorted(counts.items()):
+            self.stdout.write(f'   {labels.get(reason, reason)}: {total}')
+        self.stdout.write('')
+        for row in pending.order_by('received_at', 'id')[:LISTED]:
+            self.stdout.write(
+                f'   {row.received_at:%Y-%m-%d %H:%M:%S}  {row.barcode}  {row.test_code} = {row.value} {row.unit}'
+                f'  [{row.reason}, {row.attempts} attempts] {row.error}'
+            )
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('branches', '0001_initial'),
+        ('exams', '0008_exam_reference_interval'),
+        ('patients', '0006_patient_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('result_value', models.CharField(help_text='Valor tal como fue ingresado', max_length=100, verbose_name='resultado')),
+                ('numeric_value', models.FloatField(blank=True, null=True, verbose_name='valor numérico')),
+                ('unit', models.CharField(blank=True, max_length=20, verbose_name='unidad')),
+                ('reference_low', models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True, verbose_name='límite inferior')),
+                ('reference_high', models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True, verbose_name='límite superior')),
+                ('is_abnormal', models.BooleanField(default=False, verbose_name='anormal')),
+                ('abnormal_flag', models.CharField(blank=True, choices=[('', 'Normal'), ('L', 'Bajo'), ('H', 'Alto')], default='', max_length=1, verbose_name='indicador')),
+                ('detailed_results', models.JSONField(blank=True, default=dict, help_text='Datos adicionales del resultado (banderas del equipo, comentarios)', verbose_name='detalle')),
+                ('performed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='realizado en')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+                ('branch', models.ForeignKey(help_text='Sucursal donde se ingresó el resultado', on_delete=django.db.models.deletion.PROTECT, related_name='+', to='branches.branch', verbose_name='sucursal')),
+                ('exam_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='results', to='exams.examtype', verbose_name='examen')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='exams.examorder', verbose_name='orden')),
+                ('order_item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='result', to='exams.orderitem', verbose_name='examen de la orden')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='results', to='patients.patient', verbose_name='paciente')),
+                ('performed_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='realizado por')),
+            ],
+            options={
+                'verbose_name': 'resultado de examen',
+                'verbose_name_plural': 'resultados de examen',
+                'db_table': 'exam_results',
+                'ordering': ['-performed_at', '-id'],
+                'indexes': [models.Index(fields=['patient', '-performed_at', '-id'], name='exam_results_patient_idx'), models.Index(fields=['order'], name='exam_result_order_i_483cab_idx')],
+            },
+        ),
+    ]
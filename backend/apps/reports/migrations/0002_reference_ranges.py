@@ -0,0 +1,76 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0001_initial'),
+        ('exams', '0008_exam_reference_interval'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examresult',
+            name='analyzer',
+            field=models.CharField(blank=True, help_text='Código del analizador que produjo el resultado', max_length=50, verbose_name='equipo'),
+        ),
+        migrations.CreateModel(
+            name='UnitConversion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_unit', models.CharField(max_length=20, verbose_name='unidad de origen')),
+                ('to_unit', models.CharField(max_length=20, verbose_name='unidad de destino')),
+                ('factor', models.DecimalField(decimal_places=8, max_digits=18, verbose_name='factor')),
+                ('exam_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='unit_conversions', to='exams.examtype', verbose_name='examen')),
+            ],
+            options={
+                'verbose_name': 'conversión de unidades',
+                'verbose_name_plural': 'conversiones de unidades',
+                'db_table': 'unit_conversions',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReferenceRange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sex', models.CharField(blank=True, choices=[('', 'Ambos'), ('M', 'Masculino'), ('F', 'Femenino')], default='', max_length=1, verbose_name='sexo')),
+                ('age_min_days', models.PositiveIntegerField(default=0, verbose_name='edad mínima (días)')),
+                ('age_max_days', models.PositiveIntegerField(blank=True, help_text='Excluida; vacío: sin límite', null=True, verbose_name='edad máxima (días)')),
+                ('analyzer', models.CharField(blank=True, max_length=50, verbose_name='equipo')),
+                ('low', models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True, verbose_name='límite inferior')),
+                ('high', models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True, verbose_name='límite superior')),
+                ('unit', models.CharField(blank=True, max_length=20, verbose_name='unidad')),
+                ('is_active', models.BooleanField(default=True, verbose_name='activo')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='branches.branch', verbose_name='sucursal')),
+                ('exam_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reference_ranges', to='exams.examtype', verbose_name='examen')),
+            ],
+            options={
+                'verbose_name': 'rango de referencia',
+                'verbose_name_plural': 'rangos de referencia',
+                'db_table': 'reference_ranges',
+                'ordering': ['exam_type', 'sex', 'age_min_days'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='unitconversion',
+            constraint=models.UniqueConstraint(fields=('exam_type', 'from_unit', 'to_unit'), name='unique_unit_conversion'),
+        ),
+        migrations.AddConstraint(
+            model_name='unitconversion',
+            constraint=models.UniqueConstraint(condition=models.Q(('exam_type__isnull', True)), fields=('from_unit', 'to_unit'), name='unique_generic_unit_conversion'),
+        ),
+        migrations.AddConstraint(
+            model_name='unitconversion',
+            constraint=models.CheckConstraint(check=models.Q(('factor__gt', 0)), name='unit_conversion_factor_positive'),
+        ),
+        migrations.AddConstraint(
+            model_name='referencerange',
+            constraint=models.CheckConstraint(check=models.Q(('age_max_days__isnull', True), ('age_max_days__gt', models.F('age_min_days')), _connector='OR'), name='reference_range_age_band'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0008_exam_reference_interval'),
+        ('reports', '0002_reference_ranges'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeltaCheckRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('absolute_limit', models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True, verbose_name='límite absoluto')),
+                ('percent_limit', models.DecimalField(blank=True, decimal_places=2, max_digits=7, null=True, verbose_name='límite porcentual')),
+                ('window_days', models.PositiveIntegerField(default=30, help_text='Antigüedad máxima del resultado anterior a comparar', verbose_name='ventana (días)')),
+                ('is_active', models.BooleanField(default=True, verbose_name='activo')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+            ],
+            options={
+                'verbose_name': 'regla de delta check',
+                'verbose_name_plural': 'reglas de delta check',
+                'db_table': 'delta_check_rules',
+            },
+        ),
+        migrations.AddField(
+            model_name='examresult',
+            name='delta_failed',
+            field=models.BooleanField(default=False, help_text='El cambio respecto al resultado anterior supera el límite del examen', verbose_name='delta excedido'),
+        ),
+        migrations.AddField(
+            model_name='examresult',
+            name='previous_result',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reports.examresult', verbose_name='resultado anterior'),
+        ),
+        migrations.AddField(
+            model_name='examresult',
+            name='previous_value',
+            field=models.FloatField(blank=True, null=True, verbose_name='valor anterior'),
+        ),
+        migrations.AddIndex(
+            model_name='examresult',
+            index=models.Index(fields=['patient', 'exam_type', '-performed_at', '-id'], name='exam_results_delta_idx'),
+        ),
+        migrations.AddField(
+            model_name='deltacheckrule',
+            name='exam_type',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='delta_rule', to='exams.examtype', verbose_name='examen'),
+        ),
+        migrations.AddConstraint(
+            model_name='deltacheckrule',
+            constraint=models.CheckConstraint(check=models.Q(('absolute_limit__isnull', False), ('percent_limit__isnull', False), _connector='OR'), name='delta_check_rule_has_limit'),
+        ),
+    ]
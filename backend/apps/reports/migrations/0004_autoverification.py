@@ -0,0 +1,70 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0008_exam_reference_interval'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reports', '0003_delta_check'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AutoverificationRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('low_limit', models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True, verbose_name='límite inferior')),
+                ('high_limit', models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True, verbose_name='límite superior')),
+                ('allow_abnormal', models.BooleanField(default=False, help_text='Liberar valores fuera del rango de referencia', verbose_name='liberar anormales')),
+                ('require_delta_pass', models.BooleanField(default=True, verbose_name='exigir delta check')),
+                ('require_qc', models.BooleanField(default=True, verbose_name='exigir control de calidad')),
+                ('blocking_flags', models.JSONField(blank=True, default=list, help_text='Códigos de banderas del equipo que impiden la liberación automática', verbose_name='banderas bloqueantes')),
+                ('is_active', models.BooleanField(default=True, verbose_name='activo')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+            ],
+            options={
+                'verbose_name': 'regla de autoverificación',
+                'verbose_name_plural': 'reglas de autoverificación',
+                'db_table': 'autoverification_rules',
+            },
+        ),
+        migrations.AddField(
+            model_name='examresult',
+            name='verification_reasons',
+            field=models.JSONField(blank=True, default=list, help_text='Reglas que impidieron la liberación automática', verbose_name='motivos de revisión'),
+        ),
+        migrations.AddField(
+            model_name='examresult',
+            name='verification_status',
+            field=models.CharField(choices=[('pending', 'Pendiente de Revisión'), ('auto_verified', 'Autoverificado'), ('verified', 'Verificado')], default='pending', max_length=20, verbose_name='verificación'),
+        ),
+        migrations.AddField(
+            model_name='examresult',
+            name='verified_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='verificado en'),
+        ),
+        migrations.AddField(
+            model_name='examresult',
+            name='verified_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='verificado por'),
+        ),
+        migrations.AddIndex(
+            model_name='examresult',
+            index=models.Index(condition=models.Q(('verification_status', 'pending')), fields=['branch', 'id'], name='exam_results_review_idx'),
+        ),
+        migrations.AddField(
+            model_name='autoverificationrule',
+            name='exam_type',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='autoverification_rule', to='exams.examtype', verbose_name='examen'),
+        ),
+        migrations.AddConstraint(
+            model_name='autoverificationrule',
+            constraint=models.UniqueConstraint(condition=models.Q(('exam_type__isnull', True), ('is_active', True)), fields=('is_active',), name='unique_default_autoverification_rule'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0008_exam_reference_interval'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('branches', '0001_initial'),
+        ('patients', '0006_patient_summary'),
+        ('reports', '0004_autoverification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CriticalValueRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('critical_low', models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True, verbose_name='crítico inferior')),
+                ('critical_high', models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True, verbose_name='crítico superior')),
+                ('is_active', models.BooleanField(default=True, verbose_name='activo')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+                ('exam_type', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='critical_rule', to='exams.examtype', verbose_name='examen')),
+            ],
+            options={
+                'verbose_name': 'valor crítico',
+                'verbose_name_plural': 'valores críticos',
+                'db_table': 'critical_value_rules',
+            },
+        ),
+        migrations.CreateModel(
+            name='CriticalAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.FloatField(verbose_name='valor')),
+                ('flag', models.CharField(choices=[('L', 'Bajo'), ('H', 'Alto')], max_length=1, verbose_name='indicador')),
+                ('threshold', models.FloatField(verbose_name='límite crítico')),
+                ('escalation_level', models.PositiveSmallIntegerField(default=0, verbose_name='nivel de escalamiento')),
+                ('escalate_at', models.DateTimeField(blank=True, null=True, verbose_name='escalar en')),
+                ('delivered_at', models.DateTimeField(blank=True, null=True, verbose_name='entregada en')),
+                ('acknowledged_at', models.DateTimeField(blank=True, null=True, verbose_name='confirmada en')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='creada en')),
+                ('acknowledged_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='confirmada por')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='branches.branch', verbose_name='sucursal del resultado')),
+                ('exam_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='exams.examtype', verbose_name='examen')),
+                ('notify_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='usuario a notificar')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='critical_alerts', to='exams.examorder', verbose_name='orden')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='critical_alerts', to='patients.patient', verbose_name='paciente')),
+                ('result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='critical_alerts', to='reports.examresult', verbose_name='resultado')),
+                ('root_branch', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='branches.branch', verbose_name='sucursal de origen')),
+            ],
+            options={
+                'verbose_name': 'alerta de valor crítico',
+                'verbose_name_plural': 'alertas de valores críticos',
+                'db_table': 'critical_alerts',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='criticalvaluerule',
+            constraint=models.CheckConstraint(check=models.Q(('critical_low__isnull', False), ('critical_high__isnull', False), _connector='OR'), name='critical_value_rule_has_limit'),
+        ),
+        migrations.AddIndex(
+            model_name='criticalalert',
+            index=models.Index(condition=models.Q(('acknowledged_at__isnull', True)), fields=['escalate_at'], name='critical_alerts_escalate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='criticalalert',
+            index=models.Index(condition=models.Q(('acknowledged_at__isnull', True)), fields=['root_branch', 'created_at'], name='critical_alerts_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='criticalalert',
+            index=models.Index(condition=models.Q(('acknowledged_at__isnull', True)), fields=['branch', 'created_at'], name='critical_alerts_lab_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='criticalalert',
+            index=models.Index(condition=models.Q(('delivered_at__isnull', True)), fields=['created_at'], name='critical_alerts_undeliv_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('exams', '0008_exam_reference_interval'),
+        ('reports', '0005_critical_alerts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QCLot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('analyzer', models.CharField(blank=True, max_length=50, verbose_name='equipo')),
+                ('lot_number', models.CharField(max_length=50, verbose_name='lote')),
+                ('level', models.PositiveSmallIntegerField(default=1, verbose_name='nivel')),
+                ('target_mean', models.DecimalField(decimal_places=4, max_digits=12, verbose_name='media')),
+                ('target_sd', models.DecimalField(decimal_places=4, max_digits=12, verbose_name='desviación estándar')),
+                ('expires_on', models.DateField(blank=True, null=True, verbose_name='vence el')),
+                ('is_active', models.BooleanField(default=True, verbose_name='activo')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado en')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='actualizado en')),
+                ('exam_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='qc_lots', to='exams.examtype', verbose_name='examen')),
+            ],
+            options={
+                'verbose_name': 'lote de control',
+                'verbose_name_plural': 'lotes de control',
+                'db_table': 'qc_lots',
+                'ordering': ['exam_type', 'analyzer', 'level'],
+            },
+        ),
+        migrations.CreateModel(
+            name='QCRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.FloatField(verbose_name='valor')),
+                ('z_score', models.FloatField(verbose_name='z')),
+                ('violations', models.JSONField(blank=True, default=list, verbose_name='reglas violadas')),
+                ('is_rejected', models.BooleanField(default=False, verbose_name='rechazada')),
+                ('measured_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='medida en')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creada en')),
+                ('lot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='runs', to='reports.qclot', verbose_name='lote')),
+                ('performed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='realizada por')),
+            ],
+            options={
+                'verbose_name': 'corrida de control',
+                'verbose_name_plural': 'corridas de control',
+                'db_table': 'qc_runs',
+                'ordering': ['-measured_at'],
+                'indexes': [models.Index(fields=['lot', 'measured_at'], name='qc_runs_lot_time_idx'), models.Index(fields=['measured_at'], name='qc_runs_time_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='qclot',
+            constraint=models.UniqueConstraint(fields=('exam_type', 'analyzer', 'lot_number', 'level'), name='qc_lot_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='qclot',
+            constraint=models.CheckConstraint(check=models.Q(('target_sd__gt', 0)), name='qc_lot_sd_positive'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:50
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0006_quality_control'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UndeliveredResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('barcode', models.CharField(max_length=100, verbose_name='código de muestra')),
+                ('test_code', models.CharField(max_length=100, verbose_name='código de prueba')),
+                ('value', models.CharField(blank=True, max_length=200, verbose_name='valor')),
+                ('unit', models.CharField(blank=True, max_length=50, verbose_name='unidad')),
+                ('flags', models.JSONField(blank=True, default=list, verbose_name='indicadores')),
+                ('analyzer', models.CharField(blank=True, max_length=50, verbose_name='equipo')),
+                ('reason', models.CharField(choices=[('unmatched', 'Sin orden abierta'), ('rejected', 'Rechazado por validación'), ('failed', 'Error al guardar')], max_length=20, verbose_name='motivo')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='reintentos')),
+                ('received_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='recibido en')),
+                ('resolved_at', models.DateTimeField(blank=True, null=True, verbose_name='resuelto en')),
+            ],
+            options={
+                'verbose_name': 'resultado de equipo no registrado',
+                'verbose_name_plural': 'resultados de equipo no registrados',
+                'db_table': 'undelivered_results',
+                'ordering': ['received_at'],
+                'indexes': [models.Index(condition=models.Q(('resolved_at__isnull', True)), fields=['received_at'], name='undelivered_pending_idx')],
+            },
+        ),
+    ]
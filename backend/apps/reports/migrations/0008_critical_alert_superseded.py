@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0007_undelivered_results'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='criticalalert',
+            name='superseded_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='reemplazada en'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.11 on 2026-10-19 05:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0008_critical_alert_superseded'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='undeliveredresult',
+            name='analyzer',
+            field=models.TextField(blank=True, verbose_name='equipo'),
+        ),
+        migrations.AlterField(
+            model_name='undeliveredresult',
+            name='barcode',
+            field=models.TextField(verbose_name='código de muestra'),
+        ),
+        migrations.AlterField(
+            model_name='undeliveredresult',
+            name='test_code',
+            field=models.TextField(verbose_name='código de prueba'),
+        ),
+        migrations.AlterField(
+            model_name='undeliveredresult',
+            name='unit',
+            field=models.TextField(blank=True, verbose_name='unidad'),
+        ),
+        migrations.AlterField(
+            model_name='undeliveredresult',
+            name='value',
+            field=models.TextField(blank=True, verbose_name='valor'),
+        ),
+    ]
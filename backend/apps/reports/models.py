@@ -1,3 +1,882 @@
+"""
+Report Models
+=============
+
+Exam results for the Clinical Lab Management System.
+
+Models:
+- ExamResult: Result of one performed exam (one per order item)
+- ReferenceRange: Reference interval by exam, sex, age band, branch, analyzer
+- UnitConversion: Multiplicative factor between two units
+- DeltaCheckRule: Allowed change against the patient's previous result
+- AutoverificationRule: Conditions for releasing a result without review
+- CriticalValueRule: Life-threatening limits of an exam
+- CriticalAlert: Critical result awaiting acknowledgement
+- QCLot: Control material lot with its target mean and SD
+- QCRun: One measurement of a control, with its Westgard violations
+- UndeliveredResult: Instrument result acknowledged but not written
+"""
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
+
+
+class ExamResult(models.Model):
+    """
+    Result of one order item.
+
+    The raw value is kept as entered (qualitative results such as
+    "Positivo" are valid); numeric results are also stored parsed so they
+    can be flagged, charted and compared. The reference interval and unit
+    in force when the result was entered are copied onto the row, so a
+    later catalog change does not rewrite history.
+
+    patient, order and exam_type repeat what the order item already
+    implies; they are denormalized so per-patient history and trend
+    queries read one indexed table.
+
+    Fields:
+    - order_item: Exam of the order this result answers
+    - order / patient / exam_type: Denormalized from order_item
+    - branch: Branch where the result was entered (order's current_branch)
+    - result_value: Value as entered
+    - numeric_value: Parsed numeric value (null for qualitative results)
+    - unit / reference_low / reference_high: Snapshot used for flagging
+    - is_abnormal / abnormal_flag: Outside the reference interval (L/H)
+    - detailed_results: Extra structured data (instrument flags, comments)
+    - analyzer: Code of the instrument that produced the result (if any)
+    - previous_result / previous_value: Patient's latest earlier numeric
+      result of the same exam (value converted to this result's unit)
+    - delta_failed: Change against previous_value exceeds the exam's
+      delta check rule (see delta.py)
+    - verification_status: pending (in the review queue), auto_verified
+      (released by the autoverification rules) or verified (signed off)
+    - verification_reasons: Codes of the rules that held the result for
+      review (see autoverify.py)
+    - verified_by / verified_at: Reviewer and release time
+    - performed_by / performed_at: Technician and time of the result
+    """
+
+    FLAG_CHOICES = [
+        ('', 'Normal'),
+        ('L', 'Bajo'),
+        ('H', 'Alto'),
+    ]
+
+    VERIFICATION_CHOICES = [
+        ('pending', 'Pendiente de Revisión'),
+        ('auto_verified', 'Autoverificado'),
+        ('verified', 'Verificado'),
+    ]
+
+    order_item = models.OneToOneField(
+        'exams.OrderItem',
+        on_delete=models.CASCADE,
+        related_name='result',
+        verbose_name='examen de la orden'
+    )
+
+    order = models.ForeignKey(
+        'exams.ExamOrder',
+        on_delete=models.CASCADE,
+        related_name='results',
+        verbose_name='orden'
+    )
+
+    patient = models.ForeignKey(
+        'patients.Patient',
+        on_delete=models.PROTECT,
+        related_name='results',
+        verbose_name='paciente'
+    )
+
+    exam_type = models.ForeignKey(
+        'exams.ExamType',
+        on_delete=models.PROTECT,
+        related_name='results',
+        verbose_name='examen'
+    )
+
+    branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name='sucursal',
+        help_text='Sucursal donde se ingresó el resultado'
+    )
+
+    result_value = models.CharField(
+        'resultado',
+        max_length=100,
+        help_text='Valor tal como fue ingresado'
+    )
+
+    numeric_value = models.FloatField('valor numérico', null=True, blank=True)
+
+    unit = models.CharField('unidad', max_length=20, blank=True)
+
+    reference_low = models.DecimalField(
+        'límite inferior', max_digits=12, decimal_places=4, null=True, blank=True
+    )
+
+    reference_high = models.DecimalField(
+        'límite superior', max_digits=12, decimal_places=4, null=True, blank=True
+    )
+
+    is_abnormal = models.BooleanField('anormal', default=False)
+
+    abnormal_flag = models.CharField(
+        'indicador',
+        max_length=1,
+        choices=FLAG_CHOICES,
+        blank=True,
+        default=''
+    )
+
+    detailed_results = models.JSONField(
+        'detalle',
+        default=dict,
+        blank=True,
+        help_text='Datos adicionales del resultado (banderas del equipo, comentarios)'
+    )
+
+    analyzer = models.CharField(
+        'equipo',
+        max_length=50,
+        blank=True,
+        help_text='Código del analizador que produjo el resultado'
+    )
+
+    previous_result = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='resultado anterior'
+    )
+
+    previous_value = models.FloatField('valor anterior', null=True, blank=True)
+
+    delta_failed = models.BooleanField(
+        'delta excedido',
+        default=False,
+        help_text='El cambio respecto al resultado anterior supera el límite del examen'
+    )
+
+    verification_status = models.CharField(
+        'verificación',
+        max_length=20,
+        choices=VERIFICATION_CHOICES,
+        default='pending'
+    )
+
+    verification_reasons = models.JSONField(
+        'motivos de revisión',
+        default=list,
+        blank=True,
+        help_text='Reglas que impidieron la liberación automática'
+    )
+
+    verified_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='verificado por'
+    )
+
+    verified_at = models.DateTimeField('verificado en', null=True, blank=True)
+
+    performed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='realizado por'
+    )
+
+    performed_at = models.DateTimeField('realizado en', default=timezone.now)
+
+    # Timestamps
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'exam_results'
+        verbose_name = 'resultado de examen'
+        verbose_name_plural = 'resultados de examen'
+        ordering = ['-performed_at', '-id']
+        indexes = [
+            models.Index(
+                fields=['patient', '-performed_at', '-id'],
+                name='exam_results_patient_idx',
+            ),
+            # Latest result per (patient, exam) for delta checks (DISTINCT ON)
+            models.Index(
+                fields=['patient', 'exam_type', '-performed_at', '-id'],
+                name='exam_results_delta_idx',
+            ),
+            models.Index(fields=['order']),
+            # Review queue: pending results of a branch, oldest first
+            models.Index(
+                fields=['branch', 'id'],
+                condition=models.Q(verification_status='pending'),
+                name='exam_results_review_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.order_id}: {self.exam_type_id} = {self.result_value}'
+
+
+class ReferenceRange(models.Model):
+    """
+    Reference interval of an exam for a population.
+
+    A range applies to one sex (or both), an age band [age_min_days,
+    age_max_days) and optionally one branch and/or one analyzer. The most
+    specific matching range wins (see ranges.py); exams without a
+    matching range fall back to the exam type's default interval.
+
+    Fields:
+    - exam_type: Exam the interval applies to
+    - sex: 'M', 'F' or '' for both
+    - age_min_days / age_max_days: Age band in days (max open if null)
+    - branch / analyzer: Optional narrower scope
+    - low / high: Interval bounds (either may be open)
+    - unit: Unit of the bounds
+    """
+
+    SEX_CHOICES = [
+        ('', 'Ambos'),
+        ('M', 'Masculino'),
+        ('F', 'Femenino'),
+    ]
+
+    exam_type = models.ForeignKey(
+        'exams.ExamType',
+        on_delete=models.CASCADE,
+        related_name='reference_ranges',
+        verbose_name='examen'
+    )
+
+    sex = models.CharField('sexo', max_length=1, choices=SEX_CHOICES, blank=True, default='')
+
+    age_min_days = models.PositiveIntegerField('edad mínima (días)', default=0)
+
+    age_max_days = models.PositiveIntegerField(
+        'edad máxima (días)',
+        null=True,
+        blank=True,
+        help_text='Excluida; vacío: sin límite'
+    )
+
+    branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='sucursal'
+    )
+
+    analyzer = models.CharField('equipo', max_length=50, blank=True)
+
+    low = models.DecimalField('límite inferior', max_digits=12, decimal_places=4, null=True, blank=True)
+
+    high = models.DecimalField('límite superior', max_digits=12, decimal_places=4, null=True, blank=True)
+
+    unit = models.CharField('unidad', max_length=20, blank=True)
+
+    is_active = models.BooleanField('activo', default=True)
+
+    # Timestamps
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'reference_ranges'
+        verbose_name = 'rango de referencia'
+        verbose_name_plural = 'rangos de referencia'
+        ordering = ['exam_type', 'sex', 'age_min_days']
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(age_max_days__isnull=True) | models.Q(age_max_days__gt=models.F('age_min_days')),
+                name='reference_range_age_band',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.exam_type_id} {self.sex or "*"} [{self.age_min_days}, {self.age_max_days or "∞"})'
+
+    def clean(self):
+        same_scope = ReferenceRange.objects.filter(
+            exam_type_id=self.exam_type_id,
+            sex=self.sex,
+            branch_id=self.branch_id,
+            analyzer=self.analyzer,
+            is_active=True,
+        ).exclude(pk=self.pk)
+        overlapping = same_scope.filter(
+            models.Q(age_max_days__isnull=True) | models.Q(age_max_days__gt=self.age_min_days)
+        )
+        if self.age_max_days is not None:
+            overlapping = overlapping.filter(age_min_days__lt=self.age_max_days)
+        if self.is_active and overlapping.exists():
+            raise ValidationError('La banda de edad se superpone con otro rango del mismo alcance.')
+
+
+class UnitConversion(models.Model):
+    """
+    value_in_to_unit = value_in_from_unit * factor.
+
+    Analyte-specific factors (glucose mg/dL -> mmol/L depends on molar
+    mass) set exam_type; generic ones (g/dL -> g/L) leave it empty. The
+    inverse direction is derived automatically.
+
+    Fields:
+    - exam_type: Analyte the factor applies to (null: any)
+    - from_unit / to_unit: Units as written on results
+    - factor: Multiplier
+    """
+
+    exam_type = models.ForeignKey(
+        'exams.ExamType',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='unit_conversions',
+        verbose_name='examen'
+    )
+
+    from_unit = models.CharField('unidad de origen', max_length=20)
+
+    to_unit = models.CharField('unidad de destino', max_length=20)
+
+    factor = models.DecimalField('factor', max_digits=18, decimal_places=8)
+
+    class Meta:
+        db_table = 'unit_conversions'
+        verbose_name = 'conversión de unidades'
+        verbose_name_plural = 'conversiones de unidades'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['exam_type', 'from_unit', 'to_unit'],
+                name='unique_unit_conversion',
+            ),
+            models.UniqueConstraint(
+                fields=['from_unit', 'to_unit'],
+                condition=models.Q(exam_type__isnull=True),
+                name='unique_generic_unit_conversion',
+            ),
+            models.CheckConstraint(check=models.Q(factor__gt=0), name='unit_conversion_factor_positive'),
+        ]
+
+    def __str__(self):
+        return f'{self.from_unit} -> {self.to_unit} x{self.factor}'
+
+
+class DeltaCheckRule(models.Model):
+    """
+    Largest plausible change of an exam between two results of a patient.
+
+    A new numeric result fails the delta check when it differs from the
+    patient's previous result of the same exam (within window_days) by
+    more than absolute_limit, or by more than percent_limit percent of
+    the previous value. Either limit may be left empty.
+
+    Fields:
+    - exam_type: Exam the rule applies to
+    - absolute_limit: Largest change in the exam's reporting unit
+    - percent_limit: Largest change relative to the previous value (%)
+    - window_days: Older previous results are not compared
+    """
+
+    exam_type = models.OneToOneField(
+        'exams.ExamType',
+        on_delete=models.CASCADE,
+        related_name='delta_rule',
+        verbose_name='examen'
+    )
+
+    absolute_limit = models.DecimalField(
+        'límite absoluto', max_digits=12, decimal_places=4, null=True, blank=True
+    )
+
+    percent_limit = models.DecimalField(
+        'límite porcentual', max_digits=7, decimal_places=2, null=True, blank=True
+    )
+
+    window_days = models.PositiveIntegerField(
+        'ventana (días)',
+        default=30,
+        help_text='Antigüedad máxima del resultado anterior a comparar'
+    )
+
+    is_active = models.BooleanField('activo', default=True)
+
+    # Timestamps
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'delta_check_rules'
+        verbose_name = 'regla de delta check'
+        verbose_name_plural = 'reglas de delta check'
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(absolute_limit__isnull=False) | models.Q(percent_limit__isnull=False),
+                name='delta_check_rule_has_limit',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Delta {self.exam_type_id}: ±{self.absolute_limit} / ±{self.percent_limit}%'
+
+
+class AutoverificationRule(models.Model):
+    """
+    Conditions under which a result of an exam is released without review.
+
+    A numeric result is auto-verified when every condition holds:
+    - the value is within [low_limit, high_limit] (either may be open)
+    - it is not flagged abnormal, unless allow_abnormal
+    - it passed the delta check, unless require_delta_pass is off
+    - the instrument reported none of blocking_flags
+    - QC was not reported failed, unless require_qc is off
+
+    The rule with no exam_type is the default for exams without their own
+    rule; exams without any rule always go to review. Rules are compiled
+    into a decision table (see autoverify.py).
+
+    Fields:
+    - exam_type: Exam the rule applies to (null: default rule)
+    - low_limit / high_limit: Auto-verification limits, reporting unit
+    - allow_abnormal: Release values outside the reference interval
+    - require_delta_pass: Hold results that fail the delta check
+    - require_qc: Hold results while QC is failed
+    - blocking_flags: Instrument flag codes that hold a result
+    """
+
+    exam_type = models.OneToOneField(
+        'exams.ExamType',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='autoverification_rule',
+        verbose_name='examen'
+    )
+
+    low_limit = models.DecimalField(
+        'límite inferior', max_digits=12, decimal_places=4, null=True, blank=True
+    )
+
+    high_limit = models.DecimalField(
+        'límite superior', max_digits=12, decimal_places=4, null=True, blank=True
+    )
+
+    allow_abnormal = models.BooleanField(
+        'liberar anormales',
+        default=False,
+        help_text='Liberar valores fuera del rango de referencia'
+    )
+
+    require_delta_pass = models.BooleanField('exigir delta check', default=True)
+
+    require_qc = models.BooleanField('exigir control de calidad', default=True)
+
+    blocking_flags = models.JSONField(
+        'banderas bloqueantes',
+        default=list,
+        blank=True,
+        help_text='Códigos de banderas del equipo que impiden la liberación automática'
+    )
+
+    is_active = models.BooleanField('activo', default=True)
+
+    # Timestamps
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'autoverification_rules'
+        verbose_name = 'regla de autoverificación'
+        verbose_name_plural = 'reglas de autoverificación'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['is_active'],
+                condition=models.Q(exam_type__isnull=True, is_active=True),
+                name='unique_default_autoverification_rule',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Autoverificación {self.exam_type_id or "por defecto"}'
+
+
+class CriticalValueRule(models.Model):
+    """
+    Critical (panic) limits of an exam: results beyond them must reach the
+    ordering side immediately and be acknowledged (see critical.py).
+
+    Fields:
+    - exam_type: Exam the limits apply to
+    - critical_low / critical_high: Limits in the reporting unit (either
+      may be open); a value below low or above high is critical
+    """
+
+    exam_type = models.OneToOneField(
+        'exams.ExamType',
+        on_delete=models.CASCADE,
+        related_name='critical_rule',
+        verbose_name='examen'
+    )
+
+    critical_low = models.DecimalField(
+        'crítico inferior', max_digits=12, decimal_places=4, null=True, blank=True
+    )
+
+    critical_high = models.DecimalField(
+        'crítico superior', max_digits=12, decimal_places=4, null=True, blank=True
+    )
+
+    is_active = models.BooleanField('activo', default=True)
+
+    # Timestamps
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'critical_value_rules'
+        verbose_name = 'valor crítico'
+        verbose_name_plural = 'valores críticos'
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(critical_low__isnull=False) | models.Q(critical_high__isnull=False),
+                name='critical_value_rule_has_limit',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Crítico {self.exam_type_id}: <{self.critical_low} / >{self.critical_high}'
+
+
+class CriticalAlert(models.Model):
+    """
+    A critical result, tracked until someone acknowledges it.
+
+    Alerts are written in the result's transaction (the database is the
+    source of truth) and pushed through a Redis stream to the alert
+    worker, which delivers them live and escalates them while they stay
+    unacknowledged (see critical.py).
+
+    Fields:
+    - result / order / patient / exam_type: What is critical
+    - root_branch: Branch that ordered the exam (the ordering side)
+    - branch: Branch that produced the result
+    - notify_user: User who created the order
+    - value / flag / threshold: Critical value, 'L' or 'H', limit crossed
+    - escalation_level: Times the alert was escalated
+    - escalate_at: Next escalation (null once the alert is closed or
+      fully escalated)
+    - delivered_at: First live delivery by the alert worker
+    - acknowledged_by / acknowledged_at: Who took notice, and when
+    - superseded_at: Closed because the result was re-submitted (a new
+      alert is raised if the new value is still critical); acknowledged_at
+      is set too, acknowledged_by stays empty
+    """
+
+    result = models.ForeignKey(
+        ExamResult,
+        on_delete=models.CASCADE,
+        related_name='critical_alerts',
+        verbose_name='resultado'
+    )
+
+    order = models.ForeignKey(
+        'exams.ExamOrder',
+        on_delete=models.CASCADE,
+        related_name='critical_alerts',
+        verbose_name='orden'
+    )
+
+    patient = models.ForeignKey(
+        'patients.Patient',
+        on_delete=models.PROTECT,
+        related_name='critical_alerts',
+        verbose_name='paciente'
+    )
+
+    exam_type = models.ForeignKey(
+        'exams.ExamType',
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name='examen'
+    )
+
+    root_branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name='sucursal de origen'
+    )
+
+    branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name='sucursal del resultado'
+    )
+
+    notify_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='usuario a notificar'
+    )
+
+    value = models.FloatField('valor')
+
+    flag = models.CharField('indicador', max_length=1, choices=ExamResult.FLAG_CHOICES[1:])
+
+    threshold = models.FloatField('límite crítico')
+
+    escalation_level = models.PositiveSmallIntegerField('nivel de escalamiento', default=0)
+
+    escalate_at = models.DateTimeField('escalar en', null=True, blank=True)
+
+    delivered_at = models.DateTimeField('entregada en', null=True, blank=True)
+
+    acknowledged_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='confirmada por'
+    )
+
+    acknowledged_at = models.DateTimeField('confirmada en', null=True, blank=True)
+
+    superseded_at = models.DateTimeField('reemplazada en', null=True, blank=True)
+
+    created_at = models.DateTimeField('creada en', default=timezone.now)
+
+    class Meta:
+        db_table = 'critical_alerts'
+        verbose_name = 'alerta de valor crítico'
+        verbose_name_plural = 'alertas de valores críticos'
+        ordering = ['-created_at']
+        indexes = [
+            # Escalation timer: due unacknowledged alerts
+            models.Index(
+                fields=['escalate_at'],
+                condition=models.Q(acknowledged_at__isnull=True),
+                name='critical_alerts_escalate_idx',
+            ),
+            # Pending-acknowledgement lists per branch
+            models.Index(
+                fields=['root_branch', 'created_at'],
+                condition=models.Q(acknowledged_at__isnull=True),
+                name='critical_alerts_pending_idx',
+            ),
+            models.Index(
+                fields=['branch', 'created_at'],
+                condition=models.Q(acknowledged_at__isnull=True),
+                name='critical_alerts_lab_idx',
+            ),
+            # Re-queue sweep for alerts whose enqueue was lost
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(delivered_at__isnull=True),
+                name='critical_alerts_undeliv_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Crítico {self.exam_type_id} = {self.value} ({self.flag}) orden {self.order_id}'
+
+
+class QCLot(models.Model):
+    """
+    Lot of a quality control material for an exam on an analyzer.
+
+    Control values are judged by their z-score against the lot's target
+    mean and SD (Levey-Jennings). Lots of every level of an exam and
+    analyzer form one QC series for the Westgard rules (see qc.py).
+
+    Fields:
+    - exam_type / analyzer: Analyte and instrument controlled ('' for
+      manual methods)
+    - lot_number / level: Material lot and concentration level
+    - target_mean / target_sd: Established mean and SD of the lot
+    - expires_on: Runs of expired lots are rejected
+    """
+
+    exam_type = models.ForeignKey(
+        'exams.ExamType',
+        on_delete=models.CASCADE,
+        related_name='qc_lots',
+        verbose_name='examen'
+    )
+
+    analyzer = models.CharField('equipo', max_length=50, blank=True)
+
+    lot_number = models.CharField('lote', max_length=50)
+
+    level = models.PositiveSmallIntegerField('nivel', default=1)
+
+    target_mean = models.DecimalField('media', max_digits=12, decimal_places=4)
+
+    target_sd = models.DecimalField('desviación estándar', max_digits=12, decimal_places=4)
+
+    expires_on = models.DateField('vence el', null=True, blank=True)
+
+    is_active = models.BooleanField('activo', default=True)
+
+    # Timestamps
+    created_at = models.DateTimeField('creado en', auto_now_add=True)
+    updated_at = models.DateTimeField('actualizado en', auto_now=True)
+
+    class Meta:
+        db_table = 'qc_lots'
+        verbose_name = 'lote de control'
+        verbose_name_plural = 'lotes de control'
+        ordering = ['exam_type', 'analyzer', 'level']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['exam_type', 'analyzer', 'lot_number', 'level'],
+                name='qc_lot_unique',
+            ),
+            models.CheckConstraint(check=models.Q(target_sd__gt=0), name='qc_lot_sd_positive'),
+        ]
+
+    def __str__(self):
+        return f'QC {self.exam_type_id} {self.analyzer or "manual"} lote {self.lot_number} N{self.level}'
+
+
+class QCRun(models.Model):
+    """
+    One measurement of a control material.
+
+    Fields:
+    - lot: Control lot measured
+    - value: Measured value, in the lot's unit
+    - z_score: (value - target_mean) / target_sd
+    - violations: Westgard rules violated, e.g. ['1-2s', '2-2s']
+    - is_rejected: A rejection rule (any but 1-2s) was violated
+    - measured_at: Time of the measurement
+    """
+
+    lot = models.ForeignKey(
+        QCLot,
+        on_delete=models.CASCADE,
+        related_name='runs',
+        verbose_name='lote'
+    )
+
+    value = models.FloatField('valor')
+
+    z_score = models.FloatField('z')
+
+    violations = models.JSONField('reglas violadas', default=list, blank=True)
+
+    is_rejected = models.BooleanField('rechazada', default=False)
+
+    measured_at = models.DateTimeField('medida en', default=timezone.now)
+
+    performed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='realizada por'
+    )
+
+    created_at = models.DateTimeField('creada en', auto_now_add=True)
+
+    class Meta:
+        db_table = 'qc_runs'
+        verbose_name = 'corrida de control'
+        verbose_name_plural = 'corridas de control'
+        ordering = ['-measured_at']
+        indexes = [
+            # Levey-Jennings charts and the QC history read by qc.py
+            models.Index(fields=['lot', 'measured_at'], name='qc_runs_lot_time_idx'),
+            models.Index(fields=['measured_at'], name='qc_runs_time_idx'),
+        ]
+
+    def __str__(self):
+        return f'QC lote {self.lot_id} = {self.value} ({self.measured_at:%Y-%m-%d %H:%M})'
+
+
+class UndeliveredResult(models.Model):
+    """
+    An instrument result the listener acknowledged but could not write.
+
+    Instruments get their ACK as soon as a message is read, before the
+    batch is written; results that then fail to match an open order, are
+    rejected by validation or are lost in a failed write are kept here
+    until they are re-processed (manage.py reprocess_instrument_results).
+
+    Fields:
+    - barcode / test_code / value / unit / flags / analyzer: The result as
+      sent by the instrument
+    - reason: Why it was not written
+    - error: Last error message
+    - attempts: Re-processing attempts so far
+    - resolved_at: When it was finally written (null while pending)
+    """
+
+    REASON_CHOICES = [
+        ('unmatched', 'Sin orden abierta'),
+        ('rejected', 'Rechazado por validación'),
+        ('failed', 'Error al guardar'),
+    ]
+
+    # Text columns: the result is kept exactly as received, whatever its length
+    barcode = models.TextField('código de muestra')
+
+    test_code = models.TextField('código de prueba')
+
+    value = models.TextField('valor', blank=True)
+
+    unit = models.TextField('unidad', blank=True)
+
+    flags = models.JSONField('indicadores', default=list, blank=True)
+
+    analyzer = models.TextField('equipo', blank=True)
+
+    reason = models.CharField('motivo', max_length=20, choices=REASON_CHOICES)
+
+    error = models.TextField('error', blank=True)
+
+    attempts = models.PositiveSmallIntegerField('reintentos', default=0)
+
+    received_at = models.DateTimeField('recibido en', default=timezone.now)
+
+    resolved_at = models.DateTimeField('resuelto en', null=True, blank=True)
+
+    class Meta:
+        db_table = 'undelivered_results'
+        verbose_name = 'resultado de equipo no registrado'
+        verbose_name_plural = 'resultados de equipo no registrados'
+        ordering = ['received_at']
+        indexes = [
+            # Pending list and re-processing, oldest first
+            models.Index(
+                fields=['received_at'],
+                condition=models.Q(resolved_at__isnull=True),
+                name='undelivered_pending_idx',
+            ),
+        ]
 
-# Create your models here.
+    def __str__(self):
+        return f'{self.barcode} {self.test_code} = {self.value} ({self.get_reason_display()})'
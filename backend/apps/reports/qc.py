@@ -0,0 +1,394 @@
+"""
+Quality Control
+===============
+
+Levey-Jennings statistics and Westgard rules over QC runs, and the
+in-control state of each analyte on each analyzer.
+
+A QC series is every run of an exam on an analyzer (all levels and
+lots), in measurement order. Each run becomes a z-score against its
+lot's target mean and SD, and the rules are evaluated on the z-scores:
+
+    1-2s  one run beyond 2 SD (warning only)
+    1-3s  one run beyond 3 SD
+    2-2s  two consecutive runs beyond 2 SD on the same side
+    R-4s  two consecutive runs beyond 2 SD on opposite sides
+    4-1s  four consecutive runs beyond 1 SD on the same side
+    10x   ten consecutive runs on the same side of the mean
+
+Evaluation is one pass over all series at once: runs are sorted by
+(series, time) into flat arrays, each rule is a sliding-window test over
+a boolean array, and a window only counts when its first and last runs
+belong to the same series (series are contiguous, so the whole window
+does):
+
+    window = sliding_window_view(z > 2, 2).all(axis=1) & (series[1:] == series[:-1])
+
+An analyte is in control while the latest run of each of its control
+levels violates no rejection rule, and its latest run is at most
+VALIDITY_HOURS old: a rejected level keeps the analyte out of control
+until that level is re-run in control, whatever the other levels do. The states are compiled per process
+into a dict keyed by (analyzer, exam_type_id), so result release checks
+one with a dict probe (QCStates.failed). Recording runs or changing
+lots bumps VERSION_KEY (signals.py) and every process reloads its states
+on the next check, throttled like the catalog's.
+"""
+import threading
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from numpy.lib.stride_tricks import sliding_window_view
+
+from apps.common.exceptions import BusinessRuleError
+from apps.exams.catalog import VERSION_CHECK_INTERVAL
+from .models import QCLot, QCRun
+
+VERSION_KEY = 'qc_version'
+
+RULE_1_2S = 1
+RULE_1_3S = 2
+RULE_2_2S = 4
+RULE_R_4S = 8
+RULE_4_1S = 16
+RULE_10X = 32
+
+# Rule codes stored on runs, in bit order
+RULES = (
+    (RULE_1_2S, '1-2s'),
+    (RULE_1_3S, '1-3s'),
+    (RULE_2_2S, '2-2s'),
+    (RULE_R_4S, 'R-4s'),
+    (RULE_4_1S, '4-1s'),
+    (RULE_10X, '10x'),
+)
+
+# 1-2s only warns
+REJECTION_RULES = RULE_1_3S | RULE_2_2S | RULE_R_4S | RULE_4_1S | RULE_10X
+
+# Longest rule window (10x); runs older than HISTORY_DAYS are not evaluated
+LONGEST_RULE = 10
+HISTORY_DAYS = 90
+
+VALIDITY_HOURS = 24
+
+MAX_RUNS_PER_SUBMISSION = 200
+
+DEFAULT_CHART_DAYS = 30
+MAX_CHART_DAYS = 365
+
+# in_control: the latest run of every level passed the rejection rules
+# run_id / measured_at / violations: latest rejected level run if out of
+# control, else latest run (None / () if there is no run)
+QCState = namedtuple('QCState', ['in_control', 'run_id', 'measured_at', 'violations'])
+
+# Runs of a submission: lot id, measured value, measurement time
+QCEntry = namedtuple('QCEntry', ['lot_id', 'value', 'measured_at'])
+
+
+def rule_codes(mask):
+    """Rule codes of a violation mask, in bit order."""
+    return [code for bit, code in RULES if mask & bit]
+
+
+def _consecutive(condition, series, length):
+    """Whether each run ends `length` consecutive runs of its series meeting `condition`."""
+    hits = np.zeros(len(condition), dtype=bool)
+    if len(condition) >= length:
+        hits[length - 1:] = (
+            sliding_window_view(condition, length).all(axis=1)
+            & (series[length - 1:] == series[:len(series) - length + 1])
+        )
+    return hits
+
+
+def westgard(series, z):
+    """
+    Westgard violation masks of runs.
+
+    Args:
+        series: Int array, series of each run; runs sorted by (series, time)
+        z: Float array, z-score of each run
+
+    Returns:
+        NumPy int array of violation masks
+    """
+    series = np.asarray(series)
+    z = np.asarray(z, dtype=float)
+    masks = np.zeros(len(z), dtype=np.int64)
+    if not len(z):
+        return masks
+
+    above2, below2 = z > 2, z < -2
+    masks |= RULE_1_2S * (above2 | below2)
+    masks |= RULE_1_3S * (np.abs(z) > 3)
+    masks |= RULE_2_2S * (_consecutive(above2, series, 2) | _consecutive(below2, series, 2))
+
+    opposite = np.zeros(len(z), dtype=bool)
+    opposite[1:] = ((above2[1:] & below2[:-1]) | (below2[1:] & above2[:-1])) & (series[1:] == series[:-1])
+    masks |= RULE_R_4S * opposite
+
+    masks |= RULE_4_1S * (_consecutive(z > 1, series, 4) | _consecutive(z < -1, series, 4))
+    masks |= RULE_10X * (_consecutive(z > 0, series, LONGEST_RULE) | _consecutive(z < 0, series, LONGEST_RULE))
+    return masks
+
+
+def evaluate(rows):
+    """
+    Evaluate QC history in one pass.
+
+    Args:
+        rows: Sequence of (run_id, exam_type_id, analyzer, value, target_mean,
+            target_sd, measured_at, level), sorted by (exam_type_id,
+            analyzer, measured_at, run_id)
+
+    Returns:
+        (z-scores array, violation masks array, {(analyzer, exam_type_id): QCState})
+    """
+    if not rows:
+        return np.zeros(0), np.zeros(0, dtype=np.int64), {}
+    keys = [(analyzer, exam_type_id) for _, exam_type_id, analyzer, *_ in rows]
+    starts = np.array([index == 0 or keys[index] != keys[index - 1] for index in range(len(keys))])
+    series = np.cumsum(starts)
+
+    values = np.array([row[3] for row in rows], dtype=float)
+    means = np.array([row[4] for row in rows], dtype=float)
+    sds = np.array([row[5] for row in rows], dtype=float)
+    z = (values - means) / sds
+    masks = westgard(series, z)
+
+    # The latest run of each level decides; a rejected level wins over
+    # later passing runs of other levels
+    latest_of_level = {(keys[index], row[7]): index for index, row in enumerate(rows)}
+    decisive = {}
+    for (key, _), index in latest_of_level.items():
+        current = decisive.get(key)
+        rejected = bool(masks[index] & REJECTION_RULES)
+        if current is None or (rejected, index) > (bool(masks[current] & REJECTION_RULES), current):
+            decisive[key] = index
+    states = {}
+    for key, index in decisive.items():
+        mask = int(masks[index])
+        states[key] = QCState(
+            in_control=not mask & REJECTION_RULES,
+            run_id=rows[index][0],
+            measured_at=rows[index][6],
+            violations=tuple(rule_codes(mask)),
+        )
+    return z, masks, states
+
+
+def _history(exam_type_ids=None, now=None):
+    """QC runs of active lots within HISTORY_DAYS, in evaluation order."""
+    now = now or timezone.now()
+    queryset = QCRun.objects.filter(lot__is_active=True, measured_at__gte=now - timedelta(days=HISTORY_DAYS))
+    if exam_type_ids is not None:
+        queryset = queryset.filter(lot__exam_type_id__in=exam_type_ids)
+    return list(
+        queryset.order_by('lot__exam_type_id', 'lot__analyzer', 'measured_at', 'id').values_list(
+            'id', 'lot__exam_type_id', 'lot__analyzer', 'value',
+            'lot__target_mean', 'lot__target_sd', 'measured_at', 'lot__level',
+        )
+    )
+
+
+class QCStates:
+    """
+    Compiled in-control states.
+
+    Args:
+        version: Version the states were built for
+        states: {(analyzer, exam_type_id): QCState}; analytes with active
+            lots but no recent run are out of control
+    """
+
+    def __init__(self, version, states=None):
+        self.version = version
+        self.states = states or {}
+
+    def get(self, analyzer, exam_type_id):
+        """State of an analyte on an analyzer, else of its manual method, else None."""
+        state = self.states.get((analyzer or '', exam_type_id))
+        if state is None and analyzer:
+            state = self.states.get(('', exam_type_id))
+        return state
+
+    def failed(self, analyzer, exam_type_id, now):
+        """Whether QC blocks releasing a result (analytes without QC lots never do)."""
+        state = self.get(analyzer, exam_type_id)
+        if state is None:
+            return False
+        return not state.in_control or now - state.measured_at > timedelta(hours=VALIDITY_HOURS)
+
+
+def current_version():
+    """Read the QC version from Redis (0 if never bumped)."""
+    return cache.get(VERSION_KEY, 0)
+
+
+def bump_version():
+    """Invalidate every process's QC states; returns the new version."""
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        if cache.add(VERSION_KEY, 1, timeout=None):
+            return 1
+        return cache.incr(VERSION_KEY)
+
+
+def invalidate_on_commit():
+    """Bump the version once the current transaction commits."""
+    transaction.on_commit(bump_version)
+
+
+def _load(version):
+    _, _, states = evaluate(_history())
+    no_runs = QCState(in_control=False, run_id=None, measured_at=None, violations=())
+    for key in QCLot.objects.filter(is_active=True).values_list('analyzer', 'exam_type_id').distinct():
+        states.setdefault(key, no_runs)
+    return QCStates(version, states)
+
+
+_lock = threading.Lock()
+_state = {'states': None, 'checked_at': 0.0, 'version': 0}
+
+
+def get_qc_states():
+    """Return the in-control states, reloading them after QC changes."""
+    now = time.monotonic()
+    if now - _state['checked_at'] >= VERSION_CHECK_INTERVAL:
+        _state['version'] = current_version()
+        _state['checked_at'] = now
+
+    states = _state['states']
+    if states is None or states.version != _state['version']:
+        with _lock:
+            states = _state['states']
+            if states is None or states.version != _state['version']:
+                states = _load(_state['version'])
+                _state['states'] = states
+    return states
+
+
+def clear_local_cache():
+    """Drop this process's states (tests, shell sessions)."""
+    with _lock:
+        _state['states'] = None
+        _state['checked_at'] = 0.0
+
+
+def record_runs(entries, user, now=None):
+    """
+    Record QC runs and re-evaluate the Westgard rules of their series.
+
+    Stored violations of every run in the affected series are refreshed,
+    so runs entered late are judged in measurement order.
+
+    Args:
+        entries: Iterable of QCEntry
+        user: User recorded as performer
+
+    Returns:
+        (list of created QCRun, {(analyzer, exam_type_id): QCState} of the
+        affected series)
+
+    Raises:
+        BusinessRuleError: unknown, inactive or expired lots (details.errors
+            by index); nothing is written
+    """
+    now = now or timezone.now()
+    entries = list(entries)
+    lot_ids = {entry.lot_id for entry in entries}
+    exam_type_ids = set(QCLot.objects.filter(id__in=lot_ids).values_list('exam_type_id', flat=True))
+
+    with transaction.atomic():
+        # Every lot of the affected exams is locked (in id order), so
+        # concurrent submissions to a series are evaluated one after the
+        # other, each seeing the other's runs
+        locked = QCLot.objects.select_for_update().filter(exam_type_id__in=exam_type_ids).order_by('id')
+        lots = {lot.id: lot for lot in locked if lot.id in lot_ids}
+        errors = {}
+        for index, entry in enumerate(entries):
+            lot = lots.get(entry.lot_id)
+            if lot is None or not lot.is_active:
+                errors[index] = 'El lote de control no existe o está inactivo.'
+            elif lot.expires_on and timezone.localdate(entry.measured_at) > lot.expires_on:
+                errors[index] = 'El lote de control está vencido.'
+            elif entry.measured_at > now:
+                errors[index] = 'La fecha de medición está en el futuro.'
+        if errors:
+            raise BusinessRuleError(
+                'Algunas corridas de control no son válidas.', code='invalid_qc_runs', details={'errors': errors}
+            )
+
+        runs = QCRun.objects.bulk_create([
+            QCRun(
+                lot=lots[entry.lot_id],
+                value=entry.value,
+                z_score=(entry.value - float(lots[entry.lot_id].target_mean)) / float(lots[entry.lot_id].target_sd),
+                measured_at=entry.measured_at,
+                performed_by=user,
+            )
+            for entry in entries
+        ])
+
+        affected = {(lot.analyzer, lot.exam_type_id) for lot in lots.values()}
+        rows = [
+            row for row in _history({exam_type_id for _, exam_type_id in affected}, now)
+            if (row[2], row[1]) in affected
+        ]
+        z, masks, states = evaluate(rows)
+        stored = dict(
+            QCRun.objects.filter(id__in=[row[0] for row in rows]).values_list('id', 'violations')
+        )
+        created = {run.id: run for run in runs}
+        changed = []
+        for row, z_score, mask in zip(rows, z.tolist(), masks.tolist()):
+            violations = rule_codes(mask)
+            run = created.get(row[0])
+            if run is None:
+                if stored.get(row[0]) == violations:
+                    continue
+                run = QCRun(id=row[0])
+            run.z_score = z_score
+            run.violations = violations
+            run.is_rejected = bool(mask & REJECTION_RULES)
+            changed.append(run)
+        if changed:
+            QCRun.objects.bulk_update(changed, ['z_score', 'violations', 'is_rejected'])
+        invalidate_on_commit()
+    return runs, {key: states[key] for key in affected if key in states}
+
+
+def levey_jennings(lot, since):
+    """
+    Levey-Jennings chart of a lot: target lines and runs since a time.
+
+    Returns:
+        Dict with mean, sd, the ±1/2/3 SD limits and points
+        [[timestamp_ms, value, z_score, violations]], oldest first
+    """
+    mean, sd = float(lot.target_mean), float(lot.target_sd)
+    points = [
+        [int(measured_at.timestamp() * 1000), value, z_score, violations]
+        for measured_at, value, z_score, violations in lot.runs.filter(measured_at__gte=since)
+        .order_by('measured_at', 'id')
+        .values_list('measured_at', 'value', 'z_score', 'violations')
+    ]
+    values = np.array([point[1] for point in points], dtype=float)
+    return {
+        'lot_id': lot.id,
+        'exam_type_id': lot.exam_type_id,
+        'analyzer': lot.analyzer,
+        'level': lot.level,
+        'mean': mean,
+        'sd': sd,
+        'limits': {f'{k}s': [mean - k * sd, mean + k * sd] for k in (1, 2, 3)},
+        'observed_mean': float(values.mean()) if len(values) else None,
+        'observed_sd': float(values.std(ddof=1)) if len(values) > 1 else None,
+        'points': points,
+    }
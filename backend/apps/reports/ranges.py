@@ -0,0 +1,260 @@
+"""
+Reference Range Engine
+======================
+
+Compiled, per-process view of every reference interval and unit
+conversion factor, for abnormal flagging and reporting.
+
+Compilation groups ReferenceRange rows by scope
+(exam type, sex, branch, analyzer) into age-sorted parallel lists:
+
+    starts = [0, 365, 6570]     age_min_days
+    ends   = [365, 6570, None]  age_max_days (exclusive, None = open)
+    ranges = [Interval, Interval, Interval]
+
+A lookup tries the scopes from most to least specific (analyzer, then
+branch, then sex) and bisects the age inside the first scope that has
+ranges; exams without a matching range use the exam type's default
+interval from the catalog. A lookup is a few dict probes plus one bisect,
+so a whole panel resolves in microseconds
+(`manage.py benchmark_reference_ranges`).
+
+Unit conversion factors are compiled into a dict keyed by
+(exam type or None, from unit, to unit), inverses included. Active
+delta check rules (delta.py) and critical limits (critical.py) become
+dicts keyed by exam type, so their lookup is O(1) per analyte.
+
+Invalidation: saving a range, a conversion or a rule bumps VERSION_KEY in Redis
+(signals.py); the engine is also rebuilt when the catalog version
+changes, since default intervals come from it. Both checks are
+throttled like the catalog's.
+"""
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.exams.catalog import get_catalog, VERSION_CHECK_INTERVAL
+
+VERSION_KEY = 'reference_ranges_version'
+
+FLAG_LOW = 'L'
+FLAG_HIGH = 'H'
+FLAG_NORMAL = ''
+
+SEX_ANY = ''
+
+# low / high are floats (None when open), unit as written on the range
+Interval = namedtuple('Interval', ['low', 'high', 'unit'])
+
+OPEN_INTERVAL = Interval(None, None, '')
+
+# absolute / percent are floats (None when not limited)
+DeltaRule = namedtuple('DeltaRule', ['absolute', 'percent', 'window_days'])
+
+
+def _float(value):
+    return None if value is None else float(value)
+
+
+def _unit_key(unit):
+    return (unit or '').strip().lower()
+
+
+def age_in_days(date_of_birth, on_date):
+    """Age in whole days on a date (0 for dates before birth)."""
+    return max((on_date - date_of_birth).days, 0)
+
+
+class ReferenceEngine:
+    """
+    Immutable compiled reference data.
+
+    Args:
+        version: Opaque version tuple the engine was built for
+        defaults: {exam_type_id: Interval} default intervals
+        ranges: Iterable of dicts with ReferenceRange values
+        conversions: Iterable of (exam_type_id or None, from_unit, to_unit, factor)
+        delta_rules: Iterable of (exam_type_id, absolute_limit, percent_limit, window_days)
+        critical_rules: Iterable of (exam_type_id, critical_low, critical_high)
+    """
+
+    def __init__(self, version, defaults, ranges=(), conversions=(), delta_rules=(), critical_rules=()):
+        self.version = version
+        self.defaults = dict(defaults)
+
+        grouped = defaultdict(list)
+        for row in ranges:
+            key = (row['exam_type_id'], row['sex'] or SEX_ANY, row['branch_id'], row['analyzer'] or '')
+            grouped[key].append(row)
+
+        self.bands = {}
+        for key, rows in grouped.items():
+            rows.sort(key=lambda row: row['age_min_days'])
+            self.bands[key] = (
+                [row['age_min_days'] for row in rows],
+                [row['age_max_days'] for row in rows],
+                [Interval(_float(row['low']), _float(row['high']), row['unit']) for row in rows],
+            )
+        # Exams with any specific range; the rest go straight to defaults
+        self.scoped = {key[0] for key in self.bands}
+
+        self.factors = {}
+        for exam_type_id, from_unit, to_unit, factor in conversions:
+            forward = (exam_type_id, _unit_key(from_unit), _unit_key(to_unit))
+            backward = (exam_type_id, _unit_key(to_unit), _unit_key(from_unit))
+            self.factors[forward] = float(factor)
+            self.factors.setdefault(backward, 1 / float(factor))
+
+        self.delta_rules = {
+            exam_type_id: DeltaRule(_float(absolute), _float(percent), window_days)
+            for exam_type_id, absolute, percent, window_days in delta_rules
+        }
+        self.critical_limits = {
+            exam_type_id: (_float(low), _float(high))
+            for exam_type_id, low, high in critical_rules
+        }
+
+    def lookup(self, exam_type_id, sex=SEX_ANY, age_days=0, branch_id=None, analyzer=''):
+        """Most specific Interval for an exam and patient context."""
+        if exam_type_id in self.scoped:
+            for analyzer_key in ((analyzer, '') if analyzer else ('',)):
+                for branch_key in ((branch_id, None) if branch_id is not None else (None,)):
+                    for sex_key in ((sex, SEX_ANY) if sex else (SEX_ANY,)):
+                        bands = self.bands.get((exam_type_id, sex_key, branch_key, analyzer_key))
+                        if bands is None:
+                            continue
+                        starts, ends, intervals = bands
+                        index = bisect_right(starts, age_days) - 1
+                        if index >= 0 and (ends[index] is None or age_days < ends[index]):
+                            return intervals[index]
+        return self.defaults.get(exam_type_id, OPEN_INTERVAL)
+
+    def lookup_many(self, exam_type_ids, sex=SEX_ANY, age_days=0, branch_id=None, analyzer=''):
+        """Intervals for a panel of exams sharing one patient context."""
+        return [self.lookup(pk, sex, age_days, branch_id, analyzer) for pk in exam_type_ids]
+
+    def factor(self, exam_type_id, from_unit, to_unit):
+        """Multiplier from one unit to another, or None if unknown."""
+        source, target = _unit_key(from_unit), _unit_key(to_unit)
+        if source == target:
+            return 1.0
+        factor = self.factors.get((exam_type_id, source, target))
+        if factor is None:
+            factor = self.factors.get((None, source, target))
+        return factor
+
+    def convert(self, value, exam_type_id, from_unit, to_unit):
+        """Convert a value, or return None if no factor is known."""
+        factor = self.factor(exam_type_id, from_unit, to_unit)
+        return None if factor is None or value is None else value * factor
+
+    def critical(self, exam_type_id, value):
+        """('L' or 'H', limit crossed) if a value is critical, else None."""
+        limits = self.critical_limits.get(exam_type_id)
+        if limits is None or value is None:
+            return None
+        low, high = limits
+        if low is not None and value < low:
+            return FLAG_LOW, low
+        if high is not None and value > high:
+            return FLAG_HIGH, high
+        return None
+
+    @staticmethod
+    def flag(values, intervals):
+        """
+        Flag numeric values against their intervals with array operations.
+
+        Args:
+            values: Sequence of floats (None for qualitative results)
+            intervals: Parallel sequence of Interval
+
+        Returns:
+            List of flags: 'L', 'H' or '' per value
+        """
+        if not len(values):
+            return []
+        numbers = np.array([np.nan if v is None else v for v in values], dtype=float)
+        lows = np.array([np.nan if i.low is None else i.low for i in intervals], dtype=float)
+        highs = np.array([np.nan if i.high is None else i.high for i in intervals], dtype=float)
+        # Comparisons with NaN (open bound or qualitative value) are False
+        flags = np.where(numbers < lows, FLAG_LOW, np.where(numbers > highs, FLAG_HIGH, FLAG_NORMAL))
+        return flags.tolist()
+
+
+def current_version():
+    """Read the reference data version from Redis (0 if never bumped)."""
+    return cache.get(VERSION_KEY, 0)
+
+
+def bump_version():
+    """Invalidate every process's engine; returns the new version."""
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        if cache.add(VERSION_KEY, 1, timeout=None):
+            return 1
+        return cache.incr(VERSION_KEY)
+
+
+def invalidate_on_commit():
+    """Bump the version once the current transaction commits."""
+    transaction.on_commit(bump_version)
+
+
+def _load(version, catalog):
+    from .models import CriticalValueRule, DeltaCheckRule, ReferenceRange, UnitConversion
+
+    defaults = {
+        exam.id: Interval(_float(exam.reference_low), _float(exam.reference_high), exam.unit)
+        for exam in catalog.exams
+    }
+    ranges = ReferenceRange.objects.filter(is_active=True).values(
+        'exam_type_id', 'sex', 'age_min_days', 'age_max_days', 'branch_id', 'analyzer', 'low', 'high', 'unit'
+    )
+    conversions = UnitConversion.objects.values_list('exam_type_id', 'from_unit', 'to_unit', 'factor')
+    delta_rules = DeltaCheckRule.objects.filter(is_active=True).values_list(
+        'exam_type_id', 'absolute_limit', 'percent_limit', 'window_days'
+    )
+    critical_rules = CriticalValueRule.objects.filter(is_active=True).values_list(
+        'exam_type_id', 'critical_low', 'critical_high'
+    )
+    return ReferenceEngine(version, defaults, ranges, conversions, delta_rules, critical_rules)
+
+
+_lock = threading.Lock()
+_state = {'engine': None, 'checked_at': 0.0, 'ranges_version': 0}
+
+
+def get_engine():
+    """
+    Return the reference engine, rebuilding it if ranges, conversions or
+    the catalog changed.
+    """
+    catalog = get_catalog()
+    now = time.monotonic()
+    if now - _state['checked_at'] >= VERSION_CHECK_INTERVAL:
+        _state['ranges_version'] = current_version()
+        _state['checked_at'] = now
+
+    version = (catalog.version, _state['ranges_version'])
+    engine = _state['engine']
+    if engine is None or engine.version != version:
+        with _lock:
+            engine = _state['engine']
+            if engine is None or engine.version != version:
+                engine = _load(version, catalog)
+                _state['engine'] = engine
+    return engine
+
+
+def clear_local_cache():
+    """Drop this process's engine (tests, shell sessions)."""
+    with _lock:
+        _state['engine'] = None
+        _state['checked_at'] = 0.0
@@ -0,0 +1,190 @@
+"""
+Report Serializers
+Serialize exam result data
+"""
+from rest_framework import serializers
+
+from .critical import MAX_PENDING_SIZE
+from .models import CriticalAlert, ExamResult, QCRun
+from .autoverify import MAX_VERIFY_RESULTS
+from .qc import MAX_RUNS_PER_SUBMISSION
+from .services import MAX_RESULTS_PER_SUBMISSION
+
+
+class ResultEntrySerializer(serializers.Serializer):
+    """One result of a submission"""
+    order_item_id = serializers.IntegerField(min_value=1)
+    value = serializers.CharField(max_length=100)
+    detailed_results = serializers.JSONField(required=False, default=dict)
+    unit = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        max_length=20,
+        default='',
+        help_text='Unit the value was entered in, if not the reporting unit'
+    )
+    analyzer = serializers.CharField(required=False, allow_blank=True, max_length=50, default='')
+
+
+class ResultSubmissionSerializer(serializers.Serializer):
+    """All results submitted for an order at once"""
+    results = ResultEntrySerializer(many=True, allow_empty=False, max_length=MAX_RESULTS_PER_SUBMISSION)
+
+
+class ExamResultSerializer(serializers.ModelSerializer):
+    """Stored exam result"""
+    exam_code = serializers.CharField(source='exam_type.code', read_only=True)
+    exam_name = serializers.CharField(source='exam_type.name', read_only=True)
+
+    class Meta:
+        model = ExamResult
+        fields = [
+            'id',
+            'order_item',
+            'order',
+            'patient',
+            'exam_type',
+            'exam_code',
+            'exam_name',
+            'branch',
+            'result_value',
+            'numeric_value',
+            'unit',
+            'reference_low',
+            'reference_high',
+            'is_abnormal',
+            'abnormal_flag',
+            'detailed_results',
+            'analyzer',
+            'previous_result',
+            'previous_value',
+            'delta_failed',
+            'verification_status',
+            'verification_reasons',
+            'verified_by',
+            'verified_at',
+            'performed_by',
+            'performed_at',
+        ]
+        read_only_fields = fields
+
+
+class ReviewQueueSerializer(serializers.ModelSerializer):
+    """Result waiting for review"""
+    exam_code = serializers.CharField(source='exam_type.code', read_only=True)
+    exam_name = serializers.CharField(source='exam_type.name', read_only=True)
+
+    class Meta:
+        model = ExamResult
+        fields = [
+            'id',
+            'order',
+            'order_item',
+            'patient',
+            'exam_code',
+            'exam_name',
+            'branch',
+            'result_value',
+            'unit',
+            'abnormal_flag',
+            'previous_value',
+            'delta_failed',
+            'verification_reasons',
+            'analyzer',
+            'performed_at',
+        ]
+        read_only_fields = fields
+
+
+class VerifyResultsSerializer(serializers.Serializer):
+    """Results signed off from the review queue"""
+    result_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_VERIFY_RESULTS
+    )
+
+
+class CriticalAlertSerializer(serializers.ModelSerializer):
+    """Critical value alert awaiting acknowledgement"""
+    order_number = serializers.CharField(source='order.order_number', read_only=True)
+    patient_name = serializers.CharField(source='patient.full_name', read_only=True)
+    exam_code = serializers.CharField(source='exam_type.code', read_only=True)
+    exam_name = serializers.CharField(source='exam_type.name', read_only=True)
+
+    class Meta:
+        model = CriticalAlert
+        fields = [
+            'id',
+            'result',
+            'order',
+            'order_number',
+            'patient',
+            'patient_name',
+            'exam_code',
+            'exam_name',
+            'root_branch',
+            'branch',
+            'notify_user',
+            'value',
+            'flag',
+            'threshold',
+            'escalation_level',
+            'escalate_at',
+            'delivered_at',
+            'created_at',
+        ]
+        read_only_fields = fields
+
+
+class AcknowledgeAlertsSerializer(serializers.Serializer):
+    """Critical alerts acknowledged at once"""
+    alert_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_PENDING_SIZE
+    )
+
+
+class TrendSeriesSerializer(serializers.Serializer):
+    """Downsampled history of one analyte"""
+    exam_type_id = serializers.IntegerField()
+    unit = serializers.CharField()
+    total = serializers.IntegerField(help_text='Results before downsampling')
+    skipped = serializers.IntegerField(help_text='Results whose unit could not be converted')
+    points = serializers.ListField(
+        child=serializers.ListField(),
+        help_text='[timestamp_ms, value, abnormal_flag], oldest first'
+    )
+
+
+class QCRunEntrySerializer(serializers.Serializer):
+    """One control measurement"""
+    lot_id = serializers.IntegerField(min_value=1)
+    value = serializers.FloatField()
+    measured_at = serializers.DateTimeField(required=False)
+
+
+class QCRunSubmissionSerializer(serializers.Serializer):
+    """Control measurements recorded at once"""
+    runs = QCRunEntrySerializer(many=True, allow_empty=False, max_length=MAX_RUNS_PER_SUBMISSION)
+
+
+class QCRunSerializer(serializers.ModelSerializer):
+    """Recorded control measurement with its Westgard violations"""
+
+    class Meta:
+        model = QCRun
+        fields = ['id', 'lot', 'value', 'z_score', 'violations', 'is_rejected', 'measured_at']
+        read_only_fields = fields
+
+
+class QCStateSerializer(serializers.Serializer):
+    """In-control state of an analyte on an analyzer"""
+    analyzer = serializers.CharField()
+    exam_type_id = serializers.IntegerField()
+    in_control = serializers.BooleanField()
+    expired = serializers.BooleanField(help_text='Latest run older than the QC validity window')
+    run_id = serializers.IntegerField(allow_null=True)
+    measured_at = serializers.DateTimeField(allow_null=True)
+    violations = serializers.ListField(child=serializers.CharField())
@@ -0,0 +1,389 @@
+"""
+Result Services
+===============
+
+Bulk result submission: all results of an order (or of many orders, for
+instrument interfaces) are validated, flagged and written together, with
+a fixed number of queries per submission whatever the number of analytes
+and orders:
+
+- Lock the orders, load their items, patients and any earlier results
+- Validate every entry, collecting all errors at once
+- Resolve every analyte's reference interval for the patient (sex, age,
+  branch, analyzer) from the cached engine, convert values entered in
+  another unit, and flag them with array operations (ranges.py)
+- Delta check every numeric value against the patient's previous result
+  of the same exam, read for the whole panel in one query (delta.py)
+- Autoverify the batch against the compiled decision table; passing
+  results are released, the rest wait in the review queue (autoverify.py)
+- bulk_create new results, bulk_update re-submitted ones
+- Critical values raise alerts in the same transaction, queued for
+  delivery and escalation once it commits (critical.py)
+- One UPDATE marks the items completed; orders become completed when
+  no performable item is left, in the same transaction
+- Patient summary, live events and cached trends (trends.py) are
+  updated from the same data
+"""
+import math
+from collections import Counter, namedtuple
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.common.exceptions import BusinessRuleError
+from apps.exams.catalog import get_catalog
+from apps.exams.events import ORDER_STATUS, RESULT_READY, order_event, publish_on_commit
+from apps.exams.models import ExamOrder, OrderItem
+from apps.patients.models import Patient
+from apps.patients.summary import record_abnormal_result, refresh_abnormal_results
+from .autoverify import STATUS_AUTO_VERIFIED, get_decision_table
+from .critical import create_alerts, detect as detect_critical
+from .delta import check_deltas, previous_results_many
+from .models import ExamResult
+from .ranges import age_in_days, get_engine
+from .trends import invalidate_on_commit as invalidate_trends_on_commit
+
+MAX_RESULTS_PER_SUBMISSION = 200
+
+CLOSED_STATUSES = ('completed', 'cancelled')
+
+# unit: unit the value was entered in ('' = the reporting unit)
+# analyzer: instrument code, selects analyzer-specific ranges
+ResultEntry = namedtuple(
+    'ResultEntry',
+    ['order_item_id', 'value', 'detailed_results', 'unit', 'analyzer'],
+    defaults=(None, '', ''),
+)
+
+SubmissionResult = namedtuple('SubmissionResult', ['order', 'results', 'completed'])
+
+_RESULT_UPDATE_FIELDS = [
+    'result_value', 'numeric_value', 'unit', 'reference_low', 'reference_high',
+    'is_abnormal', 'abnormal_flag', 'detailed_results', 'analyzer', 'branch',
+    'previous_result', 'previous_value', 'delta_failed',
+    'verification_status', 'verification_reasons', 'verified_by', 'verified_at',
+    'performed_by', 'performed_at', 'updated_at',
+]
+
+
+def parse_numeric(value):
+    """Numeric value of a result ('12,5' -> 12.5), or None if qualitative."""
+    try:
+        number = float(value.strip().replace(',', '.'))
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _decimal(value):
+    return None if value is None else Decimal(str(round(value, 4)))
+
+
+def _to_reporting_units(engine, entries, exam_type_ids, intervals):
+    """
+    Numeric values converted to their interval's unit.
+
+    Raises:
+        BusinessRuleError: a value was entered in a unit with no known
+            conversion to the reporting unit
+    """
+    numbers, errors = [], {}
+    for index, (entry, exam_type_id, interval) in enumerate(zip(entries, exam_type_ids, intervals)):
+        number = parse_numeric(entry.value)
+        if number is not None and entry.unit and interval.unit:
+            converted = engine.convert(number, exam_type_id, entry.unit, interval.unit)
+            if converted is None:
+                errors[index] = f'No hay conversión de {entry.unit} a {interval.unit}.'
+            number = converted
+        numbers.append(number)
+    if errors:
+        raise BusinessRuleError(
+            'Algunos resultados no son válidos.', code='invalid_results', details={'errors': errors}
+        )
+    return numbers
+
+
+# Longest text accepted for the stored result columns
+VALUE_MAX_LENGTH = ExamResult._meta.get_field('result_value').max_length
+UNIT_MAX_LENGTH = ExamResult._meta.get_field('unit').max_length
+ANALYZER_MAX_LENGTH = ExamResult._meta.get_field('analyzer').max_length
+
+
+def _validate(entries, items):
+    errors = {}
+    seen = set()
+    for index, entry in enumerate(entries):
+        item = items.get(entry.order_item_id)
+        if item is None:
+            errors[index] = 'El examen no pertenece a la orden.'
+        elif item.is_panel:
+            errors[index] = 'Los perfiles se reportan por sus componentes.'
+        elif item.status == 'cancelled':
+            errors[index] = 'El examen está cancelado.'
+        elif entry.order_item_id in seen:
+            errors[index] = 'Examen repetido en la solicitud.'
+        elif not entry.value.strip():
+            errors[index] = 'El resultado está vacío.'
+        elif len(entry.value.strip()) > VALUE_MAX_LENGTH:
+            errors[index] = f'El resultado supera {VALUE_MAX_LENGTH} caracteres.'
+        elif len(entry.unit or '') > UNIT_MAX_LENGTH:
+            errors[index] = f'La unidad supera {UNIT_MAX_LENGTH} caracteres.'
+        elif len(entry.analyzer or '') > ANALYZER_MAX_LENGTH:
+            errors[index] = f'El código de equipo supera {ANALYZER_MAX_LENGTH} caracteres.'
+        seen.add(entry.order_item_id)
+    if errors:
+        raise BusinessRuleError(
+            'Algunos resultados no son válidos.', code='invalid_results', details={'errors': errors}
+        )
+
+
+def submit_results(order_id, entries, user, branch=None):
+    """
+    Record the results of an order's exams in one transaction.
+
+    Re-submitting an exam of an open order replaces its result.
+
+    Args:
+        order_id: Order the results belong to
+        entries: Iterable of ResultEntry
+        user: Technician submitting the results
+        branch: If given, the order must currently be at this branch
+
+    Returns:
+        SubmissionResult(order, list of ExamResult, completed)
+
+    Raises:
+        BusinessRuleError: unknown/closed order or invalid entries;
+            nothing is written
+    """
+    entries = list(entries)
+    if not entries:
+        raise BusinessRuleError('Debe indicar al menos un resultado.', code='empty_results')
+    if len(entries) > MAX_RESULTS_PER_SUBMISSION:
+        raise BusinessRuleError(
+            f'Máximo {MAX_RESULTS_PER_SUBMISSION} resultados por envío.', code='too_many_results'
+        )
+    submissions, _ = submit_result_batch([(order_id, entries)], user, branch=branch)
+    return submissions[0]
+
+
+def _check_order(order, branch):
+    if order is None:
+        raise BusinessRuleError('La orden no existe.', code='order_not_found')
+    if order.status in CLOSED_STATUSES:
+        raise BusinessRuleError('La orden ya está cerrada.', code='order_closed')
+    if branch is not None and order.current_branch_id != branch.id:
+        raise BusinessRuleError('La orden no está en su sucursal.', code='order_not_in_branch')
+
+
+def submit_result_batch(submissions, user, branch=None, skip_invalid=False):
+    """
+    Record the results of many orders in one transaction, with the same
+    number of queries as a single order (instrument interfaces flush
+    their buffers through here).
+
+    Args:
+        submissions: Iterable of (order_id, list of ResultEntry); one per order
+        user: User recorded as performer (None for unattended interfaces)
+        branch: If given, every order must currently be at this branch
+        skip_invalid: Skip invalid orders (reported in the second return
+            value) instead of rejecting the whole batch
+
+    Returns:
+        (list of SubmissionResult, {order_id: BusinessRuleError} skipped)
+
+    Raises:
+        BusinessRuleError: an invalid order or entry, unless skip_invalid;
+            nothing is written
+    """
+    submissions = [(order_id, list(entries)) for order_id, entries in submissions]
+    order_ids = [order_id for order_id, _ in submissions]
+    if len(set(order_ids)) != len(order_ids):
+        raise BusinessRuleError('Cada orden debe aparecer una sola vez.', code='duplicate_orders')
+
+    catalog = get_catalog()
+    engine = get_engine()
+    table = get_decision_table()
+    now = timezone.now()
+    today = timezone.localdate(now)
+    skipped = {}
+
+    with transaction.atomic():
+        # Locked in id order so concurrent batches cannot deadlock
+        orders = ExamOrder.objects.select_for_update().filter(id__in=order_ids).order_by('id').in_bulk()
+        items_by_order = {}
+        for item in OrderItem.objects.filter(order_id__in=order_ids).only(
+            'id', 'order_id', 'exam_type_id', 'is_panel', 'status'
+        ):
+            items_by_order.setdefault(item.order_id, {})[item.id] = item
+        patients = Patient.objects.only('gender', 'date_of_birth').in_bulk(
+            {order.patient_id for order in orders.values()}
+        )
+
+        # Per order: exam, reference interval and value in reporting units of each entry
+        accepted = []
+        for order_id, entries in submissions:
+            order = orders.get(order_id)
+            try:
+                _check_order(order, branch)
+                items = items_by_order.get(order_id, {})
+                _validate(entries, items)
+                patient = patients[order.patient_id]
+                age_days = age_in_days(patient.date_of_birth, today)
+                exam_type_ids = [items[entry.order_item_id].exam_type_id for entry in entries]
+                intervals = [
+                    engine.lookup(exam_type_id, patient.gender, age_days, order.current_branch_id, entry.analyzer)
+                    for exam_type_id, entry in zip(exam_type_ids, entries)
+                ]
+                numbers = _to_reporting_units(engine, entries, exam_type_ids, intervals)
+            except BusinessRuleError as e:
+                if not skip_invalid:
+                    raise
+                skipped[order_id] = e
+                continue
+            accepted.append((order, entries, exam_type_ids, intervals, numbers))
+
+        previous = previous_results_many(
+            [order.patient_id for order, *_ in accepted],
+            [pk for _, _, exam_type_ids, _, _ in accepted for pk in exam_type_ids],
+            exclude_order_ids=[order.id for order, *_ in accepted],
+        )
+        existing = {
+            result.order_item_id: result
+            for result in ExamResult.objects.filter(
+                order_item_id__in=[e.order_item_id for _, entries, *_ in accepted for e in entries]
+            )
+        }
+
+        created, updated, per_order = [], [], []
+        for order, entries, exam_type_ids, intervals, numbers in accepted:
+            flags = engine.flag(numbers, intervals)
+            units = [interval.unit or entry.unit for interval, entry in zip(intervals, entries)]
+            deltas = check_deltas(
+                engine, exam_type_ids, numbers, units, previous.get(order.patient_id, {}), now
+            )
+            results = []
+            for entry, exam_type_id, number, interval, unit, flag, delta in zip(
+                entries, exam_type_ids, numbers, intervals, units, flags, deltas
+            ):
+                detailed = dict(entry.detailed_results or {})
+                if entry.unit and number is not None and entry.unit != interval.unit:
+                    detailed['entered_unit'] = entry.unit
+                values = {
+                    'result_value': entry.value.strip(),
+                    'numeric_value': number,
+                    'unit': unit,
+                    'reference_low': _decimal(interval.low),
+                    'reference_high': _decimal(interval.high),
+                    'is_abnormal': bool(flag),
+                    'abnormal_flag': flag,
+                    'detailed_results': detailed,
+                    'analyzer': entry.analyzer,
+                    'previous_result_id': delta.previous_id,
+                    'previous_value': delta.previous_value,
+                    'delta_failed': delta.failed,
+                    'branch_id': order.current_branch_id,
+                    'performed_by': user,
+                    'performed_at': now,
+                }
+                result = existing.get(entry.order_item_id)
+                if result is None:
+                    result = ExamResult(
+                        order_item_id=entry.order_item_id,
+                        order=order,
+                        patient_id=order.patient_id,
+                        exam_type_id=exam_type_id,
+                        **values,
+                    )
+                    created.append(result)
+                else:
+                    for field, value in values.items():
+                        setattr(result, field, value)
+                    result.updated_at = now
+                    updated.append(result)
+                results.append(result)
+            per_order.append((order, entries, exam_type_ids, numbers, flags, deltas, results))
+
+        table.decide(created + updated, now)
+        ExamResult.objects.bulk_create(created)
+        if updated:
+            ExamResult.objects.bulk_update(updated, _RESULT_UPDATE_FIELDS)
+
+        alerts = create_alerts(
+            [
+                (order, results[hit.index], hit)
+                for order, _, exam_type_ids, numbers, _, _, results in per_order
+                for hit in detect_critical(engine, exam_type_ids, numbers)
+            ],
+            now,
+            resubmitted_ids=[result.id for result in updated],
+        )
+        alert_counts = Counter(alert.order_id for alert in alerts)
+
+        accepted_ids = [order.id for order, *_ in accepted]
+        OrderItem.objects.filter(
+            id__in=[e.order_item_id for _, entries, *_ in accepted for e in entries]
+        ).update(
+            status='completed',
+            claimed_by=None,
+            claimed_at=None,
+            claim_expires_at=None,
+            updated_at=now,
+        )
+        still_open = set(
+            OrderItem.objects.filter(order_id__in=accepted_ids, is_panel=False)
+            .exclude(status__in=CLOSED_STATUSES)
+            .values_list('order_id', flat=True)
+            .distinct()
+        )
+        completed_ids = [pk for pk in accepted_ids if pk not in still_open]
+        if completed_ids:
+            OrderItem.objects.filter(order_id__in=completed_ids, is_panel=True).update(
+                status='completed', updated_at=now
+            )
+            ExamOrder.objects.filter(id__in=completed_ids).update(status='completed', updated_at=now)
+        if still_open:
+            ExamOrder.objects.filter(id__in=still_open).update(status='in_progress', updated_at=now)
+
+        outcome, events, latest_abnormal = [], [], {}
+        for order, entries, exam_type_ids, numbers, flags, deltas, results in per_order:
+            previous_status = order.status
+            completed = order.id not in still_open
+            order.status = 'completed' if completed else 'in_progress'
+
+            abnormal = [result for result, flag in zip(results, flags) if flag]
+            if abnormal:
+                # Same pick as the rebuild: latest performed_at (all equal here), then highest id
+                latest = max(abnormal, key=lambda result: result.id)
+                current = latest_abnormal.get(order.patient_id)
+                if current is None or latest.id > current.id:
+                    latest_abnormal[order.patient_id] = latest
+
+            event_args = (order.id, order.order_number, order.status, order.root_branch_id, order.current_branch_id)
+            events.append(order_event(
+                RESULT_READY, *event_args,
+                order_item_ids=[entry.order_item_id for entry in entries],
+                abnormal_count=len(abnormal),
+                delta_failed_count=sum(delta.failed for delta in deltas),
+                auto_verified_count=sum(r.verification_status == STATUS_AUTO_VERIFIED for r in results),
+                critical_count=alert_counts[order.id],
+            ))
+            if order.status != previous_status:
+                events.append(order_event(ORDER_STATUS, *event_args))
+            outcome.append(SubmissionResult(order, results, completed))
+
+        # Patients with re-submitted results are recomputed: the corrected
+        # value may have been their last abnormal result
+        corrected = {result.patient_id for result in updated}
+        for patient_id, result in latest_abnormal.items():
+            if patient_id not in corrected:
+                exam = catalog.get(result.exam_type_id)
+                record_abnormal_result(patient_id, now, exam.name if exam else '')
+        if corrected:
+            refresh_abnormal_results(sorted(corrected))
+
+        publish_on_commit(events)
+        invalidate_trends_on_commit([order.patient_id for order, *_ in accepted])
+
+    return outcome, skipped
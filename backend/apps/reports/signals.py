@@ -0,0 +1,48 @@
+"""
+Report Signal Receivers
+=======================
+
+- Invalidates the per-process reference engine and the autoverification
+  decision table built with it (see ranges.py, autoverify.py)
+- Reloads the QC in-control states after lot or run changes (see qc.py)
+- Invalidates cached trends of merged patients (see trends.py)
+
+Connected in ReportsConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.patients.merge import patients_merged
+from .models import (
+    AutoverificationRule, CriticalValueRule, DeltaCheckRule, QCLot, QCRun, ReferenceRange, UnitConversion,
+)
+from .ranges import invalidate_on_commit
+from . import qc, trends
+
+
+@receiver(post_save, sender=ReferenceRange)
+@receiver(post_delete, sender=ReferenceRange)
+@receiver(post_save, sender=UnitConversion)
+@receiver(post_delete, sender=UnitConversion)
+@receiver(post_save, sender=DeltaCheckRule)
+@receiver(post_delete, sender=DeltaCheckRule)
+@receiver(post_save, sender=AutoverificationRule)
+@receiver(post_delete, sender=AutoverificationRule)
+@receiver(post_save, sender=CriticalValueRule)
+@receiver(post_delete, sender=CriticalValueRule)
+def reference_data_changed(sender, **kwargs):
+    invalidate_on_commit()
+
+
+@receiver(post_save, sender=QCLot)
+@receiver(post_delete, sender=QCLot)
+@receiver(post_save, sender=QCRun)
+@receiver(post_delete, sender=QCRun)
+def qc_data_changed(sender, **kwargs):
+    qc.invalidate_on_commit()
+
+
+@receiver(patients_merged)
+def merged_patient_results_moved(sender, survivor_ids, merged_ids, **kwargs):
+    """Merges (and undos) move results between patients."""
+    trends.invalidate_on_commit(list(survivor_ids) + list(merged_ids))
@@ -1,3 +1,69 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from apps.reports import qc
+
+
+def violations(z, series=None):
+    """Rule codes of each run of one series (or of the given series)."""
+    series = [1] * len(z) if series is None else series
+    return [qc.rule_codes(int(mask)) for mask in qc.westgard(series, z)]
+
+
+class WestgardTests(SimpleTestCase):
+
+    def test_in_control_runs_violate_nothing(self):
+        self.assertEqual(violations([0.5, -0.8, 1.2, -1.5]), [[], [], [], []])
+
+    def test_1_2s_warns_only(self):
+        masks = qc.westgard([1], [2.5])
+        self.assertEqual(qc.rule_codes(int(masks[0])), ['1-2s'])
+        self.assertFalse(masks[0] & qc.REJECTION_RULES)
+
+    def test_1_3s(self):
+        self.assertEqual(violations([-3.2])[0], ['1-2s', '1-3s'])
+
+    def test_2_2s_needs_the_same_side(self):
+        self.assertEqual(violations([2.1, 2.4])[1], ['1-2s', '2-2s'])
+        self.assertNotIn('2-2s', violations([2.1, -2.4])[1])
+
+    def test_r_4s(self):
+        self.assertEqual(violations([2.1, -2.4])[1], ['1-2s', 'R-4s'])
+
+    def test_4_1s(self):
+        self.assertEqual(violations([1.1, 1.5, 1.2, 1.8]), [[], [], [], ['4-1s']])
+        self.assertEqual(violations([-1.1, -1.5, 1.2, -1.8])[3], [])
+
+    def test_10x(self):
+        result = violations([0.3] * 10)
+        self.assertEqual(result[8], [])
+        self.assertEqual(result[9], ['10x'])
+
+    def test_windows_do_not_span_series(self):
+        self.assertEqual(violations([2.1, 2.4], series=[1, 2]), [['1-2s'], ['1-2s']])
+        self.assertEqual(violations([0.3] * 10, series=[1] * 5 + [2] * 5)[9], [])
+
+
+class EvaluateTests(SimpleTestCase):
+
+    def test_rejected_level_is_not_cleared_by_another_level(self):
+        # Level 1 at z = 5 (1-3s), then level 2 passes
+        rows = [(1, 5, 'A', 110, 100, 2, 1, 1), (2, 5, 'A', 200, 200, 4, 2, 2)]
+        state = qc.evaluate(rows)[2][('A', 5)]
+        self.assertFalse(state.in_control)
+        self.assertEqual(state.run_id, 1)
+
+    def test_rerunning_the_rejected_level_restores_control(self):
+        rows = [
+            (1, 5, 'A', 110, 100, 2, 1, 1),
+            (2, 5, 'A', 200, 200, 4, 2, 2),
+            (3, 5, 'A', 100, 100, 2, 3, 1),
+        ]
+        state = qc.evaluate(rows)[2][('A', 5)]
+        self.assertTrue(state.in_control)
+        self.assertEqual(state.run_id, 3)
+
+    def test_series_are_evaluated_independently(self):
+        rows = [(1, 5, 'A', 110, 100, 2, 1, 1), (2, 5, 'B', 100, 100, 2, 1, 1)]
+        states = qc.evaluate(rows)[2]
+        self.assertFalse(states[('A', 5)].in_control)
+        self.assertTrue(states[('B', 5)].in_control)
@@ -0,0 +1,222 @@
+"""
+Analyte Trends
+==============
+
+Per-analyte time series of a patient's numeric results, downsampled on
+the server to a point budget so long histories chart quickly on slow
+devices.
+
+Downsampling methods:
+
+- lttb: Largest-Triangle-Three-Buckets. Keeps the first and last points
+  and, from each of (budget - 2) equal buckets, the point forming the
+  largest triangle with the previously kept point and the next bucket's
+  average. Preserves the visual shape of the curve.
+- minmax: Keeps the lowest and highest point of each of budget / 2
+  buckets. Never hides an extreme value, which matters when the chart is
+  read for peaks.
+
+Series are cached per (patient, analyte, results version, budget,
+method, unit). The results version is a per-patient Redis counter
+bumped after every result submission or merge involving the patient, so
+a cached series is never stale and unchanged histories are served
+without touching the database. The reference engine version is part of
+the key too, since conversion factors shape the series.
+"""
+from collections import namedtuple
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import ExamResult
+from .ranges import get_engine
+
+DEFAULT_POINTS = 200
+MIN_POINTS = 10
+MAX_POINTS = 2000
+MAX_ANALYTES = 10
+
+METHOD_LTTB = 'lttb'
+METHOD_MINMAX = 'minmax'
+METHODS = (METHOD_LTTB, METHOD_MINMAX)
+
+CACHE_TTL = 60 * 60 * 24
+
+VERSION_KEY = 'results_version:{patient_id}'
+SERIES_KEY = 'trend:{patient_id}:{exam_type_id}:{version}:{engine}:{points}:{method}:{unit}'
+
+# points: list of [timestamp_ms, value, abnormal_flag], oldest first
+# total: number of results before downsampling
+# skipped: results whose unit could not be converted to `unit`
+TrendSeries = namedtuple('TrendSeries', ['exam_type_id', 'unit', 'total', 'skipped', 'points'])
+
+
+def results_version(patient_id):
+    """Current results version of a patient (0 if never bumped)."""
+    return cache.get(VERSION_KEY.format(patient_id=patient_id), 0)
+
+
+def bump_results_version(patient_id):
+    """Invalidate every cached series of a patient; returns the new version."""
+    key = VERSION_KEY.format(patient_id=patient_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout=None):
+            return 1
+        return cache.incr(key)
+
+
+def invalidate_on_commit(patient_ids):
+    """Bump the results version of patients once the transaction commits."""
+    patient_ids = set(patient_ids)
+    transaction.on_commit(lambda: [bump_results_version(pk) for pk in patient_ids])
+
+
+def lttb(x, y, threshold):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Args:
+        x / y: NumPy float arrays, x ascending
+        threshold: Number of points to keep
+
+    Returns:
+        NumPy array of indices, ascending
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, n)
+        if end < next_end:
+            average_x, average_y = x[end:next_end].mean(), y[end:next_end].mean()
+        else:
+            average_x, average_y = x[n - 1], y[n - 1]
+
+        # Twice the triangle area; the constant factor does not change argmax
+        areas = np.abs(
+            (x[previous] - average_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def minmax(y, threshold):
+    """
+    Indices of the lowest and highest point of each of threshold / 2
+    equal-count buckets.
+
+    Returns:
+        NumPy array of indices, ascending
+    """
+    n = len(y)
+    buckets = threshold // 2
+    if threshold >= n or buckets < 1:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    kept = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        segment = y[start:end]
+        kept.append(start + int(np.argmin(segment)))
+        kept.append(start + int(np.argmax(segment)))
+    return np.unique(kept)
+
+
+def downsample(x, y, threshold, method=METHOD_LTTB):
+    """Indices of the points to keep with the given method."""
+    if method == METHOD_MINMAX:
+        return minmax(y, threshold)
+    return lttb(x, y, threshold)
+
+
+def _build_series(engine, exam_type_id, rows, points, method, unit):
+    """Convert one analyte's rows to `unit` and downsample them."""
+    times, values, flags = [], [], []
+    skipped = 0
+    for performed_at, value, row_unit, flag in rows:
+        converted = engine.convert(value, exam_type_id, row_unit, unit)
+        if converted is None:
+            skipped += 1
+            continue
+        times.append(performed_at.timestamp() * 1000)
+        values.append(converted)
+        flags.append(flag)
+
+    x, y = np.array(times, dtype=float), np.array(values, dtype=float)
+    kept = downsample(x, y, points, method) if len(x) else []
+    return TrendSeries(
+        exam_type_id=exam_type_id,
+        unit=unit,
+        total=len(times),
+        skipped=skipped,
+        points=[[int(times[i]), values[i], flags[i]] for i in kept],
+    )
+
+
+def _reporting_unit(engine, exam_type_id, rows):
+    """Catalog unit of the exam, else the unit of its latest result."""
+    default = engine.defaults.get(exam_type_id)
+    if default is not None and default.unit:
+        return default.unit
+    return rows[-1][2] if rows else ''
+
+
+def analyte_trends(patient_id, exam_type_ids, points=DEFAULT_POINTS, method=METHOD_LTTB, unit=''):
+    """
+    Downsampled numeric history of a patient's analytes.
+
+    Args:
+        patient_id: Patient id
+        exam_type_ids: Analytes to chart (at most MAX_ANALYTES)
+        points: Point budget per analyte
+        method: 'lttb' or 'minmax'
+        unit: Unit to chart in ('' = each exam's reporting unit)
+
+    Returns:
+        List of TrendSeries, in the order of exam_type_ids
+    """
+    exam_type_ids = list(dict.fromkeys(exam_type_ids))
+    engine = get_engine()
+    version = results_version(patient_id)
+    keys = {
+        pk: SERIES_KEY.format(
+            patient_id=patient_id, exam_type_id=pk, version=version,
+            engine='.'.join(map(str, engine.version)), points=points, method=method, unit=unit.lower(),
+        )
+        for pk in exam_type_ids
+    }
+    cached = cache.get_many(list(keys.values()))
+    series = {pk: TrendSeries(*cached[key]) for pk, key in keys.items() if key in cached}
+
+    missing = [pk for pk in exam_type_ids if pk not in series]
+    if missing:
+        rows = {pk: [] for pk in missing}
+        # Ascending scan of exam_results_delta_idx per analyte
+        for exam_type_id, *row in (
+            ExamResult.objects.filter(
+                patient_id=patient_id, exam_type_id__in=missing, numeric_value__isnull=False
+            )
+            .order_by('exam_type_id', 'performed_at', 'id')
+            .values_list('exam_type_id', 'performed_at', 'numeric_value', 'unit', 'abnormal_flag')
+            .iterator(chunk_size=5000)
+        ):
+            rows[exam_type_id].append(row)
+
+        for pk in missing:
+            target = unit or _reporting_unit(engine, pk, rows[pk])
+            series[pk] = _build_series(engine, pk, rows[pk], points, method, target)
+        cache.set_many({keys[pk]: tuple(series[pk]) for pk in missing}, CACHE_TTL)
+
+    return [series[pk] for pk in exam_type_ids]
@@ -0,0 +1,20 @@
+"""
+Report URL Configuration
+Maps endpoints to views
+"""
+from django.urls import path
+from . import views
+
+app_name = 'reports'
+
+urlpatterns = [
+    path('orders/<int:order_id>/results', views.submit_results_view, name='result-submit'),
+    path('review-queue', views.review_queue_view, name='review-queue'),
+    path('review/verify', views.verify_results_view, name='review-verify'),
+    path('critical-alerts', views.pending_critical_alerts_view, name='critical-alerts'),
+    path('critical-alerts/acknowledge', views.acknowledge_critical_alerts_view, name='critical-alerts-acknowledge'),
+    path('qc/runs', views.record_qc_runs_view, name='qc-runs'),
+    path('qc/status', views.qc_status_view, name='qc-status'),
+    path('qc/lots/<int:lot_id>/levey-jennings', views.levey_jennings_view, name='qc-levey-jennings'),
+    path('patients/<int:patient_id>/trends', views.patient_trends_view, name='patient-trends'),
+]
@@ -1 +1,551 @@
-# Views will be implemented in future phases.
+"""
+Report Views
+Handles exam result endpoints
+"""
+from datetime import timedelta
+
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+
+from apps.auth.decorators import require_permission
+from apps.common.exceptions import BusinessRuleError
+from apps.patients.models import Patient
+from .models import ExamResult, QCLot
+from .serializers import (
+    ResultSubmissionSerializer, ExamResultSerializer, TrendSeriesSerializer,
+    ReviewQueueSerializer, VerifyResultsSerializer,
+    CriticalAlertSerializer, AcknowledgeAlertsSerializer,
+    QCRunSubmissionSerializer, QCRunSerializer, QCStateSerializer,
+)
+from .services import submit_results, ResultEntry, MAX_RESULTS_PER_SUBMISSION
+from . import autoverify, critical, qc, trends
+
+
+@extend_schema(
+    tags=['Results'],
+    summary='Submit Order Results',
+    description=(
+        f'Submits up to {MAX_RESULTS_PER_SUBMISSION} results of an order in one transaction. '
+        'Numeric values are flagged against the reference intervals and delta checked '
+        'against the patient\'s previous result of the same exam; the order is '
+        'marked completed once every exam has a result. Results passing the '
+        'autoverification rules are released; the rest go to the review queue. '
+        'Technicians can only submit '
+        'results for orders currently at their branch.'
+    ),
+    request=ResultSubmissionSerializer,
+    responses={
+        201: ExamResultSerializer(many=True),
+        400: OpenApiResponse(description='Invalid or closed order, or invalid results (details.errors by index)'),
+        403: OpenApiResponse(description='Missing results.submit permission'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('results.submit')
+def submit_results_view(request, order_id):
+    """
+    Submit the results of an order
+
+    POST /api/reports/orders/{order_id}/results
+
+    Request:
+    {
+        "results": [
+            {"order_item_id": 501, "value": "13.2"},
+            {"order_item_id": 502, "value": "Negativo", "detailed_results": {"comment": "Muestra hemolizada"}}
+        ]
+    }
+
+    Response:
+    {
+        "order_id": 101,
+        "order_status": "completed",
+        "results": [{"id": 9001, "result_value": "13.2", "is_abnormal": false, "previous_value": 12.9, "delta_failed": false, ...}]
+    }
+    """
+    serializer = ResultSubmissionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    profile = getattr(request.user, 'profile', None)
+    entries = [
+        ResultEntry(r['order_item_id'], r['value'], r['detailed_results'], r['unit'], r['analyzer'])
+        for r in serializer.validated_data['results']
+    ]
+    try:
+        submission = submit_results(
+            order_id,
+            entries,
+            request.user,
+            branch=profile.branch if profile is not None and profile.branch_id else None,
+        )
+    except BusinessRuleError as e:
+        return Response(e.as_response_data(), status=status.HTTP_400_BAD_REQUEST)
+
+    results = (
+        ExamResult.objects.filter(id__in=[r.id for r in submission.results])
+        .select_related('exam_type')
+        .order_by('order_item_id')
+    )
+    return Response(
+        {
+            'order_id': submission.order.id,
+            'order_status': submission.order.status,
+            'results': ExamResultSerializer(results, many=True).data,
+        },
+        status=status.HTTP_201_CREATED
+    )
+
+
+@extend_schema(
+    tags=['Results'],
+    summary='Patient Analyte Trends',
+    description=(
+        'Numeric history of up to '
+        f'{trends.MAX_ANALYTES} analytes of a patient, downsampled on the server to a '
+        'point budget per analyte (LTTB keeps the curve shape, minmax keeps every '
+        'bucket\'s extremes). Series are cached until the patient gets new results.'
+    ),
+    parameters=[
+        OpenApiParameter('exam_type_ids', str, required=True, description='Comma-separated exam type ids'),
+        OpenApiParameter(
+            'points', int,
+            description=f'Points per analyte (default {trends.DEFAULT_POINTS}, '
+                        f'{trends.MIN_POINTS}-{trends.MAX_POINTS})'
+        ),
+        OpenApiParameter('method', str, enum=list(trends.METHODS), description='Downsampling method (default lttb)'),
+        OpenApiParameter('unit', str, description='Unit to chart in (single analyte only; default: reporting unit)'),
+    ],
+    responses={
+        200: TrendSeriesSerializer(many=True),
+        400: OpenApiResponse(description='Invalid exam_type_ids, points, method or unit'),
+        403: OpenApiResponse(description='Missing results.view permission'),
+        404: OpenApiResponse(description='Patient not found'),
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@require_permission('results.view')
+def patient_trends_view(request, patient_id):
+    """
+    Patient analyte trends
+
+    GET /api/reports/patients/<patient_id>/trends?exam_type_ids=12,15&points=200&method=lttb
+
+    Response:
+    {
+        "patient_id": 7,
+        "series": [
+            {"exam_type_id": 12, "unit": "mg/dL", "total": 1840, "skipped": 0,
+             "points": [[1577880000000, 98.0, ""], [1580558400000, 131.0, "H"], ...]}
+        ]
+    }
+    """
+    patient = get_object_or_404(Patient.objects.only('id'), id=patient_id)
+
+    try:
+        exam_type_ids = [int(pk) for pk in request.query_params.get('exam_type_ids', '').split(',') if pk]
+        points = int(request.query_params.get('points', trends.DEFAULT_POINTS))
+    except ValueError:
+        return Response(
+            {'error': 'Los parámetros exam_type_ids y points deben ser números enteros.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not exam_type_ids or len(exam_type_ids) > trends.MAX_ANALYTES:
+        return Response(
+            {'error': f'Indique entre 1 y {trends.MAX_ANALYTES} exámenes.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    points = max(trends.MIN_POINTS, min(points, trends.MAX_POINTS))
+
+    method = request.query_params.get('method', trends.METHOD_LTTB)
+    if method not in trends.METHODS:
+        return Response(
+            {'error': f'Método inválido. Opciones: {", ".join(trends.METHODS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    unit = request.query_params.get('unit', '').strip()
+    if unit and len(exam_type_ids) > 1:
+        return Response(
+            {'error': 'El parámetro unit solo se admite con un examen.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    series = trends.analyte_trends(patient.id, exam_type_ids, points=points, method=method, unit=unit)
+    return Response({
+        'patient_id': patient.id,
+        'series': TrendSeriesSerializer(series, many=True).data,
+    })
+
+
+def _user_branch_id(user):
+    profile = getattr(user, 'profile', None)
+    return profile.branch_id if profile is not None and profile.branch_id else None
+
+
+@extend_schema(
+    tags=['Results'],
+    summary='Result Review Queue',
+    description=(
+        'Results held by the autoverification rules, oldest first, with the codes '
+        'of the rules that held them. Users assigned to a branch only see their '
+        'branch. Pages continue with `after` = id of the last result seen.'
+    ),
+    parameters=[
+        OpenApiParameter('after', int, description='Id of the last result of the previous page'),
+        OpenApiParameter(
+            'limit', int,
+            description=f'Results per page (default {autoverify.DEFAULT_QUEUE_SIZE}, max {autoverify.MAX_QUEUE_SIZE})'
+        ),
+    ],
+    responses={
+        200: ReviewQueueSerializer(many=True),
+        400: OpenApiResponse(description='Invalid after or limit'),
+        403: OpenApiResponse(description='Missing results.approve permission'),
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@require_permission('results.approve')
+def review_queue_view(request):
+    """
+    Results waiting for review
+
+    GET /api/reports/review-queue?after=9001&limit=50
+
+    Response:
+    {
+        "results": [
+            {"id": 9002, "exam_code": "GLU", "result_value": "412", "abnormal_flag": "H",
+             "verification_reasons": ["outside_limits", "abnormal"], ...}
+        ],
+        "next_after": 9051   // null on the last page
+    }
+    """
+    try:
+        after = int(request.query_params.get('after', 0))
+        limit = int(request.query_params.get('limit', autoverify.DEFAULT_QUEUE_SIZE))
+    except ValueError:
+        return Response(
+            {'error': 'Los parámetros after y limit deben ser números enteros.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    limit = max(1, min(limit, autoverify.MAX_QUEUE_SIZE))
+
+    results = autoverify.review_queue(_user_branch_id(request.user), after_id=after, limit=limit)
+    return Response({
+        'results': ReviewQueueSerializer(results, many=True).data,
+        'next_after': results[-1].id if len(results) == limit else None,
+    })
+
+
+@extend_schema(
+    tags=['Results'],
+    summary='Verify Results',
+    description=(
+        f'Signs off up to {autoverify.MAX_VERIFY_RESULTS} results from the review queue '
+        'with one update. Results already verified, or of another branch, are skipped.'
+    ),
+    request=VerifyResultsSerializer,
+    responses={
+        200: OpenApiResponse(description='Number of results verified'),
+        400: OpenApiResponse(description='Invalid result_ids'),
+        403: OpenApiResponse(description='Missing results.approve permission'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('results.approve')
+def verify_results_view(request):
+    """
+    Verify results from the review queue
+
+    POST /api/reports/review/verify
+
+    Request:
+    {
+        "result_ids": [9002, 9003]
+    }
+
+    Response:
+    {
+        "verified": 2
+    }
+    """
+    serializer = VerifyResultsSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    verified = autoverify.verify_results(
+        serializer.validated_data['result_ids'],
+        request.user,
+        branch_id=_user_branch_id(request.user),
+    )
+    return Response({'verified': verified})
+
+
+@extend_schema(
+    tags=['Results'],
+    summary='Pending Critical Alerts',
+    description=(
+        'Critical value alerts not yet acknowledged, most escalated and oldest first. '
+        'Users assigned to a branch see alerts of orders placed or resulted there. '
+        'New alerts are also pushed live as `critical_value` events on /api/exams/events.'
+    ),
+    parameters=[
+        OpenApiParameter(
+            'limit', int,
+            description=f'Alerts to return (default {critical.DEFAULT_PENDING_SIZE}, max {critical.MAX_PENDING_SIZE})'
+        ),
+    ],
+    responses={
+        200: CriticalAlertSerializer(many=True),
+        400: OpenApiResponse(description='Invalid limit'),
+        403: OpenApiResponse(description='Missing results.view permission'),
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@require_permission('results.view')
+def pending_critical_alerts_view(request):
+    """
+    Critical alerts awaiting acknowledgement
+
+    GET /api/reports/critical-alerts?limit=50
+
+    Response:
+    {
+        "results": [
+            {"id": 31, "order_number": "SUC1-20260301-0042", "exam_code": "K", "value": 7.1,
+             "flag": "H", "threshold": 6.5, "escalation_level": 1, ...}
+        ]
+    }
+    """
+    try:
+        limit = int(request.query_params.get('limit', critical.DEFAULT_PENDING_SIZE))
+    except ValueError:
+        return Response(
+            {'error': 'El parámetro limit debe ser un número entero.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    limit = max(1, min(limit, critical.MAX_PENDING_SIZE))
+
+    alerts = critical.pending_alerts(_user_branch_id(request.user), limit=limit)
+    return Response({'results': CriticalAlertSerializer(alerts, many=True).data})
+
+
+@extend_schema(
+    tags=['Results'],
+    summary='Acknowledge Critical Alerts',
+    description=(
+        'Acknowledges critical value alerts, stopping their escalation. Alerts already '
+        'acknowledged, or outside the user\'s branch, are skipped.'
+    ),
+    request=AcknowledgeAlertsSerializer,
+    responses={
+        200: OpenApiResponse(description='Number of alerts acknowledged'),
+        400: OpenApiResponse(description='Invalid alert_ids'),
+        403: OpenApiResponse(description='Missing results.view permission'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('results.view')
+def acknowledge_critical_alerts_view(request):
+    """
+    Acknowledge critical alerts
+
+    POST /api/reports/critical-alerts/acknowledge
+
+    Request:
+    {
+        "alert_ids": [31, 32]
+    }
+
+    Response:
+    {
+        "acknowledged": 2
+    }
+    """
+    serializer = AcknowledgeAlertsSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    acknowledged = critical.acknowledge(
+        serializer.validated_data['alert_ids'],
+        request.user,
+        branch_id=_user_branch_id(request.user),
+    )
+    return Response({'acknowledged': acknowledged})
+
+
+def _qc_state_rows(states, now):
+    return [
+        {
+            'analyzer': analyzer,
+            'exam_type_id': exam_type_id,
+            'in_control': state.in_control,
+            'expired': state.measured_at is None
+            or now - state.measured_at > timedelta(hours=qc.VALIDITY_HOURS),
+            'run_id': state.run_id,
+            'measured_at': state.measured_at,
+            'violations': list(state.violations),
+        }
+        for (analyzer, exam_type_id), state in sorted(states.items())
+    ]
+
+
+@extend_schema(
+    tags=['Quality Control'],
+    summary='Record QC Runs',
+    description=(
+        f'Records up to {qc.MAX_RUNS_PER_SUBMISSION} control measurements and evaluates the '
+        'Westgard rules (1-2s warning; 1-3s, 2-2s, R-4s, 4-1s, 10x rejection) over the QC '
+        'series of each analyte and analyzer. While a series is rejected, or its latest '
+        f'run is older than {qc.VALIDITY_HOURS} hours, results of that analyte are held '
+        'for review by rules requiring QC.'
+    ),
+    request=QCRunSubmissionSerializer,
+    responses={
+        201: QCRunSerializer(many=True),
+        400: OpenApiResponse(description='Unknown, inactive or expired lots (details.errors by index)'),
+        403: OpenApiResponse(description='Missing results.submit permission'),
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@require_permission('results.submit')
+def record_qc_runs_view(request):
+    """
+    Record control measurements
+
+    POST /api/reports/qc/runs
+
+    Request:
+    {
+        "runs": [
+            {"lot_id": 3, "value": 98.4, "measured_at": "2026-03-01T07:30:00Z"},
+            {"lot_id": 4, "value": 251.0}
+        ]
+    }
+
+    Response:
+    {
+        "runs": [{"id": 801, "lot": 3, "z_score": 0.4, "violations": [], "is_rejected": false, ...}],
+        "states": [{"analyzer": "COBAS-1", "exam_type_id": 12, "in_control": true, "violations": [], ...}]
+    }
+    """
+    serializer = QCRunSubmissionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    now = timezone.now()
+    entries = [
+        qc.QCEntry(run['lot_id'], run['value'], run.get('measured_at') or now)
+        for run in serializer.validated_data['runs']
+    ]
+    try:
+        runs, states = qc.record_runs(entries, request.user, now=now)
+    except BusinessRuleError as e:
+        return Response(e.as_response_data(), status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {
+            'runs': QCRunSerializer(runs, many=True).data,
+            'states': QCStateSerializer(_qc_state_rows(states, now), many=True).data,
+        },
+        status=status.HTTP_201_CREATED
+    )
+
+
+@extend_schema(
+    tags=['Quality Control'],
+    summary='QC Status',
+    description=(
+        'In-control state of every analyte with active QC lots, per analyzer: the Westgard '
+        'rules violated by its latest run and whether that run is still valid.'
+    ),
+    parameters=[
+        OpenApiParameter('analyzer', str, description='Only this analyzer'),
+    ],
+    responses={
+        200: QCStateSerializer(many=True),
+        403: OpenApiResponse(description='Missing results.view permission'),
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@require_permission('results.view')
+def qc_status_view(request):
+    """
+    QC state per analyte and analyzer
+
+    GET /api/reports/qc/status?analyzer=COBAS-1
+
+    Response:
+    {
+        "results": [
+            {"analyzer": "COBAS-1", "exam_type_id": 12, "in_control": false, "expired": false,
+             "run_id": 801, "measured_at": "2026-03-01T07:30:00Z", "violations": ["1-2s", "2-2s"]}
+        ]
+    }
+    """
+    states = qc.get_qc_states().states
+    analyzer = request.query_params.get('analyzer')
+    if analyzer is not None:
+        states = {key: state for key, state in states.items() if key[0] == analyzer}
+    rows = _qc_state_rows(states, timezone.now())
+    return Response({'results': QCStateSerializer(rows, many=True).data})
+
+
+@extend_schema(
+    tags=['Quality Control'],
+    summary='Levey-Jennings Chart',
+    description='Target mean and ±1/2/3 SD lines of a QC lot, with its runs and their Westgard violations.',
+    parameters=[
+        OpenApiParameter(
+            'days', int,
+            description=f'Days of runs (default {qc.DEFAULT_CHART_DAYS}, max {qc.MAX_CHART_DAYS})'
+        ),
+    ],
+    responses={
+        200: OpenApiResponse(description='Chart data; points are [timestamp_ms, value, z_score, violations]'),
+        400: OpenApiResponse(description='Invalid days'),
+        403: OpenApiResponse(description='Missing results.view permission'),
+        404: OpenApiResponse(description='Lot not found'),
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@require_permission('results.view')
+def levey_jennings_view(request, lot_id):
+    """
+    Levey-Jennings chart of a QC lot
+
+    GET /api/reports/qc/lots/{lot_id}/levey-jennings?days=30
+
+    Response:
+    {
+        "lot_id": 3, "mean": 98.0, "sd": 2.5,
+        "limits": {"1s": [95.5, 100.5], "2s": [93.0, 103.0], "3s": [90.5, 105.5]},
+        "observed_mean": 98.6, "observed_sd": 2.2,
+        "points": [[1772350200000, 98.4, 0.16, []], ...]
+    }
+    """
+    lot = get_object_or_404(QCLot, id=lot_id)
+    try:
+        days = int(request.query_params.get('days', qc.DEFAULT_CHART_DAYS))
+    except ValueError:
+        return Response(
+            {'error': 'El parámetro days debe ser un número entero.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    days = max(1, min(days, qc.MAX_CHART_DAYS))
+    return Response(qc.levey_jennings(lot, timezone.now() - timedelta(days=days)))
@@ -58,7 +58,8 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    
+    'django.contrib.postgres',  # Trigram/full-text search lookups
+
     # Third-party apps
     'rest_framework',  # Django REST Framework for API
     'rest_framework_simplejwt',  # JWT authentication
@@ -300,6 +301,7 @@ SPECTACULAR_SETTINGS = {
         {'name': 'Patients', 'description': 'Patient records management'},
         {'name': 'Orders', 'description': 'Exam orders management'},
         {'name': 'Results', 'description': 'Exam results and reports'},
+        {'name': 'Quality Control', 'description': 'QC runs, Westgard rules and Levey-Jennings charts'},
         {'name': 'Billing', 'description': 'Invoices and payments'},
         {'name': 'Finance', 'description': 'Financial reports'},
         {'name': 'Branches', 'description': 'Branch management'},
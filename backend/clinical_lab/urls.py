@@ -46,9 +46,9 @@ urlpatterns = [
     
     # API endpoints - all apps will be added here as we build them
     path('api/auth/', include('apps.auth.urls', namespace='authentication')),
-    # path('api/patients/', include('apps.patients.urls')),
-    # path('api/exams/', include('apps.exams.urls')),
-    # path('api/reports/', include('apps.reports.urls')),
+    path('api/patients/', include('apps.patients.urls', namespace='patients')),
+    path('api/exams/', include('apps.exams.urls', namespace='exams')),
+    path('api/reports/', include('apps.reports.urls', namespace='reports')),
     # path('api/search/', include('apps.search.urls')),
     # path('api/billing/', include('apps.billing.urls')),
     # path('api/finance/', include('apps.finance.urls')),